@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""除權息還原效能量測：逐檔還原 vs 面板一次向量化，以及新增單一事件後的增量重算。
+
+於暫存目錄產生合成收盤面板（symbols × bars）與每檔每年一次現金股利、部分標的分割的事件表。
+
+使用範例:
+  python scripts/bench_adjust.py
+  python scripts/bench_adjust.py --symbols 2000 --bars 5000
+"""
+from __future__ import annotations
+import argparse, sys, pathlib, tempfile, time
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.data.adjust import ActionStore, AdjustedPanel, AdjustmentEngine, adjust_ohlcv
+
+
+def _timeit(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    p = argparse.ArgumentParser(description='corporate-action adjustment benchmark')
+    p.add_argument('--symbols', type=int, default=1000)
+    p.add_argument('--bars', type=int, default=5000, help='每標的列數（約 20 年日線）')
+    p.add_argument('--loop-sample', type=int, default=100, help='逐檔方式只量測前 N 檔再換算')
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range('2005-01-03', periods=args.bars, name='date')
+    symbols = [str(1000 + i) for i in range(args.symbols)]
+    close = pd.DataFrame(50 * np.exp(rng.normal(0, 0.015, (args.bars, args.symbols)).cumsum(axis=0)),
+                         index=idx, columns=symbols)
+    ex_dates = idx[::252][1:]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ActionStore(tmp)
+        for i, sym in enumerate(symbols):
+            events = pd.DataFrame({'date': ex_dates, 'kind': 'cash', 'value': rng.uniform(0.5, 3.0, len(ex_dates))})
+            if i % 10 == 0:
+                events.loc[len(events)] = [idx[args.bars // 2], 'split', 2.0]
+            store.add_many(sym, events)
+        n_events = sum(len(store.load(s)) for s in symbols[:10]) * args.symbols // 10
+
+        sample = symbols[:args.loop_sample]
+        loop = _timeit(lambda: [adjust_ohlcv(close[[s]].set_axis(['close'], axis=1), s, AdjustmentEngine(store))
+                                for s in sample]) * args.symbols / len(sample)
+        engine = AdjustmentEngine(store)
+        full = _timeit(lambda: engine.factors(close))
+        cached = _timeit(lambda: engine.factors(close))
+        store.add(symbols[7], idx[-10], 'cash', 1.0)
+        incremental = _timeit(lambda: engine.factors(close))
+        recomputed = list(engine.recomputed)
+        adj = AdjustedPanel({'close': close}, engine)
+        view = _timeit(lambda: adj['close'])
+
+        print(f"{args.symbols} symbols × {args.bars} bars, ~{n_events} events")
+        print(f"{'per-symbol adjust_ohlcv (extrapolated)':<42}{loop:>9.3f}s")
+        print(f"{'vectorized panel factors (cold)':<42}{full:>9.3f}s  ({loop / full:.1f}x)")
+        print(f"{'factors, no event changes':<42}{cached:>9.3f}s")
+        print(f"{'factors after 1 new event':<42}{incremental:>9.3f}s  (recomputed {recomputed})")
+        print(f"{'AdjustedPanel close (factors cached)':<42}{view:>9.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""代理訊息延遲量測（本地 MockAgentsClient，無需 Azure）：
+舊版同步固定 1.1 秒輪詢、逐一送給各代理 vs AgentOrchestrator 適應式輪詢 + 平行 fan-out。
+
+使用範例:
+  python scripts/bench_agents.py
+  python scripts/bench_agents.py --latency 0.08 --run-seconds 2.5 --concurrent 20
+"""
+from __future__ import annotations
+import argparse, asyncio, sys, pathlib, time
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.agents.orchestrator import MOCK_AGENTS, AgentOrchestrator, ClientPool, MockAgentsClient
+
+
+def _legacy_send(client: MockAgentsClient, agent_id: str, message: str) -> str:
+    """重現舊版 agent_message：同步呼叫、固定 1.1 秒 sleep 輪詢。"""
+    thread_id = client.create_thread()['id']
+    client.add_message(thread_id=thread_id, role='user', content=message)
+    run = client.create_run(thread_id=thread_id, agent_id=agent_id)
+    started = time.time()
+    status = run['status']
+    while status not in ('completed', 'failed', 'cancelled'):
+        if time.time() - started > 30:
+            break
+        time.sleep(1.1)
+        run = client.get_run(thread_id=thread_id, run_id=run['id'])
+        status = run['status']
+    client.list_messages(thread_id=thread_id)
+    return status
+
+
+def main():
+    p = argparse.ArgumentParser(description='agent orchestration latency benchmark')
+    p.add_argument('--latency', type=float, default=0.05, help='每次 SDK 呼叫延遲（秒）')
+    p.add_argument('--run-seconds', type=float, default=1.5, help='run 完成所需時間（秒）')
+    p.add_argument('--concurrent', type=int, default=12, help='同時進行的單一代理請求數')
+    args = p.parse_args()
+
+    agents = list(MOCK_AGENTS)
+    backend = MockAgentsClient(args.latency, args.run_seconds)
+    orch = AgentOrchestrator(ClientPool(lambda: backend, size=2, max_concurrency=16), MOCK_AGENTS)
+
+    t0 = time.perf_counter()
+    _legacy_send(backend, MOCK_AGENTS[agents[0]]['id'], 'hi')
+    legacy_one = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for a in agents:
+        _legacy_send(backend, MOCK_AGENTS[a]['id'], 'hi')
+    legacy_all = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    res = asyncio.run(orch.send(agents[0], 'hi'))
+    new_one = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    asyncio.run(orch.fan_out('hi'))
+    new_all = time.perf_counter() - t0
+
+    async def burst():
+        return await asyncio.gather(*(orch.send(agents[i % len(agents)], f"q{i}") for i in range(args.concurrent)))
+    t0 = time.perf_counter()
+    asyncio.run(burst())
+    new_burst = time.perf_counter() - t0
+
+    print(f"mock: call latency {args.latency * 1000:.0f} ms, run {args.run_seconds:.2f}s")
+    print(f"  single agent     legacy {legacy_one:6.2f}s   orchestrator {new_one:6.2f}s ({res['polls']} polls)")
+    print(f"  {len(agents)} agents         legacy {legacy_all:6.2f}s   fan-out      {new_all:6.2f}s")
+    print(f"  {args.concurrent} concurrent    legacy ~{legacy_one * args.concurrent:5.1f}s*  orchestrator {new_burst:6.2f}s")
+    print("  * 舊版每個請求阻塞 event loop，同時請求實際上依序執行（估計值）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""批次報表平行化效能量測：同一批回測結果以 1 個與 N 個 worker 產出報表並比較牆鐘時間。
+
+使用範例:
+  python scripts/bench_batch_reports.py
+  python scripts/bench_batch_reports.py --symbols 200 --bars 2500 --workers 8
+"""
+from __future__ import annotations
+import argparse, os, sys, pathlib, tempfile
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.backtest.engine import backtest_engine
+from src.app.features.indicators import momentum_signal
+from src.app.visual.batch import render_batch
+
+
+def main():
+    p = argparse.ArgumentParser(description='batch report benchmark')
+    p.add_argument('--symbols', type=int, default=40)
+    p.add_argument('--bars', type=int, default=2500)
+    p.add_argument('--workers', type=int, default=os.cpu_count())
+    p.add_argument('--max-points', type=int, default=2000)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    idx = pd.date_range('2015-01-01', periods=args.bars, freq='B')
+    results = {}
+    for i in range(args.symbols):
+        close = pd.Series(100 * np.exp(rng.standard_normal(args.bars).cumsum() * 0.01), index=idx)
+        results[f"S{i:04d}"] = backtest_engine(close.to_frame('close'), momentum_signal(close, 20))
+
+    for workers in sorted({1, args.workers}):
+        with tempfile.TemporaryDirectory() as d:
+            res = render_batch(results, d, workers=workers, max_points=args.max_points)
+            print(f"--- workers={workers}")
+            print(res.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""啟動匯入成本量測：以 ``python -X importtime`` 在乾淨子行程匯入各入口模組，列出總耗時與最重的模組。
+
+使用範例:
+  python scripts/bench_import_time.py
+  python scripts/bench_import_time.py --module src.web.app --top 25
+"""
+from __future__ import annotations
+import argparse, re, subprocess, sys, pathlib
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+ENTRY_MODULES = ['src.app.agents.tools', 'src.app.ops.run_daily', 'src.web.app']
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> tuple[list[tuple[str, int, int, int]], list[str]]:
+    """回傳 ([(模組, self_us, cumulative_us, 深度)], 已載入的重量級套件)。"""
+    code = (f"import {module}\n"
+            "from src.app.lazy import loaded_heavy_modules\n"
+            "print(','.join(loaded_heavy_modules()))")
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=_ROOT,
+                          capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    heavy = [h for h in proc.stdout.strip().split(',') if h]
+    return rows, heavy
+
+
+def total_ms(rows, module: str) -> float:
+    return next((cum for name, _, cum, _ in rows if name == module), 0) / 1000
+
+
+def main():
+    p = argparse.ArgumentParser(description='import-time benchmark')
+    p.add_argument('--module', action='append', help='入口模組（可重複）；預設量測 CLI / tools / web')
+    p.add_argument('--top', type=int, default=15)
+    args = p.parse_args()
+    for module in args.module or ENTRY_MODULES:
+        rows, heavy = import_profile(module)
+        print(f"=== {module}: {total_ms(rows, module):.1f} ms  heavy loaded: {heavy or 'none'}")
+        top_level = {}
+        for name, _, cum, depth in rows:
+            if depth <= 1:  # 直接相依的頂層套件
+                top_level[name] = max(top_level.get(name, 0), cum)
+        for name, cum in sorted(top_level.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {cum / 1000:9.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""遞迴平滑指標效能量測：驗證 EMA / Wilder RSI / MACD / ATR 隨 bar 數線性成長。
+
+輸出每個長度的總耗時與每百萬 bar 耗時 (ms/Mbar)；線性擴展時後者應大致持平。
+
+使用範例:
+  python scripts/bench_indicators.py
+  python scripts/bench_indicators.py --max-bars 10000000 --panel-cols 500
+"""
+from __future__ import annotations
+import argparse, sys, pathlib, time
+import numpy as np
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.features import smoothing
+
+
+def _timeit(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    p = argparse.ArgumentParser(description='遞迴平滑指標 benchmark')
+    p.add_argument('--max-bars', type=int, default=10_000_000)
+    p.add_argument('--panel-cols', type=int, default=500, help='2D 面板測試欄數 (總 bar 數同 max-bars)')
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= args.max_bars]
+    print(f"{'bars':>12} {'indicator':>10} {'sec':>9} {'ms/Mbar':>9}")
+    for n in sizes:
+        close = 100 + rng.standard_normal(n).cumsum() * 0.1
+        high, low = close + 0.5, close - 0.5
+        cases = {
+            'ema12': lambda: smoothing.ema(close, 12),
+            'rsi14': lambda: smoothing.rsi_wilder(close, 14),
+            'macd': lambda: smoothing.macd(close),
+            'atr14': lambda: smoothing.atr(high, low, close, 14),
+        }
+        for name, fn in cases.items():
+            sec = _timeit(fn, repeat=1 if n >= 10_000_000 else 3)
+            print(f"{n:>12,} {name:>10} {sec:>9.4f} {sec / n * 1e9:>9.1f}")
+
+    cols = args.panel_cols
+    rows = args.max_bars // cols
+    panel = 100 + rng.standard_normal((rows, cols)).cumsum(axis=0) * 0.1
+    sec = _timeit(lambda: smoothing.rsi_wilder(panel, 14), repeat=1)
+    print(f"panel {rows:,}x{cols} rsi14: {sec:.4f}s ({sec / panel.size * 1e9:.1f} ms/Mbar)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""日內重取樣效能量測：串流 BarResampler vs 一次載入後 pandas resample。
+
+合成 days 個交易日、每日 ticks 筆逐筆成交（09:00–13:30），以每日一個區塊餵入串流重取樣；
+對照組先把全部 tick 串接成一個 DataFrame 再 resample。回報 ticks/s（含產生合成資料）與 tracemalloc 峰值。
+
+使用範例:
+  python scripts/bench_intraday.py
+  python scripts/bench_intraday.py --days 250 --ticks 20000 --freq 1min
+"""
+from __future__ import annotations
+import argparse, sys, pathlib, time, tracemalloc
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.data.intraday import resample_stream
+from src.app.performance.metrics import infer_periods_per_year
+
+
+def _day_chunks(n_days: int, per_day: int):
+    rng = np.random.default_rng(0)
+    price = 100.0
+    for day in pd.bdate_range('2024-01-02', periods=n_days):
+        secs = np.sort(rng.uniform(0, 270 * 60, per_day))
+        px = price + rng.normal(0, 0.02, per_day).cumsum()
+        price = float(px[-1])
+        yield pd.DataFrame({'price': px, 'volume': rng.integers(1, 50, per_day)},
+                           index=day + pd.Timedelta(hours=9) + pd.to_timedelta(secs, unit='s'))
+
+
+def _measure(fn):
+    """耗時與記憶體分兩次量測（tracemalloc 本身會大幅拖慢執行）。"""
+    t0 = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def main():
+    p = argparse.ArgumentParser(description='intraday resampling benchmark')
+    p.add_argument('--days', type=int, default=20)
+    p.add_argument('--ticks', type=int, default=20000, help='每日 tick 數')
+    p.add_argument('--freq', default='5min')
+    args = p.parse_args()
+    n = args.days * args.ticks
+
+    def streaming():
+        return pd.concat(resample_stream(_day_chunks(args.days, args.ticks), args.freq))
+
+    def in_memory():
+        ticks = pd.concat(list(_day_chunks(args.days, args.ticks)))
+        parts = []
+        for day, g in ticks.groupby(ticks.index.normalize()):
+            r = g['price'].resample(args.freq, origin=day + pd.Timedelta(hours=9)).ohlc()
+            r['volume'] = g['volume'].resample(args.freq, origin=day + pd.Timedelta(hours=9)).sum()
+            parts.append(r.dropna())
+        return pd.concat(parts)
+
+    bars, t_stream, m_stream = _measure(streaming)
+    ref, t_mem, m_mem = _measure(in_memory)
+    assert np.allclose(bars.to_numpy(dtype=float), ref.to_numpy(dtype=float))
+    print(f"{n:,} ticks -> {len(bars):,} {args.freq} bars (periods/year {infer_periods_per_year(bars.index):,.0f})")
+    print(f"streaming  {t_stream:6.2f}s  {n / t_stream / 1e6:5.2f}M ticks/s  peak {m_stream / 2**20:7.1f} MB")
+    print(f"in-memory  {t_mem:6.2f}s  {n / t_mem / 1e6:5.2f}M ticks/s  peak {m_mem / 2**20:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
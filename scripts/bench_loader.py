@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""大檔 OHLCV 讀取效能量測：pandas 原讀法 vs pyarrow 型別化讀取（CSV / parquet / feather / 串流）。
+
+於暫存目錄產生合成多標的 CSV（symbols × bars 列），再轉存 parquet / feather；
+每個案例在獨立子行程執行，回報耗時、rows/s 與峰值記憶體增量（/proc VmHWM，僅 Linux）。
+
+使用範例:
+  python scripts/bench_loader.py
+  python scripts/bench_loader.py --symbols 500 --bars 5000
+  python scripts/bench_loader.py --csv data/export/all.csv
+"""
+from __future__ import annotations
+import argparse, json, subprocess, sys, pathlib, tempfile, time
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.backtest.data import convert_ohlcv
+
+CASES = {
+    'pandas csv (load_ohlcv_csv)': "df = data.load_ohlcv_csv(str(path)); n = len(df)",
+    'typed csv (load_ohlcv)': "df = data.load_ohlcv(path); n = len(df)",
+    'typed csv, close only': "df = data.load_ohlcv(path, columns=['close']); n = len(df)",
+    'parquet': "df = data.load_ohlcv(path.with_suffix('.parquet')); n = len(df)",
+    'feather (memory-map)': "df = data.load_ohlcv(path.with_suffix('.feather')); n = len(df)",
+    'streaming csv (iter_ohlcv)': "n = sum(len(c) for c in data.iter_ohlcv(path, block_size=4 << 20))",
+}
+
+_RUNNER = """
+import json, re, sys, time, pathlib
+sys.path.insert(0, {root!r})
+
+def hwm_kb():
+    # VmHWM 於 exec 時重設；ru_maxrss 會沿用 fork 前父行程的峰值
+    with open('/proc/self/status') as f:
+        return int(re.search(r'VmHWM:\\s+(\\d+)', f.read()).group(1))
+
+import pandas, pyarrow, pyarrow.csv, pyarrow.parquet, pyarrow.feather
+from src.app.backtest import data
+path = pathlib.Path({path!r})
+base = hwm_kb()
+t0 = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - t0
+peak = hwm_kb() - base
+print(json.dumps({{'rows': n, 'seconds': elapsed, 'peak_kb': peak}}))
+"""
+
+
+def _write_synthetic(path: pathlib.Path, n_symbols: int, n_bars: int) -> None:
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range('2000-01-03', periods=n_bars).strftime('%Y-%m-%d')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('date,symbol,open,high,low,close,volume\n')
+        for i in range(n_symbols):
+            c = 50 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+            pd.DataFrame({'date': idx, 'symbol': f"{1000 + i}", 'open': c.round(2), 'high': (c * 1.01).round(2),
+                          'low': (c * 0.99).round(2), 'close': c.round(2),
+                          'volume': rng.integers(0, 10 ** 7, n_bars)}).to_csv(f, header=False, index=False)
+
+
+def _run(path: pathlib.Path, stmt: str) -> dict:
+    code = _RUNNER.format(root=str(_ROOT), path=str(path), stmt=stmt)
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    p = argparse.ArgumentParser(description='OHLCV loader benchmark')
+    p.add_argument('--csv', help='既有多標的 CSV（預設產生合成資料）')
+    p.add_argument('--symbols', type=int, default=300)
+    p.add_argument('--bars', type=int, default=5000, help='每標的列數（約 20 年日線）')
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / 'ohlcv.csv'
+        if args.csv:
+            path.write_bytes(pathlib.Path(args.csv).read_bytes())
+        else:
+            t0 = time.perf_counter()
+            _write_synthetic(path, args.symbols, args.bars)
+            print(f"synthetic csv: {args.symbols * args.bars:,} rows in {time.perf_counter() - t0:.1f}s")
+        t0 = time.perf_counter()
+        for ext in ('.parquet', '.feather'):
+            convert_ohlcv(path, path.with_suffix(ext))
+        print(f"csv {path.stat().st_size / 2**20:.0f} MB; parquet {path.with_suffix('.parquet').stat().st_size / 2**20:.0f} MB; "
+              f"feather {path.with_suffix('.feather').stat().st_size / 2**20:.0f} MB (converted in {time.perf_counter() - t0:.1f}s)")
+        for name, stmt in CASES.items():
+            r = _run(path, stmt)
+            print(f"{name:30s} {r['seconds']:7.2f}s  {r['rows'] / r['seconds'] / 1e6:6.2f}M rows/s  "
+                  f"peak +{r['peak_kb'] / 1024:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""共用價格面板效能量測：每個 worker 各自讀 parquet 快取 vs attach 已發布的 memory-map 面板。
+
+於暫存目錄產生合成 parquet 快取（symbols 檔 × bars 根），發布一次面板後同時啟動 workers 個子行程，
+每個子行程取得 close / volume 面板並完整走訪一次。回報每個 worker 的耗時與記憶體：
+private 為該行程獨佔的實體記憶體，pss 為共用頁依行程數均攤後的份額（/proc/self/smaps_rollup，僅 Linux）。
+
+使用範例:
+  python scripts/bench_panel_store.py
+  python scripts/bench_panel_store.py --symbols 1000 --bars 5000 --workers 8
+"""
+from __future__ import annotations
+import argparse, json, subprocess, sys, pathlib, tempfile, time
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.data.panel_store import PanelStore
+from src.app.data.quality import load_cache_panel
+
+CASES = {
+    'parquet per worker (load_cache_panel)':
+        "panel = load_cache_panel(cache); arrays = [panel['close'].to_numpy(), panel['volume'].to_numpy()]",
+    'attach shared panel (PanelStore.current)':
+        "view = PanelStore(store).current(); arrays = [view.arrays['close'], view.arrays['volume']]",
+}
+
+_RUNNER = """
+import json, re, sys, time
+sys.path.insert(0, {root!r})
+
+def mem_kb():
+    with open('/proc/self/smaps_rollup') as f:
+        text = f.read()
+    get = lambda k: int(re.search(k + r':\\s+(\\d+)', text).group(1))
+    return get('Private_Clean') + get('Private_Dirty'), get('Pss')
+
+import numpy as np, pandas, pyarrow.parquet
+from src.app.data.panel_store import PanelStore
+from src.app.data.quality import load_cache_panel
+cache, store = {cache!r}, {store!r}
+sys.stdin.readline()   # 等待所有 worker 就緒後同時開始
+priv0, pss0 = mem_kb()
+t0 = time.perf_counter()
+{stmt}
+total = float(sum(a.sum() for a in arrays))   # 完整走訪一次
+elapsed = time.perf_counter() - t0
+priv1, pss1 = mem_kb()
+print(json.dumps({{'seconds': elapsed, 'private_kb': priv1 - priv0, 'pss_kb': pss1 - pss0, 'total': total}}))
+"""
+
+
+def _write_cache(root: pathlib.Path, n_symbols: int, n_bars: int) -> None:
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range('2005-01-03', periods=n_bars, name='date')
+    root.mkdir(parents=True, exist_ok=True)
+    for i in range(n_symbols):
+        c = 50 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+        pd.DataFrame({'open': c, 'high': c * 1.01, 'low': c * 0.99, 'close': c,
+                      'volume': rng.integers(0, 10 ** 7, n_bars).astype(float)},
+                     index=idx).to_parquet(root / f"{1000 + i}.parquet")
+
+
+def _run(cache: pathlib.Path, store: pathlib.Path, stmt: str, workers: int) -> list[dict]:
+    code = _RUNNER.format(root=str(_ROOT), cache=str(cache), store=str(store), stmt=stmt)
+    procs = [subprocess.Popen([sys.executable, '-c', code], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              text=True) for _ in range(workers)]
+    time.sleep(2.0)   # 讓子行程完成匯入
+    for proc in procs:
+        proc.stdin.write('\n')
+        proc.stdin.flush()
+    return [json.loads(proc.communicate()[0].strip().splitlines()[-1]) for proc in procs]
+
+
+def main():
+    p = argparse.ArgumentParser(description='shared panel store benchmark')
+    p.add_argument('--symbols', type=int, default=500)
+    p.add_argument('--bars', type=int, default=5000, help='每標的列數（約 20 年日線）')
+    p.add_argument('--workers', type=int, default=4)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache, store_root = pathlib.Path(tmp) / 'twse', pathlib.Path(tmp) / 'panels'
+        _write_cache(cache, args.symbols, args.bars)
+        store = PanelStore(store_root)
+        t0 = time.perf_counter()
+        store.publish(load_cache_panel(cache))
+        publish_s = time.perf_counter() - t0
+        print(f"{args.symbols} symbols × {args.bars} bars, {args.workers} workers; "
+              f"publish {publish_s:.2f}s ({store.attach().nbytes / 1024 ** 2:.1f} MB close+volume)")
+        print(f"{'case':<42}{'s/worker':>10}{'private MB':>12}{'pss MB':>10}{'total private MB':>18}")
+        for name, stmt in CASES.items():
+            rows = _run(cache, store.dir.parent, stmt, args.workers)
+            sec = np.mean([r['seconds'] for r in rows])
+            priv = np.mean([r['private_kb'] for r in rows]) / 1024
+            pss = np.mean([r['pss_kb'] for r in rows]) / 1024
+            print(f"{name:<42}{sec:>10.3f}{priv:>12.1f}{pss:>10.1f}{priv * args.workers:>18.1f}")
+
+        t0 = time.perf_counter()
+        store.publish(load_cache_panel(cache))
+        t1 = time.perf_counter()
+        view = store.current()
+        print(f"daily swap: publish {t1 - t0:.2f}s, worker re-attach {1000 * (time.perf_counter() - t1):.2f} ms "
+              f"(generation {view.generation}); unchanged current() "
+              f"{1e6 * _timeit(store.current):.1f} µs")
+
+
+def _timeit(fn, n: int = 1000) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+if __name__ == '__main__':
+    main()
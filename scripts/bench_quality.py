@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""資料品質掃描效能量測：讀取 parquet 快取組成面板 + 向量化掃描的耗時。
+
+未指定 --cache 時於暫存目錄產生合成快取（symbols 檔 × bars 根日線，含少量注入異常）。
+
+使用範例:
+  python scripts/bench_quality.py
+  python scripts/bench_quality.py --symbols 1000 --bars 6000
+  python scripts/bench_quality.py --cache data/raw/twse
+"""
+from __future__ import annotations
+import argparse, sys, pathlib, tempfile, time
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.data.quality import load_cache_panel, scan_panel, summarize_anomalies
+
+
+def _write_synthetic(root: pathlib.Path, n_symbols: int, n_bars: int) -> None:
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range('2000-01-03', periods=n_bars)
+    for i in range(n_symbols):
+        first = int(rng.integers(0, n_bars // 2))           # 不同上市日
+        n = n_bars - first
+        c = 50 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+        df = pd.DataFrame({'open': c, 'high': c * 1.01, 'low': c * 0.99, 'close': c,
+                           'volume': rng.integers(0, 5000, n).astype(float)}, index=idx[first:])
+        if i % 10 == 0:                                      # 注入缺漏與跳空
+            k = int(rng.integers(1, n - 5))
+            df = df.drop(df.index[k:k + 3])
+            df.iloc[k:, :4] *= 0.5
+        df.index.name = 'date'
+        df.to_parquet(root / f"{i:04d}.parquet")
+
+
+def main():
+    p = argparse.ArgumentParser(description='data quality scan benchmark')
+    p.add_argument('--cache', help='既有 parquet 快取目錄（預設產生合成資料）')
+    p.add_argument('--symbols', type=int, default=1000)
+    p.add_argument('--bars', type=int, default=5000, help='約 20 年日線')
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(args.cache) if args.cache else pathlib.Path(tmp)
+        if not args.cache:
+            t0 = time.perf_counter()
+            _write_synthetic(root, args.symbols, args.bars)
+            print(f"synthetic cache: {args.symbols:,} files in {time.perf_counter() - t0:.1f}s")
+
+        t0 = time.perf_counter()
+        panel = load_cache_panel(root)
+        t_load = time.perf_counter() - t0
+        shape = panel['close'].shape
+        t0 = time.perf_counter()
+        anomalies = scan_panel(panel)
+        t_scan = time.perf_counter() - t0
+        summary = summarize_anomalies(anomalies)
+        print(f"panel {shape[0]:,} dates x {shape[1]:,} symbols: load {t_load:.2f}s, scan {t_scan:.2f}s "
+              f"({shape[0] * shape[1] / t_scan / 1e6:.1f}M cells/s)")
+        print(f"{summary['anomalies']:,} anomalies in {summary['symbols_affected']:,} symbols: "
+              + ', '.join(f"{k}={v['runs']}" for k, v in summary['by_check'].items()))
+
+
+if __name__ == '__main__':
+    main()
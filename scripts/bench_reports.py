@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""報表降採樣效益量測：比較全點繪製與 max_points 降採樣的檔案大小與產出時間。
+
+產出 interactive_report (Plotly HTML)、data_report (Plotly HTML)、equity_curve.png (matplotlib)。
+
+使用範例:
+  python scripts/bench_reports.py
+  python scripts/bench_reports.py --bars 500000 --max-points 5000 --method minmax
+"""
+from __future__ import annotations
+import argparse, sys, pathlib, tempfile, time
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+import matplotlib
+matplotlib.use('Agg')
+
+from src.app.backtest.engine import backtest_engine
+from src.app.features.indicators import sma, rsi, momentum_signal, mean_reversion_signal
+from src.app.visual.report import plot_equity
+from src.app.visual.interactive_report import build_interactive_report
+from src.app.visual.data_report import build_data_report
+
+
+def _measure(fn) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    path = pathlib.Path(fn())
+    return time.perf_counter() - t0, path.stat().st_size
+
+
+def main():
+    p = argparse.ArgumentParser(description='report downsampling benchmark')
+    p.add_argument('--bars', type=int, default=300_000, help='分K 數量 (約 5 年 1 分K = 330k)')
+    p.add_argument('--max-points', type=int, default=5000)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    idx = pd.date_range('2020-01-02 09:00', periods=args.bars, freq='min')
+    close = pd.Series(500 * np.exp(rng.standard_normal(args.bars).cumsum() * 0.001), index=idx)
+    df = pd.DataFrame({'close': close, 'volume': rng.integers(1, 1000, args.bars)})
+    bt = backtest_engine(df, momentum_signal(close, 30))
+    inds = {'sma20': sma(close, 20), 'sma60': sma(close, 60), 'rsi14': rsi(close, 14),
+            'momentum_sig': momentum_signal(close, 30), 'meanrev_sig': mean_reversion_signal(close, 30)}
+
+    print(f"{args.bars:,} bars, max_points={args.max_points:,}")
+    print(f"{'artifact':>20} {'mode':>6} {'sec':>8} {'size':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        for mode, mp in [('full', None), ('ds', args.max_points)]:
+            out = tmp / mode
+            cases = {
+                'interactive_report': lambda: build_interactive_report(bt, out, max_points=mp),
+                'data_report': lambda: build_data_report(df, inds, 'BENCH', out, lookback=30, max_points=mp),
+                'equity_curve.png': lambda: plot_equity(bt, out, max_points=mp),
+            }
+            for name, fn in cases.items():
+                sec, size = _measure(fn)
+                print(f"{name:>20} {mode:>6} {sec:>8.2f} {size / 1e6:>10.2f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""即時風控監控效能量測：以隨機部位與隨機 tick 串流量測 RiskMonitor 每秒可處理的 tick 數，
+並與逐筆純量迴圈（should_halt）比較。
+
+使用範例:
+  python scripts/bench_risk_monitor.py
+  python scripts/bench_risk_monitor.py --symbols 500 --strategies 4 --ticks 1000000 --batch 10000
+"""
+from __future__ import annotations
+import argparse, sys, pathlib, time
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.ops.kill_switch import should_halt
+from src.app.ops.risk_monitor import RiskLimits, RiskMonitor
+
+
+def _scalar_loop(positions: pd.DataFrame, prices: pd.Series, sym: np.ndarray, px: np.ndarray) -> int:
+    """逐筆 tick 只重算受影響部位的純量基準（不含策略/全書層級）。"""
+    last = prices.to_dict()
+    by_sym: dict = {}
+    for i, s in enumerate(positions['symbol']):
+        by_sym.setdefault(s, []).append(i)
+    qty = positions['qty'].to_numpy()
+    cash = positions['capital'].to_numpy() - qty * positions['symbol'].map(last).to_numpy()
+    sod = cash + qty * positions['symbol'].map(last).to_numpy()
+    peak = sod.copy()
+    halted = np.zeros(len(qty), dtype=bool)
+    for s, p in zip(sym, px):
+        for i in by_sym.get(s, ()):
+            eq = cash[i] + qty[i] * p
+            if eq > peak[i]:
+                peak[i] = eq
+            if not halted[i] and should_halt(eq / sod[i] - 1, eq / peak[i] - 1):
+                halted[i] = True
+    return int(halted.sum())
+
+
+def main():
+    p = argparse.ArgumentParser(description='risk monitor benchmark')
+    p.add_argument('--symbols', type=int, default=500)
+    p.add_argument('--strategies', type=int, default=4)
+    p.add_argument('--ticks', type=int, default=1_000_000)
+    p.add_argument('--batch', type=int, default=10_000)
+    p.add_argument('--scalar-ticks', type=int, default=100_000, help='純量基準使用的 tick 數（0 表示略過）')
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    syms = np.array([f"S{i:04d}" for i in range(args.symbols)])
+    positions = pd.DataFrame({
+        'strategy': np.repeat([f"st{j}" for j in range(args.strategies)], args.symbols),
+        'symbol': np.tile(syms, args.strategies),
+        'qty': rng.integers(-500, 1000, args.symbols * args.strategies).astype(float),
+        'capital': 1e6,
+    })
+    prices = pd.Series(100.0, index=syms)
+    tick_sym = syms[rng.integers(0, args.symbols, args.ticks)]
+    tick_px = 100 * np.exp(rng.normal(0, 0.002, args.ticks))
+    limits = RiskLimits()
+
+    mon = RiskMonitor(positions, prices, limits, strategy_limits=limits, book_limits=limits)
+    t0 = time.perf_counter()
+    n_events = 0
+    for i in range(0, args.ticks, args.batch):
+        n_events += len(mon.update(tick_sym[i:i + args.batch], tick_px[i:i + args.batch]))
+    sec = time.perf_counter() - t0
+    print(f"vectorized: {args.ticks:,} ticks x {len(positions):,} positions (batch {args.batch:,}) "
+          f"in {sec:.3f}s ({args.ticks / sec:,.0f} ticks/s, {n_events} halt events)")
+
+    if args.scalar_ticks:
+        n = min(args.scalar_ticks, args.ticks)
+        t0 = time.perf_counter()
+        _scalar_loop(positions, prices, tick_sym[:n], tick_px[:n])
+        sec = time.perf_counter() - t0
+        print(f"scalar loop: {n:,} ticks in {sec:.3f}s ({n / sec:,.0f} ticks/s, positions only)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""API 回傳序列化效能量測：舊版 to_dict('records') + json vs 列式 / 欄式 + orjson / Arrow IPC，
+以及代理工具改傳 dataset handle（資料留在伺服器端，只回傳摘要）。
+
+使用範例:
+  python scripts/bench_serialize.py
+  python scripts/bench_serialize.py --daily 2520 --minute 330000 --repeat 3
+"""
+from __future__ import annotations
+import argparse, json, sys, pathlib, tempfile, time
+import numpy as np
+import pandas as pd
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.data import serialize
+from src.app.data.serialize import dumps, to_arrow_ipc, to_columnar, to_records
+from src.app.data.datasets import DatasetRegistry
+
+
+def _frame(n: int, freq: str) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    idx = pd.date_range('2015-01-01', periods=n, freq=freq, name='date')
+    close = 100 * np.exp(rng.standard_normal(n).cumsum() * 0.001)
+    return pd.DataFrame({'open': close, 'high': close * 1.001, 'low': close * 0.999, 'close': close,
+                         'volume': rng.integers(1000, 5000, n).astype(float)}, index=idx)
+
+
+def _legacy(df: pd.DataFrame) -> bytes:
+    return json.dumps(df.reset_index().to_dict(orient='records'), default=str).encode()
+
+
+def _handle_payload(df: pd.DataFrame, root: str) -> bytes:
+    # 每次量測用新的 registry 目錄，避免內容定址命中既有檔案
+    reg = DatasetRegistry(pathlib.Path(root) / f"r{time.perf_counter_ns()}")
+    return dumps(reg.describe(reg.put(df)))
+
+
+def _time(fn, repeat: int) -> tuple[float, int]:
+    best, size = float('inf'), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - t0)
+    return best, size
+
+
+def main():
+    p = argparse.ArgumentParser(description='serialization benchmark')
+    p.add_argument('--daily', type=int, default=2520, help='日線筆數 (約 10 年)')
+    p.add_argument('--minute', type=int, default=330_000, help='分K 筆數')
+    p.add_argument('--repeat', type=int, default=3)
+    args = p.parse_args()
+
+    cases = {
+        'legacy records+json': _legacy,
+        'records+dumps': lambda df: dumps(to_records(df)),
+        'columnar+dumps': lambda df: dumps(to_columnar(df, native=True)),
+    }
+    try:
+        import pyarrow  # noqa: F401
+        cases['arrow ipc'] = to_arrow_ipc
+        tmp = tempfile.TemporaryDirectory()
+        cases['dataset handle'] = lambda df: _handle_payload(df, tmp.name)
+    except ImportError:
+        print('(pyarrow 未安裝，略過 Arrow / dataset handle)')
+    print(f"orjson: {'yes' if serialize.orjson is not None else 'no (stdlib json fallback)'}")
+    for label, n, freq in (('daily', args.daily, 'B'), ('minute', args.minute, 'min')):
+        df = _frame(n, freq)
+        print(f"[{label}] {n:,} rows")
+        base = None
+        for name, fn in cases.items():
+            sec, size = _time(lambda: fn(df), args.repeat)
+            base = base or sec
+            print(f"  {name:<22} {sec * 1000:9.1f} ms  {size / 1e3:11.1f} KB  x{base / sec:5.1f}")
+
+
+if __name__ == '__main__':
+    main()
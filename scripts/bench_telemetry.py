@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""監控指標負擔量測：histogram.observe / stage() 單次成本，以及 MetricsMiddleware
+對一個極簡 ASGI 端點每次請求增加的延遲（確認可常駐於正式環境）。
+
+使用範例:
+  python scripts/bench_telemetry.py
+  python scripts/bench_telemetry.py --n 500000 --requests 50000
+"""
+from __future__ import annotations
+import argparse, asyncio, sys, pathlib, time
+from types import SimpleNamespace
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.ops.telemetry import STAGE_SECONDS, MetricsMiddleware, Registry, stage
+
+_ROUTE = SimpleNamespace(path='/api/bench')
+
+
+async def _endpoint(scope, receive, send):
+    scope['route'] = _ROUTE
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'{}'})
+
+
+async def _drive(app, n: int) -> float:
+    async def receive():
+        return {'type': 'http.request'}
+
+    async def send(msg):
+        pass
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await app({'type': 'http', 'method': 'GET', 'path': '/api/bench'}, receive, send)
+    return time.perf_counter() - t0
+
+
+def _per_call(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    fn(n)
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+def main():
+    p = argparse.ArgumentParser(description='telemetry overhead benchmark')
+    p.add_argument('--n', type=int, default=200_000, help='observe / stage 呼叫次數')
+    p.add_argument('--requests', type=int, default=20_000, help='ASGI 請求數')
+    args = p.parse_args()
+
+    child = STAGE_SECONDS.labels('bench')
+
+    def observe(n):
+        for i in range(n):
+            child.observe(0.003)
+
+    def labelled(n):
+        for i in range(n):
+            STAGE_SECONDS.labels('bench').observe(0.003)
+
+    def staged(n):
+        for i in range(n):
+            with stage('bench'):
+                pass
+
+    def baseline(n):
+        for i in range(n):
+            pass
+
+    base = _per_call(baseline, args.n)
+    print(f"histogram.observe:        {_per_call(observe, args.n) - base:7.0f} ns/call")
+    print(f"labels(...).observe:      {_per_call(labelled, args.n) - base:7.0f} ns/call")
+    print(f"with stage(...):          {_per_call(staged, args.n) - base:7.0f} ns/call")
+
+    plain = asyncio.run(_drive(_endpoint, args.requests))
+    wrapped = asyncio.run(_drive(MetricsMiddleware(_endpoint), args.requests))
+    extra_us = (wrapped - plain) / args.requests * 1e6
+    print(f"ASGI request: plain {plain / args.requests * 1e6:.2f} us, with middleware "
+          f"{wrapped / args.requests * 1e6:.2f} us (+{extra_us:.2f} us/request)")
+
+    reg = Registry()
+    h = reg.histogram('bench_seconds', '', ['route', 'status'])
+    for r in range(50):
+        for s in (200, 404, 500):
+            h.labels(f"/api/r{r}", s).observe(0.01)
+    t0 = time.perf_counter()
+    text = reg.render()
+    print(f"render 150 histogram series ({len(text.splitlines())} lines): "
+          f"{(time.perf_counter() - t0) * 1e3:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
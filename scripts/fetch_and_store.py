@@ -7,13 +7,17 @@
   - 產出: data/clean/{symbol}_{start}_{end}.parquet (或 csv)
   - 額外建立: data/raw/ 不動 (沿用 twse 快取)，此腳本聚焦乾淨輸出
   - 可加 --force 重新抓取 (忽略既有輸出)
+  - 大量回補: --symbols-file 清單檔 (每行一檔或 CSV 第一欄)，以 (symbol, 月份) 為單位多檔平行抓取，
+    全域限速，寫入 --store/{symbol}.parquet；完成的單位記錄於 --store/manifest.jsonl，
+    中斷後以同一指令重跑即從中斷處續跑（見 src/app/data/backfill.py）
 
 使用範例:
   python scripts/fetch_and_store.py --symbol 2330 --start 2024-05-01 --end 2024-05-20
   python scripts/fetch_and_store.py --symbol 2330 --source twse --format csv
+  python scripts/fetch_and_store.py --symbols-file universe.txt --start 2010-01-01 --source twse --workers 4 --rate 2
 """
 from __future__ import annotations
-import argparse, sys, pathlib
+import argparse, sys, pathlib, time
 from datetime import datetime, timedelta
 import pandas as pd
 
@@ -38,16 +42,58 @@ def fetch(symbol: str, start: str, end: str, source: str, refresh: bool=False) -
     return df
 
 
+def _progress_printer(interval: float = 5.0):
+    """終端機上原地更新同一行；輸出導向檔案時每 interval 秒印一行。"""
+    tty = sys.stderr.isatty()
+    last = [0.0]
+
+    def show(status):
+        now = time.monotonic()
+        if tty:
+            print('\r' + status.format(), end='', file=sys.stderr, flush=True)
+        elif now - last[0] >= interval or status.done == status.total:
+            last[0] = now
+            print(status.format(), file=sys.stderr, flush=True)
+    return show
+
+
+def bulk(args) -> None:
+    from src.app.data.backfill import backfill
+    from src.app.ops.universe import read_universe
+    symbols = [s.replace('.TW', '') for s in read_universe(args.symbols_file)]
+    if not symbols:
+        sys.exit(f"[error] {args.symbols_file} 沒有任何代碼")
+    try:
+        res = backfill(symbols, args.start, args.end, source=args.source, store=args.store,
+                       workers=args.workers, rate_per_sec=args.rate or None, progress=_progress_printer())
+    except KeyboardInterrupt:
+        print(f"\n[interrupted] 已完成的單位已記錄於 {args.store}/manifest.jsonl，重跑同一指令即可續跑",
+              file=sys.stderr)
+        sys.exit(130)
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    print(res.summary())
+
+
 def main():
     p = argparse.ArgumentParser(description='抓取股票 OHLCV 並存檔')
-    p.add_argument('--symbol', required=True, help='股票代碼 (例 2330 或 2330.TW)')
+    p.add_argument('--symbol', help='股票代碼 (例 2330 或 2330.TW)')
     p.add_argument('--start', default='2024-01-01')
     p.add_argument('--end', default=datetime.now().strftime('%Y-%m-%d'))
     p.add_argument('--source', default='yf', choices=['yf','twse'])
     p.add_argument('--format', default='parquet', choices=['parquet','csv'])
     p.add_argument('--force', action='store_true', help='若輸出已存在仍覆寫')
     p.add_argument('--refresh', action='store_true', help='對 twse 強制重新抓 (忽略快取)')
+    # 大量回補模式
+    p.add_argument('--symbols-file', help='代碼清單檔；指定時改為可續跑的大量回補模式')
+    p.add_argument('--store', default='data/backfill', help='回補模式輸出目錄 ({symbol}.parquet + manifest.jsonl)')
+    p.add_argument('--workers', type=int, default=4, help='回補模式同時處理的標的數')
+    p.add_argument('--rate', type=float, default=2.0, help='回補模式全域請求上限 (次/秒，0 為不限)')
     args = p.parse_args()
+    if args.symbols_file:
+        return bulk(args)
+    if not args.symbol:
+        p.error('需指定 --symbol 或 --symbols-file')
 
     out_dir = pathlib.Path('data/clean')
     out_dir.mkdir(parents=True, exist_ok=True)
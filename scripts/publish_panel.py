@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""將 TWSE parquet 快取組成面板並發布到共用面板存放區（data.panel_store）。
+
+每次執行發布一個新世代並原子切換 CURRENT；正在執行的 worker 下一次讀取時自動改用新資料，
+不需重啟。建議排在每日抓取（fetch_and_store / twse 快取更新）之後執行。
+
+使用範例:
+  python scripts/publish_panel.py
+  python scripts/publish_panel.py --fields close,volume,open,high,low
+  python scripts/publish_panel.py --symbols 2330,2317 --root data/panels --name universe
+"""
+from __future__ import annotations
+import argparse, sys, pathlib, time
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.app.config.settings import settings
+from src.app.data.panel_store import DEFAULT_FIELDS, PanelStore
+from src.app.data.quality import load_cache_panel
+
+
+def main():
+    p = argparse.ArgumentParser(description='發布共用價格面板（新世代）')
+    p.add_argument('--cache', default='data/raw/twse', help='parquet 快取目錄（每檔一個 {symbol}.parquet）')
+    p.add_argument('--symbols', default=None, help='只發布指定代碼，逗號分隔（預設全部）')
+    p.add_argument('--fields', default=','.join(DEFAULT_FIELDS), help='發布欄位，逗號分隔')
+    p.add_argument('--root', default=settings.panel_store_dir)
+    p.add_argument('--name', default='universe')
+    p.add_argument('--keep', type=int, default=2, help='保留的世代數')
+    args = p.parse_args()
+
+    symbols = [s.strip() for s in args.symbols.split(',') if s.strip()] if args.symbols else None
+    t0 = time.perf_counter()
+    panel = load_cache_panel(args.cache, symbols)
+    if panel['close'].empty:
+        sys.exit(f"[error] {args.cache} 沒有可用的 parquet 快取")
+    store = PanelStore(args.root, args.name, keep=args.keep)
+    gen = store.publish(panel, fields=[f.strip() for f in args.fields.split(',') if f.strip()])
+    view = store.attach(gen)
+    print(f"[ok] generation {gen}: {len(view.index)} dates × {len(view.symbols)} symbols, "
+          f"fields={view.fields}, {view.nbytes / 1024 ** 2:.1f} MB, {time.perf_counter() - t0:.2f}s -> {store.dir}")
+
+
+if __name__ == '__main__':
+    main()
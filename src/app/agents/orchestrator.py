@@ -0,0 +1,222 @@
+"""非同步代理執行協調：共用 client 池、適應式退避輪詢與多代理 fan-out。
+
+- ClientPool: 延遲建立 size 個 client 輪流使用，並以 semaphore 限制同時進行的 SDK 呼叫數；
+  同步 SDK 呼叫以 asyncio.to_thread 執行，不阻塞 event loop
+- AgentOrchestrator.send: 建立/沿用 thread -> 送出訊息 -> 建立 run -> 輪詢至完成；
+  輪詢間隔由 poll_initial 起以 poll_factor 倍增至 poll_max，短 run 很快回應、長 run 不狂打 API
+- AgentOrchestrator.fan_out: 同一訊息平行送給多個代理，單一代理失敗不影響其他
+- MockAgentsClient: 與 AgentsClient 相同介面的本地模擬（可設定呼叫延遲與 run 時間），
+  供未設定 Azure 時的後備回覆與延遲 benchmark 使用
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Iterable, List
+
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled', 'expired')
+
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    """SDK 物件（屬性）與 dict（鍵）皆可讀取。"""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def _status(run: Any) -> str:
+    status = _field(run, 'status', 'unknown')
+    return str(getattr(status, 'value', status)).lower()
+
+
+def message_text(content: Any) -> str:
+    """將 SDK 訊息內容（text / image 區塊列表或字串）轉為純文字。"""
+    if not isinstance(content, list):
+        return str(content)
+    texts = []
+    for c in content:
+        kind = _field(c, 'type')
+        if kind in ('output_text', 'input_text'):
+            texts.append(_field(c, 'text', ''))
+        elif kind == 'text':  # azure-ai-agents MessageTextContent: text.value
+            texts.append(str(_field(_field(c, 'text'), 'value', '')))
+        elif kind in ('output_image', 'image_file'):
+            texts.append('[image]')
+    return '\n'.join(texts) if texts else str(content)
+
+
+class MockAgentsClient:
+    """本地模擬 AgentsClient：每次呼叫延遲 call_latency 秒，run 於 run_seconds 後完成並回覆 echo 訊息。"""
+
+    def __init__(self, call_latency: float = 0.0, run_seconds: float = 0.0):
+        self.call_latency = call_latency
+        self.run_seconds = run_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._threads: Dict[str, List[dict]] = {}
+        self._runs: Dict[str, dict] = {}
+
+    def _call(self) -> None:
+        with self._lock:
+            self.calls += 1
+        if self.call_latency:
+            time.sleep(self.call_latency)
+
+    def create_thread(self) -> dict:
+        self._call()
+        thread_id = f"mock-thread-{uuid.uuid4().hex[:8]}"
+        with self._lock:
+            self._threads[thread_id] = []
+        return {'id': thread_id}
+
+    def add_message(self, thread_id: str, role: str, content: str) -> dict:
+        self._call()
+        msg = {'role': role, 'content': [{'type': 'input_text', 'text': content}]}
+        with self._lock:
+            self._threads.setdefault(thread_id, []).append(msg)
+        return msg
+
+    def create_run(self, thread_id: str, agent_id: str) -> dict:
+        self._call()
+        run = {'id': f"mock-run-{uuid.uuid4().hex[:8]}", 'thread_id': thread_id, 'agent_id': agent_id,
+               'status': 'queued', 'done_at': time.monotonic() + self.run_seconds}
+        with self._lock:
+            self._runs[run['id']] = run
+        return dict(run)
+
+    def get_run(self, thread_id: str, run_id: str) -> dict:
+        self._call()
+        with self._lock:
+            run = self._runs[run_id]
+            if run['status'] != 'completed' and time.monotonic() >= run['done_at']:
+                run['status'] = 'completed'
+                last = next((m for m in reversed(self._threads[thread_id]) if m['role'] == 'user'), None)
+                text = last['content'][0]['text'] if last else ''
+                agent = run['agent_id'].removeprefix('mock-')
+                self._threads[thread_id].append(
+                    {'role': 'assistant', 'content': [{'type': 'output_text', 'text': f"[mock:{agent}] 收到訊息：{text[:120]}"}]})
+            elif run['status'] == 'queued':
+                run['status'] = 'in_progress'
+            return dict(run)
+
+    def list_messages(self, thread_id: str) -> dict:
+        self._call()
+        with self._lock:
+            return {'data': list(self._threads.get(thread_id, []))}
+
+
+class ClientPool:
+    """共用 client 池：factory() 延遲呼叫，最多建立 size 個 client；同時進行的呼叫數上限為 max_concurrency。"""
+
+    def __init__(self, factory: Callable[[], Any], size: int = 1, max_concurrency: int = 8):
+        self._factory = factory
+        self._size = max(1, size)
+        self._clients: List[Any] = []
+        self._cycle = None
+        self._create_lock = threading.Lock()
+        self._max_concurrency = max_concurrency
+        self._sem: asyncio.Semaphore | None = None
+        self._sem_loop = None
+
+    def _next_client(self) -> Any:
+        with self._create_lock:
+            if len(self._clients) < self._size:
+                self._clients.append(self._factory())
+                return self._clients[-1]
+            if self._cycle is None:
+                self._cycle = itertools.cycle(self._clients)
+            return next(self._cycle)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # semaphore 綁定目前的 event loop（測試或 CLI 可能先後使用不同 loop）
+        loop = asyncio.get_running_loop()
+        if self._sem_loop is not loop:
+            self._sem, self._sem_loop = asyncio.Semaphore(self._max_concurrency), loop
+        return self._sem
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self._semaphore():
+            yield self._next_client()
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """在 worker thread 上執行 client.method(*args, **kwargs)。"""
+        async with self.acquire() as client:
+            return await asyncio.to_thread(getattr(client, method), *args, **kwargs)
+
+
+class AgentOrchestrator:
+    def __init__(self, pool: ClientPool, agents: Dict[str, Any], timeout: float = 30.0,
+                 poll_initial: float = 0.1, poll_max: float = 2.0, poll_factor: float = 1.6,
+                 history: int = 25):
+        self.pool = pool
+        self.agents = agents
+        self.timeout = timeout
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.poll_factor = poll_factor
+        self.history = history
+
+    def _agent_id(self, agent: str) -> str:
+        if agent not in self.agents:
+            raise KeyError(agent)
+        return _field(self.agents[agent], 'id')
+
+    async def wait_run(self, thread_id: str, run: Any, timeout: float | None = None) -> tuple[Any, int]:
+        """適應式退避輪詢至 run 結束或逾時；回傳 (最後的 run, 輪詢次數)。"""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        delay, polls = self.poll_initial, 0
+        run_id = _field(run, 'id')
+        while _status(run) not in TERMINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * self.poll_factor, self.poll_max)
+            run = await self.pool.call('get_run', thread_id=thread_id, run_id=run_id)
+            polls += 1
+        return run, polls
+
+    async def send(self, agent: str, message: str, thread_id: str | None = None,
+                   timeout: float | None = None) -> Dict[str, Any]:
+        agent_id = self._agent_id(agent)
+        t0 = time.perf_counter()
+        if not thread_id:
+            thread = await self.pool.call('create_thread')
+            thread_id = _field(thread, 'id', 'unknown')
+        await self.pool.call('add_message', thread_id=thread_id, role='user', content=message)
+        run = await self.pool.call('create_run', thread_id=thread_id, agent_id=agent_id)
+        run, polls = await self.wait_run(thread_id, run, timeout)
+        resp = await self.pool.call('list_messages', thread_id=thread_id)
+        items = _field(resp, 'data', resp if isinstance(resp, list) else [])
+        messages = [{'role': str(_field(m, 'role')), 'content': message_text(_field(m, 'content'))} for m in items]
+        return {'agent': agent, 'thread_id': thread_id, 'run_status': _status(run), 'polls': polls,
+                'seconds': round(time.perf_counter() - t0, 3), 'messages': messages[-self.history:]}
+
+    async def fan_out(self, message: str, agents: Iterable[str] | None = None,
+                      timeout: float | None = None) -> Dict[str, Dict[str, Any]]:
+        """同一訊息平行送給多個代理（預設全部），各自建立新 thread。"""
+        names = list(agents) if agents else list(self.agents)
+        results = await asyncio.gather(*(self.send(n, message, timeout=timeout) for n in names),
+                                       return_exceptions=True)
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, res in zip(names, results):
+            if isinstance(res, BaseException):
+                out[name] = {'agent': name, 'run_status': 'error', 'error': f"{type(res).__name__}: {res}"}
+            else:
+                out[name] = res
+        return out
+
+
+MOCK_AGENTS = {
+    'data_qa_agent': {'id': 'mock-data_qa_agent'},
+    'pm_risk_agent': {'id': 'mock-pm_risk_agent'},
+    'execution_agent': {'id': 'mock-execution_agent'},
+}
+
+
+__all__ = ['AgentOrchestrator', 'ClientPool', 'MockAgentsClient', 'MOCK_AGENTS', 'message_text',
+           'TERMINAL_STATUSES']
@@ -48,7 +48,7 @@ def ensure_agents() -> dict:
 
     created = {}
     for name, instructions in [
-        ("data_qa_agent", "你是資料品質代理，負責檢查缺漏、異常、特徵一致性。"),
+        ("data_qa_agent", "你是資料品質代理，負責檢查缺漏、異常、特徵一致性；以 scan_data_quality 工具取得異常表後再解讀。"),
         ("pm_risk_agent", "你是投組與風控代理，根據策略輸出目標權重與風控限制。"),
         ("execution_agent", "你是執行代理，未來會透過 OpenAPI/MCP 下單；現階段模擬輸出委託建議。"),
     ]:
@@ -2,20 +2,36 @@
 所有函式需保持 pure（副作用僅限檔案輸出），可被 Azure Agent Service 包裝。
 """
 from __future__ import annotations
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 import numpy as np
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
 
+from ..lazy import lazy_module
 from ..data.fetch import fetch_ohlcv_yf
-from ..data.twse import fetch_twse_range_cached
-from ..backtest.engine import backtest_engine
-from ..features.indicators import momentum_signal
-from ..performance.metrics import basic_report
+from ..backtest.cache import backtest_cache
+from ..data.serialize import from_payload, to_columnar, to_records
+from ..data.datasets import DatasetRegistry
+from ..data import quality
+from ..config.settings import settings
+from ..strategies.base import MomentumStrategy
 from ..visual.report import plot_equity
 from ..visual.interactive_report import build_interactive_report
 
+# twse 模組於載入時即需 requests/backoff，延遲到第一次呼叫
+twse = lazy_module('..data.twse', __package__)
+
+# fetch 工具只回傳 handle + 摘要，價格資料留在伺服器端供 compute 工具以 handle 取用
+datasets = DatasetRegistry(
+    'data/datasets',
+    ttl_seconds=settings.dataset_ttl_minutes * 60,
+    max_bytes=int(settings.dataset_max_mb * 1024 ** 2),
+)
+
+# compute 工具的資料參數：dataset handle（建議）或 records / 欄式 payload（相容舊呼叫）
+DatasetArg = Union[str, List[Dict[str, Any]], Dict[str, Any]]
+
 
 def ping() -> str:
     """健康檢查：回傳 'pong'。"""
@@ -34,40 +50,71 @@ def calc_sharpe(values: List[float]) -> float:
     return float(np.sqrt(252) * arr.mean() / arr.std())
 
 
-def fetch_prices(symbol: str, start: str, end: str) -> Dict[str, Any]:
-    df = fetch_ohlcv_yf(symbol, start, end)
-    return {
-        "symbol": symbol,
-        "start": start,
-        "end": end,
-        "records": df.reset_index().to_dict(orient='records')
-    }
+def _price_payload(df: pd.DataFrame, symbol: str, start: str, end: str, format: str, source: str) -> Dict[str, Any]:
+    if format == 'handle':
+        handle = datasets.put(df, symbol=symbol, source=source)
+        return datasets.describe(handle)
+    out: Dict[str, Any] = {"symbol": symbol, "start": start, "end": end}
+    if format == 'columns':
+        out["columns"] = to_columnar(df)
+    else:
+        out["records"] = to_records(df)
+    return out
 
 
-def run_simple_backtest(records: List[Dict[str, Any]], lookback: int = 5) -> Dict[str, Any]:
-    df = pd.DataFrame(records)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.set_index('date')
-    # 簡易動能策略
-    positions = momentum_signal(df['close'], lookback)
-    bt = backtest_engine(df, positions)
-    rpt = basic_report(bt)
+def _resolve(dataset: DatasetArg) -> pd.DataFrame:
+    if isinstance(dataset, str):
+        return datasets.get(dataset)
+    return from_payload(dataset)
+
+
+def fetch_prices(symbol: str, start: str, end: str, format: str = 'handle') -> Dict[str, Any]:
+    """預設回傳 dataset handle 與摘要統計（資料留在伺服器端）；
+    format='records' / 'columns' 則回傳完整列式 / 欄式資料。"""
+    df = fetch_ohlcv_yf(symbol, start, end)
+    return _price_payload(df, symbol, start, end, format, source='yf')
+
+
+def describe_dataset(dataset: str) -> Dict[str, Any]:
+    """查詢 dataset handle 的摘要統計與剩餘存活秒數。"""
+    return datasets.describe(dataset)
+
+
+def scan_data_quality(dataset: DatasetArg | None = None, symbols: List[str] | None = None,
+                      max_rows: int = 50) -> Dict[str, Any]:
+    """資料品質掃描（缺漏 / 價格區間異常 / 非正價格 / 零成交量 / 跳空 / 重複報價）。
+    dataset 為 fetch 工具回傳的 handle 時掃描該資料；否則掃描 TWSE parquet 快取（symbols 可限定標的）。
+    回傳摘要、前 max_rows 筆異常，以及完整異常表的 dataset handle。"""
+    if dataset is not None:
+        name = datasets.describe(dataset).get('symbol', dataset) if isinstance(dataset, str) else 'dataset'
+        anomalies = quality.scan_frame(_resolve(dataset), symbol=name)
+    else:
+        anomalies = quality.scan_panel(quality.load_cache_panel(twse.CACHE_DIR, symbols))
+    out: Dict[str, Any] = {'summary': quality.summarize_anomalies(anomalies),
+                           'anomalies': to_records(anomalies.head(max_rows), index_label=None)}
+    if len(anomalies):
+        out['dataset'] = datasets.put(anomalies, kind='quality_anomalies')
+    return out
+
+
+def run_simple_backtest(dataset: DatasetArg, lookback: int = 5) -> Dict[str, Any]:
+    """dataset: fetch 工具回傳的 handle（亦接受 records / 欄式 payload）。"""
+    df = _resolve(dataset)
+    # 簡易動能策略；同資料同參數直接取回先前結果
+    res = backtest_cache.run(df, MomentumStrategy(lookback))
+    bt, rpt = res.bt, res.report
     out_dir = Path('reports') / datetime.now().strftime('%Y%m%d')
     chart_path = plot_equity(bt, out_dir)
     return {
         "report": rpt,
         "chart": chart_path,
-        "tail": bt.tail().reset_index().to_dict(orient='records')
+        "tail": to_records(bt.tail())
     }
 
 
-def generate_interactive_report(records: List[Dict[str, Any]], lookback: int = 5) -> Dict[str, Any]:
-    """執行簡單回測並輸出互動報表，回傳報表路徑。"""
-    df = pd.DataFrame(records)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.set_index('date')
-    positions = momentum_signal(df['close'], lookback)
-    bt = backtest_engine(df, positions)
+def generate_interactive_report(dataset: DatasetArg, lookback: int = 5) -> Dict[str, Any]:
+    """執行簡單回測並輸出互動報表，回傳報表路徑。dataset 同 run_simple_backtest。"""
+    bt = backtest_cache.run(_resolve(dataset), MomentumStrategy(lookback)).bt
     out_dir = Path('reports') / datetime.now().strftime('%Y%m%d')
     html_path = build_interactive_report(bt, out_dir)
     return {"interactive_report": html_path}
@@ -79,20 +126,17 @@ user_functions = [
     mean,
     calc_sharpe,
     fetch_prices,
+    describe_dataset,
+    scan_data_quality,
     run_simple_backtest,
     # TWSE
 ]
 
 
-def fetch_twse_price(symbol: str, start: str, end: str, refresh: bool = False):
-    """抓取台灣證交所日線資料（有 parquet 快取）。"""
-    df = fetch_twse_range_cached(symbol, start, end, refresh=refresh)
-    return {
-        "symbol": symbol,
-        "start": start,
-        "end": end,
-        "records": df.reset_index().to_dict(orient='records')
-    }
+def fetch_twse_price(symbol: str, start: str, end: str, refresh: bool = False, format: str = 'handle'):
+    """抓取台灣證交所日線資料（有 parquet 快取）；回傳格式同 fetch_prices。"""
+    df = twse.fetch_twse_range_cached(symbol, start, end, refresh=refresh)
+    return _price_payload(df, symbol, start, end, format, source='twse')
 
 user_functions.append(fetch_twse_price)
 user_functions.append(generate_interactive_report)
@@ -0,0 +1,144 @@
+"""回測結果快取：同一資料、同一策略參數、同一成本設定 → 同一結果，直接回傳不重算。
+
+鍵 = 價格資料內容指紋 (frame_fingerprint) + 策略類別與參數 + 成本 (settings 的
+tx_fee_bps / tx_tax_bps / slippage_bps) + CACHE_VERSION 與 pandas / numpy 版本。
+
+- 兩層：行程內保留最近的 max_resident 筆結果；磁碟以 ArtifactCache 存 {root}/backtest/{key}.pkl
+  （原子寫入、依容量與存活時間淘汰），web worker、背景工作與 CLI 共用
+- verify=True 時命中也會重算，並逐位元比對回測表、部位、交易明細與績效，不一致即拋出 AssertionError
+- 回傳的 DataFrame 為快取內同一份物件，呼叫端不應原地修改
+
+    res = backtest_cache.run(df, MomentumStrategy(lookback=5))
+    res.report, res.bt, res.cached
+"""
+from __future__ import annotations
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import settings
+from ..data.fingerprint import frame_fingerprint, params_fingerprint
+from ..performance.metrics import basic_report
+from ..visual.artifacts import ArtifactCache
+from .engine import backtest_engine
+from .ledger import extract_trades
+
+# 回測引擎、交易明細或績效計算邏輯變更時遞增，使既有結果失效
+CACHE_VERSION = 1
+
+
+@dataclass
+class BacktestResult:
+    bt: pd.DataFrame
+    positions: pd.Series
+    trades: pd.DataFrame
+    report: Dict[str, Any]
+    key: str
+    cached: bool = False
+
+
+def strategy_spec(strategy) -> Dict[str, Any]:
+    """策略類別（含模組路徑）與參數；策略可設 version 屬性使舊結果失效。"""
+    cls = type(strategy)
+    params = {k: v for k, v in vars(strategy).items() if not k.startswith('_')}
+    return {'class': f"{cls.__module__}.{cls.__qualname__}", 'params': params,
+            'version': getattr(strategy, 'version', 1)}
+
+
+def cost_settings() -> Dict[str, float]:
+    return {'fee_bps': settings.tx_fee_bps, 'tax_bps': settings.tx_tax_bps, 'slippage_bps': settings.slippage_bps}
+
+
+def run_backtest(df: pd.DataFrame, strategy, costs: Dict[str, float]) -> tuple[pd.Series, pd.DataFrame, pd.DataFrame, dict]:
+    """部位 -> 回測 -> 交易明細 -> 績效（與 run_daily.run_pipeline 相同定義）。"""
+    positions = strategy.generate_positions(df)
+    bt = backtest_engine(df, positions, costs['fee_bps'], costs['tax_bps'], costs['slippage_bps'])
+    trades = extract_trades(positions, df['close'], cost_bps=sum(costs.values()))
+    return positions, bt, trades, basic_report(bt, trades)
+
+
+def _parts(positions, bt, trades, report) -> Dict[str, str]:
+    return {'bt': frame_fingerprint(bt), 'positions': frame_fingerprint(positions),
+            'trades': frame_fingerprint(trades), 'report': params_fingerprint(report)}
+
+
+class BacktestCache:
+    def __init__(self, root: str | Path = 'data/backtests', max_bytes: int = 1024 ** 3,
+                 max_age_seconds: float = 30 * 86400, max_resident: int = 32, verify: bool = False):
+        self.store = ArtifactCache(root, max_bytes=max_bytes, max_age_seconds=max_age_seconds)
+        self.max_resident = max_resident
+        self.verify = verify
+        self._resident: OrderedDict[str, BacktestResult] = OrderedDict()
+        self.memory_hits = 0
+
+    def params(self, strategy, costs: Dict[str, float]) -> Dict[str, Any]:
+        return {'strategy': strategy_spec(strategy), 'costs': costs, 'version': CACHE_VERSION,
+                'pandas': pd.__version__, 'numpy': np.__version__}
+
+    def key(self, df: pd.DataFrame, strategy, costs: Dict[str, float] | None = None) -> str:
+        return self.store.key('backtest', df, self.params(strategy, costs or cost_settings()))
+
+    def _remember(self, key: str, res: BacktestResult) -> None:
+        self._resident[key] = res
+        self._resident.move_to_end(key)
+        while len(self._resident) > self.max_resident:
+            self._resident.popitem(last=False)
+
+    def run(self, df: pd.DataFrame, strategy, costs: Dict[str, float] | None = None,
+            verify: bool | None = None) -> BacktestResult:
+        """回傳 BacktestResult；cached 表示來自記憶體或磁碟。資料只雜湊一次，鍵同時用於兩層。"""
+        costs = costs or cost_settings()
+        data_fp = frame_fingerprint(df)
+        params = self.params(strategy, costs)
+        key = self.store.key('backtest', data_fp, params)
+        res = self._resident.get(key)
+        cached = res is not None
+        if cached:
+            self.memory_hits += 1
+        else:
+            computed: Dict[str, Any] = {}
+
+            def render(tmp_dir: Path) -> Path:
+                computed['out'] = run_backtest(df, strategy, costs)
+                path = tmp_dir / 'result.pkl'
+                with open(path, 'wb') as f:
+                    pickle.dump(computed['out'], f, protocol=pickle.HIGHEST_PROTOCOL)
+                return path
+
+            path, cached = self.store.get_or_render('backtest', data_fp, params, render, suffix='.pkl')
+            if cached:
+                with open(path, 'rb') as f:
+                    computed['out'] = pickle.load(f)
+            positions, bt, trades, report = computed['out']
+            res = BacktestResult(bt, positions, trades, report, key)
+        self._remember(key, res)
+        if cached and (self.verify if verify is None else verify):
+            self.check(df, strategy, costs, res)
+        return replace(res, cached=cached)
+
+    def check(self, df: pd.DataFrame, strategy, costs: Dict[str, float], res: BacktestResult) -> None:
+        """重算並逐位元比對；不一致時拋出 AssertionError（列出不一致的部分）。"""
+        expected = _parts(*run_backtest(df, strategy, costs))
+        got = _parts(res.positions, res.bt, res.trades, res.report)
+        bad = [k for k in expected if expected[k] != got[k]]
+        if bad:
+            raise AssertionError(f"回測快取 {res.key} 與重算結果不一致: {bad}")
+
+    def clear_memory(self) -> None:
+        self._resident.clear()
+
+
+backtest_cache = BacktestCache(
+    settings.backtest_cache_dir,
+    max_bytes=int(settings.backtest_cache_max_mb * 1024 ** 2),
+    verify=settings.backtest_cache_verify,
+)
+
+
+__all__ = ['BacktestCache', 'BacktestResult', 'backtest_cache', 'run_backtest', 'strategy_spec', 'cost_settings',
+           'CACHE_VERSION']
@@ -1,9 +1,219 @@
 # 資料處理與回測用 data.py
+"""OHLCV 讀檔。
+
+load_ohlcv_csv: 原本的 pandas 讀法（型別推斷、float64 / object 欄位），適合小檔。
+
+load_ohlcv / iter_ohlcv: 大檔（多年、多標的匯出，數 GB）用的型別化讀取
+- 明確 schema：價格 float32、成交量 int64、symbol 為 categorical（dictionary），日期直接解析為 timestamp
+- CSV 以 pyarrow 多執行緒 CSV 引擎解析；欄名大小寫不拘（輸出一律小寫）
+- 欄位投影 (columns) 只解析需要的欄位；日期區間 (start / end) 與 symbols 篩選
+- parquet / feather 快速路徑：parquet 以 row group 統計值下推篩選，feather 以 memory-map 讀取
+- iter_ohlcv 以固定大小的區塊串流，記憶體上限與檔案大小無關；convert_ohlcv 串流轉存為 parquet / feather
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
 import pandas as pd
 
+from ..lazy import lazy_module
+
+pa = lazy_module('pyarrow')
+pacsv = lazy_module('pyarrow.csv')
+pc = lazy_module('pyarrow.compute')
+pq = lazy_module('pyarrow.parquet')
+feather = lazy_module('pyarrow.feather')
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+_PARQUET = ('.parquet', '.pq')
+_FEATHER = ('.feather', '.arrow', '.ipc')
+
+
 def load_ohlcv_csv(path: str) -> pd.DataFrame:
     df = pd.read_csv(path)
     df.columns = [c.lower() for c in df.columns]
     df['date'] = pd.to_datetime(df['date'])
     df = df.set_index('date')
     return df
+
+
+def ohlcv_schema(price_type: str = 'float32') -> Dict[str, object]:
+    """小寫欄名 -> pyarrow 型別。"""
+    price = pa.float32() if price_type == 'float32' else pa.float64()
+    return {'date': pa.timestamp('s'), 'symbol': pa.dictionary(pa.int32(), pa.string()),
+            **{c: price for c in PRICE_COLUMNS}, 'volume': pa.int64()}
+
+
+def _kind(path: Path) -> str:
+    suffixes = [s.lower() for s in path.suffixes]
+    if suffixes and suffixes[-1] in _PARQUET:
+        return 'parquet'
+    if suffixes and suffixes[-1] in _FEATHER:
+        return 'feather'
+    return 'csv'
+
+
+def _csv_header(path: Path, delimiter: str) -> List[str]:
+    # 只解析第一個區塊取得欄名（支援 .gz 等壓縮檔）
+    reader = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=1 << 16),
+                            parse_options=pacsv.ParseOptions(delimiter=delimiter))
+    return list(reader.schema.names)
+
+
+def _csv_options(path: Path, columns: Iterable[str] | None, price_type: str, delimiter: str, block_size: int):
+    header = _csv_header(path, delimiter)
+    lower = {name.lower(): name for name in header}
+    wanted = [c.lower() for c in columns] if columns is not None else list(lower)
+    # 與 _select 相同：去除重複欄位（symbols 篩選會自動補上 symbol 欄）
+    wanted = list(dict.fromkeys(wanted if 'date' in wanted else ['date', *wanted]))
+    missing = [c for c in wanted if c not in lower]
+    if missing:
+        raise KeyError(f"{path} 缺少欄位: {missing}（現有: {header}）")
+    schema = ohlcv_schema(price_type)
+    convert = pacsv.ConvertOptions(
+        column_types={lower[c]: schema[c] for c in wanted if c in schema},
+        include_columns=[lower[c] for c in wanted],
+        timestamp_parsers=[pacsv.ISO8601, '%Y/%m/%d'],
+    )
+    read = pacsv.ReadOptions(block_size=block_size, use_threads=True)
+    return read, pacsv.ParseOptions(delimiter=delimiter), convert
+
+
+def _filter_expr(start, end, symbols):
+    conds = []
+    if start is not None:
+        conds.append(pc.field('date') >= pa.scalar(pd.Timestamp(start), pa.timestamp('s')))
+    if end is not None:
+        end_ts = pd.Timestamp(end)
+        if end_ts == end_ts.normalize():  # 只給日期：包含當日全部時間
+            conds.append(pc.field('date') < pa.scalar(end_ts + pd.Timedelta(days=1), pa.timestamp('s')))
+        else:
+            conds.append(pc.field('date') <= pa.scalar(end_ts, pa.timestamp('s')))
+    if symbols is not None:
+        conds.append(pc.field('symbol').cast(pa.string()).isin([str(s) for s in symbols]))
+    if not conds:
+        return None
+    expr = conds[0]
+    for c in conds[1:]:
+        expr = expr & c
+    return expr
+
+
+def _apply(table, expr):
+    """欄名轉小寫、symbol 統一為 dictionary，並套用篩選。"""
+    table = table.rename_columns([n.lower() for n in table.schema.names])
+    if 'symbol' in table.column_names and not pa.types.is_dictionary(table.schema.field('symbol').type):
+        i = table.column_names.index('symbol')
+        table = table.set_column(i, 'symbol', pc.dictionary_encode(table.column(i)))
+    if expr is not None and table.num_rows:
+        table = table.filter(expr)
+    return table
+
+
+def _to_frame(table, index: str | None = 'date') -> pd.DataFrame:
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    if index and index in df.columns:
+        df = df.set_index(index)
+        if df.index.dtype != 'datetime64[ns]':
+            df.index = df.index.astype('datetime64[ns]')
+    return df
+
+
+def _select(columns: Iterable[str] | None, names: List[str]) -> List[str] | None:
+    if columns is None:
+        return None
+    lower = {n.lower(): n for n in names}
+    wanted = [c.lower() for c in columns]
+    return [lower[c] for c in dict.fromkeys(['date', *wanted]) if c in lower]
+
+
+def iter_ohlcv_tables(path: str | Path, columns: Iterable[str] | None = None, start=None, end=None,
+                      symbols: Iterable[str] | None = None, price_type: str = 'float32',
+                      block_size: int = 64 << 20, delimiter: str = ','):
+    """串流讀取，逐批產出已篩選的 pyarrow.Table（欄名小寫）。"""
+    path = Path(path)
+    if symbols is not None and columns is not None:
+        columns = [*columns, 'symbol']
+    expr = _filter_expr(start, end, symbols)
+    kind = _kind(path)
+    if kind == 'csv':
+        read, parse, convert = _csv_options(path, columns, price_type, delimiter, block_size)
+        with pacsv.open_csv(path, read_options=read, parse_options=parse, convert_options=convert) as reader:
+            for batch in reader:
+                table = _apply(pa.Table.from_batches([batch]), expr)
+                if table.num_rows:
+                    yield table
+    elif kind == 'parquet':
+        pf = pq.ParquetFile(path)
+        cols = _select(columns, pf.schema_arrow.names)
+        for batch in pf.iter_batches(batch_size=max(1, block_size // 64), columns=cols):
+            table = _apply(pa.Table.from_batches([batch]), expr)
+            if table.num_rows:
+                yield table
+    else:
+        table = feather.read_table(path, memory_map=True)
+        cols = _select(columns, table.schema.names)
+        if cols is not None:
+            table = table.select(cols)
+        for batch in table.to_batches(max_chunksize=max(1, block_size // 64)):
+            out = _apply(pa.Table.from_batches([batch]), expr)
+            if out.num_rows:
+                yield out
+
+
+def iter_ohlcv(path: str | Path, columns: Iterable[str] | None = None, start=None, end=None,
+               symbols: Iterable[str] | None = None, price_type: str = 'float32',
+               block_size: int = 64 << 20, delimiter: str = ',') -> Iterator[pd.DataFrame]:
+    """串流讀取，逐批產出 index=date 的 DataFrame；block_size 為 CSV 每批位元組數（其他格式換算為列數）。"""
+    for table in iter_ohlcv_tables(path, columns, start, end, symbols, price_type, block_size, delimiter):
+        yield _to_frame(table)
+
+
+def load_ohlcv(path: str | Path, columns: Iterable[str] | None = None, start=None, end=None,
+               symbols: Iterable[str] | None = None, price_type: str = 'float32',
+               delimiter: str = ',', index: str | None = 'date') -> pd.DataFrame:
+    """一次讀入（csv / parquet / feather 依副檔名）。columns 只需列出 date 以外的欄位；
+    以 symbols 篩選時一併讀入 symbol 欄。"""
+    path = Path(path)
+    kind = _kind(path)
+    expr = _filter_expr(start, end, symbols)
+    if symbols is not None and columns is not None:
+        columns = [*columns, 'symbol']
+    if kind == 'csv':
+        read, parse, convert = _csv_options(path, columns, price_type, delimiter, 1 << 24)
+        table = pacsv.read_csv(path, read_options=read, parse_options=parse, convert_options=convert)
+    elif kind == 'parquet':
+        table = pq.read_table(path, columns=_select(columns, pq.read_schema(path).names), filters=expr)
+        expr = None  # 已於讀取時依 row group 統計值下推
+    else:
+        table = feather.read_table(path, memory_map=True)
+        cols = _select(columns, table.schema.names)
+        if cols is not None:
+            table = table.select(cols)
+    return _to_frame(_apply(table, expr), index)
+
+
+def convert_ohlcv(src: str | Path, dst: str | Path, price_type: str = 'float32',
+                  block_size: int = 64 << 20, delimiter: str = ',') -> Path:
+    """CSV 串流轉存為 parquet / feather（依 dst 副檔名），之後以快速路徑讀取。"""
+    dst = Path(dst)
+    kind = _kind(dst)
+    writer = None
+    try:
+        for table in iter_ohlcv_tables(src, price_type=price_type, block_size=block_size, delimiter=delimiter):
+            if kind == 'feather' and 'symbol' in table.column_names:
+                # IPC 檔案格式不允許各批字典不同：以字串儲存，讀取時再轉 dictionary
+                table = table.set_column(table.column_names.index('symbol'), 'symbol',
+                                         table.column('symbol').cast(pa.string()))
+            if writer is None:
+                writer = (pq.ParquetWriter(dst, table.schema) if kind == 'parquet'
+                          else pa.ipc.new_file(dst, table.schema))
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return dst
+
+
+__all__ = ['load_ohlcv_csv', 'load_ohlcv', 'iter_ohlcv', 'iter_ohlcv_tables', 'convert_ohlcv', 'ohlcv_schema',
+           'PRICE_COLUMNS']
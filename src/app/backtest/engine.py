@@ -19,3 +19,23 @@ def backtest_engine(df: pd.DataFrame, positions: pd.Series, tx_fee_bps=2, tx_tax
     df['ret'] = df['ret'] - df['cost'] / df['close']
     df['equity'] = (1 + df['ret']).cumprod()
     return df[['ret', 'equity', 'turnover', 'cost']]
+
+
+def backtest_matrix(close, positions, tx_fee_bps=2, tx_tax_bps=3, slippage_bps=1):
+    """
+    向量化版 backtest_engine：一次計算多組部位的逐 bar 淨報酬。
+    close: (dates × symbols) 收盤價（DataFrame 或陣列）
+    positions: (..., dates, symbols) 部位陣列，例如 (configs × dates × symbols)
+    回傳與 positions 同形狀的 ret；定義與 backtest_engine 相同（權益為 cumprod(1 + ret)）。
+    """
+    c = np.asarray(close, dtype=float)
+    c = c.reshape(len(c), -1)
+    pos = np.nan_to_num(np.asarray(positions, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fwd = np.zeros_like(c)
+        fwd[:-1] = c[1:] / c[:-1] - 1
+        fwd = np.nan_to_num(fwd, nan=0.0, posinf=np.inf, neginf=-np.inf)
+        turnover = np.zeros_like(pos)
+        turnover[..., 1:, :] = np.abs(np.diff(pos, axis=-2))
+        cost = turnover * (tx_fee_bps + tx_tax_bps + slippage_bps) / 10000 * c
+        return fwd * pos - cost / c
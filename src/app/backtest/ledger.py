@@ -0,0 +1,101 @@
+"""交易明細 (trade ledger)：由部位序列/矩陣向量化萃取來回交易 (round-trip)。
+
+定義與 backtest_engine 一致：部位 p_t 賺取 close_t -> close_{t+1} 的報酬，
+故一段連續且相同的非零部位 [i, j] 視為一筆交易：
+  - 進場：第 i 根收盤
+  - 出場：第 j+1 根收盤（部位改變的那根）；若持有至最後一根則以最後收盤計且 is_open=True
+  - bars：持有部位的根數 j - i + 1（未平倉者同樣計入最後一根）
+  - pnl：size * (exit_price / entry_price - 1)，不含成本
+  - cost：(進場 + 出場) 換手 × 總成本 bps，與引擎相同以報酬比例表示
+部位由 +1 直接翻為 -1 時，視為一筆平倉加一筆新倉。
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+LEDGER_COLUMNS = [
+    'symbol', 'side', 'size', 'entry_date', 'exit_date', 'entry_price', 'exit_price',
+    'bars', 'pnl', 'cost', 'net_pnl', 'is_open',
+]
+
+
+def _align(positions: pd.Series | pd.DataFrame, close: pd.Series | pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    if isinstance(positions, pd.DataFrame):
+        if isinstance(close, pd.Series):
+            raise ValueError("部位為矩陣時 close 亦需為同欄位的 DataFrame")
+        c = close.reindex(index=positions.index, columns=positions.columns)
+        return positions.fillna(0).to_numpy(dtype=float), c.to_numpy(dtype=float)
+    pos = positions.reindex(close.index).fillna(0)
+    return pos.to_numpy(dtype=float).reshape(-1, 1), close.to_numpy(dtype=float).reshape(-1, 1)
+
+
+def extract_trades(positions: pd.Series | pd.DataFrame, close: pd.Series | pd.DataFrame, cost_bps: float = 0.0) -> pd.DataFrame:
+    """將部位序列 (index=date) 或矩陣 (dates × symbols) 轉為交易明細 DataFrame。
+
+    cost_bps: 單邊總成本（手續費 + 稅 + 滑價，基點）
+    回傳欄位見 LEDGER_COLUMNS；Series 輸入時 symbol 取 positions.name。
+    """
+    P, C = _align(positions, close)
+    index = positions.index if isinstance(positions, pd.DataFrame) else close.index
+    n, m = P.shape
+    if n == 0:
+        return pd.DataFrame(columns=LEDGER_COLUMNS)
+    prev = np.vstack([np.zeros((1, m)), P[:-1]])
+    nxt = np.vstack([P[1:], np.zeros((1, m))])
+    held = P != 0
+    # 轉置後 nonzero 為欄優先排序，起訖點可逐欄一一配對
+    start_col, start_row = np.nonzero((held & (P != prev)).T)
+    _, end_row = np.nonzero((held & (P != nxt)).T)
+
+    is_open = end_row == n - 1
+    exit_row = np.where(is_open, end_row, end_row + 1)
+    size = P[start_row, start_col]
+    entry_price = C[start_row, start_col]
+    exit_price = C[exit_row, start_col]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pnl = size * (exit_price / entry_price - 1.0)
+    cost = np.abs(size) * cost_bps / 10000 * np.where(is_open, 1.0, 2.0)
+
+    if isinstance(positions, pd.DataFrame):
+        symbol = np.asarray(positions.columns)[start_col]
+    else:
+        symbol = np.full(len(start_row), positions.name, dtype=object)
+    return pd.DataFrame({
+        'symbol': symbol,
+        'side': np.sign(size).astype(int),
+        'size': size,
+        'entry_date': index[start_row],
+        'exit_date': index[exit_row],
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'bars': exit_row - start_row + is_open,
+        'pnl': pnl,
+        'cost': cost,
+        'net_pnl': pnl - cost,
+        'is_open': is_open,
+    }, columns=LEDGER_COLUMNS)
+
+
+def signal_flips(positions: pd.Series) -> tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+    """部位直接由空翻多 (buy) 或由多翻空 (sell) 的時間點；經過 0 不算翻轉。"""
+    p = positions.fillna(0).to_numpy(dtype=float)
+    prev = np.concatenate([[0.0], p[:-1]])
+    buy = (p > 0) & (prev < 0)
+    sell = (p < 0) & (prev > 0)
+    return positions.index[buy], positions.index[sell]
+
+
+def flip_events(close: pd.Series, buy_idx, sell_idx) -> list[dict]:
+    """將買賣點轉為依日期排序的 [{'type','date','price'}] 清單（API 回傳格式）。"""
+    dates = pd.DatetimeIndex(buy_idx).append(pd.DatetimeIndex(sell_idx))
+    types = np.array(['BUY'] * len(buy_idx) + ['SELL'] * len(sell_idx), dtype=object)
+    prices = close.reindex(dates).to_numpy(dtype=float)
+    order = np.argsort(dates.to_numpy(), kind='stable')
+    return pd.DataFrame({
+        'type': types[order],
+        'date': dates[order].strftime('%Y-%m-%d'),
+        'price': prices[order],
+    }).to_dict(orient='records')
+
+
+__all__ = ['LEDGER_COLUMNS', 'extract_trades', 'signal_flips', 'flip_events']
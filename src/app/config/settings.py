@@ -11,5 +11,33 @@ class Settings:
     tx_fee_bps: float = float(os.getenv("TX_FEE_BPS", 2.8))
     tx_tax_bps: float = float(os.getenv("TX_TAX_BPS", 30.0))
     slippage_bps: float = float(os.getenv("SLIPPAGE_BPS", 5.0))
+    # 報表每條曲線點數上限（0 表示不降採樣）
+    chart_max_points: int = int(os.getenv("CHART_MAX_POINTS", 5000))
+    # reports/cache 報表快取上限
+    report_cache_max_mb: float = float(os.getenv("REPORT_CACHE_MAX_MB", 512))
+    report_cache_max_age_days: float = float(os.getenv("REPORT_CACHE_MAX_AGE_DAYS", 7))
+    # 背景工作佇列：worker process 數與同時進行（排隊 + 執行）的工作上限
+    job_workers: int = int(os.getenv("JOB_WORKERS", 2))
+    job_max_pending: int = int(os.getenv("JOB_MAX_PENDING", 32))
+    # 回測結果快取 (data/backtests)：容量上限；VERIFY=1 時命中也重算並逐位元比對
+    backtest_cache_dir: str = os.getenv("BACKTEST_CACHE_DIR", "data/backtests")
+    backtest_cache_max_mb: float = float(os.getenv("BACKTEST_CACHE_MAX_MB", 1024))
+    backtest_cache_verify: bool = os.getenv("BACKTEST_CACHE_VERIFY", "0").lower() in ("1", "true", "yes")
+    # 跨行程共用價格面板 (memory-map)，每日更新發布新世代
+    panel_store_dir: str = os.getenv("PANEL_STORE_DIR", "data/panels")
+    # 除權息 / 分割事件表 (每檔一個 CSV)；ADJUST_PRICES=0 時每日流程使用未還原價格
+    corporate_actions_dir: str = os.getenv("CORPORATE_ACTIONS_DIR", "data/corporate_actions")
+    adjust_prices: bool = os.getenv("ADJUST_PRICES", "1").lower() not in ("0", "false", "no")
+    # 代理工具資料集 (data/datasets) 閒置存活時間與容量上限
+    dataset_ttl_minutes: float = float(os.getenv("DATASET_TTL_MINUTES", 60))
+    dataset_max_mb: float = float(os.getenv("DATASET_MAX_MB", 2048))
+    # 代理協調：client 池大小、同時進行的 SDK 呼叫上限、單次 run 等待秒數
+    agent_pool_size: int = int(os.getenv("AGENT_POOL_SIZE", 2))
+    agent_max_concurrency: int = int(os.getenv("AGENT_MAX_CONCURRENCY", 8))
+    agent_run_timeout: float = float(os.getenv("AGENT_RUN_TIMEOUT", 30))
+    # 交易日曆臨時異動（颱風停市、補行交易等），CSV: date,kind[,close]
+    calendar_file: str = os.getenv("TWSE_CALENDAR_FILE", "data/calendar/twse.csv")
+    # /api/metrics：是否以 middleware 記錄每個端點的延遲
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
 
 settings = Settings()
@@ -0,0 +1,312 @@
+"""除權息 / 分割還原：事件表 + 累積調整因子，以原始價格面板為底按需產生還原價。
+
+TWSE 快取存的是未還原價格，除權息日與分割日的價格跳動會讓 momentum_signal 與回測報酬
+出現假訊號。本模組採向後還原（與 yfinance Adj Close 相同）：除權息日之前的價格乘上因子，
+最新價格維持原值。
+
+- 事件表：每檔一個 {root}/{symbol}.csv，欄位 date,kind,value（date 為除權息 / 生效日）
+    cash    現金股利（元 / 股）       價格因子 1 - value / 前一日收盤
+    stock   股票股利（配股率，股 / 股） 價格因子 1 / (1 + value)，成交量反向調整
+    split   分割 / 減資（新股數 / 舊股數）價格因子 1 / value，成交量反向調整
+    factor  直接指定的價格因子
+- 因子：事件依除權息日定位後以 np.multiply.at 放入 (dates × symbols) 步階矩陣，
+  再沿時間軸反向累乘一次，所有標的同時計算
+- AdjustmentEngine 依標的快取因子：只有事件表變動的標的重算；面板只往後延伸時，
+  沒有待生效事件的標的只補 1，不重算歷史
+- AdjustedPanel 包住原始面板（{field: DataFrame} 或 panel_store.PanelView），欄位於存取時才計算
+- yfinance（auto_adjust=False）的價格已依抓取當下已知的分割 / 配股還原；unadjust_splits 依事件表
+  換回原始價格，與 TWSE 同基準後再還原，避免分割重複套用
+
+    actions.add('2330', '2024-06-13', 'cash', 4.0)
+    adjusted = AdjustedPanel(load_cache_panel('data/raw/twse'))
+    adjusted['close'], adjusted.frame('volume', start='2024-01-01')
+    df = adjust_ohlcv(df, '2330')          # 單檔 OHLCV
+"""
+from __future__ import annotations
+import hashlib
+import io
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import settings
+
+KINDS = ('cash', 'stock', 'split', 'factor')
+EVENT_COLUMNS = ['date', 'kind', 'value']
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+
+def _core(symbol: str) -> str:
+    return str(symbol).replace('.TW', '')
+
+
+def _empty_events() -> pd.DataFrame:
+    return pd.DataFrame({'date': pd.DatetimeIndex([]), 'kind': pd.Series([], dtype=object),
+                         'value': pd.Series([], dtype=float)})
+
+
+class ActionStore:
+    """每檔一個小型 CSV 事件表；寫入為原子取代，同一 (date, kind) 以後寫入者為準。"""
+
+    def __init__(self, root: str | Path = 'data/corporate_actions'):
+        self.root = Path(root)
+
+    def path(self, symbol: str) -> Path:
+        return self.root / f"{_core(symbol)}.csv"
+
+    def symbols(self) -> List[str]:
+        return sorted(p.stem for p in self.root.glob('*.csv')) if self.root.exists() else []
+
+    def read(self, symbol: str) -> bytes | None:
+        try:
+            return self.path(symbol).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def fingerprint(self, symbol: str) -> str | None:
+        """事件表內容指紋；沒有事件表時為 None。"""
+        return _fingerprint(self.read(symbol))
+
+    def load(self, symbol: str) -> pd.DataFrame:
+        path = self.path(symbol)
+        if not path.exists():
+            return _empty_events()
+        df = pd.read_csv(path, dtype={'kind': str, 'value': float})
+        return _normalize(df)
+
+    def add(self, symbol: str, date, kind: str, value: float) -> pd.DataFrame:
+        return self.add_many(symbol, pd.DataFrame({'date': [date], 'kind': [kind], 'value': [value]}))
+
+    def add_many(self, symbol: str, events: pd.DataFrame) -> pd.DataFrame:
+        """合併新事件並寫回；回傳更新後的事件表。"""
+        merged = _normalize(pd.concat([self.load(symbol), _normalize(events)], ignore_index=True))
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{uuid.uuid4().hex}.csv"
+        merged.assign(date=merged['date'].dt.strftime('%Y-%m-%d')).to_csv(tmp, index=False)
+        os.replace(tmp, self.path(symbol))
+        return merged
+
+    def remove(self, symbol: str) -> None:
+        self.path(symbol).unlink(missing_ok=True)
+
+
+def _normalize(events: pd.DataFrame) -> pd.DataFrame:
+    df = events[EVENT_COLUMNS].copy()
+    df['date'] = pd.to_datetime(df['date']).dt.normalize()
+    df['kind'] = df['kind'].astype(str).str.strip().str.lower()
+    df['value'] = df['value'].astype(float)
+    bad = sorted(set(df['kind']) - set(KINDS))
+    if bad:
+        raise ValueError(f"未知的事件種類 {bad}；可用 {KINDS}")
+    df = df.drop_duplicates(['date', 'kind'], keep='last')
+    return df.sort_values(['date', 'kind'], kind='stable').reset_index(drop=True)
+
+
+def _fingerprint(data: bytes | None) -> str | None:
+    return None if data is None else hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _parse(data: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """事件表 CSV -> (日期, 種類, 數值) 陣列。add_many 寫出的標準格式直接以 numpy 解析
+    （每檔只需數十微秒）；手動編輯的非標準內容退回 pandas 完整正規化。"""
+    lines = [line.strip() for line in data.decode('utf-8').splitlines() if line.strip()]
+    if lines and lines[0] == ','.join(EVENT_COLUMNS):
+        try:
+            rows = [line.split(',') for line in lines[1:]]
+            if not rows:
+                return np.array([], dtype='datetime64[D]'), np.array([], dtype=object), np.array([])
+            dates, kinds, values = zip(*rows)
+            kinds = np.array(kinds, dtype=object)
+            if set(kinds) <= set(KINDS) and len(set(zip(dates, kinds))) == len(rows):   # 重複事件交給 pandas 去重
+                return np.array(dates, dtype='datetime64[D]'), kinds, np.array(values, dtype=float)
+        except ValueError:
+            pass
+    df = _normalize(pd.read_csv(io.BytesIO(data), dtype={'kind': str, 'value': float}))
+    dates = df['date'].to_numpy().astype('datetime64[D]')
+    return dates, df['kind'].to_numpy(dtype=object), df['value'].to_numpy(dtype=float)
+
+
+def cumulative_factors(index: pd.DatetimeIndex, close: np.ndarray, cols: np.ndarray, dates: np.ndarray,
+                       kinds: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """事件（欄位序號, 除權息日, 種類, 數值）-> (價格因子, 股數因子)，皆為 (dates × symbols)。
+
+    第 i 列的因子為除權息日晚於 index[i] 的所有事件比率乘積；除權息日晚於資料最後一天
+    （尚未生效）或之前沒有收盤價可參考的現金股利不套用。
+    """
+    T, S = close.shape
+    step_price = np.ones((T + 1, S))
+    step_shares = np.ones((T + 1, S))
+    if len(cols):
+        pos = index.searchsorted(pd.DatetimeIndex(dates), 'left')
+        # 現金股利以除息日前最後一個有效收盤計算（停牌日不影響）
+        last = pd.DataFrame(close).ffill().to_numpy()
+        prev = np.where(pos > 0, last[np.maximum(pos - 1, 0), cols], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price = np.select([kinds == 'cash', kinds == 'stock', kinds == 'split'],
+                              [1 - values / prev, 1 / (1 + values), 1 / values], values)
+        shares = np.where((kinds == 'stock') | (kinds == 'split'), price, 1.0)
+        ok = (pos > 0) & (pos < T) & np.isfinite(price) & (price > 0)
+        np.multiply.at(step_price, (pos[ok], cols[ok]), price[ok])
+        np.multiply.at(step_shares, (pos[ok], cols[ok]), shares[ok])
+    # factor[i] = prod(step[i+1:])：反向累乘後去掉第一列
+    price_f = np.cumprod(step_price[::-1], axis=0)[::-1][1:]
+    shares_f = np.cumprod(step_shares[::-1], axis=0)[::-1][1:]
+    return price_f, shares_f
+
+
+class AdjustmentEngine:
+    def __init__(self, store: ActionStore | None = None):
+        self.store = store or actions
+        # symbol -> (事件指紋, 計算時的 index, 價格因子, 股數因子, 最後一個事件日)
+        self._cache: Dict[str, tuple] = {}
+        self.recomputed: List[str] = []
+
+    def _reusable(self, entry: tuple, index: pd.DatetimeIndex, prefix: Dict[int, bool]) -> bool:
+        _, old, _, _, last_event = entry
+        key = id(old)
+        if key not in prefix:
+            prefix[key] = len(old) <= len(index) and old.equals(index[:len(old)])
+        if not prefix[key]:
+            return False
+        # 面板往後延伸時，原本尚未生效的事件可能已生效 -> 必須重算
+        return len(old) == len(index) or pd.isna(last_event) or last_event <= old[-1]
+
+    def factors(self, close: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """close 為原始收盤面板 (dates × symbols)；回傳與其對齊的 (價格因子, 股數因子)。"""
+        index = pd.DatetimeIndex(close.index)
+        symbols = [_core(s) for s in close.columns]
+        T = len(index)
+        price_f = np.ones((T, len(symbols)))
+        shares_f = np.ones((T, len(symbols)))
+        stale: Dict[int, tuple] = {}
+        prefix: Dict[int, bool] = {}
+        fps: Dict[int, str] = {}
+        for j, sym in enumerate(symbols):
+            data = self.store.read(sym)
+            if data is None:
+                self._cache.pop(sym, None)
+                continue
+            fp = fps[j] = _fingerprint(data)
+            entry = self._cache.get(sym)
+            if entry is not None and entry[0] == fp and self._reusable(entry, index, prefix):
+                n = len(entry[1])
+                price_f[:n, j] = entry[2]
+                shares_f[:n, j] = entry[3]
+            else:
+                stale[j] = _parse(data)
+        self.recomputed = [symbols[j] for j in stale]
+        if stale:
+            cols = list(stale)
+            parts = [stale[j] for j in cols]
+            p, s = cumulative_factors(
+                index, close.iloc[:, cols].to_numpy(dtype=float),
+                np.repeat(np.arange(len(cols)), [len(d) for d, _, _ in parts]),
+                np.concatenate([d for d, _, _ in parts]), np.concatenate([k for _, k, _ in parts]),
+                np.concatenate([v for _, _, v in parts]))
+            price_f[:, cols] = p
+            shares_f[:, cols] = s
+            for k, j in enumerate(cols):
+                dates = parts[k][0]
+                self._cache[symbols[j]] = (fps[j], index, p[:, k].copy(), s[:, k].copy(),
+                                           pd.Timestamp(dates.max()) if len(dates) else pd.NaT)
+        return (pd.DataFrame(price_f, index=close.index, columns=close.columns),
+                pd.DataFrame(shares_f, index=close.index, columns=close.columns))
+
+    def invalidate(self, symbols: Iterable[str] | None = None) -> None:
+        if symbols is None:
+            self._cache.clear()
+        for s in symbols or ():
+            self._cache.pop(_core(s), None)
+
+
+class AdjustedPanel:
+    """原始面板的還原視圖：價格欄位乘價格因子、volume 除以股數因子；每個欄位第一次存取時才計算。"""
+
+    def __init__(self, raw, engine: AdjustmentEngine | None = None):
+        self._raw: Dict[str, pd.DataFrame] = raw.panel() if hasattr(raw, 'panel') else raw
+        self.engine = engine or adjustment_engine
+        self._factors: Tuple[pd.DataFrame, pd.DataFrame] | None = None
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self._raw)
+
+    @property
+    def factors(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        if self._factors is None:
+            self._factors = self.engine.factors(self._raw['close'])
+        return self._factors
+
+    def frame(self, name: str, start=None, end=None) -> pd.DataFrame:
+        out = self._frames.get(name)
+        if out is None:
+            raw = self._raw[name]
+            price_f, shares_f = self.factors
+            if name in PRICE_FIELDS:
+                out = raw * price_f.to_numpy()
+            elif name == 'volume':
+                out = raw / shares_f.to_numpy()
+            else:
+                out = raw
+            self._frames[name] = out
+        return out.loc[start:end] if start is not None or end is not None else out
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        return self.frame(name)
+
+    def panel(self) -> Dict[str, pd.DataFrame]:
+        return {name: self.frame(name) for name in self._raw}
+
+
+def adjust_ohlcv(df: pd.DataFrame, symbol: str, engine: AdjustmentEngine | None = None) -> pd.DataFrame:
+    """單檔 OHLCV 還原；沒有事件表時原樣回傳（不複製）。"""
+    engine = engine or adjustment_engine
+    if df.empty or 'close' not in df.columns or engine.store.fingerprint(symbol) is None:
+        return df
+    price_f, shares_f = engine.factors(df[['close']].set_axis([_core(symbol)], axis=1))
+    out = df.copy()
+    for col in PRICE_FIELDS:
+        if col in out.columns:
+            out[col] = out[col].to_numpy(dtype=float) * price_f.iloc[:, 0].to_numpy()
+    if 'volume' in out.columns:
+        out['volume'] = out['volume'].to_numpy(dtype=float) / shares_f.iloc[:, 0].to_numpy()
+    return out
+
+
+def unadjust_splits(df: pd.DataFrame, symbol: str, store: ActionStore | None = None, asof=None) -> pd.DataFrame:
+    """分割 / 配股已還原的 OHLCV（yfinance）-> 原始價格；asof（預設今天）之前生效的 stock / split 事件皆已套用。"""
+    store = store or actions
+    data = store.read(symbol)
+    if df.empty or data is None:
+        return df
+    dates, kinds, values = _parse(data)
+    keep = (kinds == 'stock') | (kinds == 'split')
+    if not keep.any():
+        return df
+    asof = pd.Timestamp.today().normalize() if asof is None else pd.Timestamp(asof)
+    index = pd.DatetimeIndex(df.index)
+    # 末端補一個晚於 asof 的哨兵列，使最後一筆資料之後、asof 之前生效的事件也計入
+    sentinel = max(asof, index[-1]) + pd.Timedelta(1, 'ns')
+    price_f, shares_f = cumulative_factors(index.append(pd.DatetimeIndex([sentinel])), np.ones((len(index) + 1, 1)),
+                                           np.zeros(int(keep.sum()), dtype=int), dates[keep], kinds[keep],
+                                           values[keep])
+    out = df.copy()
+    for col in PRICE_FIELDS:
+        if col in out.columns:
+            out[col] = out[col].to_numpy(dtype=float) / price_f[:-1, 0]
+    if 'volume' in out.columns:
+        out['volume'] = out['volume'].to_numpy(dtype=float) * shares_f[:-1, 0]
+    return out
+
+
+actions = ActionStore(settings.corporate_actions_dir)
+adjustment_engine = AdjustmentEngine(actions)
+
+
+__all__ = ['ActionStore', 'AdjustmentEngine', 'AdjustedPanel', 'cumulative_factors', 'adjust_ohlcv',
+           'unadjust_splits', 'actions', 'adjustment_engine', 'KINDS']
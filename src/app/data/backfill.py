@@ -0,0 +1,285 @@
+"""大量歷史資料回補：多檔 × 多月份，可中斷後從中斷處續跑。
+
+工作單位為 (symbol, 月份)：
+- 每個單位抓完先原子寫入 {store}/parts/{symbol}/{YYYY-MM}.parquet，再於 {store}/manifest.jsonl
+  追加一行完成紀錄；重跑時略過 manifest 中已完成的單位，因此中斷（Ctrl-C、斷線、當機）後
+  只補抓剩下的部分。尚未結束的月份（含今天）不記為完成，下次仍會重抓；來源回報該月無資料
+  （上市前、下市後、暫停交易）視為 0 筆完成，同樣記入 manifest。yfinance 在暫時性錯誤 / 限流時
+  也回傳空資料，因此 yf 的空月份只在相鄰月份有資料時才接受，否則記為失敗、續跑時重抓
+- 多檔以 thread pool 平行，所有請求共用同一個速率限制器（data.ratelimit）
+- 一檔的單位處理完即合併進 {store}/{symbol}.parquet（與既有資料去重後原子取代）並刪除分段檔；
+  store 與 TWSE 快取同格式，可直接給 quality.load_cache_panel / scripts/publish_panel.py 使用
+- progress(BackfillStatus) 於每個單位完成時呼叫，提供吞吐量與 ETA
+
+    res = backfill(['2330', '2317'], '2015-01-01', '2024-12-31', source='twse', workers=4, rate_per_sec=2)
+    print(res.summary())
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+import pandas as pd
+
+from ..lazy import lazy_module
+from . import ratelimit
+from .adjust import unadjust_splits
+from .sessions import twse_calendar
+
+twse = lazy_module('..data.twse', __package__)   # 僅 twse 來源需要 requests/backoff
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume']
+TWSE_NO_DATA = '沒有符合條件的資料'
+Unit = Tuple[str, str]   # (symbol, 'YYYY-MM')
+
+
+def month_units(symbols: Iterable[str], start: str, end: str) -> List[Unit]:
+    """(symbol, 月份) 工作清單；依 symbol 再依月份排序，重複代碼只保留一次。"""
+    months = pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq='M').strftime('%Y-%m')
+    return [(str(s), m) for s in dict.fromkeys(symbols) for m in months]
+
+
+class EmptyMonth(LookupError):
+    """yfinance 對該月回傳空資料：可能真的沒有交易，也可能是暫時性錯誤，需相鄰月份佐證。"""
+
+
+def _neighbours(month: str) -> tuple[str, str]:
+    p = pd.Period(month, freq='M')
+    return str(p - 1), str(p + 1)
+
+
+def _fetch_month(symbol: str, month: str, source: str) -> pd.DataFrame:
+    """抓取整個月份（不裁切到 start/end，之後擴大區間也不需重抓已完成的月份）。"""
+    period = pd.Period(month, freq='M')
+    core = symbol.replace('.TW', '')
+    if source == 'twse':
+        try:
+            return twse.fetch_twse_month(core, period.year, period.month)
+        except ValueError as e:   # stat 非 OK；「沒有符合條件的資料」為該月無資料（尚未上市 / 下市 / 暫停交易）
+            if TWSE_NO_DATA not in str(e):
+                raise
+            return pd.DataFrame(columns=FIELDS)
+    from .fetch import fetch_ohlcv_yf
+    try:
+        df = fetch_ohlcv_yf(f"{core}.TW", period.start_time.strftime('%Y-%m-%d'),
+                            period.end_time.strftime('%Y-%m-%d'))
+    except ValueError as e:   # 空資料：尚未上市 / 停牌，或暫時性錯誤（由 backfill 以相鄰月份判斷）
+        raise EmptyMonth(str(e)) from e
+    return unadjust_splits(df, core)   # store 與 TWSE 快取同為未還原價格
+
+
+class Manifest:
+    """已完成單位的追加式紀錄（JSON Lines）；最後一行寫到一半（中斷）時忽略該行。"""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def load(self) -> Set[Unit]:
+        return set(self.rows())
+
+    def rows(self) -> Dict[Unit, int]:
+        """已完成單位 -> 筆數。"""
+        done: Dict[Unit, int] = {}
+        if not self.path.exists():
+            return done
+        for line in self.path.read_text(encoding='utf-8').splitlines():
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            done[(rec['symbol'], rec['month'])] = int(rec.get('rows', 0))
+        return done
+
+    def add(self, symbol: str, month: str, rows: int, source: str) -> None:
+        line = json.dumps({'symbol': symbol, 'month': month, 'rows': rows, 'source': source,
+                           'ts': round(time.time(), 3)}) + '\n'
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+@dataclass
+class BackfillStatus:
+    done: int            # 本次完成（含失敗）的單位數
+    total: int           # 本次需處理的單位數
+    skipped: int         # manifest 中已完成而略過的單位數
+    rows: int
+    failed: int
+    elapsed: float
+    symbol: str = ''
+
+    @property
+    def rate(self) -> float:
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        return (self.total - self.done) / self.rate if self.rate > 0 else None
+
+    def format(self) -> str:
+        eta = '--:--' if self.eta is None else time.strftime('%H:%M:%S', time.gmtime(self.eta))
+        pct = 100 * self.done / self.total if self.total else 100.0
+        return (f"[backfill] {self.done}/{self.total} units ({pct:.1f}%) {self.rate:.2f} units/s "
+                f"rows={self.rows} failed={self.failed} skipped={self.skipped} ETA {eta}")
+
+
+@dataclass
+class BackfillResult:
+    store: str
+    units: int
+    skipped: int
+    fetched: int
+    rows: int
+    wall_seconds: float
+    errors: Dict[Unit, str] = field(default_factory=dict)
+    symbols: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = [f"backfill {self.units} units: {self.skipped} already done, {self.fetched} fetched "
+                 f"({self.rows} rows), {len(self.errors)} failed in {self.wall_seconds:.1f}s "
+                 f"({self.fetched / max(self.wall_seconds, 1e-9):.2f} units/s) -> {self.store}"]
+        for (sym, month), err in sorted(self.errors.items()):
+            lines.append(f"  [error] {sym} {month}: {err}")
+        if self.errors:
+            lines.append("  重新執行同一指令即只補抓失敗與未完成的單位")
+        return '\n'.join(lines)
+
+
+def _atomic_parquet(df: pd.DataFrame, path: Path) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    df.to_parquet(tmp)
+    os.replace(tmp, path)
+
+
+def consolidate(store: str | Path, symbol: str) -> int:
+    """分段檔併入 {store}/{symbol}.parquet（同日期以後寫入者為準）並刪除分段檔；回傳總列數。"""
+    store = Path(store)
+    target = store / f"{symbol}.parquet"
+    parts = sorted((store / 'parts' / symbol).glob('*.parquet'))
+    if not parts:
+        return len(pd.read_parquet(target)) if target.exists() else 0
+    frames = ([pd.read_parquet(target)] if target.exists() else []) + [pd.read_parquet(p) for p in parts]
+    frames = [f for f in frames if len(f)]
+    rows = 0
+    if frames:
+        merged = pd.concat(frames)
+        merged.index = pd.to_datetime(merged.index)
+        merged.index.name = 'date'
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        _atomic_parquet(merged[[c for c in FIELDS if c in merged.columns]], target)
+        rows = len(merged)
+    for p in parts:
+        p.unlink(missing_ok=True)
+    try:
+        (store / 'parts' / symbol).rmdir()
+    except OSError:
+        pass
+    return rows
+
+
+def backfill(symbols: Iterable[str], start: str, end: str, source: str = 'twse',
+             store: str | Path = 'data/backfill', workers: int = 4, rate_per_sec: float | None = 2.0,
+             progress: Callable[[BackfillStatus], None] | None = None) -> BackfillResult:
+    """回補 symbols 於 [start, end] 涵蓋的所有月份；已完成的單位略過。rate_per_sec=None 表示不限速。"""
+    store = Path(store)
+    store.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(store / 'manifest.jsonl')
+    units = month_units(symbols, start, end)
+    done = manifest.rows()
+    pending: Dict[str, List[str]] = {}
+    for sym, month in units:
+        if (sym, month) not in done:
+            pending.setdefault(sym, []).append(month)
+    total = sum(len(m) for m in pending.values())
+    skipped = len(units) - total
+
+    cal = twse_calendar()
+    asof = cal.last_complete_session()
+    lock = threading.Lock()
+    stop = threading.Event()
+    stats = {'done': 0, 'rows': 0}
+    errors: Dict[Unit, str] = {}
+    t0 = time.perf_counter()
+
+    def finished(month: str) -> bool:
+        # 月底已過（該月最後交易日 <= asof）才視為完成，與 twse 快取相同規則
+        month_end = pd.Period(month, freq='M').end_time.normalize()
+        return cal.previous_session(month_end, inclusive=True) <= asof
+
+    def report(sym: str, rows: int, error: str | None, month: str) -> None:
+        with lock:
+            stats['done'] += 1
+            stats['rows'] += rows
+            if error is not None:
+                errors[(sym, month)] = error
+            status = BackfillStatus(stats['done'], total, skipped, stats['rows'], len(errors),
+                                    time.perf_counter() - t0, sym)
+        if progress:
+            progress(status)
+
+    def run_symbol(sym: str, months: List[str]) -> None:
+        part_dir = store / 'parts' / sym
+        part_dir.mkdir(parents=True, exist_ok=True)
+        rows = {m: n for (s, m), n in done.items() if s == sym}
+        empty: List[str] = []
+        try:
+            for month in months:
+                if stop.is_set():
+                    return
+                try:
+                    df = _fetch_month(sym, month, source)
+                except EmptyMonth:   # 待整檔抓完後依相鄰月份判斷
+                    empty.append(month)
+                    continue
+                except Exception as e:   # 單一單位失敗不影響其他單位；下次續跑重抓
+                    report(sym, 0, f"{type(e).__name__}: {e}", month)
+                    continue
+                df = df[[c for c in FIELDS if c in df.columns]].astype('float64')
+                if len(df):
+                    _atomic_parquet(df, part_dir / f"{month}.parquet")
+                rows[month] = len(df)
+                if finished(month):
+                    manifest.add(sym, month, len(df), source)
+                report(sym, len(df), None, month)
+            for month in empty:
+                if any(rows.get(m, 0) > 0 for m in _neighbours(month)):
+                    if finished(month):
+                        manifest.add(sym, month, 0, source)
+                    report(sym, 0, None, month)
+                else:
+                    report(sym, 0, 'EmptyMonth: yfinance 回傳空資料且相鄰月份皆無資料，視為暫時性失敗', month)
+        finally:
+            consolidate(store, sym)
+
+    ratelimit.install(ratelimit.RateLimiter(rate_per_sec) if rate_per_sec else None)
+    try:
+        # 先前中斷時可能留下已完成但尚未合併的分段檔
+        for part_dir in (store / 'parts').glob('*'):
+            if part_dir.name not in pending:
+                consolidate(store, part_dir.name)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            futs = [ex.submit(run_symbol, sym, months) for sym, months in pending.items()]
+            try:
+                for f in as_completed(futs):
+                    f.result()
+            except BaseException:
+                # Ctrl-C 等中斷：執行中的單位做完即停（已完成者皆已記入 manifest），尚未開始的取消
+                stop.set()
+                ex.shutdown(wait=True, cancel_futures=True)
+                raise
+    finally:
+        ratelimit.install(None)
+
+    return BackfillResult(str(store), len(units), skipped, total - len(errors), stats['rows'],
+                          time.perf_counter() - t0, errors, list(dict.fromkeys(s for s, _ in units)))
+
+
+__all__ = ['backfill', 'consolidate', 'month_units', 'Manifest', 'EmptyMonth', 'BackfillStatus', 'BackfillResult']
@@ -0,0 +1,145 @@
+"""伺服器端資料集登錄：代理工具之間傳遞 handle，而非整段 OHLCV records。
+
+- put(df) 回傳內容定址的 handle（ds_ + 資料指紋），相同資料重複登錄只存一份
+- 資料以未壓縮 Arrow/Feather 檔存於 {root}/{handle}.arrow，讀取時 memory-map，
+  web worker、背景工作與 CLI 等多個行程可共用同一份檔案
+- 行程內保留最近使用的少數 DataFrame；檔案依存活時間 (TTL) 與總容量淘汰，
+  存取時更新 mtime（同 ArtifactCache 的 LRU 規則）
+- 過期或不存在的 handle 拋出 KeyError，工具層轉為提示重新抓取
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from ..lazy import lazy_module
+from .fingerprint import frame_fingerprint
+from ..performance.metrics import infer_periods_per_year
+
+feather = lazy_module('pyarrow.feather')
+
+_HANDLE_RE = re.compile(r'^ds_[0-9a-f]{20}$')
+
+
+def summarize(df: pd.DataFrame) -> Dict[str, Any]:
+    """資料集摘要（給代理閱讀的少量統計，而非原始資料）。"""
+    out: Dict[str, Any] = {'rows': int(len(df)), 'columns': [str(c) for c in df.columns]}
+    if len(df) and isinstance(df.index, pd.DatetimeIndex):
+        out['start'] = df.index[0].strftime('%Y-%m-%d')
+        out['end'] = df.index[-1].strftime('%Y-%m-%d')
+    if 'close' in df.columns and len(df):
+        close = df['close'].to_numpy(dtype=float)
+        valid = close[~np.isnan(close)]
+        if valid.size:
+            rets = np.diff(valid) / valid[:-1]
+            out.update(
+                first_close=float(valid[0]), last_close=float(valid[-1]),
+                min_close=float(valid.min()), max_close=float(valid.max()),
+                total_return=float(valid[-1] / valid[0] - 1),
+                ann_vol=float(rets.std() * np.sqrt(infer_periods_per_year(df.index))) if rets.size > 1 else None,
+            )
+    missing = int(df.isna().to_numpy().sum())
+    if missing:
+        out['missing_values'] = missing
+    return out
+
+
+class DatasetRegistry:
+    def __init__(self, root: str | Path = 'data/datasets', ttl_seconds: float = 3600,
+                 max_bytes: int = 2 * 1024 ** 3, max_resident: int = 16):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_resident = max_resident
+        self._resident: OrderedDict[str, pd.DataFrame] = OrderedDict()
+
+    def _paths(self, handle: str) -> tuple[Path, Path]:
+        if not _HANDLE_RE.match(handle or ''):
+            raise KeyError(f"無效的 dataset handle: {handle!r}")
+        return self.root / f"{handle}.arrow", self.root / f"{handle}.json"
+
+    def _remember(self, handle: str, df: pd.DataFrame) -> None:
+        self._resident[handle] = df
+        self._resident.move_to_end(handle)
+        while len(self._resident) > self.max_resident:
+            self._resident.popitem(last=False)
+
+    def put(self, df: pd.DataFrame, **meta: Any) -> str:
+        """登錄資料集並回傳 handle；meta（例如 symbol/source）會隨 describe() 回傳。"""
+        handle = 'ds_' + frame_fingerprint(df)[:20]
+        data_path, meta_path = self._paths(handle)
+        if data_path.exists():
+            os.utime(data_path)
+        else:
+            self.root.mkdir(parents=True, exist_ok=True)
+            index_name = df.index.name or 'index'
+            frame = df.rename_axis(index_name).reset_index()
+            frame.columns = [str(c) for c in frame.columns]
+            tmp = self.root / f".{uuid.uuid4().hex}"
+            feather.write_feather(frame, tmp, compression='uncompressed')
+            os.replace(tmp, data_path)
+            tmp.write_text(json.dumps({'index': index_name, 'created': time.time(), 'meta': meta,
+                                       'summary': summarize(df)}, default=str), encoding='utf-8')
+            os.replace(tmp, meta_path)
+            self.evict(protect=handle)
+        self._remember(handle, df)
+        return handle
+
+    def _live(self, handle: str) -> tuple[Path, Path]:
+        """回傳未過期資料集的路徑；過期者順便刪除，兩者皆拋出 KeyError。"""
+        data_path, meta_path = self._paths(handle)
+        if data_path.exists() and time.time() - data_path.stat().st_mtime > self.ttl_seconds:
+            data_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        if not (data_path.exists() and meta_path.exists()):
+            self._resident.pop(handle, None)
+            raise KeyError(f"dataset {handle} 不存在或已過期，請重新抓取")
+        return data_path, meta_path
+
+    def get(self, handle: str) -> pd.DataFrame:
+        data_path, meta_path = self._live(handle)
+        os.utime(data_path)
+        df = self._resident.get(handle)
+        if df is None:
+            table = feather.read_table(data_path, memory_map=True)
+            index_name = json.loads(meta_path.read_text(encoding='utf-8'))['index']
+            df = table.to_pandas(split_blocks=True).set_index(index_name)
+        self._remember(handle, df)
+        return df
+
+    def describe(self, handle: str) -> Dict[str, Any]:
+        data_path, meta_path = self._live(handle)
+        info = json.loads(meta_path.read_text(encoding='utf-8'))
+        age = time.time() - data_path.stat().st_mtime
+        return {'dataset': handle, **info['meta'], **info['summary'],
+                'expires_in_seconds': max(0, int(self.ttl_seconds - age))}
+
+    def evict(self, protect: str | None = None) -> list[str]:
+        """刪除逾 TTL 未使用的資料集，並由最舊者開始刪除直到總容量 <= max_bytes。"""
+        if not self.root.exists():
+            return []
+        now = time.time()
+        entries = sorted((p.stat().st_mtime, p.stat().st_size, p) for p in self.root.glob('ds_*.arrow'))
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for mtime, size, p in entries:
+            if p.stem == protect:
+                continue
+            if now - mtime > self.ttl_seconds or total > self.max_bytes:
+                p.unlink(missing_ok=True)
+                p.with_suffix('.json').unlink(missing_ok=True)
+                self._resident.pop(p.stem, None)
+                total -= size
+                removed.append(p.stem)
+        return removed
+
+
+__all__ = ['DatasetRegistry', 'summarize']
@@ -3,10 +3,14 @@
 """
 from __future__ import annotations
 import pandas as pd
-import yfinance as yf
 from typing import List
 from datetime import datetime, timedelta
 
+from ..lazy import lazy_module
+from . import ratelimit
+
+yf = lazy_module('yfinance')
+
 
 def fetch_ohlcv_yf(symbol: str, start: str, end: str) -> pd.DataFrame:
     """以 yfinance 抓取日線 OHLCV。
@@ -18,6 +22,7 @@ def fetch_ohlcv_yf(symbol: str, start: str, end: str) -> pd.DataFrame:
     """
     # yfinance end 參數為「非包含」；為確保包含 end 當日，向後加 1 天
     end_inclusive = (pd.to_datetime(end) + timedelta(days=1)).strftime('%Y-%m-%d')
+    ratelimit.acquire()
     data = yf.download(symbol, start=start, end=end_inclusive, progress=False, auto_adjust=False)
     if data.empty:
         raise ValueError(f"No data fetched for {symbol} {start}~{end}")
@@ -0,0 +1,202 @@
+"""日內資料：逐筆 (tick) / 分鐘線檔案串流讀取，並串流重取樣為任意 bar 大小。
+
+    for bars in resample_stream(iter_intraday('ticks_2330.csv'), '5min'):
+        ...                                         # 每批只含已完成的 bar
+    bars = resample_bars(iter_intraday('1min.parquet'), '30min')
+
+- 輸入為依時間排序的 DataFrame 區塊（index 為時間）：
+  tick 區塊含 price（與可選 volume / size），bar 區塊含 open/high/low/close/volume
+- bar 以交易日開盤時間 (09:00) 為錨點切分、左閉右開、標籤為區間起點；沒有成交的區間不產生 bar
+- tz-aware 輸入（例如含 +08:00 的 ISO 時間）先轉為交易所時區 (tz，預設 Asia/Taipei) 再切分，
+  輸出標籤保留該時區；tz-naive 輸入視為當地時間，輸出亦為 naive
+- 區塊最後一個尚未完成的 bar 暫存並與下一個區塊合併，因此輸出與區塊大小無關，
+  整年 tick 不需一次載入記憶體
+- 可選 symbol 欄：多標的交錯的 tick 流依 (symbol, bar) 分組，輸出保留 symbol 欄
+- 輸出欄位 open/high/low/close/volume、index 名稱 date，可直接給 backtest_engine 與 indicators；
+  年化係數見 performance.metrics.infer_periods_per_year
+"""
+from __future__ import annotations
+from datetime import time as dtime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from ..lazy import lazy_module
+from .sessions import TAIPEI
+
+pa = lazy_module('pyarrow')
+pacsv = lazy_module('pyarrow.csv')
+pq = lazy_module('pyarrow.parquet')
+
+SESSION_OPEN = dtime(9, 0)
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def iter_intraday(path: str | Path, time_col: str = 'time', block_size: int = 32 << 20,
+                  delimiter: str = ',') -> Iterator[pd.DataFrame]:
+    """逐區塊讀取 tick / 分鐘線檔（csv 或 parquet），產出 index 為時間的 DataFrame（欄名小寫）。
+
+    block_size 為 CSV 每批位元組數；parquet 以 row batch 讀取。size 欄視同 volume。
+    """
+    path = Path(path)
+    if path.suffix.lower() in ('.parquet', '.pq'):
+        batches = pq.ParquetFile(path).iter_batches(batch_size=max(1, block_size // 32))
+    else:
+        batches = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=block_size),
+                                 parse_options=pacsv.ParseOptions(delimiter=delimiter),
+                                 convert_options=pacsv.ConvertOptions(timestamp_parsers=[pacsv.ISO8601]))
+    key = time_col.lower()
+    for batch in batches:
+        df = pa.Table.from_batches([batch]).to_pandas()
+        df.columns = [c.lower() for c in df.columns]
+        if 'size' in df.columns and 'volume' not in df.columns:
+            df = df.rename(columns={'size': 'volume'})
+        if 'symbol' in df.columns:
+            df['symbol'] = df['symbol'].astype(str)
+        df = df.set_index(pd.DatetimeIndex(pd.to_datetime(df.pop(key)), name='date'))
+        if len(df):
+            yield df
+
+
+class BarResampler:
+    """有狀態的串流重取樣器：update() 回傳本區塊中已完成的 bar，flush() 回傳最後一根。
+
+    每個區塊排序後以 np.*.reduceat 一次聚合（tick 的 price 同時作為 open/high/low/close），
+    上一區塊未完成的 bar 以一列「部分 bar」接在本區塊最前面一起聚合，不需第二次 groupby。
+    """
+
+    def __init__(self, freq: str | pd.Timedelta, session_open: dtime = SESSION_OPEN, tz=TAIPEI):
+        self.freq = pd.Timedelta(freq)
+        if self.freq <= pd.Timedelta(0) or self.freq > pd.Timedelta(days=1):
+            raise ValueError(f"bar 大小需介於 0 與 1 天之間: {freq}")
+        self.origin = pd.Timedelta(hours=session_open.hour, minutes=session_open.minute)
+        self.tz = tz
+        self._aware: bool | None = None   # 第一個區塊決定：之後的區塊須同為 tz-aware 或同為 naive
+        self._carry: Dict[str, np.ndarray] | None = None
+        self._last: pd.Timestamp | None = None
+
+    def _local(self, index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        """交易所當地時間（naive）；開盤錨點以當地日期計算。"""
+        aware = index.tz is not None
+        if self._aware is None:
+            self._aware = aware
+        elif aware != self._aware:
+            raise ValueError("輸入區塊需同為 tz-aware 或同為 tz-naive")
+        return index.tz_convert(self.tz).tz_localize(None) if aware else index
+
+    def _labels(self, index: pd.DatetimeIndex) -> np.ndarray:
+        """bar 起點 (int64 ns，當地時間)：當日開盤 + freq 的整數倍。"""
+        t = index.as_unit('ns').asi8
+        day_ns, step, origin = pd.Timedelta(days=1).value, self.freq.value, self.origin.value
+        day = t - t % day_ns
+        return day + origin + (t - day - origin) // step * step
+
+    @staticmethod
+    def _columns(chunk: pd.DataFrame) -> Dict[str, np.ndarray]:
+        if 'price' in chunk.columns:
+            price = chunk['price'].to_numpy(dtype=float)
+            cols = dict.fromkeys(['open', 'high', 'low', 'close'], price)
+            cols['volume'] = (chunk['volume'].to_numpy(dtype=float) if 'volume' in chunk.columns
+                              else np.zeros(len(chunk)))
+        else:
+            cols = {c: chunk[c].to_numpy(dtype=float) for c in BAR_COLUMNS}
+        if 'symbol' in chunk.columns:
+            cols['symbol'] = chunk['symbol'].to_numpy(dtype=object)
+        return cols
+
+    @staticmethod
+    def _reduce(cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """依 (symbol, date) 分組聚合；輸入同組內須為時間順序，輸出依 (date, symbol) 排序。"""
+        date = cols['date']
+        valid = ~np.isnan(cols['close'])
+        if 'symbol' in cols:
+            codes, uniques = pd.factorize(cols['symbol'], sort=True)
+            order = np.lexsort((date, codes))             # 穩定排序：同組內維持時間順序
+            order = order[valid[order]]
+            key = (codes[order], date[order])
+        else:
+            order = np.flatnonzero(valid)
+            key = (date[order],)
+        n = len(order)
+        if n == 0:
+            return {c: v[:0] for c, v in cols.items()}
+        change = np.zeros(n, dtype=bool)
+        change[0] = True
+        for k in key:
+            change[1:] |= k[1:] != k[:-1]
+        starts = np.flatnonzero(change)
+        ends = np.append(starts[1:], n) - 1
+        out = {'date': key[-1][starts],
+               'open': cols['open'][order][starts],
+               'high': np.maximum.reduceat(cols['high'][order], starts),
+               'low': np.minimum.reduceat(cols['low'][order], starts),
+               'close': cols['close'][order][ends],
+               'volume': np.add.reduceat(cols['volume'][order], starts)}
+        if 'symbol' in cols:
+            sym = key[0][starts]
+            final = np.lexsort((sym, out['date']))
+            out = {c: v[final] for c, v in out.items()}
+            out['symbol'] = np.asarray(uniques, dtype=object)[sym[final]]
+        return out
+
+    def update(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        if not len(chunk):
+            return self._empty()
+        local = self._local(pd.DatetimeIndex(chunk.index))
+        if not local.is_monotonic_increasing or (self._last is not None and local[0] < self._last):
+            raise ValueError("輸入區塊需依時間排序")
+        self._last = local[-1]
+        cols = self._columns(chunk)
+        cols['date'] = self._labels(local)
+        if self._carry is not None:
+            # 上一區塊未完成的 bar 接在最前面：其 open 為該 bar 的第一筆
+            cols = {c: np.concatenate([self._carry[c], v]) for c, v in cols.items()}
+        bars = self._reduce(cols)
+        # 全體依時間排序：最後一個區間之前的 bar 不會再有新資料
+        last_label = self._labels(pd.DatetimeIndex([self._last]))[0]
+        pending = bars['date'] >= last_label
+        self._carry = {c: v[pending] for c, v in bars.items()}
+        return self._frame({c: v[~pending] for c, v in bars.items()})
+
+    def flush(self) -> pd.DataFrame:
+        carry, self._carry = self._carry, None
+        return self._empty() if carry is None else self._frame(carry)
+
+    def _index(self, labels: np.ndarray) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(labels.astype('datetime64[ns]'), name='date')
+        return index.tz_localize(self.tz) if self._aware else index
+
+    def _empty(self) -> pd.DataFrame:
+        return pd.DataFrame(columns=BAR_COLUMNS, index=self._index(np.array([], dtype='int64')), dtype=float)
+
+    def _frame(self, bars: Dict[str, np.ndarray]) -> pd.DataFrame:
+        index = self._index(bars['date'])
+        data = {'symbol': bars['symbol']} if 'symbol' in bars else {}
+        data.update((c, bars[c]) for c in BAR_COLUMNS)
+        return pd.DataFrame(data, index=index)
+
+
+def resample_stream(chunks: Iterable[pd.DataFrame], freq: str | pd.Timedelta,
+                    session_open: dtime = SESSION_OPEN, tz=TAIPEI) -> Iterator[pd.DataFrame]:
+    """逐區塊產出已完成的 bar（不產出空區塊），最後產出尚未結束的最後一根。"""
+    rs = BarResampler(freq, session_open, tz)
+    for chunk in chunks:
+        bars = rs.update(chunk)
+        if len(bars):
+            yield bars
+    bars = rs.flush()
+    if len(bars):
+        yield bars
+
+
+def resample_bars(data: pd.DataFrame | Iterable[pd.DataFrame], freq: str | pd.Timedelta,
+                  session_open: dtime = SESSION_OPEN, tz=TAIPEI) -> pd.DataFrame:
+    """一次取得全部 bar；data 可為單一 DataFrame 或區塊迭代器。"""
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    parts = list(resample_stream(chunks, freq, session_open, tz))
+    return pd.concat(parts) if parts else BarResampler(freq, session_open, tz)._empty()
+
+
+__all__ = ['iter_intraday', 'BarResampler', 'resample_stream', 'resample_bars', 'BAR_COLUMNS', 'SESSION_OPEN']
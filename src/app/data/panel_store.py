@@ -0,0 +1,178 @@
+"""跨行程共用的價格面板：載入一次，其他 worker 以唯讀 memory-map 零複製讀取。
+
+- publish(panel) 將 {field: DataFrame(dates × symbols)} 寫成 {root}/{name}/{generation}/{field}.npy
+  （Fortran order：每檔標的的欄位連續存放），日期與代號另存 index.npy / meta.json
+- 寫入完成後以 os.replace 更新 {root}/{name}/CURRENT（世代編號），讀者只會看到完整的世代；
+  每日更新即發布新世代，worker 不需重啟
+- attach() 以 np.load(mmap_mode='r') 開啟唯讀陣列，資料留在 OS page cache，
+  多個行程共用同一份實體記憶體；current() 僅在 CURRENT 變動時重新 attach
+- 只保留最近 keep 個世代；舊世代刪除後，已 attach 的行程仍可讀到原本的映射（POSIX）
+
+    store = PanelStore('data/panels')
+    store.publish(load_cache_panel('data/raw/twse'), fields=('close', 'volume'))
+    view = store.current()          # worker 端
+    view.frame('close'), view.series('close', '2330'), view.generation
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import settings
+
+DEFAULT_FIELDS = ('close', 'volume')
+
+
+@dataclass
+class PanelView:
+    generation: int
+    index: pd.DatetimeIndex
+    symbols: pd.Index
+    arrays: Dict[str, np.ndarray]          # field -> 唯讀 (dates × symbols) memmap
+    meta: Dict = field(default_factory=dict)
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.arrays)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def _rows(self, start=None, end=None) -> slice:
+        lo = 0 if start is None else self.index.searchsorted(pd.Timestamp(start), 'left')
+        hi = len(self.index) if end is None else self.index.searchsorted(pd.Timestamp(end), 'right')
+        return slice(lo, hi)
+
+    def frame(self, name: str, start=None, end=None) -> pd.DataFrame:
+        """(dates × symbols) DataFrame，底層即 memmap（不複製）；start/end 含端點。"""
+        rows = self._rows(start, end)
+        return pd.DataFrame(self.arrays[name][rows], index=self.index[rows], columns=self.symbols, copy=False)
+
+    def series(self, name: str, symbol, start=None, end=None) -> pd.Series:
+        rows = self._rows(start, end)
+        col = self.symbols.get_loc(str(symbol))
+        return pd.Series(self.arrays[name][rows, col], index=self.index[rows], name=str(symbol), copy=False)
+
+    def panel(self, start=None, end=None) -> Dict[str, pd.DataFrame]:
+        """同 quality.load_cache_panel 的輸出格式 {field: DataFrame}。"""
+        return {name: self.frame(name, start, end) for name in self.arrays}
+
+
+class PanelStore:
+    def __init__(self, root: str | Path = 'data/panels', name: str = 'universe', keep: int = 2):
+        self.dir = Path(root) / name
+        self.keep = max(1, keep)
+        self._view: PanelView | None = None
+        self._stamp: Tuple[int, int] | None = None
+
+    @property
+    def pointer(self) -> Path:
+        return self.dir / 'CURRENT'
+
+    def generations(self) -> List[int]:
+        if not self.dir.exists():
+            return []
+        return sorted(int(p.name) for p in self.dir.iterdir() if p.is_dir() and p.name.isdigit())
+
+    def generation(self) -> int | None:
+        """目前發布中的世代編號；尚未發布時為 None。"""
+        try:
+            return int(self.pointer.read_text(encoding='utf-8').strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def publish(self, panel: Dict[str, pd.DataFrame], fields: Iterable[str] = DEFAULT_FIELDS) -> int:
+        """寫入新世代並原子切換 CURRENT，回傳世代編號；各欄位須共用同一組日期與代號。"""
+        fields = [f for f in fields if f in panel]
+        if not fields:
+            raise ValueError("panel 中沒有可發布的欄位")
+        ref = panel[fields[0]]
+        index = pd.DatetimeIndex(ref.index)
+        symbols = [str(s) for s in ref.columns]
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / f".tmp-{uuid.uuid4().hex}"
+        tmp.mkdir()
+        try:
+            np.save(tmp / 'index.npy', index.to_numpy())
+            for name in fields:
+                frame = panel[name].reindex(index=ref.index, columns=ref.columns)
+                values = frame.to_numpy()
+                out = np.lib.format.open_memmap(tmp / f"{name}.npy", mode='w+', dtype=values.dtype,
+                                                shape=values.shape, fortran_order=True)
+                out[:] = values
+                out.flush()
+                del out
+            (tmp / 'meta.json').write_text(json.dumps({'fields': fields, 'symbols': symbols,
+                                                       'rows': len(index), 'published': time.time()}),
+                                           encoding='utf-8')
+            gen = self._claim(tmp)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        ptr = self.dir / f".CURRENT-{uuid.uuid4().hex}"
+        ptr.write_text(str(gen), encoding='utf-8')
+        os.replace(ptr, self.pointer)
+        self.prune()
+        return gen
+
+    def _claim(self, tmp: Path) -> int:
+        """以 rename 取得下一個世代編號（目錄已存在即遞增重試，多個發布者也不會覆寫彼此）。"""
+        gen = max(self.generations() + [self.generation() or 0]) + 1
+        while True:
+            try:
+                os.rename(tmp, self.dir / f"{gen:08d}")
+                return gen
+            except OSError:
+                if not (self.dir / f"{gen:08d}").exists():
+                    raise
+                gen += 1
+
+    def prune(self) -> List[int]:
+        """刪除最近 keep 個以外的舊世代（目前世代一律保留）。"""
+        current = self.generation()
+        removed = [g for g in self.generations()[:-self.keep] if g != current]
+        for g in removed:
+            shutil.rmtree(self.dir / f"{g:08d}", ignore_errors=True)
+        return removed
+
+    def attach(self, generation: int | None = None) -> PanelView:
+        """唯讀 memory-map 指定世代（預設為目前世代）；尚未發布時拋出 FileNotFoundError。"""
+        gen = self.generation() if generation is None else generation
+        if gen is None:
+            raise FileNotFoundError(f"{self.dir} 尚未發布任何面板")
+        path = self.dir / f"{gen:08d}"
+        meta = json.loads((path / 'meta.json').read_text(encoding='utf-8'))
+        index = pd.DatetimeIndex(np.load(path / 'index.npy'), name='date')
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode='r') for name in meta['fields']}
+        return PanelView(gen, index, pd.Index(meta['symbols'], name='symbol'), arrays, meta)
+
+    def current(self) -> PanelView:
+        """目前世代的 view；CURRENT 未變動時直接回傳上次的 view（只做一次 stat）。"""
+        try:
+            st = self.pointer.stat()
+            stamp = (st.st_ino, st.st_mtime_ns)
+        except FileNotFoundError:
+            stamp = None
+        if self._view is None or stamp != self._stamp:
+            self._view = self.attach()
+            self._stamp = stamp
+        return self._view
+
+    def close(self) -> None:
+        self._view = None
+        self._stamp = None
+
+
+panel_store = PanelStore(settings.panel_store_dir)
+
+
+__all__ = ['PanelStore', 'PanelView', 'panel_store', 'DEFAULT_FIELDS']
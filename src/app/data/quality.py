@@ -0,0 +1,170 @@
+"""OHLCV 資料品質掃描：對整個 dates × symbols 面板一次向量化檢查，輸出精簡的異常表。
+
+檢查項目（check 欄）：
+- gap:           上市期間（首筆至末筆有效收盤之間）落在交易日曆上卻無資料
+- bad_range:     high < low，或 open / close 落在 [low, high] 之外
+- nonpositive:   價格 <= 0
+- zero_volume:   成交量為 0 連續 >= min_zero_run 根
+- jump:          相鄰有效收盤的 |log 報酬| >= jump_threshold（疑似除權息 / 分割或錯價）
+- stale:         OHLC 與前一根完全相同連續 >= stale_run 根（疑似重複填值）
+
+同一 symbol 連續觸發的日期合併為一列 (symbol, check, start, end, bars, value)，
+value 為 jump 的最大 |log 報酬|、其他檢查為 NaN。交易日曆預設取「至少 min_coverage
+比例的已上市標的有資料」的日期，避免單一標的的錯誤日期使全市場都被判為缺漏。
+
+    panel = load_cache_panel('data/raw/twse')
+    anomalies = scan_panel(panel)
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+CHECKS = ('gap', 'bad_range', 'nonpositive', 'zero_volume', 'jump', 'stale')
+COLUMNS = ['symbol', 'check', 'start', 'end', 'bars', 'value']
+
+
+def _empty_anomalies() -> pd.DataFrame:
+    """欄位型別與非空異常表一致的空表（summarize_anomalies 等下游可直接使用）。"""
+    return pd.DataFrame({'symbol': pd.Series([], dtype=object), 'check': pd.Series([], dtype=object),
+                         'start': pd.DatetimeIndex([]), 'end': pd.DatetimeIndex([]),
+                         'bars': pd.Series([], dtype=int), 'value': pd.Series([], dtype=float)})
+
+
+def panel_from_frames(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """{symbol: OHLCV DataFrame} -> {field: DataFrame(dates × symbols)}（日期取聯集）。"""
+    frames = {str(s): f for s, f in frames.items() if f is not None and len(f)}
+    if not frames:
+        return {f: pd.DataFrame() for f in FIELDS}
+    for f in frames.values():
+        if not isinstance(f.index, pd.DatetimeIndex):
+            f.index = pd.to_datetime(f.index)
+    wide = pd.concat(frames, axis=1, sort=True)
+    wide = wide[~wide.index.duplicated(keep='last')]
+    return {field: wide.xs(field, axis=1, level=1) if field in wide.columns.get_level_values(1)
+            else pd.DataFrame(np.nan, index=wide.index, columns=list(frames)) for field in FIELDS}
+
+
+def load_cache_panel(root: str | Path = 'data/raw/twse', symbols: Iterable[str] | None = None,
+                     threads: int = 8) -> Dict[str, pd.DataFrame]:
+    """讀取 parquet 快取目錄（每檔一個 {symbol}.parquet）組成面板；以多執行緒平行讀檔。"""
+    root = Path(root)
+    paths = sorted(root.glob('*.parquet')) if symbols is None else [root / f"{s}.parquet" for s in symbols]
+    paths = [p for p in paths if p.exists()]
+
+    def read(p: Path) -> pd.DataFrame:
+        df = pd.read_parquet(p)
+        return df[[c for c in FIELDS if c in df.columns]].astype('float64')
+
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        frames = dict(zip((p.stem for p in paths), ex.map(read, paths)))
+    return panel_from_frames(frames)
+
+
+def trading_calendar(close: pd.DataFrame, min_coverage: float = 0.5) -> pd.DatetimeIndex:
+    """已上市標的中至少 min_coverage 比例有收盤價的日期。"""
+    valid = close.notna().to_numpy()
+    listed = np.maximum.accumulate(valid, axis=0) & np.maximum.accumulate(valid[::-1], axis=0)[::-1]
+    n_listed = listed.sum(axis=1)
+    coverage = np.divide(valid.sum(axis=1), n_listed, out=np.zeros(len(valid)), where=n_listed > 0)
+    return close.index[coverage >= min_coverage]
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """mask (T × N) 每欄的連續 True 區段 -> (symbol 欄號, 起始列, 長度)，依 symbol、時間排序。"""
+    T, N = mask.shape
+    padded = np.zeros((N, T + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask.T
+    d = np.diff(padded, axis=1)
+    col, start = np.nonzero(d == 1)
+    _, end = np.nonzero(d == -1)
+    return col, start, end - start
+
+
+def _run_rows(check: str, mask: np.ndarray, index: pd.Index, symbols: pd.Index, min_len: int = 1,
+              value: np.ndarray | None = None) -> pd.DataFrame:
+    col, start, length = _runs(mask)
+    if not len(col):
+        return pd.DataFrame(columns=COLUMNS)
+    vals = np.full(len(col), np.nan)
+    if value is not None:
+        # 區段依 symbol 主序排列，與 mask.T 攤平後的 True 元素順序一致：以 reduceat 取各段最大 |value|
+        flat = np.abs(value.T[mask.T])
+        vals = np.maximum.reduceat(flat, np.r_[0, np.cumsum(length)[:-1]])
+    keep = length >= min_len
+    col, start, length, vals = col[keep], start[keep], length[keep], vals[keep]
+    return pd.DataFrame({'symbol': symbols[col], 'check': check, 'start': index[start],
+                         'end': index[start + length - 1], 'bars': length, 'value': vals})
+
+
+def scan_panel(panel: Dict[str, pd.DataFrame], calendar: Iterable | None = None, min_coverage: float = 0.5,
+               jump_threshold: float = 0.2, min_zero_run: int = 3, stale_run: int = 5,
+               tolerance: float = 1e-9) -> pd.DataFrame:
+    """panel: {field: DataFrame(dates × symbols)}（load_cache_panel / panel_from_frames 的輸出）。
+    calendar 為 None 時以 trading_calendar(close, min_coverage) 推估。回傳異常表（COLUMNS 欄位）。
+    """
+    close = panel['close']
+    if close.empty:
+        return _empty_anomalies()
+    days = trading_calendar(close, min_coverage) if calendar is None else pd.DatetimeIndex(calendar)
+    cal = close.index.union(days)
+    fields = {f: panel[f].reindex(index=cal, columns=close.columns).to_numpy(dtype='float64') for f in FIELDS}
+    o, h, l, c, v = (fields[f] for f in FIELDS)
+    idx, syms = cal, close.columns
+
+    valid = ~np.isnan(c)
+    listed = np.maximum.accumulate(valid, axis=0) & np.maximum.accumulate(valid[::-1], axis=0)[::-1]
+    on_calendar = cal.isin(days)
+    rows = [_run_rows('gap', listed & ~valid & on_calendar[:, None], idx, syms)]
+
+    with np.errstate(invalid='ignore'):
+        lo, hi = l - tolerance, h + tolerance
+        bad = (h < l) | (o < lo) | (o > hi) | (c < lo) | (c > hi)
+        rows.append(_run_rows('bad_range', bad, idx, syms))
+        nonpos = (o <= 0) | (h <= 0) | (l <= 0) | (c <= 0)
+        rows.append(_run_rows('nonpositive', nonpos, idx, syms))
+        rows.append(_run_rows('zero_volume', v == 0, idx, syms, min_zero_run))
+
+        # 與前一個有效收盤比較（中間缺漏不影響）；非正價格不計 log 報酬
+        pos_c = np.where(c > 0, c, np.nan)
+        prev = pd.DataFrame(pos_c).ffill().shift(1).to_numpy()
+        logret = np.log(pos_c / prev)
+        rows.append(_run_rows('jump', np.abs(logret) >= jump_threshold, idx, syms, value=logret))
+
+        same = np.zeros_like(valid)
+        same[1:] = (o[1:] == o[:-1]) & (h[1:] == h[:-1]) & (l[1:] == l[:-1]) & (c[1:] == c[:-1])
+        rows.append(_run_rows('stale', same, idx, syms, stale_run))
+
+    if not any(len(r) for r in rows):
+        return _empty_anomalies()
+    out = pd.concat([r for r in rows if len(r)], ignore_index=True)
+    out['bars'] = out['bars'].astype(int)
+    return out.sort_values(['symbol', 'start', 'check'], kind='stable').reset_index(drop=True)
+
+
+def scan_frame(df: pd.DataFrame, symbol: str = 'symbol', calendar: Iterable | None = None, **kwargs) -> pd.DataFrame:
+    """單一標的 OHLCV 的掃描；未提供 calendar 時不檢查 gap（單檔無法推估交易日曆）。"""
+    panel = panel_from_frames({symbol: df.copy()})
+    return scan_panel(panel, calendar=panel['close'].index if calendar is None else calendar, **kwargs)
+
+
+def summarize_anomalies(anomalies: pd.DataFrame) -> Dict[str, object]:
+    """異常表摘要：各檢查的段數 / 影響 bar 數 / 標的數，以及問題最多的標的。"""
+    by_check = anomalies.groupby('check').agg(runs=('bars', 'size'), bars=('bars', 'sum'),
+                                             symbols=('symbol', 'nunique'))
+    by_check = by_check.reindex(CHECKS, fill_value=0)
+    worst = anomalies.groupby('symbol')['bars'].sum().nlargest(10)
+    return {
+        'anomalies': int(len(anomalies)),
+        'symbols_affected': int(anomalies['symbol'].nunique()),
+        'by_check': {k: {c: int(x) for c, x in row.items()} for k, row in by_check.iterrows()},
+        'worst_symbols': {str(k): int(x) for k, x in worst.items()},
+    }
+
+
+__all__ = ['scan_panel', 'scan_frame', 'load_cache_panel', 'panel_from_frames', 'trading_calendar',
+           'summarize_anomalies', 'CHECKS', 'COLUMNS']
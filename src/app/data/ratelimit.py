@@ -0,0 +1,45 @@
+"""網路請求速率限制：跨 process 共用的最小間隔節流 (requests/sec)。
+
+資料來源 (twse / yfinance) 每次發出請求前呼叫 acquire()；未安裝限制器時為 no-op。
+多 process 執行時由主行程建立 RateLimiter，經 pool initializer 以 install() 裝入各 worker，
+共用同一組 Lock / Value，因此整體速率受控，而非每個 worker 各自計算。
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import time
+
+
+class RateLimiter:
+    def __init__(self, rate_per_sec: float, ctx=None):
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec 必須 > 0")
+        ctx = ctx or mp.get_context()
+        self.interval = 1.0 / rate_per_sec
+        self._lock = ctx.Lock()
+        self._next = ctx.Value('d', 0.0, lock=False)
+
+    def acquire(self) -> float:
+        """預約下一個可用時槽並等待；回傳等待秒數。"""
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next.value)
+            self._next.value = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_LIMITER: RateLimiter | None = None
+
+
+def install(limiter: RateLimiter | None) -> None:
+    global _LIMITER
+    _LIMITER = limiter
+
+
+def acquire() -> float:
+    return _LIMITER.acquire() if _LIMITER is not None else 0.0
+
+
+__all__ = ['RateLimiter', 'install', 'acquire']
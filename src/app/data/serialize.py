@@ -0,0 +1,167 @@
+"""API / 代理工具回傳資料的序列化：欄式 (columnar) 為主，列式 (records) 維持既有公開格式。
+
+欄式格式::
+
+    {"format": "columnar", "length": n,
+     "columns": ["date", "open", ...],
+     "data": {"date": ["2024-01-02", ...], "open": [..., null, ...], ...}}
+
+- NaN / NaT 一律輸出 null
+- 日期以向量化 datetime_as_string 轉字串（日線 YYYY-MM-DD，分K 含時間，逐筆視需要到 ms / us / ns）；tz-aware 以當地時間輸出，
+  含時間者附 UTC 偏移（2024-01-02T09:00:00+08:00）
+- dumps() 若安裝 orjson（選用，不在 requirements.txt）則直接序列化 numpy 陣列（NaN 即為 null），
+  否則退回標準 json
+- 大區間可改用 Arrow IPC stream（pyarrow，延遲載入）
+"""
+from __future__ import annotations
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ..lazy import lazy_module
+
+try:  # 選用：較快的 JSON encoder
+    import orjson
+except ImportError:  # pragma: no cover - 依環境而定
+    orjson = None
+
+pa = lazy_module('pyarrow')
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+# 由粗到細：全部值都能整除時使用該精度，次秒級 tick 不會被截成同一秒
+_UNITS = (('D', 86_400 * 10 ** 9), ('s', 10 ** 9), ('ms', 10 ** 6), ('us', 10 ** 3))
+
+
+def _date_strings(values: np.ndarray | pd.DatetimeIndex) -> np.ndarray:
+    """datetime64 陣列（或 tz-aware DatetimeIndex）轉字串陣列；NaT 轉 None。"""
+    aware = values if getattr(values, 'tz', None) is not None else None
+    if aware is not None:
+        values = aware.tz_localize(None).to_numpy()
+    v = values.astype('datetime64[ns]')
+    nat = np.isnat(v)
+    ints = v[~nat].astype(np.int64)
+    unit = next((u for u, ns in _UNITS if (ints % ns == 0).all()), 'ns')
+    out = np.datetime_as_string(v, unit=unit).astype(object)
+    if aware is not None and unit != 'D':
+        # 偏移通常只有一兩種：只格式化不重複值（+0800 -> +08:00）再展開
+        offsets, inverse = np.unique(np.asarray(aware[~nat].strftime('%z'), dtype=str), return_inverse=True)
+        offsets = np.array([f"{o[:3]}:{o[3:]}" for o in offsets], dtype=str)
+        out[~nat] = np.char.add(out[~nat].astype(str), offsets[inverse])
+    out[nat] = None
+    return out
+
+
+def _values(obj: pd.Index | pd.Series) -> np.ndarray | pd.DatetimeIndex:
+    """tz-aware 日期保留為 DatetimeIndex（to_numpy 會變成 Timestamp 物件陣列）。"""
+    if isinstance(obj.dtype, pd.DatetimeTZDtype):
+        return pd.DatetimeIndex(obj)
+    return obj.to_numpy()
+
+
+def _column(values: np.ndarray | pd.DatetimeIndex, native: bool) -> Any:
+    """單欄轉為可序列化形式。native=True 時保留 numpy（給 orjson）。"""
+    if isinstance(values, pd.DatetimeIndex) or np.issubdtype(values.dtype, np.datetime64):
+        return _date_strings(values).tolist()
+    if np.issubdtype(values.dtype, np.floating):
+        if native and orjson is not None:
+            return np.ascontiguousarray(values, dtype=np.float64)
+        out = values.astype(object)
+        out[np.isnan(values)] = None
+        return out.tolist()
+    if np.issubdtype(values.dtype, np.integer) or values.dtype == bool:
+        return np.ascontiguousarray(values) if native and orjson is not None else values.tolist()
+    out = values.astype(object)
+    out[pd.isna(values)] = None
+    return out.tolist()
+
+
+def _frame_columns(df: pd.DataFrame, index_label: str | None, native: bool) -> tuple[List[str], Dict[str, Any]]:
+    names: List[str] = []
+    data: Dict[str, Any] = {}
+    if index_label is not None:
+        names.append(index_label)
+        data[index_label] = _column(_values(df.index), native)
+    for col in df.columns:
+        name = str(col)
+        names.append(name)
+        data[name] = _column(_values(df[col]), native)
+    return names, data
+
+
+def to_columnar(df: pd.DataFrame, index_label: str | None = 'date', native: bool = False) -> Dict[str, Any]:
+    """DataFrame -> 欄式 dict。native=True 時欄位值可能為 numpy 陣列，須搭配 dumps() 輸出。"""
+    names, data = _frame_columns(df, index_label, native)
+    return {'format': 'columnar', 'length': int(len(df)), 'columns': names, 'data': data}
+
+
+def to_records(df: pd.DataFrame, index_label: str | None = 'date') -> List[Dict[str, Any]]:
+    """DataFrame -> 列式 [{date, open, ...}]（既有公開格式，NaN 為 None、日期為字串）。"""
+    names, data = _frame_columns(df, index_label, native=False)
+    cols = [data[n] for n in names]
+    return [dict(zip(names, row)) for row in zip(*cols)]
+
+
+def from_payload(payload: Any, index_label: str = 'date') -> pd.DataFrame:
+    """接受列式 records 或欄式 dict，還原為 index=date 的 DataFrame。"""
+    if isinstance(payload, dict) and payload.get('format') == 'columnar':
+        df = pd.DataFrame({c: payload['data'][c] for c in payload['columns']})
+    else:
+        df = pd.DataFrame(payload)
+    if index_label in df.columns:
+        df[index_label] = pd.to_datetime(df[index_label])
+        df = df.set_index(index_label)
+    return df
+
+
+def _default(obj: Any):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (np.integer, np.floating)):
+        return obj.item()
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """以 orjson（若有）序列化；NaN 一律輸出 null。"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_nan_to_none(obj), default=_default, allow_nan=False, ensure_ascii=False).encode('utf-8')
+
+
+def _nan_to_none(obj: Any) -> Any:
+    if isinstance(obj, float) and obj != obj:
+        return None
+    if isinstance(obj, dict):
+        return {k: _nan_to_none(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_nan_to_none(v) for v in obj]
+    if isinstance(obj, np.ndarray) and np.issubdtype(obj.dtype, np.floating):
+        out = obj.astype(object)
+        out[np.isnan(obj)] = None
+        return out.tolist()
+    return obj
+
+
+def to_arrow_ipc(df: pd.DataFrame, index_label: str = 'date') -> bytes:
+    """DataFrame -> Arrow IPC stream bytes（前端可用 apache-arrow 直接讀取）。"""
+    frame = df.rename_axis(index_label).reset_index()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_arrow_ipc(data: bytes, index_label: str = 'date') -> pd.DataFrame:
+    with pa.ipc.open_stream(data) as reader:
+        df = reader.read_pandas()
+    return df.set_index(index_label) if index_label in df.columns else df
+
+
+__all__ = [
+    'ARROW_MEDIA_TYPE', 'to_columnar', 'to_records', 'from_payload', 'dumps', 'to_arrow_ipc', 'from_arrow_ipc',
+]
@@ -0,0 +1,285 @@
+"""交易日曆：預先計算排序好的交易日陣列 (datetime64[D])，以二分搜尋回答區間查詢。
+
+    cal = twse_calendar()
+    cal.sessions_in_range('2024-02-01', '2024-02-29')     # 應有的交易日
+    cal.missing_sessions(df.index, start, end)            # 應有但資料中沒有的交易日
+    cal.next_session('2024-02-05'), cal.previous_session('2024-02-15')
+
+- 交易日 = 週一至週五 − 休市日（國定假日、春節封關、颱風停市等）+ 補行交易日
+- 半日交易以 half_days {日期: 收盤時間} 表示，close_time() 查詢
+- TWSE 休市日依證交所公告整理於 TWSE_CLOSURES；未收錄的年度無法判斷休市日，
+  missing_sessions 遇到這些年度會拋出 CalendarCoverageError（strict=False 時略過），
+  呼叫端自行退回較粗略的檢查。臨時停市（颱風）可寫入 settings.calendar_file
+  （CSV: date,kind[,close]，kind 為 closed / session / half_day）而不需改程式
+- 所有查詢皆為 searchsorted (O(log n))，區間結果為陣列切片
+"""
+from __future__ import annotations
+from datetime import date, datetime, time as dtime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Mapping
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import settings
+
+TAIPEI = ZoneInfo('Asia/Taipei')
+
+# 證交所市場休市日（僅列平日；週末本來就不交易）
+TWSE_CLOSURES: Dict[int, tuple[str, ...]] = {
+    2019: (
+        '2019-01-01',
+        '2019-01-31', '2019-02-01',                                      # 春節封關（僅結算）
+        '2019-02-04', '2019-02-05', '2019-02-06', '2019-02-07', '2019-02-08',
+        '2019-02-28', '2019-03-01',                                      # 和平紀念日 / 調整放假
+        '2019-04-04', '2019-04-05',                                      # 兒童節 / 清明
+        '2019-05-01',
+        '2019-06-07',                                                    # 端午
+        '2019-09-13',                                                    # 中秋
+        '2019-10-10', '2019-10-11',                                      # 國慶 / 調整放假
+    ),
+    2020: (
+        '2020-01-01',
+        '2020-01-21', '2020-01-22',                                      # 春節封關（僅結算）
+        '2020-01-23', '2020-01-24', '2020-01-27', '2020-01-28', '2020-01-29',
+        '2020-02-28',
+        '2020-04-02', '2020-04-03',                                      # 兒童節 / 清明補假
+        '2020-05-01',
+        '2020-06-25', '2020-06-26',                                      # 端午 / 調整放假
+        '2020-10-01', '2020-10-02',                                      # 中秋 / 調整放假
+        '2020-10-09',                                                    # 國慶補假
+    ),
+    2021: (
+        '2021-01-01',
+        '2021-02-08', '2021-02-09',                                      # 春節封關（僅結算）
+        '2021-02-10', '2021-02-11', '2021-02-12', '2021-02-15', '2021-02-16',
+        '2021-03-01',                                                    # 和平紀念日補假
+        '2021-04-02', '2021-04-05',                                      # 兒童節 / 清明補假
+        '2021-06-14',                                                    # 端午
+        '2021-09-20', '2021-09-21',                                      # 調整放假 / 中秋
+        '2021-10-11',                                                    # 國慶補假
+        '2021-12-31',                                                    # 元旦補假
+    ),
+    2022: (
+        '2022-01-27', '2022-01-28',                                      # 春節封關（僅結算）
+        '2022-01-31', '2022-02-01', '2022-02-02', '2022-02-03', '2022-02-04',
+        '2022-02-28',
+        '2022-04-04', '2022-04-05',
+        '2022-05-02',                                                    # 勞動節補假
+        '2022-06-03',                                                    # 端午
+        '2022-09-09',                                                    # 中秋補假
+        '2022-10-10',
+    ),
+    2023: (
+        '2023-01-02',                                                    # 元旦補假
+        '2023-01-18', '2023-01-19', '2023-01-20',                        # 春節封關（僅結算）
+        '2023-01-23', '2023-01-24', '2023-01-25', '2023-01-26', '2023-01-27',
+        '2023-02-27', '2023-02-28',                                      # 和平紀念日
+        '2023-04-03', '2023-04-04', '2023-04-05',                        # 兒童節 / 清明
+        '2023-05-01',                                                    # 勞動節
+        '2023-06-22', '2023-06-23',                                      # 端午
+        '2023-08-03',                                                    # 颱風（卡努）停市
+        '2023-09-29',                                                    # 中秋
+        '2023-10-09', '2023-10-10',                                      # 國慶
+    ),
+    2024: (
+        '2024-01-01',
+        '2024-02-06', '2024-02-07', '2024-02-08', '2024-02-09',          # 春節（02-06、02-07 僅結算）
+        '2024-02-12', '2024-02-13', '2024-02-14',
+        '2024-02-28',
+        '2024-04-04', '2024-04-05',
+        '2024-05-01',
+        '2024-06-10',                                                    # 端午
+        '2024-07-24', '2024-07-25',                                      # 颱風（凱米）停市
+        '2024-09-17',                                                    # 中秋
+        '2024-10-02', '2024-10-03',                                      # 颱風（山陀兒）停市
+        '2024-10-10',
+        '2024-10-31',                                                    # 颱風（康芮）停市
+    ),
+    2025: (
+        '2025-01-01',
+        '2025-01-23', '2025-01-24',                                      # 春節封關（僅結算）
+        '2025-01-27', '2025-01-28', '2025-01-29', '2025-01-30', '2025-01-31',
+        '2025-02-28',
+        '2025-04-03', '2025-04-04',
+        '2025-05-01',
+        '2025-05-30',                                                    # 端午
+        '2025-09-29',                                                    # 教師節補假
+        '2025-10-06',                                                    # 中秋
+        '2025-10-10',
+        '2025-10-24',                                                    # 臺灣光復暨金門古寧頭大捷紀念日補假
+        '2025-12-25',                                                    # 行憲紀念日
+    ),
+    2026: (
+        '2026-01-01',
+        '2026-02-12', '2026-02-13',                                      # 春節封關（僅結算）
+        '2026-02-16', '2026-02-17', '2026-02-18', '2026-02-19', '2026-02-20',
+        '2026-02-27',                                                    # 和平紀念日補假
+        '2026-04-03', '2026-04-06',                                      # 兒童節 / 清明補假
+        '2026-05-01',
+        '2026-06-19',                                                    # 端午
+        '2026-09-25',                                                    # 中秋
+        '2026-09-28',                                                    # 教師節
+        '2026-10-09',                                                    # 國慶補假
+        '2026-10-26',                                                    # 臺灣光復暨金門古寧頭大捷紀念日補假
+        '2026-12-25',
+    ),
+}
+
+
+class CalendarCoverageError(ValueError):
+    """查詢區間含休市日未收錄的年度，無法判斷應有的交易日。"""
+
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+def _index(days: np.ndarray) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(days.astype('datetime64[ns]'))
+
+
+def _days(values: Iterable) -> np.ndarray:
+    """日期集合 -> 排序、去重的 datetime64[D] 陣列。"""
+    idx = pd.DatetimeIndex(pd.to_datetime(pd.Index(values)))
+    return np.unique(idx.to_numpy().astype('datetime64[D]'))
+
+
+class TradingCalendar:
+    def __init__(self, start: str | date = '2000-01-01', end: str | date | None = None,
+                 closures: Iterable = (), extra_sessions: Iterable = (),
+                 half_days: Mapping | None = None, close: dtime = dtime(13, 30),
+                 tz: ZoneInfo = TAIPEI, weekmask: str = '1111100', years: Iterable[int] | None = None):
+        """years: 休市日已完整列入 closures 的年度；None 表示全部年度皆可信。"""
+        end = end or date(date.today().year + 1, 12, 31)
+        weekdays = np.arange(_day(start), _day(end) + 1, dtype='datetime64[D]')
+        weekdays = weekdays[np.is_busday(weekdays, weekmask=weekmask)]
+        self.closures = _days(closures)
+        extra = _days(extra_sessions)
+        sessions = np.union1d(np.setdiff1d(weekdays, self.closures, assume_unique=True), extra)
+        self.sessions: np.ndarray = sessions
+        self.close = close
+        self.tz = tz
+        self.half_days: Dict[np.datetime64, dtime] = {_day(d): t for d, t in (half_days or {}).items()}
+        self.years = None if years is None else frozenset(int(y) for y in years)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @property
+    def first(self) -> pd.Timestamp:
+        return pd.Timestamp(self.sessions[0])
+
+    @property
+    def last(self) -> pd.Timestamp:
+        return pd.Timestamp(self.sessions[-1])
+
+    def _bounds(self, start, end) -> tuple[int, int]:
+        return (int(np.searchsorted(self.sessions, _day(start), 'left')),
+                int(np.searchsorted(self.sessions, _day(end), 'right')))
+
+    # --- 查詢 ---
+    def uncovered_years(self, start, end) -> list[int]:
+        """[start, end] 內休市日未收錄的年度。"""
+        if self.years is None:
+            return []
+        return [y for y in range(pd.Timestamp(start).year, pd.Timestamp(end).year + 1) if y not in self.years]
+
+    def is_session(self, day) -> bool:
+        d = _day(day)
+        i = np.searchsorted(self.sessions, d)
+        return bool(i < len(self.sessions) and self.sessions[i] == d)
+
+    def sessions_in_range(self, start, end) -> pd.DatetimeIndex:
+        """[start, end]（含兩端）內的交易日。"""
+        i, j = self._bounds(start, end)
+        return _index(self.sessions[i:j])
+
+    def session_count(self, start, end) -> int:
+        i, j = self._bounds(start, end)
+        return max(0, j - i)
+
+    def next_session(self, day, inclusive: bool = False) -> pd.Timestamp:
+        """day 之後（inclusive=True 時含 day）的第一個交易日。"""
+        i = np.searchsorted(self.sessions, _day(day), 'left' if inclusive else 'right')
+        if i >= len(self.sessions):
+            raise KeyError(f"{day} 之後超出日曆範圍")
+        return pd.Timestamp(self.sessions[i])
+
+    def previous_session(self, day, inclusive: bool = False) -> pd.Timestamp:
+        """day 之前（inclusive=True 時含 day）的最後一個交易日。"""
+        i = np.searchsorted(self.sessions, _day(day), 'right' if inclusive else 'left') - 1
+        if i < 0:
+            raise KeyError(f"{day} 之前超出日曆範圍")
+        return pd.Timestamp(self.sessions[i])
+
+    def close_time(self, day) -> dtime:
+        return self.half_days.get(_day(day), self.close)
+
+    def is_half_day(self, day) -> bool:
+        return _day(day) in self.half_days
+
+    def last_complete_session(self, now: datetime | None = None, delay_minutes: int = 60) -> pd.Timestamp:
+        """now（預設為當地現在時間）時資料應已公布的最後交易日：今日收盤 + delay_minutes 之後才算今日。"""
+        if now is None:
+            now = datetime.now(self.tz)
+        elif now.tzinfo is not None:
+            now = now.astimezone(self.tz)
+        local, today = now.replace(tzinfo=None), now.date()
+        if self.is_session(today):
+            published = datetime.combine(today, self.close_time(today)) + pd.Timedelta(minutes=delay_minutes)
+            if local >= published:
+                return pd.Timestamp(today)
+        return self.previous_session(today)
+
+    def missing_sessions(self, have: Iterable, start, end, asof=None, strict: bool = True) -> pd.DatetimeIndex:
+        """[start, min(end, asof)] 內應有但 have 中沒有的交易日；asof 預設為 last_complete_session()。
+
+        區間含休市日未收錄的年度時拋出 CalendarCoverageError；strict=False 則只回傳已收錄年度的缺漏。
+        """
+        asof = self.last_complete_session() if asof is None else pd.Timestamp(asof)
+        end = min(pd.Timestamp(end), asof)
+        gaps = self.uncovered_years(start, end)
+        if gaps and strict:
+            raise CalendarCoverageError(f"交易日曆未收錄 {gaps} 年的休市日，無法判斷缺漏交易日")
+        i, j = self._bounds(start, end)
+        expected = self.sessions[i:j]
+        if gaps:
+            years = expected.astype('datetime64[Y]').astype(int) + 1970
+            expected = expected[~np.isin(years, gaps)]
+        found = np.isin(expected, _days(have), assume_unique=True)
+        return _index(expected[~found])
+
+
+def read_calendar_file(path: str | Path) -> dict:
+    """CSV 欄位 date,kind[,close]；kind: closed / session / half_day（close 為 HH:MM）。"""
+    df = pd.read_csv(path, dtype=str).fillna('')
+    kind = df['kind'].str.strip().str.lower()
+    half = df[kind == 'half_day']
+    closes = half['close'] if 'close' in half.columns else [''] * len(half)
+    return {
+        'closures': df.loc[kind == 'closed', 'date'].tolist(),
+        'extra_sessions': df.loc[kind.isin(['session', 'half_day']), 'date'].tolist(),
+        'half_days': {d: dtime.fromisoformat(c or '12:00') for d, c in zip(half['date'], closes)},
+    }
+
+
+@lru_cache(maxsize=1)
+def twse_calendar() -> TradingCalendar:
+    """證交所日曆（行程內快取）：TWSE_CLOSURES + settings.calendar_file 的臨時異動。"""
+    closures = [d for days in TWSE_CLOSURES.values() for d in days]
+    extra: list = []
+    half_days: dict = {}
+    path = Path(settings.calendar_file) if settings.calendar_file else None
+    if path is not None and path.exists():
+        adhoc = read_calendar_file(path)
+        closures += adhoc['closures']
+        extra, half_days = adhoc['extra_sessions'], adhoc['half_days']
+    return TradingCalendar(closures=closures, extra_sessions=extra, half_days=half_days, years=TWSE_CLOSURES)
+
+
+__all__ = ['TradingCalendar', 'CalendarCoverageError', 'twse_calendar', 'read_calendar_file', 'TWSE_CLOSURES',
+           'TAIPEI']
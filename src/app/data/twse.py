@@ -7,16 +7,24 @@
   - 以月份為單位抓取（API 依指定日期回傳該月份所有日資料）
   - backoff 重試網路與暫時性錯誤
   - parquet 快取: data/raw/twse/{symbol}.parquet
+  - 依交易日曆 (data.sessions) 只補抓快取缺漏交易日所在的月份；已完整抓過的過去月份記錄於
+    {symbol}.months.json，停牌 / 未上市造成的缺漏不會每次重抓（日曆未收錄休市日的年度，
+    未記錄的月份各抓一次）
 
 注意: 公開 API 有頻率限制，請避免高併發；此實作僅供研究用途。
 """
 from __future__ import annotations
 import requests
 import pandas as pd
+import json
 from pathlib import Path
 from datetime import datetime
 import backoff
-from typing import Optional
+from typing import Iterable, Optional
+
+from . import ratelimit
+from .adjust import unadjust_splits
+from .sessions import twse_calendar
 
 BASE_URL_NEW = "https://www.twse.com.tw/rwd/zh/stock/day"
 BASE_URL_LEGACY = "https://www.twse.com.tw/exchangeReport/STOCK_DAY"
@@ -47,6 +55,7 @@ def _request_json(params):
     # 先嘗試新版 rwd，失敗再試 legacy
     for base in (BASE_URL_NEW, BASE_URL_LEGACY):
         try:
+            ratelimit.acquire()
             r = requests.get(base, params=params, headers=HEADERS, timeout=10)
             if r.status_code == 404:
                 continue
@@ -124,28 +133,62 @@ def fetch_twse_range(symbol: str, start: str, end: str) -> pd.DataFrame:
     return df.loc[mask]
 
 
+def _months_file(symbol: str) -> Path:
+    return CACHE_DIR / f"{symbol}.months.json"
+
+
+def _load_complete_months(symbol: str) -> set:
+    path = _months_file(symbol)
+    if not path.exists():
+        return set()
+    return {tuple(m) for m in json.loads(path.read_text(encoding='utf-8'))}
+
+
+def _save_complete_months(symbol: str, months: set) -> None:
+    _months_file(symbol).write_text(json.dumps(sorted(months)), encoding='utf-8')
+
+
+def fetch_twse_months(symbol: str, months: Iterable[tuple[int, int]]) -> pd.DataFrame:
+    frames = [fetch_twse_month(symbol, y, m) for y, m in months]
+    if not frames:
+        return pd.DataFrame(columns=['open','high','low','close','volume'])
+    return pd.concat(frames).sort_index()
+
+
 def fetch_twse_range_cached(symbol: str, start: str, end: str, refresh: bool = False, fallback_yf: bool = True) -> pd.DataFrame:
-    """帶 parquet 快取的範圍抓取。會增量更新檔案並回傳指定期間資料。"""
+    """帶 parquet 快取的範圍抓取。只抓取缺漏交易日所在的月份（refresh=True 時整段重抓），增量寫回並回傳指定期間資料。"""
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
     cache_file = CACHE_DIR / f"{symbol}.parquet"
-    if cache_file.exists() and not refresh:
+    if cache_file.exists():
         cache_df = pd.read_parquet(cache_file)
+        cache_df.index = pd.to_datetime(cache_df.index)
     else:
         cache_df = pd.DataFrame(columns=['open','high','low','close','volume'])
 
-    # 判斷缺失月份範圍
-    existing_dates = pd.to_datetime(cache_df.index) if not cache_df.empty else pd.DatetimeIndex([])
-    need_full_fetch = cache_df.empty or refresh
+    cal = twse_calendar()
+    asof = cal.last_complete_session()
+    complete = _load_complete_months(symbol)
+    if refresh:
+        months = list(_month_range(start, end))
+    else:
+        missing = cal.missing_sessions(cache_df.index, start, end, asof=asof, strict=False)
+        months = {(d.year, d.month) for d in missing}
+        # 休市日未收錄的年度無法逐日比對：尚未完整抓過的月份各抓一次，之後由 {symbol}.months.json 記錄
+        hi = min(pd.Timestamp(end), asof)
+        uncovered = set(cal.uncovered_years(start, hi))
+        if uncovered:
+            months |= {(y, m) for y, m in _month_range(start, hi.strftime('%Y-%m-%d')) if y in uncovered}
+        months = sorted(months - complete)
+    fetched_months = []
     try:
-        if need_full_fetch:
-            updated_df = fetch_twse_range(symbol, start, end)
-        else:
-            updated_df = fetch_twse_range(symbol, start, end)
+        updated_df = fetch_twse_months(symbol, months)
+        fetched_months = months
     except Exception as e:
         if fallback_yf:
             # 轉為 yfinance 後綴 .TW
             import yfinance as yf
             alt_symbol = symbol if symbol.endswith('.TW') else f"{symbol}.TW"
+            ratelimit.acquire()
             data = yf.download(alt_symbol, start=start, end=end, progress=False, auto_adjust=False)
             if data.empty:
                 raise RuntimeError(f"TWSE & yfinance both failed for {symbol}: {e}") from e
@@ -156,17 +199,24 @@ def fetch_twse_range_cached(symbol: str, start: str, end: str, refresh: bool = F
             keep = [col for col in ["open","high","low","close","volume"] if col in data.columns]
             data = data[keep]
             data.index.name = 'date'
-            updated_df = data
+            # 快取存未還原價格：yfinance 已做的分割 / 配股還原先換回原始價格
+            updated_df = unadjust_splits(data, symbol)
         else:
             raise
     if not updated_df.empty:
-        merged = pd.concat([cache_df, updated_df])
+        merged = pd.concat([cache_df, updated_df]) if not cache_df.empty else updated_df
     else:
         merged = cache_df
     # 去除重複日期，保留最新（後抓的覆蓋）
     if not merged.empty:
         merged = merged[~merged.index.duplicated(keep='last')]
     merged = merged.sort_index()
-    merged.to_parquet(cache_file)
+    if months or refresh:
+        merged.to_parquet(cache_file)
+    # 月底已過（該月最後交易日 <= asof）的月份視為完整，之後不再因缺漏重抓
+    done = {(y, m) for y, m in fetched_months
+            if cal.previous_session(pd.Timestamp(y, m, 1) + pd.offsets.MonthEnd(0), inclusive=True) <= asof}
+    if done - complete:
+        _save_complete_months(symbol, complete | done)
     mask = (merged.index >= start) & (merged.index <= end)
     return merged.loc[mask]
@@ -1,10 +1,14 @@
-"""技術與統計指標工具集 (MA / RSI / Volatility / Z-Score / Momentum)
+"""技術與統計指標工具集 (MA / RSI / Volatility / Z-Score / Momentum / EMA / MACD / ATR / Bollinger)
 所有函式皆回傳與輸入等長的 pandas.Series，index 對齊。
+遞迴平滑類 (ema / wilder_rsi / macd / atr) 另接受 DataFrame 面板 (dates × symbols)，
+核心計算與續算狀態見 ``features.smoothing``。
 """
 from __future__ import annotations
 import pandas as pd
 import numpy as np
 from math import sqrt
+from . import smoothing
+from ..performance.metrics import infer_periods_per_year
 
 
 def sma(series: pd.Series, window: int) -> pd.Series:
@@ -22,11 +26,13 @@ def rsi(series: pd.Series, window: int = 14) -> pd.Series:
     return rsi
 
 
-def volatility(series: pd.Series, window: int = 20, annualize: bool = False) -> pd.Series:
+def volatility(series: pd.Series, window: int = 20, annualize: bool = False,
+               periods_per_year: float | None = None) -> pd.Series:
+    """annualize 時以 periods_per_year 年化；None 依 index 的 bar 頻率推斷（日線 252）。"""
     rets = series.pct_change()
     vol = rets.rolling(window).std()
     if annualize:
-        vol = vol * sqrt(252)
+        vol = vol * sqrt(infer_periods_per_year(series.index) if periods_per_year is None else periods_per_year)
     return vol
 
 
@@ -47,6 +53,43 @@ def mean_reversion_signal(series: pd.Series, window: int = 5) -> pd.Series:
     sig = (series < ma).astype(int) - (series > ma).astype(int)
     return sig
 
+def _like(obj: pd.Series | pd.DataFrame, values: np.ndarray) -> pd.Series | pd.DataFrame:
+    if isinstance(obj, pd.DataFrame):
+        return pd.DataFrame(values, index=obj.index, columns=obj.columns)
+    return pd.Series(values, index=obj.index, name=obj.name)
+
+
+def ema(series: pd.Series | pd.DataFrame, span: int) -> pd.Series | pd.DataFrame:
+    out, _ = smoothing.ema(series.to_numpy(dtype=float), span)
+    return _like(series, out)
+
+
+def wilder_rsi(series: pd.Series | pd.DataFrame, window: int = 14) -> pd.Series | pd.DataFrame:
+    """Wilder 平滑 RSI（alpha=1/window）；前 window 筆為 NaN。"""
+    out, _ = smoothing.rsi_wilder(series.to_numpy(dtype=float), window)
+    return _like(series, out)
+
+
+def macd(series: pd.Series | pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9):
+    """回傳 (macd, signal, hist)，型別與輸入相同。"""
+    (line, sig, hist), _ = smoothing.macd(series.to_numpy(dtype=float), fast, slow, signal)
+    return _like(series, line), _like(series, sig), _like(series, hist)
+
+
+def atr(high: pd.Series | pd.DataFrame, low: pd.Series | pd.DataFrame, close: pd.Series | pd.DataFrame,
+        window: int = 14) -> pd.Series | pd.DataFrame:
+    out, _ = smoothing.atr(high.to_numpy(dtype=float), low.to_numpy(dtype=float), close.to_numpy(dtype=float), window)
+    return _like(close, out)
+
+
+def bollinger(series: pd.Series | pd.DataFrame, window: int = 20, k: float = 2.0):
+    """回傳 (mid, upper, lower)；標準差採母體 (ddof=0)。"""
+    mid = series.rolling(window).mean()
+    std_ = series.rolling(window).std(ddof=0)
+    return mid, mid + k * std_, mid - k * std_
+
+
 __all__ = [
-    'sma', 'rsi', 'volatility', 'zscore', 'momentum_signal', 'mean_reversion_signal'
+    'sma', 'rsi', 'volatility', 'zscore', 'momentum_signal', 'mean_reversion_signal',
+    'ema', 'wilder_rsi', 'macd', 'atr', 'bollinger',
 ]
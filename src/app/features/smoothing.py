@@ -0,0 +1,197 @@
+"""遞迴平滑濾波核心 (EMA / Wilder)：以 NumPy 向量化，支援 1D 序列與 2D 面板 (dates × symbols)。
+
+y_t = (1 - alpha) * y_{t-1} + alpha * x_t 是一階遞迴，逐筆 Python 迴圈在全市場資料上太慢。
+此處將序列切成區塊，區塊內以封閉解一次算完：
+
+    y_t = D_t * (y_prev + cumsum(alpha * x_k / D_k)),  D_t = prod(decay_j, j <= t)
+
+區塊長度依 decay 決定，確保 D_t 不會下溢；區塊間只傳遞最後一列狀態，因此總成本為 O(n)。
+語意對齊 ``pandas.ewm(alpha, adjust=False, ignore_na=True)``：
+  - 每欄以第一個有效值為種子
+  - NaN 不更新狀態，輸出沿用前值
+  - 有效觀測數 < min_periods 時輸出 NaN
+
+所有函式皆可傳入上次回傳的 state，於既有結果後增量追加 (incremental append)，
+結果與一次計算整段在浮點誤差內一致。
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+
+# 區塊內 D_t 下限約 1e-100，遠離 float64 下溢且保有足夠精度
+_LOG_FLOOR = 100 * np.log(10.0)
+_MAX_BLOCK = 8192
+
+
+@dataclass
+class EwmState:
+    """單一 EWM 濾波的續算狀態 (每欄一個值)。"""
+    value: np.ndarray  # 最後平滑值；尚無有效觀測時為 NaN
+    count: np.ndarray  # 已納入的有效觀測數
+
+    @classmethod
+    def empty(cls, n_cols: int) -> 'EwmState':
+        return cls(value=np.full(n_cols, np.nan), count=np.zeros(n_cols, dtype=np.int64))
+
+
+@dataclass
+class RsiState:
+    last_close: np.ndarray
+    gain: EwmState
+    loss: EwmState
+
+
+@dataclass
+class MacdState:
+    fast: EwmState
+    slow: EwmState
+    signal: EwmState
+
+
+@dataclass
+class AtrState:
+    last_close: np.ndarray
+    tr: EwmState
+
+
+def _as_2d(x) -> tuple[np.ndarray, bool]:
+    arr = np.asarray(x, dtype=np.float64)
+    if arr.ndim == 1:
+        return arr.reshape(-1, 1), True
+    if arr.ndim != 2:
+        raise ValueError(f"僅支援 1D/2D 輸入，收到 ndim={arr.ndim}")
+    return arr, False
+
+
+def _block_size(decay: float) -> int:
+    if decay >= 1.0:
+        return _MAX_BLOCK
+    return int(max(1, min(_MAX_BLOCK, _LOG_FLOOR // -np.log(decay))))
+
+
+def _ffill_filter(a2: np.ndarray, prev: np.ndarray) -> np.ndarray:
+    """alpha == 1 的退化情形：輸出即為最近一筆有效值。"""
+    stacked = np.vstack([prev[None, :], a2])
+    valid = ~np.isnan(stacked)
+    idx = np.where(valid, np.arange(len(stacked))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return np.take_along_axis(stacked, idx, axis=0)[1:]
+
+
+def ewm_filter(x, alpha: float, state: EwmState | None = None, min_periods: int = 0) -> tuple[np.ndarray, EwmState]:
+    """向量化指數平滑。回傳 (平滑結果, 續算狀態)，結果形狀與輸入相同。"""
+    if not 0.0 < alpha <= 1.0:
+        raise ValueError(f"alpha 必須介於 (0, 1]，收到 {alpha}")
+    a2, squeeze = _as_2d(x)
+    n, m = a2.shape
+    state = state or EwmState.empty(m)
+    if state.value.shape != (m,):
+        raise ValueError(f"state 欄數 {state.value.shape} 與輸入欄數 {m} 不符")
+    valid_all = ~np.isnan(a2)
+    count = state.count[None, :] + np.cumsum(valid_all, axis=0)
+
+    decay = 1.0 - alpha
+    if decay == 0.0:
+        out = _ffill_filter(a2, state.value)
+    else:
+        out = np.empty_like(a2)
+        prev = state.value.copy()
+        block = _block_size(decay)
+        for s in range(0, n, block):
+            xb = a2[s:s + block]
+            valid = valid_all[s:s + block]
+            # 尚未有種子的欄位：以本區塊第一個有效值為種子
+            unseeded = np.isnan(prev) & valid.any(axis=0)
+            if unseeded.any():
+                first = valid.argmax(axis=0)
+                prev[unseeded] = xb[first[unseeded], np.flatnonzero(unseeded)]
+            d = np.where(valid, decay, 1.0)
+            w = alpha * np.where(valid, xb, 0.0)
+            D = np.cumprod(d, axis=0)
+            yb = D * (np.nan_to_num(prev)[None, :] + np.cumsum(w / D, axis=0))
+            out[s:s + block] = yb
+            prev = np.where(np.isnan(prev), np.nan, yb[-1])
+
+    if n:
+        # 狀態保留未遮罩的內部平滑值（min_periods 只影響輸出）
+        new_state = EwmState(value=np.where(count[-1] > 0, out[-1], np.nan), count=count[-1].copy())
+    else:
+        new_state = EwmState(value=state.value.copy(), count=state.count.copy())
+    out[count < max(min_periods, 1)] = np.nan
+    if squeeze:
+        out = out[:, 0]
+    return out, new_state
+
+
+def ema(x, span: int, state: EwmState | None = None, min_periods: int = 0) -> tuple[np.ndarray, EwmState]:
+    return ewm_filter(x, 2.0 / (span + 1.0), state, min_periods)
+
+
+def wilder(x, window: int, state: EwmState | None = None, min_periods: int | None = None) -> tuple[np.ndarray, EwmState]:
+    """Wilder 平滑 (RMA)：alpha = 1/window。"""
+    return ewm_filter(x, 1.0 / window, state, window if min_periods is None else min_periods)
+
+
+def _diff_with_prev(a2: np.ndarray, last: np.ndarray) -> np.ndarray:
+    return np.diff(np.vstack([last[None, :], a2]), axis=0)
+
+
+def rsi_wilder(close, window: int = 14, state: RsiState | None = None) -> tuple[np.ndarray, RsiState]:
+    c2, squeeze = _as_2d(close)
+    m = c2.shape[1]
+    if state is None:
+        state = RsiState(np.full(m, np.nan), EwmState.empty(m), EwmState.empty(m))
+    delta = _diff_with_prev(c2, state.last_close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    nan = np.isnan(delta)
+    gain[nan] = np.nan
+    loss[nan] = np.nan
+    avg_gain, g_state = wilder(gain, window, state.gain)
+    avg_loss, l_state = wilder(loss, window, state.loss)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    last = c2[-1].copy() if len(c2) else state.last_close.copy()
+    if squeeze:
+        out = out[:, 0]
+    return out, RsiState(last, g_state, l_state)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9,
+         state: MacdState | None = None) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], MacdState]:
+    """回傳 ((macd, signal, hist), state)。"""
+    c2, squeeze = _as_2d(close)
+    m = c2.shape[1]
+    if state is None:
+        state = MacdState(EwmState.empty(m), EwmState.empty(m), EwmState.empty(m))
+    f, f_state = ema(c2, fast, state.fast)
+    s, s_state = ema(c2, slow, state.slow)
+    line = f - s
+    sig, sig_state = ema(line, signal, state.signal)
+    hist = line - sig
+    if squeeze:
+        line, sig, hist = line[:, 0], sig[:, 0], hist[:, 0]
+    return (line, sig, hist), MacdState(f_state, s_state, sig_state)
+
+
+def atr(high, low, close, window: int = 14, state: AtrState | None = None) -> tuple[np.ndarray, AtrState]:
+    h2, squeeze = _as_2d(high)
+    l2, _ = _as_2d(low)
+    c2, _ = _as_2d(close)
+    m = c2.shape[1]
+    if state is None:
+        state = AtrState(np.full(m, np.nan), EwmState.empty(m))
+    prev_close = np.vstack([state.last_close[None, :], c2[:-1]])
+    with np.errstate(invalid='ignore'):
+        tr = np.fmax(h2 - l2, np.fmax(np.abs(h2 - prev_close), np.abs(l2 - prev_close)))
+    out, tr_state = wilder(tr, window, state.tr)
+    last = c2[-1].copy() if len(c2) else state.last_close.copy()
+    if squeeze:
+        out = out[:, 0]
+    return out, AtrState(last, tr_state)
+
+
+__all__ = [
+    'EwmState', 'RsiState', 'MacdState', 'AtrState',
+    'ewm_filter', 'ema', 'wilder', 'rsi_wilder', 'macd', 'atr',
+]
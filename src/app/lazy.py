@@ -0,0 +1,56 @@
+"""延遲匯入：重量級相依 (matplotlib / plotly / yfinance / azure SDK) 於首次使用時才載入。
+
+    plt = lazy_module('matplotlib.pyplot')
+    plt.subplots(...)          # 此時才真正 import
+
+CLI、測試收集與每個 uvicorn worker 啟動時，不會為了用不到的繪圖或代理功能付出匯入成本。
+相對名稱需帶 package，例如 ``lazy_module('..data.twse', __package__)``。
+"""
+from __future__ import annotations
+import importlib
+import sys
+from types import ModuleType
+
+# 啟動預算測試與 import-time benchmark 共用：核心模組匯入後不應出現在 sys.modules
+HEAVY_MODULES = ('matplotlib', 'plotly', 'yfinance', 'azure', 'requests', 'backoff')
+
+
+class _LazyModule(ModuleType):
+    def __init__(self, name: str, package: str | None = None):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = (name, package)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> ModuleType:
+        mod = self.__dict__['_lazy_module']
+        if mod is None:
+            name, package = self.__dict__['_lazy_target']
+            mod = importlib.import_module(name, package)
+            self.__dict__['_lazy_module'] = mod
+        return mod
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        name, _ = self.__dict__['_lazy_target']
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module {name!r} ({state})>"
+
+
+def lazy_module(name: str, package: str | None = None) -> ModuleType:
+    """回傳模組代理；若模組已載入則直接回傳真正的模組。"""
+    if not name.startswith('.') and name in sys.modules:
+        return sys.modules[name]
+    return _LazyModule(name, package)
+
+
+def loaded_heavy_modules() -> list[str]:
+    """目前已載入的重量級頂層套件（供啟動預算檢查）。"""
+    return sorted({m.split('.')[0] for m in sys.modules} & set(HEAVY_MODULES))
+
+
+__all__ = ['lazy_module', 'loaded_heavy_modules', 'HEAVY_MODULES']
@@ -0,0 +1,248 @@
+"""階段圖 (DAG) 執行器：每個 stage 的輸出持久化，並以「參數 + 上游輸出指紋」為鍵。
+
+- 重跑時只執行鍵改變的 stage；上游重算但輸出內容不變時，下游仍命中快取
+- 互不相依的 stage（含多檔標的各自的子圖）以 thread pool 同時執行
+- serial=True 的 stage（例如 matplotlib 繪圖）彼此互斥執行
+- 某 stage 失敗時其下游標記為 skipped，已完成的 stage 仍保留 checkpoint，下次從斷點續跑
+- dry_run=True 只回報哪些 stage 會重算，不執行任何 stage
+
+    stages = [Stage('fetch', fetch, params={'symbol': '2330'}), Stage('bt', run_bt, deps=('fetch',))]
+    result = run_dag(stages, StageStore('data/checkpoints'))
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+from ..data.fingerprint import frame_fingerprint, params_fingerprint
+
+CACHED, RAN, FAILED, SKIPPED, WOULD_RUN, UPSTREAM = 'cached', 'ran', 'failed', 'skipped', 'would-run', 'would-run (upstream)'
+
+
+@dataclass(frozen=True)
+class Stage:
+    """fn(*上游輸出（依 deps 順序）, **params) -> 輸出。
+
+    version: 邏輯變更時遞增以使舊 checkpoint 失效。
+    check: 命中快取時額外驗證輸出仍有效（例如報表檔案仍存在），回傳 False 則重算。
+    """
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    version: int = 1
+    check: Callable[[Any], bool] | None = None
+    serial: bool = False
+
+
+def namespaced(prefix: str, stages: Iterable[Stage]) -> List[Stage]:
+    """為子圖加上前綴（例如每檔標的一組 stage），以便多個子圖合併成一個 DAG。"""
+    return [replace(s, name=f"{prefix}:{s.name}", deps=tuple(f"{prefix}:{d}" for d in s.deps)) for s in stages]
+
+
+def output_fingerprint(obj: Any) -> str:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return frame_fingerprint(obj)
+    return params_fingerprint(obj)
+
+
+class StageStore:
+    """checkpoint 儲存：{root}/{stage}/{key}.pkl 為輸出、{key}.json 為中繼資料（含輸出指紋）。"""
+
+    def __init__(self, root: str | Path = 'data/checkpoints'):
+        self.root = Path(root)
+
+    def _paths(self, name: str, key: str) -> Tuple[Path, Path]:
+        d = self.root / name.replace(':', '__')
+        return d / f"{key}.pkl", d / f"{key}.json"
+
+    def meta(self, name: str, key: str) -> dict | None:
+        pkl, meta = self._paths(name, key)
+        if not (pkl.exists() and meta.exists()):
+            return None
+        return json.loads(meta.read_text(encoding='utf-8'))
+
+    def load(self, name: str, key: str) -> Any:
+        return pd.read_pickle(self._paths(name, key)[0])
+
+    def save(self, name: str, key: str, output: Any, fingerprint: str, seconds: float) -> None:
+        pkl, meta = self._paths(name, key)
+        pkl.parent.mkdir(parents=True, exist_ok=True)
+        tmp = pkl.parent / f".{uuid.uuid4().hex}"
+        pd.to_pickle(output, tmp)
+        os.replace(tmp, pkl)
+        tmp.write_text(json.dumps({'fingerprint': fingerprint, 'seconds': seconds, 'created': time.time()}),
+                       encoding='utf-8')
+        os.replace(tmp, meta)
+
+
+@dataclass
+class DagResult:
+    status: Dict[str, str]
+    seconds: Dict[str, float]
+    errors: Dict[str, str]
+    wall_seconds: float
+    _outputs: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _loader: Callable[[str], Any] | None = field(default=None, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and SKIPPED not in self.status.values()
+
+    def output(self, name: str) -> Any:
+        """取得 stage 輸出；命中快取的 stage 於此時才從 checkpoint 載入。"""
+        if name not in self._outputs:
+            if self._loader is None or self.status.get(name) not in (CACHED, RAN):
+                raise KeyError(name)
+            self._outputs[name] = self._loader(name)
+        return self._outputs[name]
+
+    def summary(self) -> str:
+        lines = [f"dag {len(self.status)} stages in {self.wall_seconds:.2f}s"]
+        for name, st in self.status.items():
+            sec = f" {self.seconds[name]:.2f}s" if name in self.seconds else ''
+            err = f" ({self.errors[name]})" if name in self.errors else ''
+            lines.append(f"  {st:<20} {name}{sec}{err}")
+        return '\n'.join(lines)
+
+
+def _topo_order(stages: Dict[str, Stage]) -> List[str]:
+    order: List[str] = []
+    state: Dict[str, int] = {}
+
+    def visit(name: str, path: Tuple[str, ...]):
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"DAG 有循環: {' -> '.join(path + (name,))}")
+        if name not in stages:
+            raise KeyError(f"未知的上游 stage: {name} (from {path[-1] if path else '?'})")
+        state[name] = 1
+        for d in stages[name].deps:
+            visit(d, path + (name,))
+        state[name] = 2
+        order.append(name)
+
+    for name in stages:
+        visit(name, ())
+    return order
+
+
+def run_dag(stages: Iterable[Stage], store: StageStore, workers: int = 4, dry_run: bool = False,
+            force: Iterable[str] = ()) -> DagResult:
+    """執行 DAG。force: 強制重算的 stage 名稱（子圖中可只寫後綴，例如 'fetch' 符合 '2330:fetch'）。"""
+    graph = {s.name: s for s in stages}
+    order = _topo_order(graph)
+    force = set(force)
+    forced = {n for n in graph if n in force or n.rsplit(':', 1)[-1] in force}
+
+    keys: Dict[str, str] = {}
+    fps: Dict[str, str] = {}
+    outputs: Dict[str, Any] = {}
+    status: Dict[str, str] = {}
+    seconds: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    lock = threading.Lock()
+    serial_lock = threading.Lock()
+
+    def key_for(name: str) -> str | None:
+        s = graph[name]
+        if any(d not in fps for d in s.deps):
+            return None
+        return params_fingerprint({'stage': name.rsplit(':', 1)[-1], 'version': s.version, 'params': s.params,
+                                   'inputs': [fps[d] for d in s.deps]})[:24]
+
+    def load(name: str) -> Any:
+        with lock:
+            if name in outputs:
+                return outputs[name]
+        out = store.load(name, keys[name])
+        with lock:
+            outputs[name] = out
+        return out
+
+    def cached(name: str) -> bool:
+        if name in forced:
+            return False
+        meta = store.meta(name, keys[name])
+        if meta is None:
+            return False
+        check = graph[name].check
+        if check is not None and not check(load(name)):
+            return False
+        fps[name] = meta['fingerprint']
+        return True
+
+    def execute(name: str) -> None:
+        s = graph[name]
+        args = [load(d) for d in s.deps]
+        t0 = time.perf_counter()
+        if s.serial:
+            with serial_lock:
+                out = s.fn(*args, **s.params)
+        else:
+            out = s.fn(*args, **s.params)
+        sec = time.perf_counter() - t0
+        fp = output_fingerprint(out)
+        store.save(name, keys[name], out, fp, sec)
+        with lock:
+            outputs[name] = out
+            fps[name] = fp
+            seconds[name] = sec
+
+    t_start = time.perf_counter()
+    if dry_run:
+        for name in order:
+            key = key_for(name)
+            if key is None:
+                status[name] = UPSTREAM
+                continue
+            keys[name] = key
+            status[name] = CACHED if cached(name) else WOULD_RUN
+        return DagResult(status, seconds, errors, time.perf_counter() - t_start)
+
+    pending = list(order)
+    running: Dict[Any, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        while pending or running:
+            progressed = False
+            for name in list(pending):
+                deps = graph[name].deps
+                if any(status.get(d) in (FAILED, SKIPPED) for d in deps):
+                    status[name] = SKIPPED
+                elif all(status.get(d) in (CACHED, RAN) for d in deps):
+                    keys[name] = key_for(name)
+                    if cached(name):
+                        status[name] = CACHED
+                    else:
+                        running[ex.submit(execute, name)] = name
+                else:
+                    continue
+                pending.remove(name)
+                progressed = True
+            if progressed or not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                exc = fut.exception()
+                if exc is None:
+                    status[name] = RAN
+                else:
+                    status[name] = FAILED
+                    errors[name] = f"{type(exc).__name__}: {exc}"
+
+    ordered = {n: status[n] for n in order}
+    return DagResult(ordered, seconds, errors, time.perf_counter() - t_start,
+                     _outputs=outputs, _loader=load)
+
+
+__all__ = ['Stage', 'StageStore', 'DagResult', 'run_dag', 'namespaced', 'output_fingerprint']
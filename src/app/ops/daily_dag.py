@@ -0,0 +1,125 @@
+"""每日例行流程的階段圖：fetch -> validate -> {features, positions} -> backtest -> {metrics, reports}。
+
+各 stage 由 ops.dag 執行並 checkpoint 於 data/checkpoints；重跑時只重算輸入改變的 stage。
+多檔標的以 namespaced 子圖合併為同一個 DAG，跨標的與互不相依的 stage 同時執行。
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+from ..backtest.engine import backtest_engine
+from ..backtest.ledger import extract_trades
+from ..config.settings import settings
+from ..features.indicators import atr, ema, rsi, sma, zscore
+from ..performance.metrics import basic_report
+from .dag import DagResult, Stage, StageStore, namespaced, run_dag
+from ..data.adjust import actions
+from ..data.sessions import twse_calendar
+from .run_daily import adjust_prices, build_positions, load_local_or_fetch, validate_date_range, write_reports
+
+
+def _fetch(symbol: str, start: str, end: str, source: str, ignore_local: bool, local_stamp: float | None,
+           asof: str | None = None):
+    # local_stamp / asof 只參與快取鍵：sample_data.csv 更新或有新交易日收盤資料公布時 fetch 需重算
+    return load_local_or_fetch(symbol, start, end, source=source, ignore_local=ignore_local)
+
+
+def _validate(df: pd.DataFrame, symbol: str, start: str, end: str, source: str,
+              actions_stamp: str | None = None) -> pd.DataFrame:
+    # actions_stamp 只參與快取鍵：該檔事件表變動時才重算 validate 與其下游
+    out = validate_date_range(df, symbol, start, end, source)
+    if out.empty:
+        raise ValueError(f"no data for {symbol} {start}~{end}")
+    return adjust_prices(out, symbol, source)
+
+
+def _features(df: pd.DataFrame) -> pd.DataFrame:
+    close = df['close']
+    feats = pd.DataFrame({
+        'close': close,
+        'sma20': sma(close, 20),
+        'sma60': sma(close, 60),
+        'ema12': ema(close, 12),
+        'rsi14': rsi(close, 14),
+        'zscore20': zscore(close, 20),
+    })
+    if {'high', 'low'} <= set(df.columns):
+        feats['atr14'] = atr(df['high'], df['low'], close, 14)
+    return feats
+
+
+def _positions(df: pd.DataFrame, lookback: int) -> pd.Series:
+    return build_positions(df, lookback)[0]
+
+
+def _backtest(df: pd.DataFrame, positions: pd.Series, fee_bps: float, tax_bps: float, slippage_bps: float):
+    return backtest_engine(df, positions, fee_bps, tax_bps, slippage_bps)
+
+
+def _metrics(df: pd.DataFrame, positions: pd.Series, bt: pd.DataFrame, cost_bps: float) -> dict:
+    trades = extract_trades(positions, df['close'], cost_bps=cost_bps)
+    return {'report': basic_report(bt, trades), 'trades': trades}
+
+
+def _reports(bt: pd.DataFrame, out_dir: str, max_points: int | None) -> dict:
+    return write_reports(bt, out_dir, max_points)
+
+
+def _reports_exist(out: dict) -> bool:
+    return all(Path(p).exists() for p in out.values())
+
+
+def daily_stages(symbol: str, start: str, end: str, source: str = 'yf', lookback: int = 20,
+                 out_dir: str | Path = 'reports', ignore_local: bool = False,
+                 max_points: int | None = None) -> List[Stage]:
+    csv_path = Path('sample_data.csv')
+    stamp = csv_path.stat().st_mtime if not ignore_local and csv_path.exists() else None
+    actions_stamp = actions.fingerprint(symbol) if settings.adjust_prices else None
+    # 區間內最後一個已公布的交易日；end 已過去時固定不變，歷史區間不會每天重抓
+    asof = min(pd.Timestamp(end), twse_calendar().last_complete_session()).strftime('%Y-%m-%d')
+    where = {'symbol': symbol, 'start': start, 'end': end, 'source': source}
+    costs = {'fee_bps': settings.tx_fee_bps, 'tax_bps': settings.tx_tax_bps, 'slippage_bps': settings.slippage_bps}
+    return [
+        Stage('fetch', _fetch, params={**where, 'ignore_local': ignore_local, 'local_stamp': stamp,
+                                              'asof': asof}),
+        Stage('validate', _validate, deps=('fetch',), params={**where, 'actions_stamp': actions_stamp}),
+        Stage('features', _features, deps=('validate',)),
+        Stage('positions', _positions, deps=('validate',), params={'lookback': lookback}),
+        Stage('backtest', _backtest, deps=('validate', 'positions'), params=costs),
+        Stage('metrics', _metrics, deps=('validate', 'positions', 'backtest'),
+              params={'cost_bps': sum(costs.values())}),
+        Stage('reports', _reports, deps=('backtest',), check=_reports_exist, serial=True,
+              params={'out_dir': str(out_dir), 'max_points': max_points}),
+    ]
+
+
+def run_daily_dag(symbols: Iterable[str], start: str, end: str, source: str = 'yf', lookback: int = 20,
+                  out_dir: str | Path = 'reports', ignore_local: bool = False, max_points: int | None = None,
+                  store: StageStore | None = None, workers: int = 4, dry_run: bool = False,
+                  force: Iterable[str] = ()) -> DagResult:
+    """單檔時 stage 名稱不加前綴；多檔時為 '{symbol}:{stage}'，報表輸出至 out_dir/{symbol}。"""
+    symbols = list(dict.fromkeys(symbols))
+    store = store or StageStore()
+    stages: List[Stage] = []
+    for sym in symbols:
+        sub_dir = Path(out_dir) if len(symbols) == 1 else Path(out_dir) / sym.replace('.', '_')
+        sub = daily_stages(sym, start, end, source, lookback, sub_dir, ignore_local, max_points)
+        stages += sub if len(symbols) == 1 else namespaced(sym, sub)
+    return run_dag(stages, store, workers=workers, dry_run=dry_run, force=force)
+
+
+def symbol_outputs(result: DagResult, symbol: str | None = None) -> Dict[str, object]:
+    """取出某檔的 metrics / reports 輸出（單檔 DAG 時 symbol 傳 None）。"""
+    prefix = f"{symbol}:" if symbol else ''
+    out = {}
+    for stage in ('metrics', 'reports'):
+        try:
+            out[stage] = result.output(prefix + stage)
+        except KeyError:
+            out[stage] = None
+    return out
+
+
+__all__ = ['daily_stages', 'run_daily_dag', 'symbol_outputs']
@@ -0,0 +1,211 @@
+"""背景工作佇列：本機 process pool 執行長時間運算（無外部 broker）。
+
+- submit(kind, params) 立即回傳 job；相同 (kind, params) 且仍在排隊/執行中的工作直接共用同一個 job
+- 佇列有上限（max_pending），滿載時拋出 QueueFull
+- 工作函式簽名 fn(params, progress) -> dict，須為模組層級函式（可 pickle）；
+  progress(fraction, message) 回報進度，工作被取消時於下一次回報拋出 JobCancelled
+- 排隊中的工作取消即移除；執行中的工作為協作式取消
+- 進度經 Manager queue 回到主行程，由監聽 thread 更新 job 狀態（version 遞增供 SSE 輪詢）
+
+Manager 與 process pool 皆於第一次 submit 時才啟動，不影響匯入與啟動時間。
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from ..data.fingerprint import params_fingerprint
+from .telemetry import REGISTRY
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+JOB_WAIT_SECONDS = REGISTRY.histogram('app_job_wait_seconds', 'Time jobs spend queued before a worker starts them.',
+                                      ['kind'])
+JOB_RUN_SECONDS = REGISTRY.histogram('app_job_run_seconds', 'Job run time by final status.', ['kind', 'status'])
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class JobCancelled(RuntimeError):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    key: str
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = ''
+    result: Any = None
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    version: int = 0
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        out = {'job_id': self.id, 'kind': self.kind, 'status': self.status, 'progress': round(self.progress, 4),
+               'message': self.message, 'error': self.error, 'created': self.created,
+               'started': self.started, 'finished': self.finished}
+        if include_result and self.status == DONE:
+            out['result'] = self.result
+        return out
+
+
+def _execute(fn: Callable, job_id: str, params: Dict[str, Any], events, cancel_flag) -> Any:
+    """於 worker 行程執行。"""
+    events.put((job_id, RUNNING, 0.0, ''))
+
+    def progress(fraction: float, message: str = '') -> None:
+        if cancel_flag.is_set():
+            raise JobCancelled(job_id)
+        events.put((job_id, RUNNING, float(fraction), message))
+
+    return fn(params, progress)
+
+
+class JobQueue:
+    def __init__(self, workers: int = 2, max_pending: int = 32, history: int = 200):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.history = history
+        self._kinds: Dict[str, Callable] = {}
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._inflight: Dict[str, str] = {}
+        self._futures: Dict[str, Future] = {}
+        self._cancel: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._manager = None
+        self._events = None
+        self._listener: threading.Thread | None = None
+
+    def register(self, kind: str, fn: Callable) -> None:
+        self._kinds[kind] = fn
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._kinds)
+
+    def _start(self) -> None:
+        if self._pool is not None:
+            return
+        self._manager = mp.Manager()
+        self._events = self._manager.Queue()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._listener = threading.Thread(target=self._listen, name='job-events', daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                item = self._events.get()
+            except (EOFError, OSError):  # manager 已關閉
+                return
+            if item is None:
+                return
+            job_id, status, fraction, message = item
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status in FINISHED:
+                    continue
+                if job.status == QUEUED:
+                    job.started = time.time()
+                    JOB_WAIT_SECONDS.labels(job.kind).observe(job.started - job.created)
+                job.status, job.progress = status, fraction
+                if message:
+                    job.message = message
+                job.version += 1
+
+    def submit(self, kind: str, params: Dict[str, Any] | None = None) -> tuple[Job, bool]:
+        """回傳 (job, deduplicated)。未知 kind 拋 KeyError，佇列滿載拋 QueueFull。"""
+        if kind not in self._kinds:
+            raise KeyError(kind)
+        params = dict(params or {})
+        key = params_fingerprint({'kind': kind, 'params': params})
+        with self._lock:
+            existing = self._inflight.get(key)
+            if existing is not None:
+                return self._jobs[existing], True
+            if len(self._inflight) >= self.max_pending:
+                raise QueueFull(f"job queue full ({self.max_pending} in flight)")
+            self._start()
+            job = Job(id=uuid.uuid4().hex[:16], kind=kind, params=params, key=key)
+            self._jobs[job.id] = job
+            self._inflight[key] = job.id
+            self._cancel[job.id] = self._manager.Event()
+            fut = self._pool.submit(_execute, self._kinds[kind], job.id, params, self._events, self._cancel[job.id])
+            self._futures[job.id] = fut
+            self._trim()
+        fut.add_done_callback(lambda f, job_id=job.id: self._finish(job_id, f))
+        return job, False
+
+    def _finish(self, job_id: str, fut: Future) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            try:
+                job.result = fut.result()
+                job.status, job.progress = DONE, 1.0
+            except (CancelledError, JobCancelled):
+                job.status = CANCELLED
+            except Exception as e:
+                job.status, job.error = FAILED, f"{type(e).__name__}: {e}"
+            job.finished = time.time()
+            job.version += 1
+            JOB_RUN_SECONDS.labels(job.kind, job.status).observe(job.finished - (job.started or job.created))
+            self._inflight.pop(job.key, None)
+            self._futures.pop(job_id, None)
+            self._cancel.pop(job_id, None)
+
+    def _trim(self) -> None:
+        """只保留最近 history 筆已結束的工作。"""
+        done = [j for j in self._jobs.values() if j.status in FINISHED]
+        for job in done[:max(0, len(done) - self.history)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """回傳是否已送出取消（已結束的工作回傳 False）。"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return False
+            fut = self._futures.get(job_id)
+            flag = self._cancel.get(job_id)
+        if fut is not None and fut.cancel():
+            return True  # 尚未開始：done callback 會標記為 cancelled
+        if flag is not None:
+            flag.set()
+        return True
+
+    def shutdown(self) -> None:
+        for job_id in list(self._futures):
+            self.cancel(job_id)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._events.put(None)
+            self._listener.join(timeout=5)
+            self._manager.shutdown()
+            self._pool = self._manager = self._events = self._listener = None
+
+
+__all__ = ['JobQueue', 'Job', 'QueueFull', 'JobCancelled', 'QUEUED', 'RUNNING', 'DONE', 'FAILED', 'CANCELLED']
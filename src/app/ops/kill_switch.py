@@ -1,3 +1,11 @@
 # 風控 Kill-Switch（實務應連動監控與委託撤單）
+import numpy as np
+
+
 def should_halt(pnl_today: float, drawdown: float, pnl_limit=-0.06, dd_limit=-0.15) -> bool:
     return (pnl_today <= pnl_limit) or (drawdown <= dd_limit)
+
+
+def halt_mask(pnl_today: np.ndarray, drawdown: np.ndarray, pnl_limit=-0.06, dd_limit=-0.15) -> np.ndarray:
+    """should_halt 的陣列版本（逐元素），供 RiskMonitor 一次評估整本部位。"""
+    return (np.asarray(pnl_today) <= pnl_limit) | (np.asarray(drawdown) <= dd_limit)
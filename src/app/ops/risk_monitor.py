@@ -0,0 +1,229 @@
+"""即時風控監控：以陣列維護每個 strategy×symbol 部位的權益、當日損益與回撤，
+逐批套用價格 tick 並在每一筆 tick 上評估 kill-switch（kill_switch.halt_mask）。
+
+部位權益 = cash + qty × price（cash = capital − qty × entry_price）；
+當日損益 = 權益 / 開盤權益 − 1；回撤 = 權益 / 歷史高點 − 1。
+
+向量化方式：
+- 部位層級：把每筆 tick 展開到持有該 symbol 的部位，依部位分組做 running max，
+  因此批次內先跌後漲也能抓到谷底（結果與逐筆迴圈一致）
+- 策略 / 全書層級：每筆 tick 的權益變動 = Δprice × 該 symbol 在各策略的淨部位，
+  以 cumsum 得到批次內逐筆權益路徑，再做 running max 與門檻判斷
+- 觸發後發出 HaltEvent 並標記 halted（不再重複發出），平倉由下游處理；reset_halts() 解除
+
+    monitor = RiskMonitor(book, prices)
+    for events in monitor.replay(load_ticks('ticks.csv'), batch_size=10_000): ...
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from .kill_switch import halt_mask
+
+
+@dataclass(frozen=True)
+class RiskLimits:
+    pnl_limit: float = -0.06
+    dd_limit: float = -0.15
+
+
+@dataclass(frozen=True)
+class HaltEvent:
+    level: str            # 'position' / 'strategy' / 'book'
+    strategy: str | None
+    symbol: str | None
+    seq: int              # 全域 tick 序號（自 0 起）
+    time: object
+    pnl_today: float
+    drawdown: float
+    equity: float
+
+    @property
+    def reason(self) -> str:
+        return f"pnl_today={self.pnl_today:.4f} drawdown={self.drawdown:.4f}"
+
+
+def load_ticks(path: str | Path) -> pd.DataFrame:
+    """讀取歷史 tick 檔（csv / parquet），欄位 time, symbol, price，依檔案順序重播。"""
+    path = Path(path)
+    df = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path, dtype={'symbol': str})
+    if 'time' in df.columns:
+        df['time'] = pd.to_datetime(df['time'])
+    return df
+
+
+class RiskMonitor:
+    def __init__(self, positions: pd.DataFrame, prices: pd.Series | dict,
+                 position_limits: RiskLimits = RiskLimits(), strategy_limits: RiskLimits | None = None,
+                 book_limits: RiskLimits | None = None):
+        """positions: 欄位 strategy, symbol, qty, capital（可選 entry_price，預設為 prices 中的現價）。
+        prices: symbol -> 目前價格。strategy_limits / book_limits 為 None 時不評估該層級。
+        """
+        prices = pd.Series(prices, dtype=float)
+        pos = positions.reset_index(drop=True)
+        self.symbols = pd.Index(pd.unique(pd.concat([pos['symbol'].astype(str), prices.index.to_series().astype(str)])))
+        self.strategies = pd.Index(pd.unique(pos['strategy'].astype(str)))
+        self.position_limits = position_limits
+        self.strategy_limits = strategy_limits
+        self.book_limits = book_limits
+
+        n_sym = len(self.symbols)
+        self.last_px = np.full(n_sym, np.nan)
+        self.last_px[self.symbols.get_indexer(prices.index.astype(str))] = prices.to_numpy()
+        self.pos_sym = self.symbols.get_indexer(pos['symbol'].astype(str))
+        self.pos_strat = self.strategies.get_indexer(pos['strategy'].astype(str))
+        self.qty = pos['qty'].to_numpy(dtype=float)
+        entry = pos['entry_price'].to_numpy(dtype=float) if 'entry_price' in pos else self.last_px[self.pos_sym]
+        if np.isnan(entry).any():
+            raise ValueError("部位缺少 entry_price 且 prices 未提供該 symbol 的現價")
+        self.last_px[self.pos_sym] = np.where(np.isnan(self.last_px[self.pos_sym]), entry, self.last_px[self.pos_sym])
+        self.cash = pos['capital'].to_numpy(dtype=float) - self.qty * entry
+        # symbol -> 部位 (CSR)
+        self._by_sym = np.argsort(self.pos_sym, kind='stable')
+        self._n_by_sym = np.bincount(self.pos_sym, minlength=n_sym)
+        self._ptr = np.concatenate([[0], np.cumsum(self._n_by_sym)[:-1]])
+
+        # 聚合層級：各策略 + 全書（最後一欄）
+        n_grp = len(self.strategies) + 1
+        self.grp_qty = np.zeros((n_sym, n_grp))
+        np.add.at(self.grp_qty, (self.pos_sym, self.pos_strat), self.qty)
+        self.grp_qty[:, -1] = self.grp_qty[:, :-1].sum(axis=1)
+        self.grp_cash = np.bincount(self.pos_strat, weights=self.cash, minlength=n_grp)
+        self.grp_cash[-1] = self.cash.sum()
+
+        self.seq = 0
+        self.halted = np.zeros(len(pos), dtype=bool)
+        self.grp_halted = np.zeros(n_grp, dtype=bool)
+        self.peak = self.equity.copy()
+        self.grp_peak = self.group_equity.copy()
+        self.start_day()
+
+    # --- 狀態 ---
+    @property
+    def equity(self) -> np.ndarray:
+        return self.cash + self.qty * self.last_px[self.pos_sym]
+
+    @property
+    def group_equity(self) -> np.ndarray:
+        return self.grp_cash + np.nan_to_num(self.last_px) @ self.grp_qty
+
+    def start_day(self) -> None:
+        """新交易日：以目前權益為開盤基準（當日損益歸零）；歷史高點保留。"""
+        self.sod = self.equity.copy()
+        self.grp_sod = self.group_equity.copy()
+
+    def reset_halts(self) -> None:
+        self.halted[:] = False
+        self.grp_halted[:] = False
+
+    def snapshot(self) -> pd.DataFrame:
+        eq = self.equity
+        return pd.DataFrame({
+            'strategy': self.strategies[self.pos_strat], 'symbol': self.symbols[self.pos_sym],
+            'qty': self.qty, 'price': self.last_px[self.pos_sym], 'equity': eq,
+            'pnl_today': eq / self.sod - 1, 'drawdown': eq / self.peak - 1, 'halted': self.halted,
+        })
+
+    # --- 更新 ---
+    def update(self, symbols: Iterable, prices: Iterable[float], times: Iterable | None = None) -> List[HaltEvent]:
+        """依到達順序套用一批 tick，回傳本批新觸發的 HaltEvent（依 seq 排序）。未知 symbol 忽略。"""
+        sym = self.symbols.get_indexer(pd.Index(np.asarray(symbols)).astype(str))
+        px = np.asarray(prices, dtype=float)
+        seq = self.seq + np.arange(len(px))
+        self.seq += len(px)
+        keep = (sym >= 0) & ~np.isnan(px)
+        sym, px, seq = sym[keep], px[keep], seq[keep]
+        times = None if times is None else np.asarray(times)[keep]
+        if not len(px):
+            return []
+
+        groups = self.strategy_limits is not None or self.book_limits is not None
+        grp_eq0 = self.group_equity if groups else None
+        # 每筆 tick 的前一價（同 symbol 上一筆；批次第一筆取狀態中的現價）
+        order = np.argsort(sym, kind='stable')
+        s_sorted = sym[order]
+        first = np.r_[True, s_sorted[1:] != s_sorted[:-1]]
+        prev_sorted = np.r_[np.nan, px[order][:-1]]
+        prev_sorted[first] = self.last_px[s_sorted[first]]
+        prev = np.empty_like(px)
+        prev[order] = prev_sorted
+        last = np.r_[s_sorted[1:] != s_sorted[:-1], True]
+        self.last_px[s_sorted[last]] = px[order][last]
+
+        events = self._update_positions(sym, px, seq, times)
+        if groups:
+            # 無部位且無初始價的 symbol 前一價為 NaN，其淨部位為 0，變動視為 0
+            events += self._update_groups(sym, np.nan_to_num(px - prev), grp_eq0, seq, times)
+        return sorted(events, key=lambda e: e.seq)
+
+    def _update_positions(self, sym, px, seq, times) -> List[HaltEvent]:
+        counts = self._n_by_sym[sym]
+        n_rows = int(counts.sum())
+        if not n_rows:
+            return []
+        tick = np.repeat(np.arange(len(px)), counts)
+        offset = np.arange(n_rows) - np.repeat(np.cumsum(counts) - counts, counts)
+        pos = self._by_sym[np.repeat(self._ptr[sym], counts) + offset]
+        eq = self.cash[pos] + self.qty[pos] * px[tick]
+
+        # 依部位分組（組內維持時間順序）做 running max，含批次前的高點
+        o = np.argsort(pos, kind='stable')
+        pos_o, eq_o, tick_o = pos[o], eq[o], tick[o]
+        run_peak = pd.Series(eq_o).groupby(pos_o).cummax().to_numpy()
+        run_peak = np.maximum(run_peak, self.peak[pos_o])
+        dd = eq_o / run_peak - 1
+        pnl = eq_o / self.sod[pos_o] - 1
+        lim = self.position_limits
+        breach = halt_mask(pnl, dd, lim.pnl_limit, lim.dd_limit) & ~self.halted[pos_o]
+        np.maximum.at(self.peak, pos, eq)
+
+        idx = np.flatnonzero(breach)
+        if not len(idx):
+            return []
+        _, first = np.unique(pos_o[idx], return_index=True)
+        idx = idx[first]
+        hit = pos_o[idx]
+        self.halted[hit] = True
+        return [HaltEvent('position', self.strategies[self.pos_strat[p]], self.symbols[self.pos_sym[p]],
+                          int(seq[t]), None if times is None else times[t], float(pnl[i]), float(dd[i]), float(eq_o[i]))
+                for i, p, t in zip(idx, hit, tick_o[idx])]
+
+    def _update_groups(self, sym, delta, eq0, seq, times) -> List[HaltEvent]:
+        path = eq0 + np.cumsum(delta[:, None] * self.grp_qty[sym], axis=0)
+        run_peak = np.maximum(np.maximum.accumulate(path, axis=0), self.grp_peak)
+        dd = path / run_peak - 1
+        pnl = path / self.grp_sod - 1
+        breach = np.zeros_like(path, dtype=bool)
+        if self.strategy_limits is not None:
+            lim = self.strategy_limits
+            breach[:, :-1] = halt_mask(pnl[:, :-1], dd[:, :-1], lim.pnl_limit, lim.dd_limit)
+        if self.book_limits is not None:
+            lim = self.book_limits
+            breach[:, -1] = halt_mask(pnl[:, -1], dd[:, -1], lim.pnl_limit, lim.dd_limit)
+        breach &= ~self.grp_halted
+        self.grp_peak = run_peak[-1]
+        events = []
+        for g in np.flatnonzero(breach.any(axis=0)):
+            t = int(np.argmax(breach[:, g]))
+            self.grp_halted[g] = True
+            is_book = g == len(self.strategies)
+            events.append(HaltEvent('book' if is_book else 'strategy', None if is_book else self.strategies[g], None,
+                                    int(seq[t]), None if times is None else times[t],
+                                    float(pnl[t, g]), float(dd[t, g]), float(path[t, g])))
+        return events
+
+    def replay(self, ticks: pd.DataFrame, batch_size: int = 10_000) -> Iterator[List[HaltEvent]]:
+        """依序以 batch_size 筆為一批重播 tick DataFrame（time, symbol, price），每批產出該批事件。"""
+        sym = ticks['symbol'].to_numpy()
+        px = ticks['price'].to_numpy(dtype=float)
+        tm = ticks['time'].to_numpy() if 'time' in ticks.columns else None
+        for i in range(0, len(ticks), batch_size):
+            sl = slice(i, i + batch_size)
+            yield self.update(sym[sl], px[sl], None if tm is None else tm[sl])
+
+
+__all__ = ['RiskMonitor', 'RiskLimits', 'HaltEvent', 'load_ticks']
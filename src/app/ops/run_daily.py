@@ -2,7 +2,7 @@
 若本地有 sample_data.csv 亦可改為讀檔。
 """
 from pathlib import Path
-import sys, pathlib, argparse
+import sys, pathlib, argparse, json
 import pandas as pd
 from datetime import datetime
 
@@ -14,22 +14,33 @@ if str(_PROJECT_ROOT) not in sys.path:
 
 try:
     from src.app.data.fetch import fetch_ohlcv_yf
-    from src.app.data.twse import fetch_twse_range_cached
+    from src.app.data.sessions import CalendarCoverageError, twse_calendar
+    from src.app.data.adjust import adjust_ohlcv, unadjust_splits
     from src.app.backtest.engine import backtest_engine
+    from src.app.backtest.ledger import extract_trades
     from src.app.strategies.base import MomentumStrategy
     from src.app.performance.metrics import basic_report
+    from src.app.performance.rolling import RollingAnalytics
     from src.app.visual.report import plot_equity
     from src.app.visual.interactive_report import build_interactive_report
     from src.app.config.settings import settings
+    from src.app.lazy import lazy_module
 except ImportError as e:  # 最後退回相對匯入（理論上不會再需要）
     raise RuntimeError(f"匯入模組失敗，請確認目錄結構與 __init__.py：{e}")
 
 
 def _fetch_from_source(symbol: str, start: str, end: str, source: str, refresh: bool = False) -> pd.DataFrame:
-    """根據 source 從遠端抓資料；twse 支援 refresh。"""
+    """根據 source 從遠端抓資料；twse 支援 refresh。panel 讀取已發布的共用面板（data.panel_store）。"""
+    if source == 'panel':
+        from src.app.data.panel_store import panel_store
+        view = panel_store.current()
+        core_sym = symbol.replace('.TW', '')
+        df = pd.DataFrame({f: view.series(f, core_sym, start, end) for f in view.fields})
+        return df.dropna(subset=['close']) if 'close' in df.columns else df
     if source == 'twse':
         core_sym = symbol.replace('.TW', '')
-        return fetch_twse_range_cached(core_sym, start, end, refresh=refresh)
+        twse = lazy_module('src.app.data.twse')  # 僅 twse 來源需要 requests/backoff
+        return twse.fetch_twse_range_cached(core_sym, start, end, refresh=refresh)
     # yfinance
     yf_symbol = symbol if symbol.endswith('.TW') else f"{symbol}.TW"
     return fetch_ohlcv_yf(yf_symbol, start, end)
@@ -46,60 +57,142 @@ def load_local_or_fetch(symbol: str, start: str, end: str, source: str = 'yf', i
     return _fetch_from_source(symbol, start, end, source, refresh=False)
 
 
-def validate_date_range(df: pd.DataFrame, symbol: str, start: str, end: str, source: str) -> pd.DataFrame:
-    """驗證資料是否涵蓋要求日期；若不涵蓋則強制重抓（twse refresh=True）。
+ABSENT_DIR = Path('data/raw')
 
-    規則：若 df 空、或最小日期 > start、或最大日期 < end，則重抓。
-    容忍週末/假日：若最大日期距離 end <= 2 天則視為可接受。
-    """
+
+def _absent_file(symbol: str, source: str) -> Path:
+    return ABSENT_DIR / source / f"{symbol.replace('.TW', '')}.absent.json"
+
+
+def _load_absent(symbol: str, source: str) -> pd.DatetimeIndex:
+    """補抓後來源仍無資料的交易日（停牌、尚未上市等），之後不再重抓。"""
+    path = _absent_file(symbol, source)
+    if not path.exists():
+        return pd.DatetimeIndex([])
+    return pd.DatetimeIndex(pd.to_datetime(json.loads(path.read_text(encoding='utf-8'))))
+
+
+def _save_absent(symbol: str, source: str, days: pd.DatetimeIndex) -> None:
+    path = _absent_file(symbol, source)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(sorted(d.strftime('%Y-%m-%d') for d in days)), encoding='utf-8')
+
+
+def _validate_by_bounds(df: pd.DataFrame, symbol: str, start: str, end: str, source: str) -> pd.DataFrame:
+    """日曆未收錄休市日的年度改用首末日期檢查：首日晚於 start 或末日早於 end 超過 2 天（週末/假日）則整段重抓。"""
     if df.empty:
         print(f"[warn] 初次資料為空，改為強制重抓 source={source}")
         return _fetch_from_source(symbol, start, end, source, refresh=True)
-    start_req = pd.to_datetime(start)
-    end_req = pd.to_datetime(end)
-    data_min = pd.to_datetime(df.index.min())
-    data_max = pd.to_datetime(df.index.max())
-    need = False
+    start_req, end_req = pd.to_datetime(start), pd.to_datetime(end)
+    data_min, data_max = pd.to_datetime(df.index.min()), pd.to_datetime(df.index.max())
     reasons = []
     if data_min > start_req:
-        need = True; reasons.append(f"data_min {data_min.date()} > requested_start {start_req.date()}")
-    # 容忍結束差 2 天（週末/假日）
+        reasons.append(f"data_min {data_min.date()} > requested_start {start_req.date()}")
     if data_max < end_req and (end_req - data_max).days > 2:
-        need = True; reasons.append(f"data_max {data_max.date()} < requested_end {end_req.date()} (gap={(end_req-data_max).days}d)")
-    if need:
-        print(f"[warn] 資料日期區間不足: {', '.join(reasons)} -> 重新抓取 (refresh)")
-        refreshed = _fetch_from_source(symbol, start, end, source, refresh=True)
-        if refreshed.empty:
-            print("[error] 重抓後仍無資料，保留原資料")
-            return df
-        return refreshed
-    return df
+        reasons.append(f"data_max {data_max.date()} < requested_end {end_req.date()} (gap={(end_req-data_max).days}d)")
+    if not reasons:
+        return df
+    print(f"[warn] 資料日期區間不足: {', '.join(reasons)} -> 重新抓取 (refresh)")
+    refreshed = _fetch_from_source(symbol, start, end, source, refresh=True)
+    if refreshed.empty:
+        print("[error] 重抓後仍無資料，保留原資料")
+        return df
+    return refreshed
+
+
+def validate_date_range(df: pd.DataFrame, symbol: str, start: str, end: str, source: str) -> pd.DataFrame:
+    """依交易日曆驗證資料是否涵蓋要求區間；只補抓缺漏交易日的區段（twse 由快取層再細分到月份）。
+
+    補抓後仍缺的交易日（停牌、尚未上市等）記錄於 data/raw/{source}/{symbol}.absent.json，之後不再重抓
+    （panel 來源除外）。
+    區間含日曆未收錄休市日的年度時退回首末日期檢查 (_validate_by_bounds)。
+    """
+    cal = twse_calendar()
+    absent = _load_absent(symbol, source)
+    have = df.index.union(absent) if not df.empty else absent
+    try:
+        missing = cal.missing_sessions(have, start, end)
+    except CalendarCoverageError as e:
+        print(f"[warn] {e} -> 改以首末日期檢查")
+        return _validate_by_bounds(df, symbol, start, end, source)
+    if not len(missing):
+        return df
+    lo, hi = missing[0].strftime('%Y-%m-%d'), missing[-1].strftime('%Y-%m-%d')
+    print(f"[warn] 缺少 {len(missing)} 個交易日 ({lo} ~ {hi}) -> 只補抓缺漏區段 source={source}")
+    try:
+        patch = _fetch_from_source(symbol, lo, hi, source, refresh=False)
+    except Exception as e:
+        print(f"[error] 補抓失敗 ({type(e).__name__}: {e})，保留原資料")
+        return df
+    merged = pd.concat([df, patch]) if not df.empty else patch
+    if not merged.empty:
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        merged = merged.loc[(merged.index >= pd.to_datetime(start)) & (merged.index <= pd.to_datetime(end))]
+    still = missing.difference(merged.index)
+    # 最近一個交易日可能只是來源尚未更新，不記錄；panel 為本機面板，重新發布後可能補上，也不記錄
+    still = still[still < cal.last_complete_session()]
+    if len(still) and source != 'panel':
+        print(f"[info] 仍缺 {len(still)} 個交易日（可能停牌或尚未上市），已記錄不再重抓")
+        _save_absent(symbol, source, absent.union(still))
+    return merged if not merged.empty else df
+
+def adjust_prices(df: pd.DataFrame, symbol: str, source: str = 'twse') -> pd.DataFrame:
+    """有除權息 / 分割事件表時改用還原價格（settings.adjust_prices=False 時不還原）。
+
+    yf 價格已含分割 / 配股還原：先以 unadjust_splits 換回原始價格，避免分割重複套用。
+    """
+    if not settings.adjust_prices:
+        return df
+    if source == 'yf':
+        df = unadjust_splits(df, symbol)
+    return adjust_ohlcv(df, symbol)
+
+def build_positions(df: pd.DataFrame, lookback: int = 20) -> tuple[pd.Series, int]:
+    """動能策略部位；資料長度不足時動態縮短 lookback 避免全 0 部位。回傳 (positions, 實際 lookback)。"""
+    eff_lookback = min(lookback, max(1, len(df)//3)) if len(df) < lookback + 2 else lookback
+    if eff_lookback != lookback:
+        print(f"[warn] 資料筆數 {len(df)} 不足原 lookback={lookback}，調整為 {eff_lookback}")
+    return MomentumStrategy(lookback=eff_lookback).generate_positions(df), eff_lookback
+
+
+def write_reports(bt: pd.DataFrame, out_dir: str | Path, max_points: int | None = None, fig=None) -> dict:
+    analytics = RollingAnalytics(bt['ret'])
+    return {
+        'chart': plot_equity(bt, out_dir, dd=analytics.drawdown(), max_points=max_points, fig=fig),
+        'interactive': build_interactive_report(bt, out_dir, analytics=analytics, max_points=max_points),
+    }
+
+
+def run_pipeline(df: pd.DataFrame, lookback: int = 20, out_dir: str | Path | None = None,
+                 max_points: int | None = None, reports: bool = True, fig=None) -> dict:
+    """單一標的：部位 -> 回測 -> 交易明細與績效 -> (可選) 報表。單檔與 universe 模式共用。"""
+    positions, eff_lookback = build_positions(df, lookback)
+    bt = backtest_engine(df, positions, settings.tx_fee_bps, settings.tx_tax_bps, settings.slippage_bps)
+    cost_bps = settings.tx_fee_bps + settings.tx_tax_bps + settings.slippage_bps
+    trades = extract_trades(positions, df['close'], cost_bps=cost_bps)
+    out = {'bt': bt, 'trades': trades, 'report': basic_report(bt, trades), 'lookback': eff_lookback}
+    if reports:
+        out_dir = Path(out_dir) if out_dir is not None else Path('reports') / datetime.now().strftime('%Y%m%d')
+        out.update(write_reports(bt, out_dir, max_points, fig))
+    return out
+
 
 def main(symbol: str | None = None, start: str | None = None, end: str | None = None, source: str = 'yf', ignore_local: bool = False, lookback: int = 20):
     symbol = symbol or '2330'
     start = start or '2024-01-01'
     end = end or datetime.now().strftime('%Y-%m-%d')
     df = load_local_or_fetch(symbol, start, end, source=source, ignore_local=ignore_local)
-    df = validate_date_range(df, symbol, start, end, source)
+    df = adjust_prices(validate_date_range(df, symbol, start, end, source), symbol, source)
     # Debug: 檢視抓回資料
     print(f"[debug] fetched df shape={df.shape} cols={list(df.columns)} head=\n{df.head()}\n...")
-    # 動態調整 lookback：若資料長度不足則縮短避免全 0 部位
-    eff_lookback = min(lookback, max(1, len(df)//3)) if len(df) < lookback + 2 else lookback
-    if eff_lookback != lookback:
-        print(f"[warn] 資料筆數 {len(df)} 不足原 lookback={lookback}，調整為 {eff_lookback}")
-    strat = MomentumStrategy(lookback=eff_lookback)
-    positions = strat.generate_positions(df)
-    bt = backtest_engine(df, positions, settings.tx_fee_bps, settings.tx_tax_bps, settings.slippage_bps)
-    rpt = basic_report(bt)
-    out_dir = Path('reports') / datetime.now().strftime('%Y%m%d')
-    chart_path = plot_equity(bt, out_dir)
-    interactive_path = build_interactive_report(bt, out_dir)
+    res = run_pipeline(df, lookback, max_points=settings.chart_max_points or None)
+    bt = res['bt']
     print('=== Daily Run Report ===')
     print('Symbol:', symbol)
     print('Period:', df.index.min().date(), '->', df.index.max().date())
-    print('Metrics:', rpt)
-    print('Chart:', chart_path)
-    print('Interactive:', interactive_path)
+    print('Metrics:', res['report'])
+    print('Chart:', res['chart'])
+    print('Interactive:', res['interactive'])
     print(bt.tail())
 
 if __name__ == '__main__':
@@ -107,8 +200,55 @@ if __name__ == '__main__':
     parser.add_argument('--symbol', default='2330', help='股票代碼 (不加 .TW 也可)')
     parser.add_argument('--start', default=None, help='開始日期 YYYY-MM-DD')
     parser.add_argument('--end', default=None, help='結束日期 YYYY-MM-DD')
-    parser.add_argument('--source', default='yf', choices=['yf','twse'], help='資料來源: yf 或 twse')
+    parser.add_argument('--source', default='yf', choices=['yf','twse','panel'],
+                        help='資料來源: yf、twse 或 panel（已發布的共用面板）')
     parser.add_argument('--lookback', type=int, default=20, help='策略 lookback')
     parser.add_argument('--ignore-local', action='store_true', help='忽略本地 sample_data.csv 強制重新抓取')
+    # universe 模式：多檔平行（忽略本地 sample_data.csv）
+    parser.add_argument('--symbols', default=None, help='多檔代碼，逗號分隔，例如 2330,2317,2454')
+    parser.add_argument('--universe-file', default=None, help='代碼清單檔（每行一檔或 CSV 第一欄）')
+    parser.add_argument('--workers', type=int, default=None, help='universe 模式 process 數（預設 CPU 數）')
+    parser.add_argument('--rate', type=float, default=2.0, help='universe 模式全域網路請求上限 (次/秒，0 為不限)')
+    parser.add_argument('--retries', type=int, default=2, help='universe 模式單檔失敗重試次數')
+    parser.add_argument('--no-reports', action='store_true', help='universe 模式不輸出個股圖表，只產出彙總表')
+    # checkpoint DAG 模式：只重算輸入改變的 stage
+    parser.add_argument('--dag', action='store_true', help='以 checkpoint 階段圖執行（重跑只算變動部分）')
+    parser.add_argument('--dry-run', action='store_true', help='DAG 模式：只列出將重算的 stage')
+    parser.add_argument('--force', default='', help='DAG 模式：強制重算的 stage，逗號分隔，例如 fetch,reports')
     args = parser.parse_args()
-    main(symbol=args.symbol, start=args.start, end=args.end, source=args.source, ignore_local=args.ignore_local, lookback=args.lookback)
+    if args.dag or args.dry_run:
+        from src.app.ops.daily_dag import run_daily_dag, symbol_outputs
+        from src.app.ops.universe import read_universe
+        symbols = read_universe(args.universe_file) if args.universe_file else []
+        symbols += [s.strip() for s in (args.symbols or '').split(',') if s.strip()]
+        symbols = symbols or [args.symbol]
+        end = args.end or datetime.now().strftime('%Y-%m-%d')
+        result = run_daily_dag(symbols, args.start or '2024-01-01', end, source=args.source, lookback=args.lookback,
+                               out_dir=Path('reports') / datetime.now().strftime('%Y%m%d'),
+                               ignore_local=args.ignore_local or len(symbols) > 1,
+                               max_points=settings.chart_max_points or None, workers=args.workers or 4,
+                               dry_run=args.dry_run, force=[f for f in args.force.split(',') if f])
+        print(result.summary())
+        if not args.dry_run:
+            for sym in symbols:
+                out = symbol_outputs(result, sym if len(symbols) > 1 else None)
+                if out['metrics'] is not None:
+                    print(sym, 'Metrics:', out['metrics']['report'])
+                if out['reports'] is not None:
+                    print(sym, 'Reports:', out['reports'])
+    elif args.symbols or args.universe_file:
+        from src.app.ops.universe import read_universe, run_universe
+        symbols = read_universe(args.universe_file) if args.universe_file else []
+        symbols += [s.strip() for s in (args.symbols or '').split(',') if s.strip()]
+        end = args.end or datetime.now().strftime('%Y-%m-%d')
+        out_dir = Path('reports') / datetime.now().strftime('%Y%m%d') / 'universe'
+        result = run_universe(symbols, args.start or '2024-01-01', end, source=args.source, lookback=args.lookback,
+                              out_dir=out_dir, workers=args.workers, rate_per_sec=args.rate or None,
+                              retries=args.retries, reports=not args.no_reports,
+                              max_points=settings.chart_max_points or None)
+        print(result.summary())
+        if not result.metrics.empty:
+            print(result.metrics.to_string(float_format=lambda v: f"{v:.4f}"))
+            print('Metrics table:', result.metrics_path)
+    else:
+        main(symbol=args.symbol, start=args.start, end=args.end, source=args.source, ignore_local=args.ignore_local, lookback=args.lookback)
@@ -0,0 +1,290 @@
+"""行程內監控指標：counter / gauge / histogram，輸出 Prometheus 文字格式（無外部相依）。
+
+    with stage('fetch'):                 # 各階段耗時 -> app_stage_seconds{stage="fetch"}
+        df = fetch_ohlcv_yf(...)
+    REGISTRY.render()                    # /api/metrics 的內容
+
+- labels(*values) 以 tuple 查表取得子指標，observe/inc 只做 bisect + 加法（持有極短的 lock），
+  成本約數百奈秒，可常駐於正式環境（見 scripts/bench_telemetry.py）
+- on_collect(fn) 註冊抓取時才計算的數值（例如佇列長度），平時零成本
+- MetricsMiddleware 為純 ASGI middleware，以路由樣板（/api/jobs/{job_id}）而非實際路徑為標籤，
+  避免標籤數量失控；SSE 等串流回應計至回應結束
+- 指標只存在於本行程；背景工作 worker 行程內的 stage 耗時不會匯出，
+  工作層級的排隊與執行時間由主行程的 JobQueue 記錄
+"""
+from __future__ import annotations
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# 秒；涵蓋快取命中（毫秒內）到抓取 / 繪圖（數秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help: str = '', labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> object:
+        """依標籤值取得子指標（輸出時以 str() 轉換；同一標籤請固定使用同一型別）。"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} 需要標籤 {self.labelnames}，收到 {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += self._samples()
+        return '\n'.join(lines)
+
+    def _items(self):
+        for key, child in list(self._children.items()):
+            yield tuple(str(v) for v in key), child
+
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(c.value)}" for k, c in self._items()]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str = '', labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != float('inf')))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, c in self._items():
+            with c._lock:
+                counts, total = list(c.counts), c.sum
+            acc = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                acc += n
+                le = 'le="' + _fmt(bound) + '"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {acc}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {acc}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"指標 {name} 已登錄為 {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = '', labelnames: Iterable[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str = '', labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str = '', labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def on_collect(self, fn: Callable[[], None]) -> None:
+        """fn() 於每次 render 前呼叫，用於更新抓取時才計算的 gauge。"""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for fn in self._collectors:
+            fn()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(m.render() for m in metrics) + '\n'
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram('app_stage_seconds', 'Latency of pipeline stages (fetch/indicators/backtest/report).',
+                                   ['stage'])
+STAGE_ERRORS = REGISTRY.counter('app_stage_errors_total', 'Pipeline stages that raised.', ['stage'])
+CACHE_REQUESTS = REGISTRY.counter('app_cache_requests_total', 'Cache lookups by cache and result (hit/miss).',
+                                  ['cache', 'result'])
+HTTP_SECONDS = REGISTRY.histogram('http_request_duration_seconds', 'HTTP request latency by route template.',
+                                  ['method', 'route', 'status'])
+HTTP_IN_PROGRESS = REGISTRY.gauge('http_requests_in_progress', 'HTTP requests currently being served.')
+
+
+@contextmanager
+def stage(name: str):
+    """計時一個處理階段；例外時另計 app_stage_errors_total 並照常拋出。"""
+    child = STAGE_SECONDS.labels(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.labels(name).inc()
+        raise
+    finally:
+        child.observe(time.perf_counter() - t0)
+
+
+def timed(name: str) -> Callable:
+    """stage 的 decorator 版本。"""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+class MetricsMiddleware:
+    """ASGI middleware：每個 HTTP 請求計入 http_request_duration_seconds 與 in-progress gauge。"""
+
+    def __init__(self, app, exclude: Iterable[str] = ()):
+        self.app = app
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route = scope.get('route')
+            # 未比對到路由（404 等）合併為同一標籤
+            path = getattr(route, 'path', None) or 'unmatched'
+            HTTP_SECONDS.labels(scope['method'], path, status[0]).observe(time.perf_counter() - t0)
+
+
+__all__ = ['REGISTRY', 'Registry', 'Counter', 'Gauge', 'Histogram', 'MetricsMiddleware', 'CONTENT_TYPE',
+           'STAGE_SECONDS', 'STAGE_ERRORS', 'CACHE_REQUESTS', 'HTTP_SECONDS', 'HTTP_IN_PROGRESS',
+           'stage', 'timed', 'record_cache']
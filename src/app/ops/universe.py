@@ -0,0 +1,166 @@
+"""Universe 模式：多檔標的以 process pool 平行執行每日例行流程。
+
+fetch -> validate -> (還原權值) -> positions -> backtest -> metrics -> reports，每檔：
+- 於獨立 worker 執行，單檔失敗（含例外）不影響其他標的
+- 失敗時以指數退避重試 retries 次
+- 所有網路請求共用同一個跨 process 速率限制器（data.ratelimit）
+- source='panel' 時各 worker 唯讀 memory-map 同一份已發布面板（data.panel_store），不各自讀檔
+結束時以一次 metrics_matrix 彙整所有成功標的，輸出 universe_metrics.csv。
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+import pandas as pd
+
+from ..data import ratelimit
+from ..performance.metrics import metrics_matrix
+
+_WORKER_FIG = None
+
+
+def read_universe(path: str | Path) -> List[str]:
+    """每行一檔（或 CSV 第一欄）；忽略空行、# 註解與 symbol 標題列，保留首次出現順序。"""
+    out: List[str] = []
+    for line in Path(path).read_text(encoding='utf-8').splitlines():
+        sym = line.split('#', 1)[0].split(',', 1)[0].strip()
+        if sym and sym.lower() != 'symbol' and sym not in out:
+            out.append(sym)
+    return out
+
+
+def _init_worker(limiter: ratelimit.RateLimiter | None, reports: bool, panel: bool = False):
+    """ProcessPoolExecutor 的 initializer；workers=1 時只安裝限速器，不切換呼叫端的 matplotlib backend。"""
+    global _WORKER_FIG
+    ratelimit.install(limiter)
+    if panel:
+        from ..data.panel_store import panel_store
+        panel_store.current()   # 每個 worker 只 attach 一次；之後僅在發布新世代時重新 attach
+    if reports:
+        import matplotlib
+        matplotlib.use('Agg')
+        from ..visual.report import new_equity_figure
+        _WORKER_FIG = new_equity_figure()
+
+
+def _run_symbol(symbol: str, start: str, end: str, source: str, lookback: int, out_dir: str,
+                reports: bool, max_points: int | None, retries: int, retry_backoff: float, fig=None) -> dict:
+    from .run_daily import adjust_prices, load_local_or_fetch, run_pipeline, validate_date_range
+    t0 = time.perf_counter()
+    out = {'symbol': symbol, 'pid': os.getpid(), 'attempts': 0}
+    for attempt in range(retries + 1):
+        out['attempts'] = attempt + 1
+        try:
+            df = load_local_or_fetch(symbol, start, end, source=source, ignore_local=True)
+            df = adjust_prices(validate_date_range(df, symbol, start, end, source), symbol, source)
+            if df.empty:
+                raise ValueError(f"no data for {symbol} {start}~{end}")
+            res = run_pipeline(df, lookback, out_dir=Path(out_dir) / symbol.replace('.', '_'),
+                               max_points=max_points, reports=reports, fig=_WORKER_FIG if fig is None else fig)
+            out.update(ret=res['bt']['ret'], report=res['report'],
+                       chart=res.get('chart'), interactive=res.get('interactive'))
+            out.pop('error', None)
+            break
+        except Exception as e:  # 單檔隔離：記錄後重試，最終失敗不拋出
+            out['error'] = f"{type(e).__name__}: {e}"
+            if attempt < retries:
+                time.sleep(retry_backoff * 2 ** attempt)
+    out['seconds'] = time.perf_counter() - t0
+    return out
+
+
+@dataclass
+class UniverseResult:
+    metrics: pd.DataFrame
+    wall_seconds: float
+    errors: Dict[str, str] = field(default_factory=dict)
+    artifacts: Dict[str, dict] = field(default_factory=dict)
+    metrics_path: str | None = None
+
+    def summary(self) -> str:
+        n = len(self.metrics) + len(self.errors)
+        lines = [f"universe {n} symbols: {len(self.metrics)} ok, {len(self.errors)} failed "
+                 f"in {self.wall_seconds:.2f}s ({n / max(self.wall_seconds, 1e-9):.1f} symbols/s)"]
+        for sym, err in self.errors.items():
+            lines.append(f"  [error] {sym}: {err}")
+        return '\n'.join(lines)
+
+
+def _consolidate(rows: List[dict]) -> pd.DataFrame:
+    ok = [r for r in rows if 'error' not in r]
+    if not ok:
+        return pd.DataFrame()
+    rets = pd.DataFrame({r['symbol']: r['ret'] for r in ok}).sort_index()
+    table = metrics_matrix(rets)
+    extra = pd.DataFrame({r['symbol']: {k: r['report'].get(k) for k in ('trades', 'win_rate', 'avg_holding_bars')}
+                          for r in ok}).T
+    table = table.join(extra)
+    table['attempts'] = pd.Series({r['symbol']: r['attempts'] for r in ok})
+    return table.sort_index()
+
+
+def run_universe(symbols: Iterable[str], start: str, end: str, source: str = 'yf', lookback: int = 20,
+                 out_dir: str | Path = 'reports/universe', workers: int | None = None,
+                 rate_per_sec: float | None = 2.0, retries: int = 2, retry_backoff: float = 1.0,
+                 reports: bool = True, max_points: int | None = None,
+                 progress: Callable[[int, int, str], None] | None = None) -> UniverseResult:
+    """symbols 依序執行；workers=1 時於本行程依序執行（測試/除錯用）。rate_per_sec=None 表示不限速。
+    progress(完成數, 總數, symbol) 於每檔完成時呼叫。
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if source == 'panel':
+        from ..data.panel_store import panel_store
+        panel_store.attach()   # 尚未發布面板時於此拋出 FileNotFoundError，而非讓每個 worker 初始化失敗
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ctx = mp.get_context()
+    limiter = ratelimit.RateLimiter(rate_per_sec, ctx) if rate_per_sec else None
+    args = (start, end, source, lookback, str(out_dir), reports, max_points, retries, retry_backoff)
+    t0 = time.perf_counter()
+    if workers == 1:
+        _init_worker(limiter, False, source == 'panel')
+        fig = None
+        if reports:
+            import matplotlib.pyplot as plt
+            from ..visual.report import new_equity_figure
+            fig = new_equity_figure()
+        try:
+            rows = []
+            for sym in symbols:
+                rows.append(_run_symbol(sym, *args, fig=fig))
+                if progress:
+                    progress(len(rows), len(symbols), sym)
+        finally:
+            ratelimit.install(None)
+            if fig is not None:
+                plt.close(fig)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(limiter, reports, source == 'panel')) as ex:
+            futs = [ex.submit(_run_symbol, sym, *args) for sym in symbols]
+            rows = []
+            for f in as_completed(futs):
+                rows.append(f.result())
+                if progress:
+                    progress(len(rows), len(symbols), rows[-1]['symbol'])
+
+    metrics = _consolidate(rows)
+    metrics_path = None
+    if not metrics.empty:
+        metrics_path = str(out_dir / 'universe_metrics.csv')
+        metrics.to_csv(metrics_path, index_label='symbol')
+    return UniverseResult(
+        metrics=metrics,
+        wall_seconds=time.perf_counter() - t0,
+        errors={r['symbol']: r['error'] for r in rows if 'error' in r},
+        artifacts={r['symbol']: {k: r[k] for k in ('chart', 'interactive') if r.get(k)} for r in rows if 'error' not in r},
+        metrics_path=metrics_path,
+    )
+
+
+__all__ = ['run_universe', 'read_universe', 'UniverseResult']
@@ -1,15 +1,57 @@
-"""績效指標計算"""
+"""績效指標計算
+
+年化係數依 bar 頻率決定（periods_per_year=None 時由報酬的 DatetimeIndex 推斷）：
+日線 252、週線約 52、月線約 12；日內 bar 為 252 × 每日 bar 數。
+"""
 from __future__ import annotations
+import warnings
 import pandas as pd
 import numpy as np
 
+TRADING_DAYS = 252
+SESSION_MINUTES = 270  # TWSE 09:00–13:30
+
+
+def bars_per_year(freq: str | pd.Timedelta, session_minutes: int = SESSION_MINUTES,
+                  trading_days: int = TRADING_DAYS) -> float:
+    """固定長度 bar（'5min'、'1h'、'1D'…）的年化係數；日內 bar 以每日交易時間計算。"""
+    step = pd.Timedelta(freq)
+    days = step / pd.Timedelta(days=1)
+    if days < 1:
+        return trading_days * float(np.ceil(pd.Timedelta(minutes=session_minutes) / step))
+    if days < 2:
+        return float(trading_days)
+    return 365.25 / days
+
+
+def infer_periods_per_year(index, default: float = TRADING_DAYS, trading_days: int = TRADING_DAYS) -> float:
+    """由時間軸推斷年化係數；非 DatetimeIndex 或點數不足時回傳 default。
 
-def sharpe_ratio(returns: pd.Series, risk_free: float = 0.0) -> float:
+    日內資料以實際「每個交易日平均 bar 數」計算，午休、半日市與無成交的空 bar 都已反映在內。
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 3:
+        return float(default)
+    values = index.as_unit('ns').asi8
+    step = np.median(np.diff(values))
+    day = pd.Timedelta(days=1).value
+    if step <= 0:
+        return float(default)
+    if step < day:
+        days = np.unique(values // day).size
+        return trading_days * len(values) / days
+    if step < 2 * day:
+        return float(trading_days)
+    return 365.25 * day * (len(values) - 1) / (values[-1] - values[0])   # 週 / 月線：平均間隔
+
+
+def sharpe_ratio(returns: pd.Series, risk_free: float = 0.0, periods_per_year: float | None = None) -> float:
+    """periods_per_year=None 時依 returns.index 的 bar 頻率推斷（日線 252）。"""
     r = returns.dropna()
     if r.std() == 0:
         return 0.0
-    excess = r - risk_free/252
-    return float(np.sqrt(252) * excess.mean() / excess.std())
+    ppy = infer_periods_per_year(returns.index) if periods_per_year is None else periods_per_year
+    excess = r - risk_free/ppy
+    return float(np.sqrt(ppy) * excess.mean() / excess.std())
 
 
 def max_drawdown(equity: pd.Series) -> float:
@@ -18,15 +60,95 @@ def max_drawdown(equity: pd.Series) -> float:
     return float(dd.min())
 
 
-def basic_report(df: pd.DataFrame) -> dict:
+def basic_report(df: pd.DataFrame, trades: pd.DataFrame | None = None,
+                 periods_per_year: float | None = None) -> dict:
+    """trades: 可選的交易明細（backtest.ledger.extract_trades），提供時附加交易統計。"""
     eq = df['equity']
     rets = df['ret']
     out = {
         'cumulative_return': float(eq.iloc[-1] - 1),
-        'sharpe': sharpe_ratio(rets),
+        'sharpe': sharpe_ratio(rets, periods_per_year=periods_per_year),
         'max_drawdown': max_drawdown(eq),
         'turnover_sum': float(df['turnover'].sum()),
         'cost_sum': float(df['cost'].sum()),
         'periods': int(len(df))
     }
+    if trades is not None:
+        closed = trades[~trades['is_open']]
+        out['trades'] = int(len(trades))
+        out['win_rate'] = float((closed['net_pnl'] > 0).mean()) if len(closed) else 0.0
+        out['avg_holding_bars'] = float(trades['bars'].mean()) if len(trades) else 0.0
+    return out
+
+
+def _drawdown_matrix(equity: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """回傳 (回撤比例, 距前高 bar 數)，皆為 (bars × strategies)。"""
+    roll_max = np.maximum.accumulate(equity, axis=0)
+    dd = equity / roll_max - 1
+    steps = np.arange(len(equity))[:, None]
+    last_peak = np.maximum.accumulate(np.where(dd >= 0, steps, 0), axis=0)
+    return dd, steps - last_peak
+
+
+def metrics_matrix(returns: pd.DataFrame | np.ndarray, turnover: pd.DataFrame | np.ndarray | None = None,
+                   risk_free: float = 0.0, periods_per_year: float | None = None,
+                   from_equity: bool = False) -> pd.DataFrame:
+    """一次向量化計算多策略績效指標 (bars × strategies -> strategies × metrics)。
+
+    returns: 每欄一個策略的單期報酬；from_equity=True 時視為權益曲線（起始基準 1）
+    turnover: 可選，同形狀換手矩陣
+    NaN 視為該策略無資料（例如較晚開始），不計入樣本數。
+    periods_per_year: None 時由 returns.index 推斷（見 infer_periods_per_year）
+    單欄結果與 sharpe_ratio / max_drawdown / basic_report 一致。
+    """
+    frame = returns if isinstance(returns, pd.DataFrame) else pd.DataFrame(np.asarray(returns, dtype=float))
+    if periods_per_year is None:
+        periods_per_year = infer_periods_per_year(frame.index)
+    r = frame.to_numpy(dtype=float)
+    if r.ndim == 1:
+        r = r.reshape(-1, 1)
+    if from_equity:
+        r = r / np.vstack([np.ones((1, r.shape[1])), r[:-1]]) - 1
+    valid = ~np.isnan(r)
+    n = valid.sum(axis=0)
+    r0 = np.where(valid, r, 0.0)
+    excess = np.where(valid, r - risk_free / periods_per_year, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # 全 NaN 欄位
+        mean = np.nanmean(excess, axis=0)
+        std = np.nanstd(excess, axis=0, ddof=1)
+        sharpe = np.where(std > 0, np.sqrt(periods_per_year) * mean / std, 0.0)
+        downside = np.sqrt(np.nanmean(np.minimum(excess, 0.0) ** 2, axis=0))
+        sortino = np.where(downside > 0, np.sqrt(periods_per_year) * mean / downside, np.nan)
+
+        equity = np.cumprod(1 + r0, axis=0)
+        cum = equity[-1] - 1 if len(equity) else np.full(r.shape[1], np.nan)
+        ann_return = (1 + cum) ** (periods_per_year / n) - 1
+        dd, underwater = _drawdown_matrix(equity)
+        mdd = dd.min(axis=0)
+        calmar = np.where(mdd < 0, ann_return / np.abs(mdd), np.nan)
+
+        nonzero = valid & (r != 0)
+        hit_rate = (r0 > 0).sum(axis=0) / nonzero.sum(axis=0)
+        pct = np.percentile if valid.all() else np.nanpercentile
+        q05, q95 = pct(r, [5, 95], axis=0)
+        tail_ratio = np.abs(q95) / np.abs(q05)
+        ann_vol = std * np.sqrt(periods_per_year)  # 扣除常數無風險利率不影響標準差
+
+    out = pd.DataFrame({
+        'cumulative_return': cum,
+        'ann_return': ann_return,
+        'ann_vol': ann_vol,
+        'sharpe': sharpe,
+        'sortino': sortino,
+        'calmar': calmar,
+        'max_drawdown': mdd,
+        'max_dd_duration': underwater.max(axis=0),
+        'hit_rate': hit_rate,
+        'tail_ratio': tail_ratio,
+        'periods': n,
+    }, index=frame.columns)
+    if turnover is not None:
+        out['turnover_sum'] = np.nansum(np.asarray(turnover, dtype=float).reshape(len(r), -1), axis=0)
     return out
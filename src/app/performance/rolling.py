@@ -0,0 +1,129 @@
+"""Rolling 績效分析：一次建立累積和，多個視窗、多個策略共用。
+
+視窗內的和以 ``cs[t] - cs[t-w]`` 取得，因此新增一個視窗只需 O(n) 的相減，
+不必對每個視窗重跑 rolling。輸入可為單一報酬 Series 或 (bars × strategies) DataFrame，
+輸出型別與輸入相同；NaN 報酬視為 0（與舊版 rolling_sharpe 相同）。
+
+可選 benchmark（例如加權指數 TAIEX 日報酬）以計算 rolling beta。
+periods_per_year=None 時依報酬 index 的 bar 頻率推斷年化係數（日線 252，日內 bar 見 metrics.infer_periods_per_year）。
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from .metrics import infer_periods_per_year
+
+# 變異數相對門檻：累積和相減的浮點殘差低於此值視為 0（常數報酬視窗）
+_VAR_RTOL = 1e-10
+
+
+def drawdown(equity: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
+    """權益曲線相對歷史高點的回撤比例（<= 0）。"""
+    return equity / equity.cummax() - 1
+
+
+class RollingAnalytics:
+    def __init__(self, returns: pd.Series | pd.DataFrame, benchmark: pd.Series | None = None,
+                 periods_per_year: float | None = None):
+        self.returns = returns
+        self.periods_per_year = infer_periods_per_year(returns.index) if periods_per_year is None else periods_per_year
+        r = returns.fillna(0).to_numpy(dtype=float)
+        self._r = r.reshape(len(r), -1)
+        self._cs = self._cumsum(self._r)
+        self._cs2 = self._cumsum(self._r ** 2)
+        self._csd2 = self._cumsum(np.minimum(self._r, 0.0) ** 2)
+        self._dd = None
+        self._b = None
+        if benchmark is not None:
+            b = benchmark.reindex(returns.index).fillna(0).to_numpy(dtype=float).reshape(-1, 1)
+            self._b = b
+            self._csb = self._cumsum(b)
+            self._csb2 = self._cumsum(b ** 2)
+            self._csrb = self._cumsum(self._r * b)
+
+    @property
+    def has_benchmark(self) -> bool:
+        return self._b is not None
+
+    @staticmethod
+    def _cumsum(x: np.ndarray) -> np.ndarray:
+        out = np.zeros((len(x) + 1, x.shape[1]))
+        np.cumsum(x, axis=0, out=out[1:])
+        return out
+
+    @staticmethod
+    def _window_sum(cs: np.ndarray, window: int) -> np.ndarray:
+        out = np.full((len(cs) - 1, cs.shape[1]), np.nan)
+        if window <= len(out):
+            out[window - 1:] = cs[window:] - cs[:-window]
+        return out
+
+    def _wrap(self, values: np.ndarray) -> pd.Series | pd.DataFrame:
+        if isinstance(self.returns, pd.DataFrame):
+            return pd.DataFrame(values, index=self.returns.index, columns=self.returns.columns)
+        return pd.Series(values[:, 0], index=self.returns.index, name=self.returns.name)
+
+    def _moments(self, window: int) -> tuple[np.ndarray, np.ndarray]:
+        """視窗平均與母體標準差 (ddof=0)。"""
+        mean = self._window_sum(self._cs, window) / window
+        ms = self._window_sum(self._cs2, window) / window
+        var = ms - mean ** 2
+        var[var <= _VAR_RTOL * ms] = 0.0
+        return mean, np.sqrt(var)
+
+    def mean(self, window: int):
+        return self._wrap(self._window_sum(self._cs, window) / window)
+
+    def volatility(self, window: int, annualize: bool = True):
+        _, std = self._moments(window)
+        return self._wrap(std * (np.sqrt(self.periods_per_year) if annualize else 1.0))
+
+    def sharpe(self, window: int):
+        mean, std = self._moments(window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = np.where(std > 0, mean / std, np.nan) * np.sqrt(self.periods_per_year)
+        return self._wrap(out)
+
+    def sortino(self, window: int):
+        mean = self._window_sum(self._cs, window) / window
+        downside = np.sqrt(self._window_sum(self._csd2, window) / window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = np.where(downside > 0, mean / downside, np.nan) * np.sqrt(self.periods_per_year)
+        return self._wrap(out)
+
+    def beta(self, window: int):
+        if self._b is None:
+            raise ValueError("未提供 benchmark，無法計算 beta")
+        mr = self._window_sum(self._cs, window) / window
+        mb = self._window_sum(self._csb, window) / window
+        cov = self._window_sum(self._csrb, window) / window - mr * mb
+        mb2 = self._window_sum(self._csb2, window) / window
+        var_b = mb2 - mb ** 2
+        var_b[var_b <= _VAR_RTOL * mb2] = 0.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = np.where(var_b > 0, cov / var_b, np.nan)
+        return self._wrap(out)
+
+    def equity(self):
+        return self._wrap(np.cumprod(1 + self._r, axis=0))
+
+    def drawdown(self):
+        """全期回撤（與視窗無關，計算一次後快取，供多個報表共用）。"""
+        if self._dd is None:
+            self._dd = drawdown(self.equity())
+        return self._dd
+
+    def table(self, windows, metrics=('sharpe', 'sortino', 'volatility')) -> pd.DataFrame:
+        """多視窗、多指標彙整；欄位為 MultiIndex (metric, window, strategy)。"""
+        metrics = list(metrics)
+        if self._b is not None and 'beta' not in metrics:
+            metrics.append('beta')
+        frames = {}
+        for name in metrics:
+            for w in windows:
+                val = getattr(self, name)(w)
+                frames[(name, w)] = val.to_frame() if isinstance(val, pd.Series) else val
+        return pd.concat(frames, axis=1, names=['metric', 'window', 'strategy'])
+
+
+__all__ = ['RollingAnalytics', 'drawdown']
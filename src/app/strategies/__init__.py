@@ -1,3 +1,4 @@
 # src/app/strategies/__init__.py
 from .base import Strategy, MomentumStrategy
 from .mean_reversion import MeanReversionStrategy
+from .batch import PositionBatch, param_grid, vote, weighted_average, regime_switch, sweep
@@ -1,11 +1,45 @@
 # 策略基底類別
+from typing import Dict, List, Sequence
+
+import numpy as np
 import pandas as pd
 from ..features.indicators import momentum_signal
 
+
+def _panel(close: pd.DataFrame | pd.Series) -> np.ndarray:
+    """收盤價面板 (dates × symbols) -> float 陣列；單一 Series 視為一欄。"""
+    arr = close.to_numpy(dtype=float)
+    return arr.reshape(len(arr), -1)
+
+
+def _group_by(cls, params: Sequence[Dict], attr: str) -> Dict[object, List[int]]:
+    """以參數值分組（建立實例取值，順便套用預設值並檢查參數名稱），相同值只算一次。"""
+    groups: Dict[object, List[int]] = {}
+    for i, p in enumerate(params):
+        groups.setdefault(getattr(cls(**p), attr), []).append(i)
+    return groups
+
+
 class Strategy:
     def generate_positions(self, df: pd.DataFrame) -> pd.Series:
         raise NotImplementedError("策略需實作 generate_positions 方法")
 
+    @classmethod
+    def batch_positions(cls, close: pd.DataFrame | pd.Series, params: Sequence[Dict]) -> np.ndarray:
+        """多組參數 × 多檔標的一次產生部位，回傳 (configs × dates × symbols) 陣列。
+
+        預設逐組、逐檔呼叫 generate_positions；子類別可覆寫為向量化實作（結果須與單檔一致）。
+        """
+        arr = _panel(close)
+        out = np.zeros((len(params), *arr.shape))
+        for i, p in enumerate(params):
+            strat = cls(**p)
+            for j in range(arr.shape[1]):
+                frame = pd.DataFrame({'close': arr[:, j]}, index=close.index)
+                out[i, :, j] = strat.generate_positions(frame).to_numpy(dtype=float)
+        return out
+
+
 class MomentumStrategy(Strategy):
     def __init__(self, lookback: int = 5):
         self.lookback = lookback
@@ -13,3 +47,16 @@ class MomentumStrategy(Strategy):
     def generate_positions(self, df: pd.DataFrame) -> pd.Series:
         pos = momentum_signal(df['close'], self.lookback)
         return pos.fillna(0)
+
+    @classmethod
+    def batch_positions(cls, close: pd.DataFrame | pd.Series, params: Sequence[Dict]) -> np.ndarray:
+        """sign(close_t / close_{t-lookback} - 1)，每個不同的 lookback 只算一次；int8。"""
+        arr = _panel(close)
+        out = np.zeros((len(params), *arr.shape), dtype=np.int8)
+        for lookback, rows in _group_by(cls, params, 'lookback').items():
+            if lookback >= len(arr):
+                continue
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mom = arr[lookback:] / arr[:-lookback] - 1
+            out[rows, lookback:] = (mom > 0).astype(np.int8) - (mom < 0)
+        return out
@@ -0,0 +1,117 @@
+"""批次策略：多組參數 × 多檔標的的部位矩陣與向量化組合 (ensemble)。
+
+    params = param_grid(lookback=[5, 10, 20, 60])
+    batch = PositionBatch.build(MomentumStrategy, close_panel, params)   # (configs × dates × symbols)
+    batch.stacked()                      # 2D：欄位為 (config, symbol)
+    vote(batch.values)                   # 多數決
+    weighted_average(batch.values, w)    # 加權平均部位
+    regime_switch(batch.values, regime)  # 依 regime 逐 bar 選用某組參數
+    sweep(MomentumStrategy, close_panel, params)   # 每組 (config, symbol) 的績效表
+
+close_panel 為收盤價面板 (dates × symbols)，可由 data.quality.panel_from_frames(frames)['close'] 取得。
+組合函式只做陣列運算，不在 Python 逐組或逐檔迴圈。
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..backtest.engine import backtest_matrix
+from ..config.settings import settings
+from ..performance.metrics import metrics_matrix
+
+
+def param_grid(**ranges: Sequence) -> List[Dict]:
+    """參數笛卡兒積：param_grid(lookback=[5, 10], ...) -> [{'lookback': 5, ...}, ...]。"""
+    keys = list(ranges)
+    return [dict(zip(keys, values)) for values in product(*(ranges[k] for k in keys))]
+
+
+def config_label(params: Dict) -> str:
+    return ','.join(f"{k}={v}" for k, v in params.items()) or 'default'
+
+
+@dataclass
+class PositionBatch:
+    values: np.ndarray                 # (configs × dates × symbols)
+    index: pd.Index
+    symbols: pd.Index
+    params: List[Dict]
+
+    @classmethod
+    def build(cls, strategy_cls, close: pd.DataFrame | pd.Series, params: Sequence[Dict]) -> 'PositionBatch':
+        symbols = close.columns if isinstance(close, pd.DataFrame) else pd.Index([close.name or 'close'])
+        return cls(strategy_cls.batch_positions(close, list(params)), close.index, symbols, list(params))
+
+    def __len__(self) -> int:
+        return len(self.params)
+
+    @property
+    def labels(self) -> List[str]:
+        return [config_label(p) for p in self.params]
+
+    def frame(self, values: np.ndarray) -> pd.DataFrame:
+        """(dates × symbols) 陣列（例如組合結果）包成 DataFrame。"""
+        return pd.DataFrame(values, index=self.index, columns=self.symbols)
+
+    def positions(self, config: int, symbol) -> pd.Series:
+        return pd.Series(self.values[config, :, self.symbols.get_loc(symbol)], index=self.index, name=symbol)
+
+    def stacked(self, values: np.ndarray | None = None) -> pd.DataFrame:
+        """(configs × dates × symbols) -> (dates × (config, symbol)) 的 2D 表。"""
+        values = self.values if values is None else values
+        n, t, s = values.shape
+        flat = values.transpose(1, 0, 2).reshape(t, n * s)
+        columns = pd.MultiIndex.from_product([self.labels, self.symbols], names=['config', 'symbol'])
+        return pd.DataFrame(flat, index=self.index, columns=columns)
+
+
+def vote(values: np.ndarray, min_agree: int | None = None) -> np.ndarray:
+    """多數決：各組部位符號相加後取符號；min_agree 指定時需至少該數量的組合與結果同向才持有部位。"""
+    signs = np.sign(values).astype(np.int8)
+    out = np.sign(signs.sum(axis=0, dtype=np.int32)).astype(np.int8)
+    if min_agree is not None:
+        out[(signs == out).sum(axis=0) < min_agree] = 0
+    return out
+
+
+def weighted_average(values: np.ndarray, weights: Sequence[float] | np.ndarray, normalize: bool = True) -> np.ndarray:
+    """加權平均部位；weights 可為 (configs,) 或隨時間變動的 (configs × dates) / (configs × dates × symbols)。"""
+    w = np.asarray(weights, dtype=float)
+    w = w.reshape(w.shape + (1,) * (values.ndim - w.ndim))
+    total = (values * w).sum(axis=0)
+    if normalize:
+        denom = np.abs(w).sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total = np.where(denom > 0, total / denom, 0.0)
+    return total
+
+
+def regime_switch(values: np.ndarray, regime: np.ndarray | pd.Series | pd.DataFrame) -> np.ndarray:
+    """依 regime（每個 bar 使用的組合編號）選取部位；regime 為 (dates,) 或 (dates × symbols)，負值表示空手。"""
+    r = np.asarray(regime)
+    if r.ndim == 1:
+        r = np.broadcast_to(r[:, None], values.shape[1:])
+    flat = np.take_along_axis(values, np.clip(r, 0, len(values) - 1)[None].astype(np.intp), axis=0)[0]
+    return np.where(r >= 0, flat, 0).astype(values.dtype)
+
+
+def sweep(strategy_cls, close: pd.DataFrame | pd.Series, params: Sequence[Dict],
+          costs: Dict[str, float] | None = None) -> pd.DataFrame:
+    """參數掃描：批次部位 -> 向量化回測 -> metrics_matrix，回傳以 (config, symbol) 為 index 的績效表。"""
+    costs = costs or {'fee_bps': settings.tx_fee_bps, 'tax_bps': settings.tx_tax_bps,
+                      'slippage_bps': settings.slippage_bps}
+    batch = PositionBatch.build(strategy_cls, close, params)
+    ret = backtest_matrix(close, batch.values, costs['fee_bps'], costs['tax_bps'], costs['slippage_bps'])
+    turnover = np.zeros_like(ret)
+    turnover[:, 1:] = np.abs(np.diff(batch.values.astype(float), axis=1))
+    rets = batch.stacked(ret)
+    out = metrics_matrix(rets, turnover=batch.stacked(turnover).to_numpy())
+    out.index = rets.columns
+    return out
+
+
+__all__ = ['PositionBatch', 'param_grid', 'config_label', 'vote', 'weighted_average', 'regime_switch', 'sweep']
@@ -1,5 +1,8 @@
+from typing import Dict, Sequence
+
+import numpy as np
 import pandas as pd
-from .base import Strategy
+from .base import Strategy, _group_by, _panel
 from ..features.indicators import mean_reversion_signal
 
 class MeanReversionStrategy(Strategy):
@@ -9,3 +12,15 @@ class MeanReversionStrategy(Strategy):
     def generate_positions(self, df: pd.DataFrame) -> pd.Series:
         pos = mean_reversion_signal(df['close'], self.lookback)
         return pos.fillna(0)
+
+    @classmethod
+    def batch_positions(cls, close: pd.DataFrame | pd.Series, params: Sequence[Dict]) -> np.ndarray:
+        """收盤低於 / 高於 lookback 均線時做多 / 做空；每個不同的 lookback 對整個面板算一次 rolling；int8。"""
+        arr = _panel(close)
+        frame = pd.DataFrame(arr)
+        out = np.zeros((len(params), *arr.shape), dtype=np.int8)
+        for lookback, rows in _group_by(cls, params, 'lookback').items():
+            # 與單檔相同的 pandas rolling，均線數值逐位元一致
+            ma = frame.rolling(lookback).mean().to_numpy()
+            out[rows] = (arr < ma).astype(np.int8) - (arr > ma)
+        return out
@@ -0,0 +1,81 @@
+"""報表產出物快取 (content-addressed)：以 (報表類型, 資料指紋, 參數) 雜湊為檔名。
+
+- 相同請求直接回傳既有檔案，不重新繪製
+- 不同請求各自有穩定路徑 {root}/{kind}/{key}{suffix}，不會互相覆寫
+- 先繪製到暫存目錄再 os.replace 進最終路徑，多 worker 同時產生同一鍵也安全
+- 依總容量與存活時間淘汰（以 mtime 為 LRU 依據，命中時會更新 mtime）
+"""
+from __future__ import annotations
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from ..data.fingerprint import frame_fingerprint, params_fingerprint
+
+
+class ArtifactCache:
+    def __init__(self, root: str | Path, max_bytes: int = 512 * 1024 ** 2, max_age_seconds: float = 7 * 86400):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, kind: str, data: pd.DataFrame | str, params: dict[str, Any] | None = None) -> str:
+        fp = data if isinstance(data, str) else frame_fingerprint(data)
+        return params_fingerprint({'kind': kind, 'data': fp, 'params': params or {}})[:24]
+
+    def path_for(self, kind: str, key: str, suffix: str = '.html') -> Path:
+        return self.root / kind / f"{key}{suffix}"
+
+    def get_or_render(self, kind: str, data: pd.DataFrame | str, params: dict[str, Any] | None,
+                      render: Callable[[Path], str | Path], suffix: str = '.html') -> tuple[Path, bool]:
+        """render(tmp_dir) 需在 tmp_dir 內產生檔案並回傳其路徑。回傳 (最終路徑, 是否命中)。"""
+        path = self.path_for(kind, self.key(kind, data, params), suffix)
+        if path.exists():
+            os.utime(path)
+            self.hits += 1
+            return path, True
+        self.misses += 1
+        tmp_dir = self.root / '.tmp' / uuid.uuid4().hex
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            produced = Path(render(tmp_dir))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(produced, path)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(protect=path)
+        return path, False
+
+    def evict(self, protect: Path | None = None) -> list[Path]:
+        """刪除過期檔案，並由最舊者開始刪除直到總容量 <= max_bytes。"""
+        now = time.time()
+        entries = []
+        for p in self.root.glob('*/*'):
+            if p.parent.name == '.tmp' or not p.is_file():
+                continue
+            st = p.stat()
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for mtime, size, p in entries:
+            if p == protect:
+                continue
+            if now - mtime > self.max_age_seconds or total > self.max_bytes:
+                p.unlink(missing_ok=True)
+                total -= size
+                removed.append(p)
+        return removed
+
+    def url_for(self, path: Path, mount: str = '/reports', mount_dir: str | Path = 'reports') -> str:
+        return mount.rstrip('/') + '/' + path.relative_to(Path(mount_dir)).as_posix()
+
+
+__all__ = ['ArtifactCache']
@@ -0,0 +1,145 @@
+"""批次報表：多檔回測結果以 process pool 平行輸出 PNG / HTML，並產生總覽索引頁。
+
+- pool worker 啟動時切換 matplotlib 為非互動 Agg backend，並建立一個可重用的 figure；
+  workers=1 於呼叫端行程執行時不更動其 backend，只借用一個 figure 並於批次結束時關閉
+- 每檔輸出至 out_dir/{symbol}/（equity_curve.png、interactive_report.html）
+- index.html 以一次向量化的 metrics_matrix 彙整各檔績效並連結所有產出
+- 回傳每個 worker 的處理檔數、忙碌秒數、吞吐量與總牆鐘時間
+"""
+from __future__ import annotations
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+from ..performance.metrics import metrics_matrix
+
+_WORKER_FIG = None
+
+
+def _init_worker():
+    """僅作為 ProcessPoolExecutor 的 initializer（子行程內執行）。"""
+    global _WORKER_FIG
+    import matplotlib
+    matplotlib.use('Agg')
+    from .report import new_equity_figure
+    _WORKER_FIG = new_equity_figure()
+
+
+def _render_one(symbol: str, bt: pd.DataFrame, out_dir: str, max_points: int | None, kinds: tuple,
+                fig=None) -> dict:
+    from .report import plot_equity
+    from .interactive_report import build_interactive_report
+    from ..performance.rolling import RollingAnalytics
+    t0 = time.perf_counter()
+    sym_dir = Path(out_dir) / symbol.replace('.', '_')
+    out = {'symbol': symbol, 'pid': os.getpid()}
+    try:
+        analytics = RollingAnalytics(bt['ret'])
+        if 'png' in kinds:
+            out['png'] = plot_equity(bt, sym_dir, dd=analytics.drawdown(), max_points=max_points,
+                                     fig=_WORKER_FIG if fig is None else fig)
+        if 'html' in kinds:
+            out['html'] = build_interactive_report(bt, sym_dir, analytics=analytics, max_points=max_points)
+    except Exception as e:  # 單檔失敗不影響整批
+        out['error'] = f"{type(e).__name__}: {e}"
+    out['seconds'] = time.perf_counter() - t0
+    return out
+
+
+@dataclass
+class BatchReportResult:
+    index_path: str
+    artifacts: Dict[str, dict]
+    wall_seconds: float
+    workers: List[dict] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        lines = [f"rendered {len(self.artifacts)} symbols in {self.wall_seconds:.2f}s "
+                 f"({len(self.artifacts) / max(self.wall_seconds, 1e-9):.1f} symbols/s)"]
+        for w in self.workers:
+            lines.append(f"  worker pid={w['pid']}: {w['count']} symbols, busy {w['busy_seconds']:.2f}s, "
+                         f"{w['throughput']:.1f} symbols/s")
+        for sym, err in self.errors.items():
+            lines.append(f"  [error] {sym}: {err}")
+        return '\n'.join(lines)
+
+
+def _worker_stats(rows: List[dict]) -> List[dict]:
+    stats: Dict[int, dict] = {}
+    for r in rows:
+        s = stats.setdefault(r['pid'], {'pid': r['pid'], 'count': 0, 'busy_seconds': 0.0})
+        s['count'] += 1
+        s['busy_seconds'] += r['seconds']
+    for s in stats.values():
+        s['throughput'] = s['count'] / s['busy_seconds'] if s['busy_seconds'] else 0.0
+    return sorted(stats.values(), key=lambda s: s['pid'])
+
+
+def _write_index(out_dir: Path, artifacts: Dict[str, dict], metrics: pd.DataFrame, title: str) -> Path:
+    def link(path: str | None, label: str) -> str:
+        if not path:
+            return ''
+        rel = Path(path).relative_to(out_dir).as_posix()
+        return f'<a href="{html.escape(rel)}">{label}</a>'
+
+    cols = ['cumulative_return', 'sharpe', 'sortino', 'max_drawdown', 'calmar', 'periods']
+    head = ''.join(f'<th>{c}</th>' for c in ['symbol'] + cols + ['chart', 'interactive'])
+    rows = []
+    for sym in sorted(artifacts):
+        a = artifacts[sym]
+        vals = ''.join(f'<td>{metrics.loc[sym, c]:.4g}</td>' if sym in metrics.index else '<td></td>' for c in cols)
+        rows.append(f"<tr><td>{html.escape(sym)}</td>{vals}<td>{link(a.get('png'), 'PNG')}</td>"
+                    f"<td>{link(a.get('html'), 'HTML')}</td></tr>")
+    page = (f"<!doctype html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+            "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}</style></head>"
+            f"<body><h2>{html.escape(title)}</h2><table><tr>{head}</tr>{''.join(rows)}</table></body></html>")
+    index_path = out_dir / 'index.html'
+    index_path.write_text(page, encoding='utf-8')
+    return index_path
+
+
+def render_batch(results: Dict[str, pd.DataFrame], out_dir: str | Path, workers: int | None = None,
+                 max_points: int | None = None, kinds: tuple = ('png', 'html'),
+                 title: str = 'Batch Report') -> BatchReportResult:
+    """results: {symbol: backtest_engine 輸出}。workers=1 時於本行程依序執行（測試/除錯用）。"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    rows: List[dict] = []
+    if workers == 1:
+        import matplotlib.pyplot as plt
+        from .report import new_equity_figure
+        fig = new_equity_figure() if 'png' in kinds else None
+        try:
+            rows = [_render_one(sym, bt, str(out_dir), max_points, kinds, fig) for sym, bt in results.items()]
+        finally:
+            if fig is not None:
+                plt.close(fig)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+            futs = [ex.submit(_render_one, sym, bt, str(out_dir), max_points, kinds) for sym, bt in results.items()]
+            rows = [f.result() for f in as_completed(futs)]
+
+    artifacts = {r['symbol']: {k: r[k] for k in ('png', 'html') if k in r} for r in rows if 'error' not in r}
+    errors = {r['symbol']: r['error'] for r in rows if 'error' in r}
+    rets = pd.DataFrame({sym: results[sym]['ret'] for sym in artifacts}) if artifacts else pd.DataFrame()
+    metrics = metrics_matrix(rets) if not rets.empty else pd.DataFrame()
+    index_path = _write_index(out_dir, artifacts, metrics, title)
+    return BatchReportResult(
+        index_path=str(index_path),
+        artifacts=artifacts,
+        wall_seconds=time.perf_counter() - t0,
+        workers=_worker_stats(rows),
+        errors=errors,
+    )
+
+
+__all__ = ['render_batch', 'BatchReportResult']
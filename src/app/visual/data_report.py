@@ -1,12 +1,18 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
+from ..backtest.ledger import signal_flips
+from .downsample import downsample_series
+from ..lazy import lazy_module
 
-def _compute_flip_signals(close: pd.Series, lookback: int, mode: str = 'meanrev'):
+go = lazy_module('plotly.graph_objects')
+psub = lazy_module('plotly.subplots')
+
+
+def compute_flip_signals(close: pd.Series, lookback: int, mode: str = 'meanrev'):
     """計算翻轉信號索引。
 
     mode = 'meanrev' (預設):
@@ -17,14 +23,10 @@ def _compute_flip_signals(close: pd.Series, lookback: int, mode: str = 'meanrev'
         Sell = 正 -> 負
     """
     mom_raw = close.pct_change(lookback)
-    sign = mom_raw.apply(lambda v: 1 if v > 0 else (-1 if v < 0 else 0))
-    prev = sign.shift(1)
-    if mode == 'trend':
-        buy_idx = sign[(sign == 1) & (prev == -1)].index
-        sell_idx = sign[(sign == -1) & (prev == 1)].index
-    else:  # meanrev
-        buy_idx = sign[(sign == -1) & (prev == 1)].index
-        sell_idx = sign[(sign == 1) & (prev == -1)].index
+    sign = np.sign(mom_raw).fillna(0)
+    # meanrev 部位與動能方向相反；翻轉點由 ledger 統一判定
+    pos = sign if mode == 'trend' else -sign
+    buy_idx, sell_idx = signal_flips(pos)
     return mom_raw, buy_idx, sell_idx
 
 
@@ -36,28 +38,39 @@ def build_data_report(
     lookback: int = 5,
     buy_idx=None,
     sell_idx=None,
+    max_points: int | None = None,
 ) -> Path:
-    """建立資料/指標分析報表 (HTML) 並標註波段買賣點 (lookback 可調)。"""
+    """建立資料/指標分析報表 (HTML) 並標註波段買賣點 (lookback 可調)。
+
+    max_points: 每條曲線的點數上限（None 表示全畫）；收盤價降採樣時必定保留買賣點，
+    離散訊號與成交量採 min/max 分桶以保留翻轉與量能尖峰。
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # 計算（若未外部提供）
     mom_raw = None
     if buy_idx is None or sell_idx is None:
-        mom_raw, buy_idx, sell_idx = _compute_flip_signals(df['close'], lookback, mode='meanrev')
+        mom_raw, buy_idx, sell_idx = compute_flip_signals(df['close'], lookback, mode='meanrev')
     else:
         # 仍需 mom_raw 以畫曲線
-        mom_raw, _, _ = _compute_flip_signals(df['close'], lookback, mode='meanrev')
+        mom_raw, _, _ = compute_flip_signals(df['close'], lookback, mode='meanrev')
+
+    def ds(series: pd.Series, method: str = 'lttb', keep=None) -> pd.Series:
+        return downsample_series(series, max_points, method=method, keep=keep)
 
-    fig = make_subplots(
+    fig = psub.make_subplots(
         rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.03,
         row_heights=[0.55, 0.25, 0.2], specs=[[{"secondary_y": False}], [{"secondary_y": False}], [{"secondary_y": True}]]
     )
 
     # Row 1: 價格 + 均線
-    fig.add_trace(go.Scatter(x=df.index, y=df['close'], name='Close', line=dict(color='#1f77b4')), row=1, col=1)
+    markers = pd.DatetimeIndex(buy_idx).append(pd.DatetimeIndex(sell_idx))
+    close = ds(df['close'], keep=markers)
+    fig.add_trace(go.Scatter(x=close.index, y=close, name='Close', line=dict(color='#1f77b4')), row=1, col=1)
     for k in ['sma20', 'sma60']:
         if k in indicators and indicators[k].notna().any():
-            fig.add_trace(go.Scatter(x=indicators[k].index, y=indicators[k], name=k.upper(), line=dict(width=1)), row=1, col=1)
+            s_k = ds(indicators[k])
+            fig.add_trace(go.Scatter(x=s_k.index, y=s_k, name=k.upper(), line=dict(width=1)), row=1, col=1)
 
     # 買賣點
     if buy_idx is not None and len(buy_idx):
@@ -71,21 +84,26 @@ def build_data_report(
 
     # Row 2: RSI
     if 'rsi14' in indicators:
-        fig.add_trace(go.Scatter(x=indicators['rsi14'].index, y=indicators['rsi14'], name='RSI14', line=dict(color='#ff7f0e')), row=2, col=1)
+        rsi_s = ds(indicators['rsi14'])
+        fig.add_trace(go.Scatter(x=rsi_s.index, y=rsi_s, name='RSI14', line=dict(color='#ff7f0e')), row=2, col=1)
         fig.add_hrect(y0=30, y1=30, line_width=1, line_color='gray', row=2, col=1)
         fig.add_hrect(y0=70, y1=70, line_width=1, line_color='gray', row=2, col=1)
 
     # Row 3: Volume + Momentum / MeanRev
     if 'volume' in df.columns:
-        fig.add_trace(go.Bar(x=df.index, y=df['volume'], name='Volume', marker_color='#888'), row=3, col=1, secondary_y=False)
+        vol = ds(df['volume'], method='minmax')
+        fig.add_trace(go.Bar(x=vol.index, y=vol, name='Volume', marker_color='#888'), row=3, col=1, secondary_y=False)
     # 離散 momentum_signal 若提供（統一用 key 'momentum_sig'）
     if 'momentum_sig' in indicators:
-        fig.add_trace(go.Scatter(x=indicators['momentum_sig'].index, y=indicators['momentum_sig'], name=f'MomentumSig({lookback})', line=dict(color='purple', width=1)), row=3, col=1, secondary_y=True)
+        mom_sig = ds(indicators['momentum_sig'], method='minmax')
+        fig.add_trace(go.Scatter(x=mom_sig.index, y=mom_sig, name=f'MomentumSig({lookback})', line=dict(color='purple', width=1)), row=3, col=1, secondary_y=True)
     # 連續動能曲線 (百分比)
     if mom_raw is not None:
-        fig.add_trace(go.Scatter(x=mom_raw.index, y=mom_raw * 100, name=f'Mom{lookback} %', line=dict(color='brown', dash='dot')), row=3, col=1, secondary_y=True)
+        mom_pct = ds(mom_raw * 100)
+        fig.add_trace(go.Scatter(x=mom_pct.index, y=mom_pct, name=f'Mom{lookback} %', line=dict(color='brown', dash='dot')), row=3, col=1, secondary_y=True)
     if 'meanrev_sig' in indicators:
-        fig.add_trace(go.Scatter(x=indicators['meanrev_sig'].index, y=indicators['meanrev_sig'], name=f'MeanRevSig({lookback})', line=dict(color='green', dash='dot')), row=3, col=1, secondary_y=True)
+        mr_sig = ds(indicators['meanrev_sig'], method='minmax')
+        fig.add_trace(go.Scatter(x=mr_sig.index, y=mr_sig, name=f'MeanRevSig({lookback})', line=dict(color='green', dash='dot')), row=3, col=1, secondary_y=True)
 
     fig.update_layout(
         title=f"Data Report - {symbol} [MeanReversion] (Lkb={lookback} Buy={len(buy_idx)} / Sell={len(sell_idx)})",
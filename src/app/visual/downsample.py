@@ -0,0 +1,94 @@
+"""圖表降採樣：長序列（多年分K）繪圖前縮減點數，保留形狀與關鍵點。
+
+方法:
+  - 'lttb'  : Largest-Triangle-Three-Buckets，視覺上最接近原曲線
+  - 'minmax': 每個桶保留最小與最大值，完全向量化，極值（回撤谷底）天然保留
+
+keep 指定必須保留的點（例如最大回撤谷底、買賣點），會與降採樣結果取聯集；
+首尾點一律保留。NaN 不參與選點（與 Plotly 不繪 NaN 的效果相同）。
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(y: np.ndarray, n_out: int, x: np.ndarray | None = None) -> np.ndarray:
+    """回傳 LTTB 選出的位置索引（遞增）。"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # 預先算好每個桶的平均點，迴圈內只做選點（桶數 = n_out，與 n 無關）
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """每桶保留最小與最大值的位置索引（遞增、不重複）。"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_buckets = max(1, n_out // 2)
+    if n_out >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    base = np.arange(n_buckets) * size
+    lo = base + np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1)
+    hi = base + np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1)
+    idx = np.concatenate([lo, hi, [0, n - 1]])
+    return np.unique(idx[idx < n])
+
+
+def downsample_indices(y: np.ndarray, n_out: int, method: str = 'lttb', keep=None) -> np.ndarray:
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) <= n_out:
+        sel = finite
+    elif method == 'minmax':
+        sel = finite[minmax_indices(y[finite], n_out)]
+    elif method == 'lttb':
+        sel = finite[lttb_indices(y[finite], n_out)]
+    else:
+        raise ValueError(f"未知的降採樣方法: {method}")
+    if keep is not None and len(keep):
+        sel = np.union1d(sel, np.asarray(keep, dtype=np.int64))
+    return sel
+
+
+def downsample_series(series: pd.Series, max_points: int | None, method: str = 'lttb', keep=None) -> pd.Series:
+    """max_points 為 None 或序列夠短時原樣回傳；keep 為需保留的 index 標籤。"""
+    if max_points is None or len(series) <= max_points:
+        return series
+    keep_pos = None
+    if keep is not None and len(keep):
+        keep_pos = series.index.get_indexer(pd.Index(keep))
+        keep_pos = keep_pos[keep_pos >= 0]
+    return series.iloc[downsample_indices(series.to_numpy(dtype=float), max_points, method, keep_pos)]
+
+
+def drawdown_keypoints(equity: pd.Series, dd: pd.Series) -> list:
+    """最大回撤的谷底與其前高日期：降採樣後仍需保留。"""
+    if dd.empty or not dd.notna().any():
+        return []
+    trough = dd.idxmin()
+    peak = equity.loc[:trough].idxmax()
+    return [peak, trough]
+
+
+__all__ = ['lttb_indices', 'minmax_indices', 'downsample_indices', 'downsample_series', 'drawdown_keypoints']
@@ -1,39 +1,53 @@
 """互動 Plotly 報表：包含
 1. Equity Curve
 2. Drawdown
-3. Rolling 20d Sharpe (簡化: 20d mean(ret)/std(ret) * sqrt(252))
+3. Rolling Sharpe (簡化: window 內 mean(ret)/std(ret) * sqrt(每年 bar 數)，日線為 252)
+4. Rolling Beta（僅在提供 benchmark 時）
+Rolling 指標與回撤統一由 performance.rolling 計算。
+max_points 可對長序列降採樣（見 visual.downsample），最大回撤的前高與谷底必定保留。
 """
 from __future__ import annotations
 import pandas as pd
-import numpy as np
 from pathlib import Path
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from math import sqrt
 
+from ..performance.rolling import RollingAnalytics
+from .downsample import downsample_series, drawdown_keypoints
+from ..lazy import lazy_module
 
-def rolling_sharpe(returns: pd.Series, window: int = 20) -> pd.Series:
-    r = returns.fillna(0)
-    mean = r.rolling(window).mean()
-    std = r.rolling(window).std(ddof=0)
-    sharpe = (mean / std.replace(0, np.nan)) * sqrt(252)
-    return sharpe
+go = lazy_module('plotly.graph_objects')
+psub = lazy_module('plotly.subplots')
 
 
-def build_interactive_report(bt: pd.DataFrame, out_dir: str | Path) -> str:
+def rolling_sharpe(returns: pd.Series, window: int = 20, periods_per_year: float | None = None) -> pd.Series:
+    return RollingAnalytics(returns, periods_per_year=periods_per_year).sharpe(window)
+
+
+def build_interactive_report(bt: pd.DataFrame, out_dir: str | Path, analytics: RollingAnalytics | None = None,
+                             window: int = 20, max_points: int | None = None) -> str:
+    """analytics: 可傳入已建立的 RollingAnalytics（例如含 TAIEX benchmark）以共用計算結果。
+    max_points: 每條曲線的點數上限；None 表示繪出全部點。
+    """
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     equity = bt['equity']
-    ret = bt['ret']
-    roll_max = equity.cummax()
-    dd = equity/roll_max - 1
-    rsh = rolling_sharpe(ret)
+    analytics = analytics or RollingAnalytics(bt['ret'])
+    dd = analytics.drawdown()
+    rsh = analytics.sharpe(window)
+    has_beta = analytics.has_benchmark
+    keep = drawdown_keypoints(equity, dd)
+    equity = downsample_series(equity, max_points, keep=keep)
+    dd = downsample_series(dd, max_points, keep=keep)
+    rsh = downsample_series(rsh, max_points)
 
-    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.03,
-                        subplot_titles=('Equity Curve', 'Drawdown', 'Rolling Sharpe (20d)'))
+    titles = ('Equity Curve', 'Drawdown', f'Rolling Sharpe ({window}d)') + ((f'Rolling Beta ({window}d)',) if has_beta else ())
+    fig = psub.make_subplots(rows=len(titles), cols=1, shared_xaxes=True, vertical_spacing=0.03, subplot_titles=titles)
     fig.add_trace(go.Scatter(x=equity.index, y=equity, name='Equity', line=dict(color='blue')), row=1, col=1)
     fig.add_trace(go.Scatter(x=dd.index, y=dd, name='Drawdown', line=dict(color='red')), row=2, col=1)
     fig.add_trace(go.Scatter(x=rsh.index, y=rsh, name='Rolling Sharpe', line=dict(color='orange')), row=3, col=1)
+    if has_beta:
+        beta = downsample_series(analytics.beta(window), max_points)
+        fig.add_trace(go.Scatter(x=beta.index, y=beta, name='Rolling Beta', line=dict(color='green')), row=4, col=1)
+        fig.update_yaxes(title_text='Beta', row=4, col=1)
     fig.update_yaxes(title_text='Equity', row=1, col=1)
     fig.update_yaxes(title_text='Drawdown', row=2, col=1)
     fig.update_yaxes(title_text='Sharpe', row=3, col=1)
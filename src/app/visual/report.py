@@ -1,26 +1,50 @@
 """簡易視覺化：輸出權益曲線與回撤圖"""
 from __future__ import annotations
 import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
 
+from ..performance.rolling import drawdown
+from .downsample import downsample_series, drawdown_keypoints
+from ..lazy import lazy_module
 
-def plot_equity(df: pd.DataFrame, out_dir: str | Path) -> str:
+plt = lazy_module('matplotlib.pyplot')
+
+
+def new_equity_figure():
+    """建立 plot_equity 使用的圖框；批次繪圖時可重複傳入以避免每檔重建 figure。"""
+    return plt.subplots(2, 1, figsize=(10,6), sharex=True, gridspec_kw={'height_ratios':[3,1]})[0]
+
+
+def plot_equity(df: pd.DataFrame, out_dir: str | Path, dd: pd.Series | None = None, max_points: int | None = None,
+                fig=None) -> str:
+    """dd: 可選的回撤序列（例如 RollingAnalytics.drawdown()），未提供時由 equity 計算。
+    max_points: 降採樣點數上限（保留最大回撤前高與谷底）；None 表示繪出全部點。
+    fig: 可重用的 new_equity_figure()；提供時只清空座標軸、不關閉 figure。
+    """
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
-    fig, ax = plt.subplots(2, 1, figsize=(10,6), sharex=True, gridspec_kw={'height_ratios':[3,1]})
+    owned = fig is None
+    if owned:
+        fig = new_equity_figure()
+    ax = fig.axes
+    for a in ax:
+        a.clear()
     equity = df['equity']
+    if dd is None:
+        dd = drawdown(equity)
+    keep = drawdown_keypoints(equity, dd)
+    equity = downsample_series(equity, max_points, keep=keep)
+    dd = downsample_series(dd, max_points, keep=keep)
     ax[0].plot(equity.index, equity.values, label='Equity')
     ax[0].set_title('Equity Curve')
     ax[0].legend()
     # Drawdown
-    roll_max = equity.cummax()
-    dd = equity/roll_max - 1
     ax[1].fill_between(dd.index, dd.values, 0, color='red', alpha=0.4)
     ax[1].set_title('Drawdown')
     ax[1].set_ylim(dd.min()*1.1, 0)
     fig.tight_layout()
     out_path = out_dir / 'equity_curve.png'
     fig.savefig(out_path)
-    plt.close(fig)
+    if owned:
+        plt.close(fig)
     return str(out_path)
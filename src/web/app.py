@@ -1,34 +1,63 @@
 from __future__ import annotations
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from datetime import datetime
 from pathlib import Path
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import pandas as pd
 import time
 from typing import Dict, Any, List, Optional
 
-from src.app.agents.registry import ensure_agents, get_client
-
+from src.app.lazy import lazy_module
 from src.app.data.fetch import fetch_ohlcv_yf
 from src.app.features.indicators import momentum_signal, sma, rsi, zscore, mean_reversion_signal
-from src.app.visual.data_report import build_data_report
-from src.app.backtest.engine import backtest_engine
-from src.app.performance.metrics import basic_report
-from src.app.visual.interactive_report import build_interactive_report
+from src.app.config.settings import settings
+from src.app.data.serialize import ARROW_MEDIA_TYPE, dumps, to_arrow_ipc, to_columnar, to_records
+from src.app.ops.jobs import FINISHED, JobQueue, QueueFull
+from src.app.ops import telemetry
+from src.app.ops.telemetry import MetricsMiddleware, stage
+from src.web.tasks import TASKS, backtest_task, data_report_task, reports_dir
+from src.app.agents.orchestrator import MOCK_AGENTS, AgentOrchestrator, ClientPool, MockAgentsClient
+
+# Azure 代理 SDK 僅在代理相關端點首次使用時載入
+registry = lazy_module('src.app.agents.registry')
+
+# 背景工作：長時間運算交給本機 process pool，請求只負責提交與查詢
+jobs = JobQueue(workers=settings.job_workers, max_pending=settings.job_max_pending)
+for _kind, _fn in TASKS.items():
+    jobs.register(_kind, _fn)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    jobs.shutdown()
+
 
-app = FastAPI(title="TW Stock Multi-Agent UI", version="0.1")
+app = FastAPI(title="TW Stock Multi-Agent UI", version="0.1", lifespan=lifespan)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 base_path = Path(__file__).parent
 templates = Jinja2Templates(directory=str(base_path / 'templates'))
 app.mount('/static', StaticFiles(directory=str(base_path / 'static')), name='static')
 # 掛載報表靜態檔案（若目錄存在），以便直接訪問 /reports/...html
-reports_dir = Path('reports')
 reports_dir.mkdir(exist_ok=True)
 app.mount('/reports', StaticFiles(directory=str(reports_dir)), name='reports')
 
 
+class FastJSONResponse(Response):
+    """以 data.serialize.dumps 輸出（orjson + numpy 欄位，NaN 為 null）。"""
+    media_type = 'application/json'
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
 class BacktestRequest(BaseModel):
     symbol: str = '2330.TW'
     start: str = '2024-05-01'
@@ -49,38 +78,62 @@ class DataReportRequest(BaseModel):
     lookback: int = 5
 
 
+class JobRequest(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+
 class AgentMessageRequest(BaseModel):
     agent: str
     message: str
     thread_id: Optional[str] = None
 
 
-# --- Agent Client 快取 ---
-AGENT_STATE: Dict[str, Any] = {
-    "agents": None,
-}
+class FanOutRequest(BaseModel):
+    message: str
+    agents: Optional[List[str]] = None
+
 
+# --- Agent 協調器（共用 client 池；Azure 不可用時改用本地 mock client）---
+AGENT_STATE: Dict[str, Any] = {"orchestrator": None, "mock": False, "warning": None}
+_agent_lock = asyncio.Lock()
 
-def _ensure_agent_client():
-    if not AGENT_STATE.get("client"):
-        try:
-            AGENT_STATE["client"] = get_client()
-        except Exception as e:
-            # 不中斷：記錄並回傳 None 供後備使用
-            AGENT_STATE["client"] = None
-            AGENT_STATE["client_error"] = str(e)
-    if not AGENT_STATE.get("agents"):
-        try:
-            AGENT_STATE["agents"] = ensure_agents()
-        except Exception as e:
-            # 後備 mock 代理
-            AGENT_STATE["agents"] = {
-                "data_qa_agent": {"id": "mock-data-qa"},
-                "pm_risk_agent": {"id": "mock-pm-risk"},
-                "execution_agent": {"id": "mock-exec"},
-            }
-            AGENT_STATE["agent_error"] = str(e)
-    return AGENT_STATE["client"], AGENT_STATE["agents"]
+
+def _build_orchestrator():
+    try:
+        agents = registry.ensure_agents()
+        pool = ClientPool(registry.get_client, size=settings.agent_pool_size,
+                          max_concurrency=settings.agent_max_concurrency)
+        mock, warning = False, None
+    except Exception as e:
+        # 不中斷：記錄原因並以 mock 代理回覆
+        agents, pool = dict(MOCK_AGENTS), ClientPool(MockAgentsClient)
+        mock, warning = True, str(e) or "azure agents not configured"
+    orch = AgentOrchestrator(pool, agents, timeout=settings.agent_run_timeout)
+    return orch, mock, warning
+
+
+async def _get_orchestrator() -> AgentOrchestrator:
+    async with _agent_lock:
+        if AGENT_STATE["orchestrator"] is None:
+            orch, mock, warning = await asyncio.to_thread(_build_orchestrator)
+            AGENT_STATE.update(orchestrator=orch, mock=mock, warning=warning)
+    return AGENT_STATE["orchestrator"]
+
+
+# 抓取時才計算的佇列狀態
+JOBS_GAUGE = telemetry.REGISTRY.gauge('app_jobs', 'Background jobs currently tracked, by status.', ['status'])
+
+
+def _collect_jobs() -> None:
+    counts = dict.fromkeys(('queued', 'running', *FINISHED), 0)
+    for job in jobs.list():
+        counts[job.status] = counts.get(job.status, 0) + 1
+    for status, n in counts.items():
+        JOBS_GAUGE.labels(status).set(n)
+
+
+telemetry.REGISTRY.on_collect(_collect_jobs)
 
 
 @app.get('/', response_class=HTMLResponse)
@@ -90,18 +143,13 @@ async def index(request: Request):
 
 @app.post('/api/backtest')
 async def api_backtest(req: BacktestRequest):
-    df = fetch_ohlcv_yf(req.symbol, req.start, req.end)
-    pos = momentum_signal(df['close'], req.lookback)
-    bt = backtest_engine(df, pos)
-    rpt = basic_report(bt)
-    out_dir = Path('reports') / datetime.now().strftime('%Y%m%d')
-    html_path = build_interactive_report(bt, out_dir)
-    return {"metrics": rpt, "report_html": html_path}
+    return backtest_task(req.model_dump())
 
 
 @app.post('/api/research')
 async def api_research(req: ResearchRequest):
-    df = fetch_ohlcv_yf(req.symbol, req.start, req.end)
+    with stage('fetch'):
+        df = fetch_ohlcv_yf(req.symbol, req.start, req.end)
     if df.empty:
         raise HTTPException(status_code=404, detail="無資料")
     # 指標計算（安全檢查資料長度）
@@ -112,12 +160,13 @@ async def api_research(req: ResearchRequest):
             import pandas as _pd
             return _pd.Series(index=df.index, dtype='float64')
     ind = {}
-    ind['sma20'] = safe(sma, df['close'], 20)
-    ind['sma60'] = safe(sma, df['close'], 60)
-    ind['rsi14'] = safe(rsi, df['close'], 14)
-    ind['zscore20'] = safe(zscore, df['close'], 20)
-    ind['momentum5'] = safe(momentum_signal, df['close'], 5)
-    ind['meanrev5'] = safe(mean_reversion_signal, df['close'], 5)
+    with stage('indicators'):
+        ind['sma20'] = safe(sma, df['close'], 20)
+        ind['sma60'] = safe(sma, df['close'], 60)
+        ind['rsi14'] = safe(rsi, df['close'], 14)
+        ind['zscore20'] = safe(zscore, df['close'], 20)
+        ind['momentum5'] = safe(momentum_signal, df['close'], 5)
+        ind['meanrev5'] = safe(mean_reversion_signal, df['close'], 5)
     feat_df = df[['close']].copy()
     for k, s in ind.items():
         feat_df[k] = s
@@ -138,11 +187,7 @@ async def api_research(req: ResearchRequest):
         reasons.append('條件未形成趨勢方向')
     latest['composite_signal'] = comp
     # 過去 N 筆
-    preview = feat_df.tail(req.preview_rows)
-    preview_records = [
-        {**{'date': d.strftime('%Y-%m-%d')}, **{k: (None if pd.isna(v) else float(v)) for k, v in row.items()}}
-        for d, row in preview.iterrows()
-    ]
+    preview_records = to_records(feat_df.tail(req.preview_rows).astype(float))
     return {
         'symbol': req.symbol,
         'period': {'start': feat_df.index.min().strftime('%Y-%m-%d'), 'end': feat_df.index.max().strftime('%Y-%m-%d')},
@@ -151,36 +196,26 @@ async def api_research(req: ResearchRequest):
         'explanation': '; '.join(reasons)
     }
 
+@app.get('/api/prices')
+async def api_prices(symbol: str, start: str, end: str, format: str = 'columns'):
+    """OHLCV 原始資料：format=columns（欄式 JSON）、records（列式 JSON）、arrow（Arrow IPC stream）。"""
+    with stage('fetch'):
+        df = fetch_ohlcv_yf(symbol, start, end)
+    if format == 'arrow':
+        return Response(content=to_arrow_ipc(df), media_type=ARROW_MEDIA_TYPE)
+    if format == 'records':
+        return FastJSONResponse({'symbol': symbol, 'start': start, 'end': end, 'records': to_records(df)})
+    if format == 'columns':
+        return FastJSONResponse({'symbol': symbol, 'start': start, 'end': end, 'columns': to_columnar(df, native=True)})
+    raise HTTPException(status_code=400, detail=f"未知格式: {format}")
+
+
 @app.post('/api/data_report')
 async def api_data_report(req: DataReportRequest):
-    df = fetch_ohlcv_yf(req.symbol, req.start, req.end)
-    if df.empty:
-        raise HTTPException(status_code=404, detail='無資料')
-    lb = max(1, min(60, req.lookback))
-    inds = {
-        'sma20': sma(df['close'], 20),
-        'sma60': sma(df['close'], 60),
-        'rsi14': rsi(df['close'], 14),
-        'momentum_sig': momentum_signal(df['close'], lb),
-        'meanrev_sig': mean_reversion_signal(df['close'], lb),
-    }
-    # 計算買賣點列表
-    mom_raw = df['close'].pct_change(lb)
-    sign = mom_raw.apply(lambda v: 1 if v>0 else (-1 if v<0 else 0))
-    prev = sign.shift(1)
-    # Mean Reversion: 負<-正 (轉為 -1) 視為買點；正<-負 (轉為 +1) 視為賣點
-    buys = sign[(sign==-1) & (prev==1)].index
-    sells = sign[(sign==1) & (prev==-1)].index
-    trades = []
-    for ts in buys:
-        trades.append({'type':'BUY','date': ts.strftime('%Y-%m-%d'), 'price': float(df.loc[ts,'close'])})
-    for ts in sells:
-        trades.append({'type':'SELL','date': ts.strftime('%Y-%m-%d'), 'price': float(df.loc[ts,'close'])})
-    trades.sort(key=lambda x: x['date'])
-    out_dir = Path('reports') / datetime.now().strftime('%Y%m%d')
-    html_path = build_data_report(df, inds, req.symbol, out_dir, lookback=lb, buy_idx=buys, sell_idx=sells)
-    rel_url = '/' + str(html_path).replace('\\', '/')
-    return {"report": str(html_path), "url": rel_url, "lookback": lb, "trades": trades}
+    try:
+        return data_report_task(req.model_dump())
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @app.get('/api/data_report')
 async def api_data_report_get(symbol: str, start: str, end: str, lookback: int = 5):
@@ -188,70 +223,101 @@ async def api_data_report_get(symbol: str, start: str, end: str, lookback: int =
     return await api_data_report(req)
 
 
+@app.post('/api/jobs')
+async def submit_job(req: JobRequest):
+    """提交背景工作（kind: backtest / data_report / universe）；相同參數的進行中工作會共用 job_id。"""
+    try:
+        job, deduplicated = jobs.submit(req.kind, req.params)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"未知工作類型: {req.kind} (可用: {', '.join(jobs.kinds)})")
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {**job.to_dict(include_result=False), 'deduplicated': deduplicated,
+            'events': f"/api/jobs/{job.id}/events"}
+
+
+@app.get('/api/jobs')
+async def list_jobs():
+    return {'jobs': [j.to_dict(include_result=False) for j in jobs.list()]}
+
+
+def _get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"找不到工作: {job_id}")
+    return job
+
+
+@app.get('/api/jobs/{job_id}')
+async def job_status(job_id: str):
+    return _get_job(job_id).to_dict()
+
+
+@app.get('/api/jobs/{job_id}/result')
+async def job_result(job_id: str):
+    job = _get_job(job_id)
+    if job.status != 'done':
+        raise HTTPException(status_code=409, detail=f"工作狀態為 {job.status}")
+    return FastJSONResponse(job.result)
+
+
+@app.delete('/api/jobs/{job_id}')
+async def cancel_job(job_id: str):
+    job = _get_job(job_id)
+    return {'job_id': job.id, 'cancel_requested': jobs.cancel(job_id), 'status': job.status}
+
+
+@app.get('/api/jobs/{job_id}/events')
+async def job_events(job_id: str, request: Request):
+    """Server-Sent Events：狀態或進度改變時推送 progress 事件，結束時推送 done 事件後關閉。"""
+    job = _get_job(job_id)
+
+    async def stream():
+        seen = -1
+        while True:
+            if job.version != seen:
+                seen = job.version
+                finished = job.status in FINISHED
+                payload = json.dumps(job.to_dict(include_result=False), ensure_ascii=False)
+                yield f"event: {'done' if finished else 'progress'}\ndata: {payload}\n\n"
+                if finished:
+                    return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(stream(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.get('/api/agents/list')
 async def list_agents():
-    client, agents = _ensure_agent_client()
-    resp = {"agents": list(agents.keys())}
-    if client is None:
+    orch = await _get_orchestrator()
+    resp = {"agents": list(orch.agents.keys())}
+    if AGENT_STATE["mock"]:
         resp["mock"] = True
-        resp["warning"] = AGENT_STATE.get("client_error") or AGENT_STATE.get("agent_error") or "azure agents not configured"
+        resp["warning"] = AGENT_STATE["warning"]
     return resp
 
 
 @app.post('/api/agents/message')
 async def agent_message(req: AgentMessageRequest):
-    client, agents = _ensure_agent_client()
-    if req.agent not in agents:
+    orch = await _get_orchestrator()
+    if req.agent not in orch.agents:
         raise HTTPException(status_code=400, detail=f"未知代理: {req.agent}")
-    # Mock path
-    if client is None:
-        thread_id = req.thread_id or 'mock-thread'
-        mock_reply = f"[mock:{req.agent}] 收到訊息：{req.message[:120]}"  # echo effect
-        return {
-            "thread_id": thread_id,
-            "run_status": "completed",
-            "messages": [
-                {"role": "user", "content": req.message},
-                {"role": req.agent, "content": mock_reply}
-            ]
-        }
-    # 真實 Azure Agents 流程
-    if req.thread_id:
-        thread_id = req.thread_id
-    else:
-        thread = client.create_thread()
-        thread_id = getattr(thread, 'id', thread.get('id','unknown'))
-    client.add_message(thread_id=thread_id, role="user", content=req.message)
-    agent_obj = agents[req.agent]
-    run = client.create_run(thread_id=thread_id, agent_id=getattr(agent_obj, 'id', agent_obj.get('id')))
-    run_id = getattr(run, 'id', run.get('id'))
-    started = time.time()
-    status = getattr(run, 'status', run.get('status','running'))
-    while status not in ("completed", "failed", "cancelled"):
-        if time.time() - started > 30:
-            break
-        time.sleep(1.1)
-        run = client.get_run(thread_id=thread_id, run_id=run_id)
-        status = getattr(run, 'status', run.get('status','unknown'))
-    msgs_resp = client.list_messages(thread_id=thread_id)
-    messages: List[Dict[str, Any]] = []
-    for m in getattr(msgs_resp, 'data', msgs_resp if isinstance(msgs_resp, list) else []):
-        role = getattr(m, 'role', m.get('role'))
-        content = getattr(m, 'content', m.get('content'))
-        if isinstance(content, list):
-            texts = []
-            for c in content:
-                if isinstance(c, dict) and c.get('type') == 'output_text':
-                    texts.append(c.get('text',''))
-                elif isinstance(c, dict) and c.get('type') == 'output_image':
-                    texts.append('[image]')
-                elif isinstance(c, dict) and c.get('type') == 'input_text':
-                    texts.append(c.get('text',''))
-            content_str = '\n'.join(texts) if texts else str(content)
-        else:
-            content_str = str(content)
-        messages.append({'role': role, 'content': content_str})
-    return {"thread_id": thread_id, "run_status": status, "messages": messages[-25:]}
+    return await orch.send(req.agent, req.message, thread_id=req.thread_id)
+
+
+@app.post('/api/agents/fanout')
+async def agent_fanout(req: FanOutRequest):
+    """同一訊息平行送給多個代理（預設全部），回傳 {agent: 回覆}。"""
+    orch = await _get_orchestrator()
+    unknown = [a for a in (req.agents or []) if a not in orch.agents]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知代理: {', '.join(unknown)}")
+    started = time.perf_counter()
+    results = await orch.fan_out(req.message, req.agents)
+    return {"results": results, "seconds": round(time.perf_counter() - started, 3)}
 
 
 @app.get('/api/health')
@@ -259,6 +325,12 @@ async def health():
     return {"status": "ok", "time": datetime.utcnow().isoformat()}
 
 
+@app.get('/api/metrics')
+async def metrics():
+    """Prometheus 文字格式：各端點延遲、stage 耗時、快取命中與背景工作排隊情形。"""
+    return Response(content=telemetry.REGISTRY.render(), media_type=telemetry.CONTENT_TYPE)
+
+
 # 簡易嵌入互動報表: 讀取檔案內容（安全上僅供本地測試）
 @app.get('/report', response_class=HTMLResponse)
 async def report_page(request: Request, date: str | None = None):
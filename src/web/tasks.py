@@ -0,0 +1,113 @@
+"""Web 端運算工作：同步端點與背景工作佇列共用同一份實作。
+
+每個函式簽名為 fn(params, progress) -> dict（JSON 可序列化），於 worker 行程中執行時
+progress(fraction, message) 會回報進度並檢查取消；同步呼叫時傳入 no_progress。
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from src.app.data.fetch import fetch_ohlcv_yf
+from src.app.features.indicators import momentum_signal, sma, rsi, mean_reversion_signal
+from src.app.visual.data_report import build_data_report, compute_flip_signals
+from src.app.backtest.ledger import flip_events
+from src.app.backtest.cache import backtest_cache
+from src.app.strategies.base import MomentumStrategy
+from src.app.visual.interactive_report import build_interactive_report
+from src.app.visual.artifacts import ArtifactCache
+from src.app.config.settings import settings
+from src.app.ops.telemetry import record_cache, stage
+
+Progress = Callable[[float, str], None]
+
+reports_dir = Path('reports')
+# 報表快取：相同資料 + 參數直接回傳既有檔案，各請求有各自穩定 URL
+report_cache = ArtifactCache(
+    reports_dir / 'cache',
+    max_bytes=int(settings.report_cache_max_mb * 1024 ** 2),
+    max_age_seconds=settings.report_cache_max_age_days * 86400,
+)
+
+
+def no_progress(fraction: float, message: str = '') -> None:
+    pass
+
+
+def backtest_task(params: Dict[str, Any], progress: Progress = no_progress) -> Dict[str, Any]:
+    symbol, lookback = params['symbol'], int(params.get('lookback', 5))
+    progress(0.05, f"fetch {symbol}")
+    with stage('fetch'):
+        df = fetch_ohlcv_yf(symbol, params['start'], params['end'])
+    progress(0.4, 'backtest')
+    with stage('backtest'):
+        res = backtest_cache.run(df, MomentumStrategy(lookback))
+    record_cache('backtests', res.cached)
+    bt, rpt = res.bt, res.report
+    progress(0.6, 'report')
+    max_points = settings.chart_max_points or None
+    with stage('report'):
+        # res.key 涵蓋資料、策略參數與成本設定：成本變更時權益曲線不同，不可沿用舊報表
+        html_path, cached = report_cache.get_or_render(
+            'interactive', df, {'symbol': symbol, 'lookback': lookback, 'max_points': max_points,
+                                'backtest': res.key},
+            lambda d: build_interactive_report(bt, d, max_points=max_points),
+        )
+    record_cache('reports', cached)
+    return {"metrics": rpt, "report_html": str(html_path), "url": report_cache.url_for(html_path), "cached": cached,
+            "backtest_cached": res.cached}
+
+
+def data_report_task(params: Dict[str, Any], progress: Progress = no_progress) -> Dict[str, Any]:
+    symbol = params['symbol']
+    progress(0.05, f"fetch {symbol}")
+    with stage('fetch'):
+        df = fetch_ohlcv_yf(symbol, params['start'], params['end'])
+    if df.empty:
+        raise LookupError('無資料')
+    lb = max(1, min(60, int(params.get('lookback', 5))))
+    progress(0.3, 'indicators')
+    with stage('indicators'):
+        inds = {
+            'sma20': sma(df['close'], 20),
+            'sma60': sma(df['close'], 60),
+            'rsi14': rsi(df['close'], 14),
+            'momentum_sig': momentum_signal(df['close'], lb),
+            'meanrev_sig': mean_reversion_signal(df['close'], lb),
+        }
+        # 計算買賣點列表 (Mean Reversion: 動能由正轉負視為買點，由負轉正視為賣點)
+        _, buys, sells = compute_flip_signals(df['close'], lb, mode='meanrev')
+        trades = flip_events(df['close'], buys, sells)
+    progress(0.5, 'report')
+    max_points = settings.chart_max_points or None
+    with stage('report'):
+        html_path, cached = report_cache.get_or_render(
+            'data_report', df, {'symbol': symbol, 'lookback': lb, 'max_points': max_points},
+            lambda d: build_data_report(df, inds, symbol, d, lookback=lb, buy_idx=buys, sell_idx=sells, max_points=max_points),
+        )
+    record_cache('reports', cached)
+    return {"report": str(html_path), "url": report_cache.url_for(html_path), "lookback": lb, "trades": trades, "cached": cached}
+
+
+def universe_task(params: Dict[str, Any], progress: Progress = no_progress) -> Dict[str, Any]:
+    """多檔回測（於單一 worker 內依序執行），每完成一檔回報一次進度。"""
+    from src.app.ops.universe import run_universe
+    from src.app.data.serialize import to_records
+    symbols = list(params['symbols'])
+    out_dir = reports_dir / 'jobs' / params.get('name', 'universe')
+    res = run_universe(symbols, params['start'], params['end'], source=params.get('source', 'yf'),
+                       lookback=int(params.get('lookback', 20)), out_dir=out_dir, workers=1,
+                       rate_per_sec=params.get('rate', 2.0), reports=bool(params.get('reports', False)),
+                       max_points=settings.chart_max_points or None,
+                       progress=lambda done, total, sym: progress(done / total, f"{sym} ({done}/{total})"))
+    return {
+        'metrics': to_records(res.metrics, index_label='symbol') if not res.metrics.empty else [],
+        'errors': res.errors,
+        'wall_seconds': res.wall_seconds,
+    }
+
+
+TASKS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    'backtest': backtest_task,
+    'data_report': data_report_task,
+    'universe': universe_task,
+}
@@ -0,0 +1,136 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.app.data import adjust
+from src.app.data.adjust import ActionStore, AdjustedPanel, AdjustmentEngine, adjust_ohlcv, unadjust_splits
+from src.app.data.panel_store import PanelStore
+from src.app.features.indicators import momentum_signal
+
+
+def _raw(n=60, symbols=('2330', '2317', '2454'), seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range('2024-01-01', periods=n, name='date')
+    close = pd.DataFrame(100 * np.exp(rng.normal(0, 0.001, (n, len(symbols))).cumsum(axis=0)),
+                         index=idx, columns=list(symbols))
+    return close
+
+
+class TestAdjust(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ActionStore(Path(self.tmp.name) / 'actions')
+        self.engine = AdjustmentEngine(self.store)
+        self.close = _raw()
+        self.ex = self.close.index[30]
+        # 2330 除息 5 元；2317 一拆二
+        self.close.loc[self.ex:, '2330'] -= 5.0
+        self.close.loc[self.ex:, '2317'] /= 2
+        self.store.add('2330', self.ex, 'cash', 5.0)
+        self.store.add('2317', self.ex, 'split', 2)
+        self.volume = pd.DataFrame(1000.0, index=self.close.index, columns=self.close.columns)
+        self.volume.loc[self.ex:, '2317'] = 2000.0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_factors_remove_fake_jumps(self):
+        adj = AdjustedPanel({'close': self.close, 'volume': self.volume}, self.engine)
+        raw_ret = self.close.pct_change()
+        ret = adj['close'].pct_change()
+        self.assertLess(raw_ret.loc[self.ex].abs().min(), 0.01)   # 2454 無事件
+        self.assertGreater(raw_ret.loc[self.ex, ['2330', '2317']].abs().min(), 0.04)
+        self.assertLess(ret.loc[self.ex].abs().max(), 0.01)
+        prev = self.close.index[29]
+        self.assertAlmostEqual(ret.loc[self.ex, '2330'],
+                               self.close.loc[self.ex, '2330'] / (self.close.loc[prev, '2330'] - 5) - 1)
+        pd.testing.assert_frame_equal(adj['close'].iloc[30:], self.close.iloc[30:])
+        pd.testing.assert_series_equal(adj['close']['2454'], self.close['2454'])
+        np.testing.assert_allclose(adj['volume']['2317'], 2000.0)
+        np.testing.assert_allclose(adj['volume']['2330'], 1000.0)
+        # 動能訊號不再因除權息日翻轉
+        sig = momentum_signal(adj['close']['2317'], 5)
+        self.assertNotEqual(momentum_signal(self.close['2317'], 5).loc[self.ex], sig.loc[self.ex])
+
+    def test_panel_matches_single_symbol(self):
+        adj = AdjustedPanel({'close': self.close}, self.engine)
+        for sym in self.close.columns:
+            df = pd.DataFrame({'close': self.close[sym], 'volume': self.volume[sym]})
+            single = adjust_ohlcv(df, sym + '.TW', AdjustmentEngine(self.store))
+            np.testing.assert_allclose(single['close'].to_numpy(), adj['close'][sym].to_numpy())
+        df = pd.DataFrame({'close': self.close['2454']})
+        self.assertIs(adjust_ohlcv(df, '2454', self.engine), df)
+
+    def test_incremental_recompute(self):
+        self.engine.factors(self.close)
+        self.assertEqual(sorted(self.engine.recomputed), ['2317', '2330'])
+        self.engine.factors(self.close)
+        self.assertEqual(self.engine.recomputed, [])
+        self.store.add('2454', self.close.index[10], 'stock', 0.1)
+        price_f, _ = self.engine.factors(self.close)
+        self.assertEqual(self.engine.recomputed, ['2454'])
+        self.assertAlmostEqual(price_f['2454'].iloc[0], 1 / 1.1)
+        # 面板往後延伸：沒有待生效事件的標的只補 1
+        longer = _raw(n=70)
+        longer.iloc[:60] = self.close
+        self.store.add('2330', longer.index[65], 'cash', 1.0)   # 已登錄但原面板中尚未生效
+        self.engine.factors(self.close)
+        self.assertEqual(self.engine.recomputed, ['2330'])
+        price_f, _ = self.engine.factors(longer)
+        self.assertEqual(self.engine.recomputed, ['2330'])
+        full = AdjustmentEngine(self.store).factors(longer)[0]
+        pd.testing.assert_frame_equal(price_f, full)
+        self.assertLess(price_f['2330'].iloc[64], price_f['2330'].iloc[65])
+
+    def test_adjusted_view_over_shared_panel(self):
+        store = PanelStore(Path(self.tmp.name) / 'panels')
+        store.publish({'close': self.close, 'volume': self.volume})
+        adj = AdjustedPanel(store.current(), self.engine)
+        self.assertEqual(adj._frames, {})
+        expected = AdjustedPanel({'close': self.close}, AdjustmentEngine(self.store))['close']
+        pd.testing.assert_frame_equal(adj.frame('close', start='2024-02-01'), expected.loc['2024-02-01':],
+                                      check_names=False, check_freq=False)
+        self.assertEqual(list(adj._frames), ['close'])
+
+    def test_event_table(self):
+        self.store.add('2330', self.ex, 'cash', 4.5)   # 同日同種類以後寫入者為準
+        self.store.add('2330', self.close.index[5], 'stock', 0.05)
+        events = self.store.load('2330.TW')
+        self.assertEqual(events['kind'].tolist(), ['stock', 'cash'])
+        self.assertEqual(events['value'].tolist(), [0.05, 4.5])
+        with self.assertRaises(ValueError):
+            self.store.add('2330', self.ex, 'bonus', 1.0)
+        self.assertEqual(self.store.symbols(), ['2317', '2330'])
+        # 手動編輯的非標準格式（斜線日期、大寫種類）仍可使用
+        self.store.path('2454').write_text(f"date,kind,value\n{self.ex:%Y/%m/%d}, Cash ,5\n", encoding='utf-8')
+        price_f, _ = AdjustmentEngine(self.store).factors(self.close[['2330']].rename(columns={'2330': '2454'}))
+        self.assertAlmostEqual(price_f.iloc[0, 0], 1 - 5 / (self.close['2330'].iloc[29]))
+
+    def test_yf_split_not_applied_twice(self):
+        from src.app.ops.run_daily import adjust_prices
+        raw = pd.DataFrame({'close': self.close['2317'], 'volume': self.volume['2317']})
+        # yfinance (auto_adjust=False)：分割已還原，但現金股利未還原
+        yf = raw.copy()
+        yf.loc[:self.close.index[29], 'close'] /= 2
+        yf.loc[:self.close.index[29], 'volume'] *= 2
+        self.store.add('2317', self.close.index[10], 'cash', 1.0)
+        with mock.patch.object(adjust, 'actions', self.store), \
+                mock.patch.object(adjust, 'adjustment_engine', AdjustmentEngine(self.store)), \
+                mock.patch('src.app.ops.run_daily.settings.adjust_prices', True):
+            pd.testing.assert_frame_equal(unadjust_splits(yf, '2317'), raw)
+            from_twse = adjust_prices(raw, '2317', 'twse')
+            from_yf = adjust_prices(yf, '2317.TW', 'yf')
+        pd.testing.assert_frame_equal(from_yf, from_twse)
+        self.assertLess(from_yf['close'].pct_change().abs().max(), 0.01)
+        # 分割在資料最後一天之後才生效（但 yfinance 已套用）：換回原始價格後不再還原
+        head = yf.iloc[:20]
+        np.testing.assert_allclose(unadjust_splits(head, '2317', self.store)['close'], raw['close'].iloc[:20])
+        self.assertIs(unadjust_splits(head, '2454', self.store), head)
+
+
+if __name__ == '__main__':
+    unittest.main()
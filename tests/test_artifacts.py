@@ -0,0 +1,64 @@
+import os
+import time
+import unittest
+import tempfile
+from pathlib import Path
+import pandas as pd
+from src.app.data.fingerprint import frame_fingerprint, params_fingerprint
+from src.app.visual.artifacts import ArtifactCache
+
+
+class TestArtifactCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / 'reports' / 'cache'
+        self.df = pd.DataFrame({'close': [1.0, 2.0, 3.0]}, index=pd.date_range('2024-01-01', periods=3))
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _render(self, d: Path, size: int = 10) -> Path:
+        self.calls += 1
+        p = d / 'out.html'
+        p.write_text('x' * size)
+        return p
+
+    def test_fingerprints(self):
+        other = self.df.copy()
+        other.iloc[1, 0] = 2.5
+        self.assertEqual(frame_fingerprint(self.df), frame_fingerprint(self.df.copy()))
+        self.assertNotEqual(frame_fingerprint(self.df), frame_fingerprint(other))
+        self.assertEqual(params_fingerprint({'a': 1, 'b': 2}), params_fingerprint({'b': 2, 'a': 1}))
+
+    def test_hit_and_distinct_paths(self):
+        cache = ArtifactCache(self.root)
+        p1, hit1 = cache.get_or_render('interactive', self.df, {'lookback': 5}, self._render)
+        p2, hit2 = cache.get_or_render('interactive', self.df, {'lookback': 5}, self._render)
+        p3, _ = cache.get_or_render('interactive', self.df, {'lookback': 10}, self._render)
+        self.assertEqual((hit1, hit2), (False, True))
+        self.assertEqual(p1, p2)
+        self.assertNotEqual(p1, p3)
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(any((self.root / '.tmp').iterdir()))
+
+    def test_eviction_by_size_and_age(self):
+        cache = ArtifactCache(self.root, max_bytes=250)
+        paths = []
+        for lb in range(5):
+            p, _ = cache.get_or_render('r', self.df, {'lb': lb}, lambda d: self._render(d, 100))
+            os.utime(p, (time.time() - 100 + lb, time.time() - 100 + lb))
+            paths.append(p)
+        self.assertEqual([p.exists() for p in paths], [False, False, False, True, True])
+        cache.max_age_seconds = 50
+        cache.evict()
+        self.assertFalse(any(p.exists() for p in paths))
+
+    def test_url(self):
+        cache = ArtifactCache('reports/cache')
+        url = cache.url_for(cache.path_for('data_report', 'abc'))
+        self.assertEqual(url, '/reports/cache/data_report/abc.html')
+
+
+if __name__ == '__main__':
+    unittest.main()
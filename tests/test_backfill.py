@@ -0,0 +1,151 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.app.data import backfill as bf
+from src.app.data.quality import load_cache_panel
+
+
+def _fake_fetch(calls, fail=(), interrupt_after=None):
+    lock = threading.Lock()
+
+    def fetch(symbol, month, source):
+        with lock:
+            calls.append((symbol, month))
+            n = len(calls)
+        if interrupt_after is not None and n > interrupt_after:
+            raise KeyboardInterrupt
+        if (symbol, month) in fail:
+            raise ConnectionError('boom')
+        period = pd.Period(month, freq='M')
+        idx = pd.bdate_range(period.start_time, period.end_time, name='date')
+        close = np.full(len(idx), float(sum(map(ord, symbol + month)) % 97 + 10))
+        return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1.0}, index=idx)
+    return fetch
+
+
+class TestBackfill(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = Path(self.tmp.name) / 'store'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, fetch, symbols=('2330', '2317', '2454'), **kw):
+        with mock.patch.object(bf, '_fetch_month', fetch):
+            return bf.backfill(symbols, '2023-01-15', '2023-06-10', store=self.store, rate_per_sec=None, **kw)
+
+    def test_units_cover_whole_months(self):
+        units = bf.month_units(['2330', '2330', '2317'], '2023-11-20', '2024-02-01')
+        self.assertEqual(units[:4], [('2330', '2023-11'), ('2330', '2023-12'), ('2330', '2024-01'),
+                                     ('2330', '2024-02')])
+        self.assertEqual(len(units), 8)
+
+    def test_resume_fetches_only_failed_units(self):
+        calls = []
+        res = self._run(_fake_fetch(calls, fail={('2317', '2023-03')}), workers=3)
+        self.assertEqual(res.units, 18)
+        self.assertEqual(list(res.errors), [('2317', '2023-03')])
+        self.assertEqual(len(calls), 18)
+        again = []
+        res = self._run(_fake_fetch(again), workers=3)
+        self.assertEqual(again, [('2317', '2023-03')])
+        self.assertEqual((res.skipped, res.fetched, len(res.errors)), (17, 1, 0))
+        # 合併後為整月資料（不裁切到 start/end），分段檔已清除
+        panel = load_cache_panel(self.store)
+        self.assertEqual(sorted(panel['close'].columns), ['2317', '2330', '2454'])
+        self.assertEqual(panel['close'].index[0], pd.Timestamp('2023-01-02'))
+        self.assertEqual(panel['close'].index[-1], pd.Timestamp('2023-06-30'))
+        self.assertFalse(panel['close'].isna().any().any())
+        self.assertFalse(any((self.store / 'parts').glob('*/*.parquet')))
+        self.assertEqual(self._run(_fake_fetch([])).fetched, 0)
+
+    def test_interrupt_then_resume_exactly(self):
+        calls = []
+        with self.assertRaises(KeyboardInterrupt):
+            self._run(_fake_fetch(calls, interrupt_after=7), workers=1)
+        done = bf.Manifest(self.store / 'manifest.jsonl').load()
+        self.assertEqual(done, set(calls[:7]))
+        with open(self.store / 'manifest.jsonl', 'a', encoding='utf-8') as f:
+            f.write('{"symbol": "2454", "mo')   # 中斷時寫到一半的一行
+        rest = []
+        self._run(_fake_fetch(rest), workers=2)
+        units = set(bf.month_units(['2330', '2317', '2454'], '2023-01-15', '2023-06-10'))
+        self.assertEqual(set(rest), units - done)
+        self.assertEqual(len(pd.read_parquet(self.store / '2330.parquet')),
+                         len(pd.bdate_range('2023-01-01', '2023-06-30')))
+
+    def test_open_month_not_recorded(self):
+        month = (pd.Timestamp.today() + pd.Timedelta(days=35)).strftime('%Y-%m')   # 尚未結束的月份
+        with mock.patch.object(bf, '_fetch_month', _fake_fetch([])):
+            bf.backfill(['2330'], month + '-01', month + '-01', store=self.store, rate_per_sec=None)
+        self.assertEqual(bf.Manifest(self.store / 'manifest.jsonl').load(), set())
+        self.assertTrue((self.store / '2330.parquet').exists())
+
+    def test_twse_no_data_months_recorded_empty(self):
+        calls = []
+
+        def month(symbol, year, mon):
+            calls.append((year, mon))
+            if mon <= 2:   # 上市前：證交所回傳非 OK stat
+                raise ValueError('TWSE response not OK: 很抱歉，沒有符合條件的資料!')
+            if mon == 6:
+                raise ValueError('TWSE response not OK: 查詢日期大於今日，請重新查詢!')
+            return _fake_fetch([])(symbol, f"{year}-{mon:02d}", 'twse')
+
+        with mock.patch('src.app.data.twse.fetch_twse_month', month):
+            res = bf.backfill(['2330'], '2023-01-15', '2023-06-10', store=self.store, rate_per_sec=None)
+        self.assertEqual(list(res.errors), [('2330', '2023-06')])
+        recs = [json.loads(line) for line in (self.store / 'manifest.jsonl').read_text(encoding='utf-8').splitlines()]
+        rows = {r['month']: r['rows'] for r in recs}
+        self.assertEqual(rows['2023-01'], 0)
+        self.assertEqual(rows['2023-02'], 0)
+        self.assertGreater(rows['2023-03'], 0)
+        self.assertNotIn('2023-06', rows)
+        self.assertEqual(pd.read_parquet(self.store / '2330.parquet').index[0], pd.Timestamp('2023-03-01'))
+
+    def test_yf_empty_month_needs_neighbour_data(self):
+        calls = []
+        empty = {('2330', 1), ('2330', 2), ('2330', 4)}   # 1-2 月上市前、4 月停牌
+
+        def yf(ticker, start, end):
+            symbol, mon = ticker.split('.')[0], pd.Timestamp(start).month
+            calls.append((symbol, mon))
+            if symbol == '2317' or (symbol, mon) in empty:   # 2317 整段限流：yfinance 回傳空資料
+                raise ValueError(f"No data fetched for {ticker}")
+            return _fake_fetch([])(symbol, f"2023-{mon:02d}", 'yf')
+
+        with mock.patch('src.app.data.fetch.fetch_ohlcv_yf', yf):
+            res = bf.backfill(['2330', '2317'], '2023-01-15', '2023-06-10', source='yf',
+                              store=self.store, rate_per_sec=None)
+        self.assertEqual(sorted(res.errors), [('2317', f"2023-{m:02d}") for m in range(1, 7)] + [('2330', '2023-01')])
+        rows = bf.Manifest(self.store / 'manifest.jsonl').rows()
+        self.assertEqual(rows[('2330', '2023-02')], 0)   # 相鄰的 3 月有資料
+        self.assertEqual(rows[('2330', '2023-04')], 0)
+        self.assertNotIn(('2330', '2023-01'), rows)
+        self.assertFalse(any(sym == '2317' for sym, _ in rows))
+        calls.clear()
+        with mock.patch('src.app.data.fetch.fetch_ohlcv_yf', yf):
+            bf.backfill(['2330', '2317'], '2023-01-15', '2023-06-10', source='yf',
+                        store=self.store, rate_per_sec=None)
+        self.assertEqual(sorted(calls), [('2317', m) for m in range(1, 7)] + [('2330', 1)])
+
+    def test_progress_reports_eta(self):
+        seen = []
+        self._run(_fake_fetch([]), symbols=['2330'], progress=seen.append)
+        self.assertEqual([s.done for s in seen], list(range(1, 7)))
+        self.assertEqual(seen[-1].total, 6)
+        self.assertIn('ETA', seen[0].format())
+        rec = json.loads((self.store / 'manifest.jsonl').read_text(encoding='utf-8').splitlines()[0])
+        self.assertEqual(set(rec), {'symbol', 'month', 'rows', 'source', 'ts'})
+
+
+if __name__ == '__main__':
+    unittest.main()
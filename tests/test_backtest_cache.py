@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.app.backtest.cache import BacktestCache, cost_settings, run_backtest
+from src.app.data.fingerprint import frame_fingerprint
+from src.app.strategies import MeanReversionStrategy, MomentumStrategy
+
+
+def _prices(seed=0, n=400):
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({'open': c, 'high': c * 1.01, 'low': c * 0.99, 'close': c, 'volume': 1000.0},
+                        index=pd.bdate_range('2022-01-03', periods=n, name='date'))
+
+
+class TestBacktestCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = BacktestCache(self.tmp.name)
+        self.df = _prices()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_is_bit_identical_across_instances(self):
+        first = self.cache.run(self.df, MomentumStrategy(5))
+        self.assertFalse(first.cached)
+        again = self.cache.run(self.df.copy(), MomentumStrategy(5))
+        self.assertTrue(again.cached)
+        self.assertEqual(self.cache.memory_hits, 1)
+        # 新行程（新實例）由磁碟取回，結果逐位元相同
+        disk = BacktestCache(self.tmp.name).run(self.df, MomentumStrategy(5))
+        self.assertTrue(disk.cached)
+        self.assertEqual(disk.key, first.key)
+        self.assertEqual(frame_fingerprint(disk.bt), frame_fingerprint(first.bt))
+        self.assertEqual(disk.report, first.report)
+        positions, bt, trades, report = run_backtest(self.df, MomentumStrategy(5), cost_settings())
+        pd.testing.assert_frame_equal(disk.bt, bt, check_exact=True)
+        pd.testing.assert_frame_equal(disk.trades, trades, check_exact=True)
+        self.assertEqual(disk.report, report)
+
+    def test_key_covers_data_strategy_and_costs(self):
+        base = self.cache.key(self.df, MomentumStrategy(5))
+        bumped = self.df.copy()
+        bumped.iloc[200, 3] = np.nextafter(bumped.iloc[200, 3], np.inf)   # 只差 1 ulp
+        costs = {**cost_settings(), 'slippage_bps': cost_settings()['slippage_bps'] + 1}
+        others = [self.cache.key(bumped, MomentumStrategy(5)),
+                  self.cache.key(self.df, MomentumStrategy(6)),
+                  self.cache.key(self.df, MeanReversionStrategy(5)),
+                  self.cache.key(self.df, MomentumStrategy(5), costs)]
+        self.assertEqual(len({base, *others}), 5)
+        self.assertEqual(self.cache.key(self.df.copy(), MomentumStrategy(5)), base)
+        self.assertFalse(self.cache.run(self.df, MomentumStrategy(5), costs).cached)
+
+    def test_verify_mode_detects_tampering(self):
+        self.cache.run(self.df, MomentumStrategy(5))
+        self.assertTrue(self.cache.run(self.df, MomentumStrategy(5), verify=True).cached)
+        res = next(iter(self.cache._resident.values()))
+        res.bt.iloc[10, 1] += 1e-12
+        with self.assertRaises(AssertionError):
+            self.cache.run(self.df, MomentumStrategy(5), verify=True)
+
+    def test_resident_limit(self):
+        cache = BacktestCache(self.tmp.name, max_resident=2)
+        for lb in (3, 4, 5):
+            cache.run(self.df, MomentumStrategy(lb))
+        self.assertEqual(len(cache._resident), 2)
+        self.assertTrue(cache.run(self.df, MomentumStrategy(3)).cached)   # 由磁碟取回
+        self.assertEqual(cache.memory_hits, 0)
+
+
+class TestFrameFingerprint(unittest.TestCase):
+    def test_mixed_dtypes_and_index(self):
+        df = pd.DataFrame({'s': ['a', 'b', 'c'], 'c': pd.Categorical(['x', 'y', 'x']),
+                           'i': pd.array([1, None, 3], dtype='Int64'), 'f': [0.5, 1.5, 2.5]},
+                          index=pd.Index(['p', 'q', 'r']))
+        fp = frame_fingerprint(df)
+        self.assertEqual(fp, frame_fingerprint(df.copy()))
+        changed = df.copy()
+        changed.loc['q', 's'] = 'z'
+        self.assertNotEqual(fp, frame_fingerprint(changed))
+        self.assertNotEqual(fp, frame_fingerprint(df.rename(index={'r': 's'})))
+        self.assertNotEqual(fp, frame_fingerprint(df.astype({'f': 'float32'})))
+        self.assertNotEqual(frame_fingerprint(pd.Series([0.0])), frame_fingerprint(pd.Series([-0.0])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import tempfile
+from pathlib import Path
+from unittest import mock
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from src.app.backtest.engine import backtest_engine
+from src.app.features.indicators import momentum_signal
+from src.app.visual.batch import render_batch
+
+
+def _results(n: int) -> dict:
+    rng = np.random.default_rng(2)
+    out = {}
+    for i in range(n):
+        idx = pd.date_range('2024-01-01', periods=120 + i)
+        close = pd.Series(100 + rng.standard_normal(len(idx)).cumsum(), index=idx)
+        out[f"{2330 + i}.TW"] = backtest_engine(close.to_frame('close'), momentum_signal(close, 5))
+    return out
+
+
+class TestBatchReport(unittest.TestCase):
+    def test_in_process_and_pool(self):
+        results = _results(3)
+        for workers in (1, 2):
+            with tempfile.TemporaryDirectory() as d:
+                res = render_batch(results, d, workers=workers, max_points=50)
+                self.assertEqual(set(res.artifacts), set(results))
+                self.assertFalse(res.errors)
+                index = Path(res.index_path).read_text(encoding='utf-8')
+                for sym, a in res.artifacts.items():
+                    self.assertTrue(Path(a['png']).exists())
+                    self.assertTrue(Path(a['html']).exists())
+                    self.assertIn(Path(a['html']).relative_to(d).as_posix(), index)
+                self.assertEqual(sum(w['count'] for w in res.workers), 3)
+                self.assertIn('symbols/s', res.summary())
+
+    def test_in_process_isolation(self):
+        results = _results(3)
+        results['bad'] = results['2330.TW'].drop(columns=['ret'])   # 缺欄位的回測結果
+        before = plt.get_fignums()
+        with tempfile.TemporaryDirectory() as d, mock.patch.object(matplotlib, 'use') as use:
+            res = render_batch(results, d, workers=1, max_points=50)
+        use.assert_not_called()
+        self.assertEqual(plt.get_fignums(), before)
+        self.assertEqual(list(res.errors), ['bad'])
+        self.assertEqual(len(res.artifacts), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.app.ops import run_daily
+from src.app.ops.dag import Stage, StageStore, namespaced, run_dag
+from src.app.ops.daily_dag import daily_stages, run_daily_dag, symbol_outputs
+
+
+class TestDag(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = StageStore(Path(self.tmp.name) / 'ckpt')
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _stages(self, n=10, fail=False):
+        def src(n):
+            self.calls.append('src')
+            return pd.Series(np.arange(n, dtype=float))
+
+        def parity(s):
+            self.calls.append('parity')
+            return (s % 2).astype(float)
+
+        def total(s, p):
+            self.calls.append('total')
+            if fail:
+                raise RuntimeError('boom')
+            return float(s.sum() + p.sum())
+
+        return [Stage('src', src, params={'n': n}), Stage('parity', parity, deps=('src',)),
+                Stage('total', total, deps=('src', 'parity'))]
+
+    def test_cached_rerun_and_param_change(self):
+        r1 = run_dag(self._stages(), self.store)
+        self.assertTrue(r1.ok)
+        self.assertEqual(r1.output('total'), 45.0 + 5)
+        self.calls.clear()
+        r2 = run_dag(self._stages(), self.store)
+        self.assertEqual(set(r2.status.values()), {'cached'})
+        self.assertEqual(self.calls, [])
+        self.assertEqual(r2.output('total'), 50.0)
+        r3 = run_dag(self._stages(n=12), self.store)
+        self.assertEqual(set(r3.status.values()), {'ran'})
+
+    def test_unchanged_output_keeps_downstream_cached(self):
+        run_dag(self._stages(), self.store)
+        self.calls.clear()
+        r = run_dag(self._stages(), self.store, force=['src'])
+        self.assertEqual(r.status, {'src': 'ran', 'parity': 'cached', 'total': 'cached'})
+
+    def test_failure_resumes_from_checkpoint(self):
+        r = run_dag(self._stages(fail=True), self.store)
+        self.assertEqual(r.status['total'], 'failed')
+        self.assertIn('boom', r.errors['total'])
+        self.calls.clear()
+        r = run_dag(self._stages(), self.store)
+        self.assertEqual(self.calls, ['total'])
+        self.assertEqual(r.status['total'], 'ran')
+
+    def test_dry_run(self):
+        run_dag(self._stages(), self.store)
+        self.calls.clear()
+        r = run_dag(self._stages(n=3), self.store, dry_run=True)
+        self.assertEqual(r.status, {'src': 'would-run', 'parity': 'would-run (upstream)',
+                                    'total': 'would-run (upstream)'})
+        self.assertEqual(self.calls, [])
+
+    def test_independent_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def side(x):
+            barrier.wait()
+            return x
+
+        stages = [Stage('root', lambda: 1)]
+        stages += [Stage(f'b{i}', side, deps=('root',), params={}) for i in range(2)]
+        r = run_dag(stages, self.store, workers=2)
+        self.assertTrue(r.ok, r.errors)
+
+    def test_namespaced_and_cycle(self):
+        subs = namespaced('A', self._stages()) + namespaced('B', self._stages(n=4))
+        r = run_dag(subs, self.store)
+        self.assertEqual(r.output('B:total'), 6.0 + 2)
+        with self.assertRaises(ValueError):
+            run_dag([Stage('x', lambda y: y, deps=('y',)), Stage('y', lambda x: x, deps=('x',))], self.store)
+
+
+class TestDailyDag(unittest.TestCase):
+    def test_daily_graph_two_symbols(self):
+        def fetch(symbol, start, end, source, refresh=False):
+            idx = pd.bdate_range(start, end, name='date')
+            close = 100 * np.exp(np.random.default_rng(len(symbol)).standard_normal(len(idx)).cumsum() * 0.01)
+            return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1.0}, index=idx)
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(run_daily, '_fetch_from_source', fetch):
+            kw = dict(start='2024-01-01', end='2024-06-28', out_dir=Path(tmp) / 'reports', ignore_local=True,
+                      store=StageStore(Path(tmp) / 'ckpt'))
+            r = run_daily_dag(['2330', '2317'], **kw)
+            self.assertTrue(r.ok, r.errors)
+            out = symbol_outputs(r, '2317')
+            self.assertIn('sharpe', out['metrics']['report'])
+            self.assertTrue(Path(out['reports']['interactive']).exists())
+            plan = run_daily_dag(['2330', '2317'], lookback=10, dry_run=True, **kw)
+            self.assertEqual(plan.status['2330:features'], 'cached')
+            self.assertEqual(plan.status['2330:positions'], 'would-run')
+
+    def test_fetch_refreshes_when_new_session_published(self):
+        def fetch_params(session, end='2099-12-31'):
+            cal = mock.Mock(last_complete_session=mock.Mock(return_value=pd.Timestamp(session)))
+            with mock.patch('src.app.ops.daily_dag.twse_calendar', return_value=cal):
+                return daily_stages('2330', '2024-01-01', end, ignore_local=True)[0].params
+
+        self.assertEqual(fetch_params('2026-10-16')['asof'], '2026-10-16')
+        self.assertNotEqual(fetch_params('2026-10-16'), fetch_params('2026-10-19'))
+        # 已結束的歷史區間：快取鍵不隨日期變動
+        self.assertEqual(fetch_params('2026-10-16', '2024-06-28'), fetch_params('2026-10-19', '2024-06-28'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.app.backtest.data import convert_ohlcv, iter_ohlcv, load_ohlcv, load_ohlcv_csv
+
+ROOT = Path(__file__).resolve().parents[1]
+SYMBOLS = ['2330', '2317', '2454']
+
+
+def _write_csv(path: Path, n: int = 250) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range('2023-01-02', periods=n)
+    parts = []
+    for s in SYMBOLS:
+        c = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        parts.append(pd.DataFrame({'Date': idx.strftime('%Y-%m-%d'), 'Symbol': s, 'Open': c, 'High': c * 1.01,
+                                   'Low': c * 0.99, 'Close': c, 'Volume': rng.integers(0, 10 ** 6, n)}))
+    df = pd.concat(parts).sort_values(['Date', 'Symbol'], kind='stable')
+    df.to_csv(path, index=False)
+    return df
+
+
+class TestTypedLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv = Path(self.tmp.name) / 'multi.csv'
+        self.raw = _write_csv(self.csv)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_dtypes_and_values_match_pandas_loader(self):
+        df = load_ohlcv(self.csv)
+        self.assertEqual(df.index.dtype, 'datetime64[ns]')
+        self.assertEqual(str(df['symbol'].dtype), 'category')
+        for c in ('open', 'high', 'low', 'close'):
+            self.assertEqual(df[c].dtype, np.float32)
+        self.assertEqual(df['volume'].dtype, np.int64)
+        ref = load_ohlcv_csv(str(self.csv))
+        self.assertTrue(df.index.equals(ref.index))
+        np.testing.assert_allclose(df['close'].to_numpy(), ref['close'].to_numpy(), rtol=1e-6)
+        np.testing.assert_array_equal(df['volume'].to_numpy(), ref['volume'].to_numpy())
+
+    def test_sample_data(self):
+        df = load_ohlcv(ROOT / 'sample_data.csv')
+        ref = load_ohlcv_csv(str(ROOT / 'sample_data.csv'))
+        self.assertTrue(df.index.equals(ref.index))
+        np.testing.assert_allclose(df['close'].to_numpy(), ref['close'].to_numpy(), rtol=1e-6)
+
+    def test_projection_and_filters(self):
+        df = load_ohlcv(self.csv, columns=['CLOSE'], start='2023-03-01', end='2023-03-31', symbols=['2330'])
+        self.assertEqual(list(df.columns), ['close', 'symbol'])
+        self.assertEqual(set(df['symbol']), {'2330'})
+        self.assertEqual(df.index.min(), pd.Timestamp('2023-03-01'))
+        self.assertEqual(df.index.max(), pd.Timestamp('2023-03-31'))   # 只給日期的 end 包含當日
+        self.assertEqual(list(load_ohlcv(self.csv, columns=['volume']).columns), ['volume'])
+        # 已列出 symbol / date 且以 symbols 篩選：不重複要求同一欄
+        both = load_ohlcv(self.csv, columns=['close', 'Symbol', 'date'], symbols=['2330'])
+        self.assertEqual(list(both.columns), ['close', 'symbol'])
+        self.assertEqual(set(both['symbol']), {'2330'})
+        pq_path = Path(self.tmp.name) / 'multi.parquet'
+        convert_ohlcv(self.csv, pq_path)
+        pd.testing.assert_frame_equal(load_ohlcv(pq_path, columns=['close', 'symbol'], symbols=['2330']), both)
+        with self.assertRaises(KeyError):
+            load_ohlcv(self.csv, columns=['vwap'])
+
+    def test_chunked_iteration_equals_full_load(self):
+        full = load_ohlcv(self.csv, symbols=['2317', '2454'], start='2023-02-01')
+        chunks = list(iter_ohlcv(self.csv, symbols=['2317', '2454'], start='2023-02-01', block_size=4096))
+        self.assertGreater(len(chunks), 1)
+        joined = pd.concat(chunks)
+        self.assertTrue(joined.index.equals(full.index))
+        np.testing.assert_array_equal(joined['close'].to_numpy(), full['close'].to_numpy())
+        self.assertEqual(joined['symbol'].astype(str).tolist(), full['symbol'].astype(str).tolist())
+
+    def test_parquet_and_feather_roundtrip(self):
+        full = load_ohlcv(self.csv)
+        for ext in ('parquet', 'feather'):
+            with self.subTest(ext=ext):
+                dst = convert_ohlcv(self.csv, Path(self.tmp.name) / f'multi.{ext}', block_size=4096)
+                out = load_ohlcv(dst)
+                self.assertTrue(out.index.equals(full.index))
+                np.testing.assert_array_equal(out['close'].to_numpy(), full['close'].to_numpy())
+                self.assertEqual(out['close'].dtype, np.float32)
+                self.assertEqual(str(out['symbol'].dtype), 'category')
+                sub = load_ohlcv(dst, columns=['close'], end='2023-01-31', symbols=['2454'])
+                ref = load_ohlcv(self.csv, columns=['close'], end='2023-01-31', symbols=['2454'])
+                np.testing.assert_array_equal(sub['close'].to_numpy(), ref['close'].to_numpy())
+                self.assertEqual(sum(len(c) for c in iter_ohlcv(dst, block_size=4096)), len(full))
+
+
+if __name__ == '__main__':
+    unittest.main()
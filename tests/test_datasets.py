@@ -0,0 +1,79 @@
+import os
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.app.agents import tools
+from src.app.data.datasets import DatasetRegistry
+
+
+def _ohlcv(n=300):
+    idx = pd.date_range('2020-01-01', periods=n, freq='B', name='date')
+    close = 100 * np.exp(np.random.default_rng(1).standard_normal(n).cumsum() * 0.01)
+    return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                         'volume': np.arange(n, dtype=float)}, index=idx)
+
+
+class TestDatasetRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reg = DatasetRegistry(Path(self.tmp.name) / 'ds', ttl_seconds=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_across_registries(self):
+        df = _ohlcv()
+        h = self.reg.put(df, symbol='2330.TW')
+        self.assertEqual(h, self.reg.put(df.copy()))
+        other = DatasetRegistry(self.reg.root)  # 另一個行程：從 memory-mapped 檔讀取
+        pd.testing.assert_frame_equal(other.get(h), df, check_freq=False)
+        info = other.describe(h)
+        self.assertEqual(info['symbol'], '2330.TW')
+        self.assertEqual(info['rows'], 300)
+        self.assertEqual(info['end'], df.index[-1].strftime('%Y-%m-%d'))
+        self.assertAlmostEqual(info['total_return'], df['close'].iloc[-1] / df['close'].iloc[0] - 1)
+
+    def test_ttl_and_invalid_handles(self):
+        h = self.reg.put(_ohlcv())
+        old = time.time() - 120
+        os.utime(self.reg.root / f"{h}.arrow", (old, old))
+        with self.assertRaises(KeyError):
+            self.reg.describe(h)   # 尚未被 evict 也不得回傳過期資料集
+        self.assertFalse((self.reg.root / f"{h}.arrow").exists())
+        with self.assertRaises(KeyError):
+            self.reg.get(h)
+        for bad in ('ds_../../etc', '', 'records'):
+            with self.assertRaises(KeyError):
+                self.reg.get(bad)
+
+    def test_capacity_eviction(self):
+        reg = DatasetRegistry(self.reg.root, max_bytes=1)
+        a = reg.put(_ohlcv(100))
+        b = reg.put(_ohlcv(200))
+        self.assertEqual(reg.evict(protect=b), [])
+        with self.assertRaises(KeyError):
+            reg.get(a)
+        self.assertEqual(len(reg.get(b)), 200)
+
+
+class TestToolHandles(unittest.TestCase):
+    def test_fetch_returns_handle_and_compute_accepts_it(self):
+        df = _ohlcv()
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(tools, 'datasets', DatasetRegistry(Path(tmp) / 'ds')), \
+                mock.patch.object(tools, 'fetch_ohlcv_yf', return_value=df):
+            out = tools.fetch_prices('2330.TW', '2020-01-01', '2021-03-01')
+            self.assertNotIn('records', out)
+            self.assertTrue(out['dataset'].startswith('ds_'))
+            self.assertEqual(tools.describe_dataset(out['dataset'])['rows'], len(df))
+            pd.testing.assert_frame_equal(tools._resolve(out['dataset']), tools._resolve(
+                tools.fetch_prices('2330.TW', '2020-01-01', '2021-03-01', format='records')['records']),
+                check_freq=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
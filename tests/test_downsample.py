@@ -0,0 +1,56 @@
+import unittest
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.app.visual.downsample import lttb_indices, minmax_indices, downsample_series, drawdown_keypoints
+from src.app.visual.interactive_report import build_interactive_report
+
+
+class TestDownsample(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        idx = pd.date_range('2024-01-01', periods=20000, freq='min')
+        self.series = pd.Series(100 + rng.standard_normal(20000).cumsum(), index=idx)
+
+    def test_lttb_shape(self):
+        sel = lttb_indices(self.series.to_numpy(), 500)
+        self.assertEqual(len(sel), 500)
+        self.assertEqual(sel[0], 0)
+        self.assertEqual(sel[-1], len(self.series) - 1)
+        self.assertTrue((np.diff(sel) > 0).all())
+
+    def test_minmax_keeps_extremes(self):
+        y = self.series.to_numpy()
+        sel = minmax_indices(y, 400)
+        self.assertLessEqual(len(sel), 402)
+        self.assertIn(int(np.argmin(y)), sel)
+        self.assertIn(int(np.argmax(y)), sel)
+
+    def test_keep_points_survive(self):
+        eq = self.series / self.series.iloc[0]
+        dd = eq / eq.cummax() - 1
+        keep = drawdown_keypoints(eq, dd) + list(self.series.index[[123, 4567]])
+        out = downsample_series(dd, 300, keep=keep)
+        for ts in keep:
+            self.assertIn(ts, out.index)
+        self.assertAlmostEqual(out.min(), dd.min())
+        self.assertIs(downsample_series(dd, None), dd)
+
+    def test_leading_nan(self):
+        s = self.series.copy()
+        s.iloc[:50] = np.nan
+        out = downsample_series(s, 200)
+        self.assertFalse(out.isna().any())
+
+    def test_report_smaller(self):
+        ret = self.series.pct_change().fillna(0) * 0.1
+        bt = pd.DataFrame({'ret': ret, 'equity': (1 + ret).cumprod()})
+        with tempfile.TemporaryDirectory() as d:
+            full = Path(build_interactive_report(bt, Path(d) / 'full')).stat().st_size
+            small = Path(build_interactive_report(bt, Path(d) / 'small', max_points=1000)).stat().st_size
+        self.assertLess(small * 5, full)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import re
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+ENTRY_MODULES = ['src.app.agents.tools', 'src.app.ops.run_daily', 'src.web.app']
+# 冷啟動匯入預算（毫秒）；CI 機器較慢時可用環境變數放寬
+BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', 2500))
+
+
+def _profile(module: str) -> tuple[float, list[str]]:
+    code = (f"import {module}\n"
+            "from src.app.lazy import loaded_heavy_modules\n"
+            "print(','.join(loaded_heavy_modules()))")
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    m = re.search(rf"\|\s+(\d+)\s+\| {re.escape(module)}$", proc.stderr, re.M)
+    heavy = [h for h in proc.stdout.strip().split(',') if h]
+    return int(m.group(1)) / 1000, heavy
+
+
+class TestImportBudget(unittest.TestCase):
+    def test_entry_points_stay_light(self):
+        for module in ENTRY_MODULES:
+            with self.subTest(module=module):
+                ms, heavy = _profile(module)
+                self.assertEqual(heavy, [], f"{module} 匯入時載入了重量級套件 {heavy}")
+                self.assertLess(ms, BUDGET_MS, f"{module} 匯入耗時 {ms:.0f}ms 超出預算 {BUDGET_MS:.0f}ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import tempfile
+import unittest
+from math import sqrt
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.app.backtest.engine import backtest_engine
+from src.app.data.intraday import BarResampler, iter_intraday, resample_bars, resample_stream
+from src.app.features.indicators import volatility
+from src.app.performance.metrics import bars_per_year, basic_report, infer_periods_per_year, sharpe_ratio
+from src.app.performance.rolling import RollingAnalytics
+
+DAYS = pd.bdate_range('2024-01-02', periods=4)
+
+
+def _ticks(seed=0, per_day=3000, symbols=None):
+    rng = np.random.default_rng(seed)
+    stamps = [d + pd.Timedelta(hours=9) + pd.to_timedelta(np.sort(rng.uniform(0, 270 * 60, per_day)), unit='s')
+              for d in DAYS]
+    idx = pd.DatetimeIndex(np.concatenate(stamps))
+    df = pd.DataFrame({'price': 100 + rng.normal(0, 0.05, len(idx)).cumsum(),
+                       'volume': rng.integers(1, 20, len(idx))}, index=idx)
+    if symbols:
+        df['symbol'] = rng.choice(symbols, len(idx))
+    return df
+
+
+def _chunks(df, n):
+    bounds = np.linspace(0, len(df), n + 1).astype(int)
+    return [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _reference(ticks, freq):
+    """逐日以 09:00 為錨點的 pandas resample。"""
+    parts = []
+    for day, g in ticks.groupby(ticks.index.normalize()):
+        origin = day + pd.Timedelta(hours=9)
+        r = g['price'].resample(freq, origin=origin).ohlc()
+        r['volume'] = g['volume'].resample(freq, origin=origin).sum()
+        parts.append(r.dropna())
+    return pd.concat(parts).astype(float)
+
+
+class TestResampler(unittest.TestCase):
+    def test_matches_pandas_and_is_chunk_invariant(self):
+        ticks = _ticks()
+        ref = _reference(ticks, '7min')
+        for n in (1, 5, 97):
+            with self.subTest(chunks=n):
+                out = resample_bars(iter(_chunks(ticks, n)), '7min')
+                np.testing.assert_allclose(out[['open', 'high', 'low', 'close', 'volume']], ref)
+                self.assertTrue(out.index.equals(ref.index))
+        self.assertEqual(out.index.name, 'date')
+        self.assertEqual(out.index[0], DAYS[0] + pd.Timedelta(hours=9))
+
+    def test_streaming_yields_only_completed_bars(self):
+        ticks = _ticks()
+        rs = BarResampler('30min')
+        first = rs.update(ticks.iloc[:100])
+        self.assertTrue((first.index < ticks.index[99].floor('30min')).all())
+        emitted = [first] + [rs.update(c) for c in _chunks(ticks.iloc[100:], 10)] + [rs.flush()]
+        out = pd.concat(emitted)
+        self.assertFalse(out.index.duplicated().any())
+        self.assertEqual(len(out), 9 * len(DAYS))
+        with self.assertRaises(ValueError):
+            rs.update(ticks.iloc[:10])
+
+    def test_bars_of_bars_and_multi_symbol(self):
+        ticks = _ticks(1, symbols=['2330', '2317'])
+        one_min = resample_bars(iter(_chunks(ticks, 13)), '1min')
+        self.assertEqual(set(one_min['symbol']), {'2330', '2317'})
+        five = resample_bars(iter(_chunks(one_min, 7)), '5min')
+        direct = resample_bars(ticks, '5min')
+        pd.testing.assert_frame_equal(five, direct)
+        tsmc = ticks[ticks['symbol'] == '2330']
+        np.testing.assert_allclose(direct[direct['symbol'] == '2330'].drop(columns='symbol'),
+                                   _reference(tsmc, '5min'))
+
+    def test_output_feeds_engine_and_annualization(self):
+        bars = resample_bars(_ticks(2), '5min')
+        bt = backtest_engine(bars, pd.Series(1.0, index=bars.index))
+        self.assertEqual(len(bt), len(bars))
+        ppy = infer_periods_per_year(bars.index)
+        self.assertEqual(ppy, bars_per_year('5min'))            # 270 / 5 = 54 bar / 日
+        self.assertEqual(ppy, 252 * 54)
+        r = bt['ret']
+        self.assertAlmostEqual(sharpe_ratio(r), sqrt(252 * 54) * r.mean() / r.std())
+        self.assertAlmostEqual(basic_report(bt)['sharpe'], sharpe_ratio(r))
+        self.assertEqual(RollingAnalytics(r).periods_per_year, 252 * 54)
+        self.assertAlmostEqual(volatility(bars['close'], 20, annualize=True).iloc[-1],
+                               bars['close'].pct_change().rolling(20).std().iloc[-1] * sqrt(252 * 54))
+
+    def test_tz_aware_input_uses_exchange_time(self):
+        ticks = _ticks()
+        naive = resample_bars(ticks, '90min')
+        utc = ticks.tz_localize('Asia/Taipei').tz_convert('UTC')
+        for n in (1, 7):
+            with self.subTest(chunks=n):
+                out = resample_bars(iter(_chunks(utc, n)), '90min')
+                self.assertTrue(out.index.equals(naive.index.tz_localize('Asia/Taipei')))
+                np.testing.assert_allclose(out.to_numpy(), naive.to_numpy())
+        self.assertEqual(str(out.index[0]), '2024-01-02 09:00:00+08:00')
+        self.assertEqual(out.index[1].hour * 60 + out.index[1].minute, 10 * 60 + 30)
+        rs = BarResampler('5min')
+        rs.update(utc.iloc[:10])
+        with self.assertRaises(ValueError):
+            rs.update(ticks.iloc[10:20])
+
+
+class TestAnnualization(unittest.TestCase):
+    def test_infer_periods_per_year(self):
+        self.assertEqual(infer_periods_per_year(pd.bdate_range('2020-01-01', periods=300)), 252)
+        self.assertEqual(infer_periods_per_year(pd.date_range('2020-01-01', periods=300)), 252)
+        self.assertAlmostEqual(infer_periods_per_year(pd.date_range('2020-01-05', periods=100, freq='W')), 52.18, 2)
+        self.assertAlmostEqual(infer_periods_per_year(pd.date_range('2020-01-01', periods=60, freq='MS')), 12, 1)
+        self.assertEqual(infer_periods_per_year(pd.RangeIndex(100)), 252)
+        self.assertEqual(bars_per_year('1h'), 252 * 5)
+        # 明確指定時不推斷（舊行為）
+        r = pd.Series(np.random.default_rng(0).normal(0, 0.01, 500),
+                      index=pd.date_range('2024-01-02 09:00', periods=500, freq='min'))
+        self.assertAlmostEqual(sharpe_ratio(r, periods_per_year=252), sqrt(252) * r.mean() / r.std())
+
+
+class TestIterIntraday(unittest.TestCase):
+    def test_csv_and_parquet(self):
+        ticks = _ticks(3, per_day=2000, symbols=['2330', '2454'])
+        raw = ticks.rename(columns={'volume': 'Size'}).rename_axis('Time').reset_index()
+        raw.columns = [c.capitalize() for c in raw.columns]
+        with tempfile.TemporaryDirectory() as tmp:
+            csv = Path(tmp) / 'ticks.csv'
+            raw.to_csv(csv, index=False)
+            pq_path = Path(tmp) / 'ticks.parquet'
+            raw.to_parquet(pq_path, index=False)
+            expected = resample_bars(ticks, '15min')
+            for path in (csv, pq_path):
+                with self.subTest(path=path.suffix):
+                    chunks = list(iter_intraday(path, block_size=1 << 14))
+                    self.assertGreater(len(chunks), 1)
+                    out = pd.concat(resample_stream(iter(chunks), '15min'))
+                    pd.testing.assert_frame_equal(out, expected, check_freq=False)
+
+    def test_iso_offsets_keep_taipei_labels(self):
+        ticks = _ticks(4, per_day=500)
+        raw = ticks.rename_axis('time').reset_index()
+        raw['time'] = ticks.index.tz_localize('Asia/Taipei').strftime('%Y-%m-%dT%H:%M:%S.%f%z')
+        raw['time'] = raw['time'].str.replace(r'(\d{2})(\d{2})$', r'\1:\2', regex=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'ticks.csv'
+            raw.to_csv(path, index=False)
+            out = resample_bars(iter_intraday(path), '30min')
+        expected = resample_bars(ticks, '30min')
+        self.assertEqual(out.index[0], pd.Timestamp('2024-01-02 09:00', tz='Asia/Taipei'))
+        self.assertTrue(out.index.tz_localize(None).equals(expected.index))
+        np.testing.assert_allclose(out.to_numpy(), expected.to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
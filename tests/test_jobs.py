@@ -0,0 +1,86 @@
+import time
+import unittest
+from src.app.ops.jobs import CANCELLED, DONE, FAILED, FINISHED, JobQueue, QueueFull
+
+
+def _steps(params, progress):
+    for i in range(params['n']):
+        time.sleep(params.get('delay', 0.05))
+        progress((i + 1) / params['n'], f"step {i + 1}")
+    return {'total': params['n']}
+
+
+def _boom(params, progress):
+    raise ValueError('bad input')
+
+
+def _wait(job, timeout=20.0):
+    t0 = time.time()
+    while job.status not in FINISHED:
+        if time.time() - t0 > timeout:
+            raise TimeoutError(job.to_dict())
+        time.sleep(0.02)
+    return job
+
+
+class TestJobQueue(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.q = JobQueue(workers=2, max_pending=3)
+        cls.q.register('steps', _steps)
+        cls.q.register('boom', _boom)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.q.shutdown()
+
+    def test_result_and_progress(self):
+        job, dedup = self.q.submit('steps', {'n': 4})
+        self.assertFalse(dedup)
+        versions = set()
+        while job.status not in FINISHED:
+            versions.add(job.version)
+            time.sleep(0.01)
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(job.result, {'total': 4})
+        self.assertEqual(job.progress, 1.0)
+        self.assertGreater(len(versions), 2)
+
+    def test_dedup_inflight(self):
+        a, _ = self.q.submit('steps', {'n': 3, 'tag': 'dup'})
+        b, dedup = self.q.submit('steps', {'tag': 'dup', 'n': 3})
+        self.assertTrue(dedup)
+        self.assertEqual(a.id, b.id)
+        _wait(a)
+        c, dedup = self.q.submit('steps', {'n': 3, 'tag': 'dup'})
+        self.assertFalse(dedup)
+        self.assertNotEqual(c.id, a.id)
+        _wait(c)
+
+    def test_cancel_running(self):
+        job, _ = self.q.submit('steps', {'n': 200, 'delay': 0.02})
+        while job.progress == 0:
+            time.sleep(0.01)
+        self.assertTrue(self.q.cancel(job.id))
+        self.assertEqual(_wait(job).status, CANCELLED)
+        self.assertFalse(self.q.cancel(job.id))
+
+    def test_failure_and_unknown_kind(self):
+        job, _ = self.q.submit('boom', {})
+        self.assertEqual(_wait(job).status, FAILED)
+        self.assertIn('bad input', job.error)
+        with self.assertRaises(KeyError):
+            self.q.submit('nope', {})
+
+    def test_queue_bound(self):
+        held = [self.q.submit('steps', {'n': 20, 'i': i})[0] for i in range(3)]
+        with self.assertRaises(QueueFull):
+            self.q.submit('steps', {'n': 20, 'i': 99})
+        for job in held:
+            self.q.cancel(job.id)
+        for job in held:
+            self.assertIn(_wait(job).status, (CANCELLED, DONE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.app.backtest.ledger import extract_trades, signal_flips, flip_events
+from src.app.performance.metrics import basic_report
+from src.app.backtest.engine import backtest_engine
+
+
+class TestLedger(unittest.TestCase):
+    def setUp(self):
+        self.idx = pd.date_range('2024-01-01', periods=8)
+        self.close = pd.Series([100, 102, 101, 103, 104, 100, 98, 99], index=self.idx, dtype=float)
+
+    def test_round_trips(self):
+        pos = pd.Series([0, 1, 1, 0, -1, 1, 1, 1], index=self.idx, name='2330')
+        t = extract_trades(pos, self.close, cost_bps=10)
+        self.assertEqual(len(t), 3)
+        first = t.iloc[0]
+        self.assertEqual(first['entry_date'], self.idx[1])
+        self.assertEqual(first['exit_date'], self.idx[3])
+        self.assertEqual(first['bars'], 2)
+        self.assertAlmostEqual(first['pnl'], 103 / 102 - 1)
+        self.assertAlmostEqual(first['cost'], 0.002)
+        # 由空翻多：空單在第 5 根平倉，多單同時進場且持有至結尾
+        self.assertEqual(t.iloc[1]['side'], -1)
+        self.assertAlmostEqual(t.iloc[1]['pnl'], -(100 / 104 - 1))
+        self.assertTrue(t.iloc[2]['is_open'])
+        # bars 為持有根數：未平倉者（第 5~7 根）同樣計入最後一根
+        self.assertEqual(t['bars'].tolist(), [2, 1, 3])
+        self.assertFalse(t.iloc[0]['is_open'])
+        self.assertTrue((t['symbol'] == '2330').all())
+
+    def test_matrix_matches_series(self):
+        rng = np.random.default_rng(1)
+        pos = pd.DataFrame(rng.integers(-1, 2, size=(200, 3)), index=pd.date_range('2024-01-01', periods=200), columns=list('abc'))
+        close = pd.DataFrame(100 + rng.standard_normal((200, 3)).cumsum(axis=0), index=pos.index, columns=pos.columns)
+        panel = extract_trades(pos, close)
+        for col in pos.columns:
+            single = extract_trades(pos[col], close[col])
+            got = panel[panel['symbol'] == col].reset_index(drop=True)
+            pd.testing.assert_frame_equal(got, single)
+
+    def test_flips_and_events(self):
+        close = pd.Series(100 + np.sin(np.arange(60) / 3) * 5, index=pd.date_range('2024-01-01', periods=60))
+        mom = close.pct_change(5)
+        sign = mom.apply(lambda v: 1 if v > 0 else (-1 if v < 0 else 0))
+        prev = sign.shift(1)
+        buys, sells = signal_flips(-sign)
+        self.assertTrue(buys.equals(sign[(sign == -1) & (prev == 1)].index))
+        self.assertTrue(sells.equals(sign[(sign == 1) & (prev == -1)].index))
+        events = flip_events(close, buys, sells)
+        self.assertEqual(len(events), len(buys) + len(sells))
+        self.assertEqual([e['date'] for e in events], sorted(e['date'] for e in events))
+
+    def test_basic_report_trade_stats(self):
+        pos = pd.Series([0, 1, 1, 0, -1, 1, 1, 1], index=self.idx)
+        bt = backtest_engine(self.close.to_frame('close'), pos)
+        rpt = basic_report(bt, extract_trades(pos, self.close))
+        self.assertEqual(rpt['trades'], 3)
+        self.assertAlmostEqual(rpt['win_rate'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.app.performance.metrics import sharpe_ratio, max_drawdown, basic_report, metrics_matrix
+
+
+class TestMetricsMatrix(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.rets = pd.DataFrame(rng.normal(0.0005, 0.01, size=(500, 4)), columns=['a', 'b', 'c', 'd'])
+        self.rets.iloc[:100, 3] = np.nan  # 較晚開始的策略
+
+    def test_matches_single_strategy_functions(self):
+        out = metrics_matrix(self.rets)
+        for col in ['a', 'b']:
+            r = self.rets[col]
+            eq = (1 + r).cumprod()
+            bt = pd.DataFrame({'ret': r, 'equity': eq, 'turnover': 0.0, 'cost': 0.0})
+            rpt = basic_report(bt)
+            self.assertAlmostEqual(out.loc[col, 'sharpe'], sharpe_ratio(r))
+            self.assertAlmostEqual(out.loc[col, 'max_drawdown'], max_drawdown(eq))
+            self.assertAlmostEqual(out.loc[col, 'cumulative_return'], rpt['cumulative_return'])
+        self.assertEqual(out.loc['d', 'periods'], 400)
+        self.assertAlmostEqual(out.loc['d', 'sharpe'], sharpe_ratio(self.rets['d']))
+
+    def test_equity_input_and_drawdown_duration(self):
+        eq = pd.DataFrame({'x': [1.0, 1.1, 1.0, 0.9, 1.05, 1.2, 1.1]})
+        out = metrics_matrix(eq, from_equity=True)
+        self.assertAlmostEqual(out.loc['x', 'max_drawdown'], 0.9 / 1.1 - 1)
+        self.assertEqual(out.loc['x', 'max_dd_duration'], 3)
+        self.assertAlmostEqual(out.loc['x', 'cumulative_return'], 0.1)
+        self.assertAlmostEqual(out.loc['x', 'hit_rate'], 3 / 6)
+
+    def test_turnover_and_ratios(self):
+        out = metrics_matrix(self.rets, turnover=np.ones(self.rets.shape))
+        self.assertTrue((out['turnover_sum'] == 500).all())
+        for k in ['sortino', 'calmar', 'tail_ratio']:
+            self.assertTrue(np.isfinite(out[k]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+from src.app.agents.orchestrator import MOCK_AGENTS, AgentOrchestrator, ClientPool, MockAgentsClient, message_text
+
+
+def _orch(call_latency=0.0, run_seconds=0.3, **kw):
+    backend = MockAgentsClient(call_latency, run_seconds)  # 真實 client 共用伺服器端狀態；mock 以同一實例模擬
+    pool = ClientPool(lambda: backend, size=2)
+    return AgentOrchestrator(pool, MOCK_AGENTS, **kw)
+
+
+class TestOrchestrator(unittest.TestCase):
+    def test_send_completes_with_backoff(self):
+        res = asyncio.run(_orch(poll_initial=0.05).send('pm_risk_agent', 'hello'))
+        self.assertEqual(res['run_status'], 'completed')
+        self.assertEqual(res['messages'][-1]['content'], '[mock:pm_risk_agent] 收到訊息：hello')
+        # 0.05, 0.08, 0.128, 0.205 ... 約 4 次輪詢即超過 0.3 秒
+        self.assertLessEqual(res['polls'], 5)
+
+    def test_thread_reuse(self):
+        async def go():
+            orch = _orch(run_seconds=0)
+            first = await orch.send('data_qa_agent', 'a')
+            return await orch.send('data_qa_agent', 'b', thread_id=first['thread_id'])
+        res = asyncio.run(go())
+        self.assertEqual([m['role'] for m in res['messages']], ['user', 'assistant', 'user', 'assistant'])
+
+    def test_fan_out_runs_in_parallel(self):
+        orch = _orch(call_latency=0.02, run_seconds=0.4, poll_initial=0.05)
+        t0 = time.perf_counter()
+        res = asyncio.run(orch.fan_out('status?'))
+        elapsed = time.perf_counter() - t0
+        self.assertEqual(set(res), set(MOCK_AGENTS))
+        self.assertTrue(all(r['run_status'] == 'completed' for r in res.values()))
+        self.assertLess(elapsed, 3 * 0.4)
+
+    def test_fan_out_isolates_errors_and_timeout(self):
+        res = asyncio.run(_orch(run_seconds=5).fan_out('x', ['execution_agent', 'ghost'], timeout=0.2))
+        self.assertEqual(res['ghost']['run_status'], 'error')
+        self.assertEqual(res['execution_agent']['run_status'], 'in_progress')
+
+    def test_message_text_sdk_objects(self):
+        content = [SimpleNamespace(type='text', text=SimpleNamespace(value='hi')), {'type': 'image_file'}]
+        self.assertEqual(message_text(content), 'hi\n[image]')
+        self.assertEqual(message_text('plain'), 'plain')
+
+
+if __name__ == '__main__':
+    unittest.main()
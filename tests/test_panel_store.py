@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.app.data import panel_store as ps
+from src.app.data.panel_store import PanelStore
+from src.app.data.quality import panel_from_frames
+from src.app.ops.universe import run_universe
+
+
+def _frames(n=300, symbols=('2330', '2317', '2454'), seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range('2023-01-02', periods=n, name='date')
+    out = {}
+    for i, s in enumerate(symbols):
+        close = 100 * np.exp(rng.standard_normal(n).cumsum() * 0.01)
+        part = slice(10 * i, None)   # 上市日不同，面板含 NaN
+        out[s] = pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                               'volume': rng.integers(1, 1000, n).astype(float)}, index=idx).iloc[part]
+    return out
+
+
+def _attach_and_sum(root: str) -> tuple:
+    view = PanelStore(root).current()
+    return view.generation, float(np.nansum(view.arrays['close'])), view.arrays['close'].flags.writeable
+
+
+class TestPanelStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.panel = panel_from_frames(_frames())
+        self.store = PanelStore(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_zero_copy_read_only(self):
+        gen = self.store.publish(self.panel)
+        view = self.store.attach()
+        self.assertEqual(view.generation, gen)
+        self.assertEqual(view.fields, ['close', 'volume'])
+        pd.testing.assert_frame_equal(view.frame('close'), self.panel['close'], check_names=False, check_freq=False)
+        arr = view.arrays['close']
+        self.assertIsInstance(arr, np.memmap)
+        self.assertFalse(arr.flags.writeable)
+        self.assertTrue(np.shares_memory(view.frame('close').to_numpy(), arr))
+        s = view.series('volume', '2317', '2023-03-01', '2023-03-31')
+        self.assertTrue(np.shares_memory(s.to_numpy(), view.arrays['volume']))
+        pd.testing.assert_series_equal(s, self.panel['volume']['2317'].loc['2023-03-01':'2023-03-31'],
+                                       check_names=False, check_freq=False)
+
+    def test_generation_swap_and_prune(self):
+        self.assertIsNone(self.store.generation())
+        with self.assertRaises(FileNotFoundError):
+            self.store.attach()
+        self.store.publish(self.panel)
+        first = self.store.current()
+        self.assertIs(self.store.current(), first)
+        updated = panel_from_frames(_frames(n=301, seed=1))
+        for _ in range(3):
+            gen = self.store.publish(updated)
+        self.assertEqual(gen, 4)
+        self.assertEqual(self.store.generations(), [3, 4])
+        second = self.store.current()
+        self.assertEqual(second.generation, 4)
+        self.assertEqual(len(second.index), 301)
+        # 舊世代目錄已刪除，但已 attach 的映射仍可讀
+        self.assertEqual(len(first.frame('close')), 300)
+        self.assertTrue(np.isfinite(first.arrays['close'][-1]).all())
+
+    def test_other_processes_attach(self):
+        self.store.publish(self.panel)
+        expected = float(np.nansum(self.panel['close'].to_numpy()))
+        with ProcessPoolExecutor(max_workers=2) as ex:
+            results = list(ex.map(_attach_and_sum, [str(self.root)] * 2))
+        for gen, total, writeable in results:
+            self.assertEqual(gen, 1)
+            self.assertAlmostEqual(total, expected)
+            self.assertFalse(writeable)
+
+    def test_universe_reads_panel(self):
+        self.store.publish(self.panel)
+        with mock.patch.object(ps, 'panel_store', self.store):
+            res = run_universe(['2330', '2454.TW'], '2023-01-02', '2023-12-29', source='panel',
+                               out_dir=self.root / 'out', workers=1, rate_per_sec=None, reports=False)
+        self.assertEqual(sorted(res.metrics.index), ['2330', '2454.TW'])
+        self.assertFalse(res.errors)
+
+
+if __name__ == '__main__':
+    unittest.main()
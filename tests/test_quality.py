@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.app.data.quality import (COLUMNS, load_cache_panel, panel_from_frames, scan_frame, scan_panel,
+                                  summarize_anomalies, trading_calendar)
+
+IDX = pd.bdate_range('2024-01-01', periods=40)
+
+
+def _clean(seed, idx=IDX):
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(idx))))
+    return pd.DataFrame({'open': c, 'high': c * 1.01, 'low': c * 0.99, 'close': c, 'volume': 1000.0}, index=idx)
+
+
+def _rows(anomalies, check):
+    return anomalies[anomalies['check'] == check].reset_index(drop=True)
+
+
+class TestQuality(unittest.TestCase):
+    def test_clean_panel_has_no_anomalies(self):
+        out = scan_panel(panel_from_frames({s: _clean(i) for i, s in enumerate(['A', 'B', 'C'])}))
+        self.assertEqual(list(out.columns), COLUMNS)
+        self.assertTrue(out.empty)
+
+    def test_each_check(self):
+        a, b, c, d = _clean(1), _clean(2), _clean(3), _clean(4)
+        b = b.drop(IDX[10:13])                                        # gap 3 bars
+        a.loc[IDX[5], 'high'] = a.loc[IDX[5], 'low'] * 0.9             # high < low
+        a.loc[IDX[7], 'close'] = a.loc[IDX[7], 'high'] * 1.05          # close > high
+        a.loc[IDX[30]:, ['open', 'high', 'low', 'close']] *= 0.5       # 分割式跳空
+        c.loc[IDX[8:14], 'volume'] = 0                                  # 6 根零量
+        c.loc[IDX[20:22], 'volume'] = 0                                 # 2 根零量（低於門檻）
+        c.iloc[25:33, :4] = c.iloc[25, :4].to_numpy()                   # 重複報價 7 根
+        d.loc[IDX[3], 'low'] = 0.0                                      # 非正價格
+        out = scan_panel(panel_from_frames({'A': a, 'B': b, 'C': c, 'D': d}))
+
+        gap = _rows(out, 'gap')
+        self.assertEqual(gap[['symbol', 'start', 'end', 'bars']].values.tolist(), [['B', IDX[10], IDX[12], 3]])
+        bad = _rows(out, 'bad_range')
+        self.assertEqual(bad['start'].tolist(), [IDX[5], IDX[7]])
+        jump = _rows(out, 'jump')
+        self.assertEqual(jump[['symbol', 'start']].values.tolist(), [['A', IDX[30]]])
+        self.assertAlmostEqual(jump['value'][0], np.log(2), delta=0.05)
+        zero = _rows(out, 'zero_volume')
+        self.assertEqual(zero[['symbol', 'start', 'bars']].values.tolist(), [['C', IDX[8], 6]])
+        stale = _rows(out, 'stale')
+        self.assertEqual(stale[['symbol', 'start', 'end', 'bars']].values.tolist(), [['C', IDX[26], IDX[32], 7]])
+        self.assertEqual(_rows(out, 'nonpositive')['symbol'].tolist(), ['D'])
+
+        summary = summarize_anomalies(out)
+        self.assertEqual(summary['by_check']['gap'], {'runs': 1, 'bars': 3, 'symbols': 1})
+        self.assertEqual(summary['symbols_affected'], 4)
+
+    def test_listing_and_calendar(self):
+        # 晚上市 / 提前下市不算缺漏；單一標的的多餘日期不會讓其他標的被判缺漏
+        late = _clean(5).iloc[15:]
+        gone = _clean(6).iloc[:20]
+        odd = _clean(7)
+        odd.loc[pd.Timestamp('2024-01-06')] = odd.iloc[0].to_numpy()   # 週六的錯誤資料
+        panel = panel_from_frames({'L': late, 'G': gone, 'O': odd.sort_index(), 'X': _clean(8)})
+        self.assertNotIn(pd.Timestamp('2024-01-06'), trading_calendar(panel['close']))
+        out = scan_panel(panel)
+        self.assertTrue(_rows(out, 'gap').empty)
+        # 明確提供交易日曆時以其為準
+        cal = IDX.delete(3)
+        b = _clean(9).drop(IDX[3])
+        self.assertTrue(_rows(scan_panel(panel_from_frames({'B': b, 'X': _clean(8)}), calendar=cal), 'gap').empty)
+
+    def test_jump_uses_previous_valid_close(self):
+        a = _clean(1)
+        a.loc[IDX[10], 'close'] = np.nan
+        a.loc[IDX[11]:, ['open', 'high', 'low', 'close']] *= 1.5
+        jump = _rows(scan_frame(a, 'A'), 'jump')
+        self.assertEqual(jump['start'].tolist(), [IDX[11]])
+
+    def test_load_cache_panel(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, s in enumerate(['2330', '2317']):
+                df = _clean(i)
+                df.index = df.index.strftime('%Y-%m-%d')   # 舊快取以字串日期為 index
+                df.to_parquet(Path(tmp) / f"{s}.parquet")
+            panel = load_cache_panel(tmp)
+            self.assertEqual(sorted(panel['close'].columns), ['2317', '2330'])
+            self.assertIsInstance(panel['close'].index, pd.DatetimeIndex)
+            self.assertEqual(list(load_cache_panel(tmp, symbols=['2330', '9999'])['close'].columns), ['2330'])
+
+    def test_empty_cache_summary(self):
+        from unittest import mock
+        from src.app.agents import tools
+        with tempfile.TemporaryDirectory() as tmp:
+            out = scan_panel(load_cache_panel(tmp))
+            self.assertEqual(list(out.columns), COLUMNS)
+            self.assertEqual(out['bars'].dtype, np.dtype(int))
+            summary = summarize_anomalies(out)
+            self.assertEqual((summary['anomalies'], summary['worst_symbols']), (0, {}))
+            with mock.patch.object(tools.twse, 'CACHE_DIR', Path(tmp)):
+                res = tools.scan_data_quality(symbols=['NOPE'])
+        self.assertEqual(res['summary']['anomalies'], 0)
+        self.assertEqual(res['anomalies'], [])
+        self.assertNotIn('dataset', res)
+
+
+if __name__ == '__main__':
+    unittest.main()
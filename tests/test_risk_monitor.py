@@ -0,0 +1,145 @@
+import unittest
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.app.ops.kill_switch import halt_mask, should_halt
+from src.app.ops.risk_monitor import RiskLimits, RiskMonitor, load_ticks
+
+TICKS = Path(__file__).parent / 'data' / 'risk_ticks.csv'
+
+
+def _book():
+    return pd.DataFrame({
+        'strategy': ['mom', 'mom', 'rev', 'rev'],
+        'symbol': ['2330', '2317', '2317', '2454'],
+        'qty': [100.0, 800.0, 400.0, 60.0],
+        'capital': [100_000.0, 100_000.0, 60_000.0, 80_000.0],
+    })
+
+
+def _naive(positions, prices, ticks, position_limits, strategy_limits, book_limits):
+    """逐筆純量參考實作：每筆 tick 後重算所有部位/策略/全書權益並以 should_halt 判斷。"""
+    px = {str(k): float(v) for k, v in prices.items()}
+    pos = positions.assign(symbol=positions['symbol'].astype(str))
+    cash = (pos['capital'] - pos['qty'] * pos['symbol'].map(px)).to_numpy()
+
+    def equities():
+        eq = cash + pos['qty'].to_numpy() * pos['symbol'].map(px).to_numpy()
+        grp = {s: eq[(pos['strategy'] == s).to_numpy()].sum() for s in pd.unique(pos['strategy'])}
+        grp[None] = eq.sum()
+        return eq, grp
+
+    eq, grp = equities()
+    sod, peak, gsod, gpeak = eq.copy(), eq.copy(), dict(grp), dict(grp)
+    halted, ghalted, events = set(), set(), []
+    for seq, (sym, price) in enumerate(zip(ticks['symbol'].astype(str), ticks['price'])):
+        if sym not in px:
+            continue
+        px[sym] = float(price)
+        eq, grp = equities()
+        peak = np.maximum(peak, eq)
+        for i in range(len(pos)):
+            if i not in halted and should_halt(eq[i] / sod[i] - 1, eq[i] / peak[i] - 1, position_limits.pnl_limit, position_limits.dd_limit):
+                halted.add(i)
+                events.append(('position', pos['strategy'][i], pos['symbol'][i], seq))
+        for g, v in grp.items():
+            gpeak[g] = max(gpeak[g], v)
+            lim = book_limits if g is None else strategy_limits
+            if lim is None or g in ghalted:
+                continue
+            if should_halt(v / gsod[g] - 1, v / gpeak[g] - 1, lim.pnl_limit, lim.dd_limit):
+                ghalted.add(g)
+                events.append(('book' if g is None else 'strategy', g, None, seq))
+    return events
+
+
+def _keys(events):
+    return [(e.level, e.strategy, e.symbol, e.seq) for e in events]
+
+
+class TestRiskMonitor(unittest.TestCase):
+    def setUp(self):
+        self.ticks = load_ticks(TICKS)
+        self.prices = self.ticks.groupby('symbol', sort=False)['price'].first()
+        self.limits = dict(position_limits=RiskLimits(-0.08, -0.10), strategy_limits=RiskLimits(-0.05, -0.06),
+                           book_limits=RiskLimits(-0.04, -0.05))
+
+    def _replay(self, batch_size):
+        mon = RiskMonitor(_book(), self.prices, **self.limits)
+        return mon, [e for batch in mon.replay(self.ticks, batch_size=batch_size) for e in batch]
+
+    def test_halt_mask_matches_should_halt(self):
+        rng = np.random.default_rng(0)
+        pnl, dd = rng.uniform(-0.2, 0.05, 200), rng.uniform(-0.3, 0, 200)
+        expected = [should_halt(p, d) for p, d in zip(pnl, dd)]
+        self.assertEqual(halt_mask(pnl, dd).tolist(), expected)
+
+    def test_replay_tick_file(self):
+        mon, events = self._replay(10_000)
+        levels = {(e.level, e.strategy, e.symbol) for e in events}
+        # 2317 急跌：兩個策略的 2317 部位、mom 策略與全書皆觸發；2330/2454 部位不受影響
+        self.assertIn(('position', 'mom', '2317'), levels)
+        self.assertIn(('position', 'rev', '2317'), levels)
+        self.assertIn(('strategy', 'mom', None), levels)
+        self.assertIn(('book', None, None), levels)
+        self.assertNotIn(('position', 'mom', '2330'), levels)
+        self.assertEqual(len(events), len(levels))  # 每個層級只觸發一次
+        self.assertEqual([e.seq for e in events], sorted(e.seq for e in events))
+        first = events[0]
+        self.assertEqual(first.time, self.ticks['time'].iloc[first.seq])
+        self.assertIn('drawdown=', first.reason)
+        snap = mon.snapshot()
+        self.assertEqual(snap['halted'].tolist(), [False, True, True, False])
+
+    def test_matches_naive_per_tick_loop(self):
+        expected = _naive(_book(), self.prices, self.ticks, **self.limits)
+        _, events = self._replay(10_000)
+        self.assertEqual(_keys(events), expected)
+
+    def test_batch_size_invariance(self):
+        _, base = self._replay(10_000)
+        for bs in (1, 7, 64):
+            _, events = self._replay(bs)
+            self.assertEqual(_keys(events), _keys(base), bs)
+            self.assertEqual([round(e.equity, 6) for e in events], [round(e.equity, 6) for e in base])
+
+    def test_intra_batch_dip_and_recovery(self):
+        # 同一批內先跌破門檻再漲回：逐筆評估仍須觸發
+        mon = RiskMonitor(_book(), {'2330': 600, '2317': 100, '2454': 900}, RiskLimits(-0.5, -0.10))
+        events = mon.update(['2317', '2317', '2317'], [95.0, 84.0, 101.0])
+        self.assertEqual(_keys(events), [('position', 'mom', '2317', 1), ('position', 'rev', '2317', 1)])
+        self.assertEqual(mon.last_px[mon.symbols.get_loc('2317')], 101.0)
+
+    def test_random_ticks_against_naive(self):
+        rng = np.random.default_rng(7)
+        syms = [f"S{i}" for i in range(6)]
+        positions = pd.DataFrame({
+            'strategy': rng.choice(['a', 'b', 'c'], 15), 'symbol': rng.choice(syms, 15),
+            'qty': rng.integers(-50, 200, 15).astype(float), 'capital': rng.uniform(5e4, 1e5, 15),
+        })
+        prices = pd.Series(100.0, index=syms)
+        n = 1500
+        ticks = pd.DataFrame({'symbol': rng.choice(syms + ['UNKNOWN'], n),
+                              'price': 100 * np.exp(np.cumsum(rng.normal(-0.001, 0.01, n)))})
+        limits = dict(position_limits=RiskLimits(-0.03, -0.04), strategy_limits=RiskLimits(-0.02, -0.03), book_limits=RiskLimits(-0.015, -0.02))
+        expected = _naive(positions, prices, ticks, **limits)
+        self.assertTrue(expected)
+        for bs in (1, 13, 500, n):
+            mon = RiskMonitor(positions, prices, **limits)
+            events = [e for batch in mon.replay(ticks, batch_size=bs) for e in batch]
+            self.assertEqual(_keys(events), expected, bs)
+
+    def test_reset_halts_and_start_day(self):
+        mon = RiskMonitor(_book(), {'2330': 600, '2317': 100, '2454': 900}, RiskLimits(-0.05, -0.5))
+        self.assertEqual(len(mon.update(['2317'], [90.0])), 2)
+        self.assertEqual(mon.update(['2317'], [89.0]), [])      # 已 halted 不重複發出
+        mon.reset_halts()
+        mon.start_day()                                          # 以 89 為新開盤基準
+        self.assertEqual(mon.update(['2317'], [88.0]), [])
+        self.assertEqual(len(mon.update(['2317'], [80.0])), 2)
+        self.assertEqual(mon.update(['9999'], [1.0]), [])       # 未知 symbol 忽略
+        self.assertEqual(mon.seq, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
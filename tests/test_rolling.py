@@ -0,0 +1,46 @@
+import unittest
+from math import sqrt
+import numpy as np
+import pandas as pd
+from src.app.performance.rolling import RollingAnalytics, drawdown
+from src.app.visual.interactive_report import rolling_sharpe
+
+
+class TestRollingAnalytics(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        idx = pd.date_range('2023-01-01', periods=300)
+        self.bench = pd.Series(rng.normal(0, 0.01, 300), index=idx)
+        self.rets = pd.DataFrame({
+            's1': 0.8 * self.bench + rng.normal(0, 0.005, 300),
+            's2': rng.normal(0.001, 0.02, 300),
+        }, index=idx)
+        self.rets.iloc[100:130, 1] = 0.0  # 空手期間：波動為 0
+
+    def test_matches_pandas_rolling(self):
+        ra = RollingAnalytics(self.rets, benchmark=self.bench)
+        for w in (5, 20, 60):
+            r = self.rets.rolling(w)
+            ref_sharpe = r.mean() / r.std(ddof=0).replace(0, np.nan) * sqrt(252)
+            pd.testing.assert_frame_equal(ra.sharpe(w), ref_sharpe, atol=1e-8)
+            pd.testing.assert_frame_equal(ra.volatility(w), r.std(ddof=0) * sqrt(252), atol=1e-10)
+            ref_beta = self.rets['s1'].rolling(w).cov(self.bench) / self.bench.rolling(w).var()
+            np.testing.assert_allclose(ra.beta(w)['s1'], ref_beta, rtol=1e-6)
+        self.assertTrue(ra.sharpe(20)['s2'].iloc[119:130].isna().all())
+
+    def test_series_input_and_legacy_rolling_sharpe(self):
+        r = self.rets['s2']
+        legacy = r.rolling(20).mean() / r.rolling(20).std(ddof=0).replace(0, np.nan) * sqrt(252)
+        pd.testing.assert_series_equal(rolling_sharpe(r), legacy, atol=1e-8)
+
+    def test_drawdown_and_table(self):
+        ra = RollingAnalytics(self.rets, benchmark=self.bench)
+        eq = (1 + self.rets).cumprod()
+        pd.testing.assert_frame_equal(ra.drawdown(), drawdown(eq))
+        tbl = ra.table([20, 60])
+        self.assertEqual(set(tbl.columns.get_level_values('metric')), {'sharpe', 'sortino', 'volatility', 'beta'})
+        self.assertEqual(tbl.shape[1], 4 * 2 * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
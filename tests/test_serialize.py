@@ -0,0 +1,87 @@
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from src.app.data import serialize
+from src.app.data.serialize import dumps, from_payload, to_columnar, to_records
+
+
+def _ohlcv(n=60):
+    rng = np.random.default_rng(0)
+    idx = pd.date_range('2024-01-01', periods=n, freq='B', name='date')
+    close = 100 * np.exp(rng.standard_normal(n).cumsum() * 0.01)
+    df = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                       'volume': rng.integers(1000, 5000, n)}, index=idx)
+    df.iloc[3, 0] = np.nan
+    return df
+
+
+class TestSerialize(unittest.TestCase):
+    def test_records_format(self):
+        df = _ohlcv()
+        rec = to_records(df)
+        self.assertEqual(len(rec), len(df))
+        self.assertEqual(rec[0]['date'], '2024-01-01')
+        self.assertIsNone(rec[3]['open'])
+        self.assertIsInstance(rec[0]['volume'], int)
+        json.dumps(rec, allow_nan=False)
+
+    def test_intraday_dates_keep_time(self):
+        idx = pd.date_range('2024-01-02 09:00', periods=3, freq='min')
+        rec = to_records(pd.DataFrame({'close': [1.0, 2.0, 3.0]}, index=idx))
+        self.assertEqual(rec[1]['date'], '2024-01-02T09:01:00')
+        ticks = pd.DatetimeIndex(['2024-01-02 09:00:00.250', '2024-01-02 09:00:00.750', '2024-01-02 09:00:01'])
+        payload = to_columnar(pd.DataFrame({'price': [1.0, 2.0, 3.0]}, index=ticks))
+        self.assertEqual(payload['data']['date'][:2], ['2024-01-02T09:00:00.250', '2024-01-02T09:00:00.750'])
+        self.assertTrue(from_payload(json.loads(dumps(payload))).index.equals(ticks))
+        aware = to_records(pd.DataFrame({'price': [1.0]}, index=ticks[:1].tz_localize('Asia/Taipei')))
+        self.assertEqual(aware[0]['date'], '2024-01-02T09:00:00.250+08:00')
+
+    def test_tz_aware_dates(self):
+        df = _ohlcv()
+        df.index = df.index.tz_localize('Asia/Taipei')
+        payload = to_columnar(df)
+        json.dumps(payload, allow_nan=False)
+        self.assertEqual(payload['data']['date'][0], '2024-01-01')
+        idx = pd.DatetimeIndex(['2024-01-02 09:00', None, '2024-01-02 13:30'], tz='Asia/Taipei')
+        frame = pd.DataFrame({'close': [1.0, 2.0, 3.0], 'ts': idx.tz_convert('UTC')}, index=idx)
+        rec = to_records(frame)
+        self.assertEqual(rec[0]['date'], '2024-01-02T09:00:00+08:00')
+        self.assertIsNone(rec[1]['date'])
+        self.assertEqual(rec[2]['ts'], '2024-01-02T05:30:00+00:00')
+        self.assertEqual(from_payload(rec).index[0], idx[0])
+
+    def test_columnar_roundtrip(self):
+        df = _ohlcv()
+        for native in (False, True):
+            payload = json.loads(dumps(to_columnar(df, native=native)))
+            self.assertEqual(payload['length'], len(df))
+            self.assertIsNone(payload['data']['open'][3])
+            back = from_payload(payload)
+            pd.testing.assert_frame_equal(back, df, check_freq=False, check_names=False, check_dtype=False)
+
+    def test_dumps_without_orjson(self):
+        orig = serialize.orjson
+        serialize.orjson = None
+        try:
+            out = json.loads(dumps({'x': [1.0, float('nan')], 'n': np.int64(3)}))
+        finally:
+            serialize.orjson = orig
+        self.assertEqual(out, {'x': [1.0, None], 'n': 3})
+
+    def test_payload_formats_equivalent(self):
+        df = _ohlcv()
+        pd.testing.assert_frame_equal(from_payload(to_records(df)), from_payload(to_columnar(df)))
+
+    def test_arrow_roundtrip(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest('pyarrow 未安裝')
+        df = _ohlcv()
+        back = serialize.from_arrow_ipc(serialize.to_arrow_ipc(df))
+        pd.testing.assert_frame_equal(back, df, check_freq=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
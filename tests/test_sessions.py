@@ -0,0 +1,197 @@
+import tempfile
+import unittest
+from datetime import datetime, time as dtime
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.app.data import twse
+from src.app.data.sessions import CalendarCoverageError, TradingCalendar, read_calendar_file, twse_calendar
+from src.app.ops import run_daily
+
+
+def _ohlcv(idx):
+    close = np.linspace(100, 110, len(idx))
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1.0},
+                        index=pd.DatetimeIndex(idx, name='date'))
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        self.cal = twse_calendar()
+
+    def test_lunar_new_year_and_typhoon(self):
+        feb = self.cal.sessions_in_range('2024-02-01', '2024-02-29')
+        self.assertNotIn(pd.Timestamp('2024-02-08'), feb)
+        self.assertEqual(len(feb), 13)
+        self.assertEqual(self.cal.next_session('2024-02-05'), pd.Timestamp('2024-02-15'))
+        self.assertEqual(self.cal.previous_session('2024-02-15'), pd.Timestamp('2024-02-05'))
+        self.assertFalse(self.cal.is_session('2024-07-24'))
+        self.assertEqual(self.cal.next_session('2024-07-23'), pd.Timestamp('2024-07-26'))
+        self.assertEqual(self.cal.next_session('2024-07-26', inclusive=True), pd.Timestamp('2024-07-26'))
+        self.assertEqual(self.cal.session_count('2024-02-10', '2024-02-14'), 0)
+
+    def test_missing_sessions(self):
+        have = self.cal.sessions_in_range('2024-01-01', '2024-03-29').delete([3, 20])
+        missing = self.cal.missing_sessions(have, '2024-01-01', '2024-03-31', asof='2024-12-31')
+        self.assertEqual(len(missing), 2)
+        # 週末 / 春節不算缺漏；asof 之後的交易日也不算
+        bdays = pd.bdate_range('2024-01-01', '2024-02-29')
+        self.assertEqual(len(self.cal.missing_sessions(bdays, '2024-01-01', '2024-03-31', asof='2024-02-29')), 0)
+        self.assertEqual(len(self.cal.missing_sessions([], '2024-02-06', '2024-02-14', asof='2024-12-31')), 0)
+
+    def test_holidays_outside_2023_2025(self):
+        for day in ['2026-01-01', '2026-02-16', '2026-02-20', '2026-04-03', '2026-05-01', '2026-06-19',
+                    '2026-09-25', '2026-10-09', '2019-02-28', '2019-10-11', '2021-12-31']:
+            self.assertFalse(self.cal.is_session(day), day)
+        bdays = pd.bdate_range('2019-01-01', '2026-10-09')
+        have = bdays[np.isin(bdays, self.cal.sessions_in_range('2019-01-01', '2026-10-09'))]
+        self.assertEqual(len(self.cal.missing_sessions(have, '2019-01-01', '2026-10-09', asof='2026-10-16')), 0)
+
+    def test_uncovered_years_fail_loudly(self):
+        with self.assertRaises(CalendarCoverageError):
+            self.cal.missing_sessions([], '2018-12-01', '2019-01-31', asof='2024-12-31')
+        missing = self.cal.missing_sessions([], '2018-12-01', '2019-01-31', asof='2024-12-31', strict=False)
+        self.assertEqual(missing[0], pd.Timestamp('2019-01-02'))
+        self.assertEqual(self.cal.uncovered_years('2017-06-01', '2020-01-01'), [2017, 2018])
+        self.assertEqual(TradingCalendar('2010-01-01', '2010-12-31').uncovered_years('2010-01-01', '2010-12-31'), [])
+
+    def test_last_complete_session(self):
+        before = datetime(2024, 2, 15, 13, 0)
+        after = datetime(2024, 2, 15, 15, 0)
+        self.assertEqual(self.cal.last_complete_session(before), pd.Timestamp('2024-02-05'))
+        self.assertEqual(self.cal.last_complete_session(after), pd.Timestamp('2024-02-15'))
+        self.assertEqual(self.cal.last_complete_session(datetime(2024, 2, 17, 10)), pd.Timestamp('2024-02-16'))
+
+    def test_half_days_extra_sessions_and_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'cal.csv'
+            path.write_text('date,kind,close\n2024-03-04,closed,\n2024-03-09,half_day,12:00\n2024-03-16,session,\n',
+                            encoding='utf-8')
+            adhoc = read_calendar_file(path)
+        cal = TradingCalendar('2024-01-01', '2024-12-31', **adhoc)
+        self.assertFalse(cal.is_session('2024-03-04'))
+        self.assertTrue(cal.is_session('2024-03-09'))
+        self.assertTrue(cal.is_half_day('2024-03-09'))
+        self.assertEqual(cal.close_time('2024-03-09'), dtime(12, 0))
+        self.assertEqual(cal.close_time('2024-03-11'), dtime(13, 30))
+        self.assertEqual(cal.next_session('2024-03-15'), pd.Timestamp('2024-03-16'))
+        self.assertEqual(cal.last_complete_session(datetime(2024, 3, 9, 13, 5)), pd.Timestamp('2024-03-09'))
+        with self.assertRaises(KeyError):
+            cal.next_session('2024-12-31')
+
+
+class TestValidateDateRange(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patch_dir = mock.patch.object(run_daily, 'ABSENT_DIR', Path(self.tmp.name))
+        self.patch_dir.start()
+
+    def tearDown(self):
+        self.patch_dir.stop()
+        self.tmp.cleanup()
+
+    def test_only_missing_span_is_fetched(self):
+        cal = twse_calendar()
+        full = cal.sessions_in_range('2024-01-02', '2024-06-28')
+        have = _ohlcv(full.delete(range(40, 45)))
+        calls = []
+
+        def fetch(symbol, start, end, source, refresh=False):
+            calls.append((start, end, refresh))
+            return _ohlcv(cal.sessions_in_range(start, end))
+
+        with mock.patch.object(run_daily, '_fetch_from_source', fetch):
+            out = run_daily.validate_date_range(have, '2330', '2024-01-01', '2024-06-28', 'twse')
+            self.assertEqual(calls, [(full[40].strftime('%Y-%m-%d'), full[44].strftime('%Y-%m-%d'), False)])
+            self.assertTrue(out.index.equals(full))
+            # 假日（春節、颱風）造成的空缺不觸發抓取
+            calls.clear()
+            run_daily.validate_date_range(_ohlcv(full), '2330', '2024-01-01', '2024-06-30', 'twse')
+            self.assertEqual(calls, [])
+
+    def test_still_missing_sessions_recorded(self):
+        cal = twse_calendar()
+        full = cal.sessions_in_range('2026-01-02', '2026-06-30')
+        suspended = full[50:55]
+        calls = []
+
+        def fetch(symbol, start, end, source, refresh=False):
+            calls.append((start, end))
+            return _ohlcv(cal.sessions_in_range(start, end).difference(suspended))
+
+        with mock.patch.object(run_daily, '_fetch_from_source', fetch):
+            out = run_daily.validate_date_range(_ohlcv(full[:40]), '2330.TW', '2026-01-01', '2026-06-30', 'yf')
+            self.assertEqual(len(calls), 1)
+            self.assertTrue(out.index.equals(full.difference(suspended)))
+            self.assertTrue((Path(self.tmp.name) / 'yf' / '2330.absent.json').exists())
+            run_daily.validate_date_range(out, '2330', '2026-01-01', '2026-06-30', 'yf')
+            self.assertEqual(len(calls), 1)
+
+    def test_uncovered_years_fall_back_to_bounds(self):
+        calls = []
+
+        def fetch(symbol, start, end, source, refresh=False):
+            calls.append((start, end, refresh))
+            return _ohlcv(pd.bdate_range(start, end))
+
+        with mock.patch.object(run_daily, '_fetch_from_source', fetch):
+            run_daily.validate_date_range(_ohlcv(pd.bdate_range('2017-01-03', '2017-06-29')), '2330',
+                                          '2017-01-03', '2017-06-30', 'yf')
+            self.assertEqual(calls, [])
+            run_daily.validate_date_range(_ohlcv(pd.bdate_range('2017-01-03', '2017-05-31')), '2330',
+                                          '2017-01-03', '2017-06-30', 'yf')
+            self.assertEqual(calls, [('2017-01-03', '2017-06-30', True)])
+
+
+class TestTwseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patch_dir = mock.patch.object(twse, 'CACHE_DIR', Path(self.tmp.name))
+        self.patch_dir.start()
+        self.calls = []
+        self.suspended = set()
+        cal = twse_calendar()
+
+        def month(symbol, year, mon):
+            self.calls.append((year, mon))
+            first = pd.Timestamp(year, mon, 1)
+            days = cal.sessions_in_range(first, first + pd.offsets.MonthEnd(0))
+            return _ohlcv(days.difference(pd.DatetimeIndex(sorted(self.suspended))))
+
+        self.patch_fetch = mock.patch.object(twse, 'fetch_twse_month', month)
+        self.patch_fetch.start()
+
+    def tearDown(self):
+        self.patch_fetch.stop()
+        self.patch_dir.stop()
+        self.tmp.cleanup()
+
+    def test_incremental_months_only(self):
+        self.suspended = {pd.Timestamp('2024-03-12'), pd.Timestamp('2024-03-13')}   # 停牌
+        df = twse.fetch_twse_range_cached('2330', '2024-01-01', '2024-04-30')
+        self.assertEqual(self.calls, [(2024, 1), (2024, 2), (2024, 3), (2024, 4)])
+        self.assertEqual(len(df), twse_calendar().session_count('2024-01-01', '2024-04-30') - 2)
+        # 已完整抓過的月份即使有停牌缺漏也不再重抓；只抓新的月份
+        self.calls.clear()
+        twse.fetch_twse_range_cached('2330', '2024-01-01', '2024-05-31')
+        self.assertEqual(self.calls, [(2024, 5)])
+        self.calls.clear()
+        twse.fetch_twse_range_cached('2330', '2024-02-01', '2024-05-31')
+        self.assertEqual(self.calls, [])
+        twse.fetch_twse_range_cached('2330', '2024-02-01', '2024-03-31', refresh=True)
+        self.assertEqual(self.calls, [(2024, 2), (2024, 3)])
+        # refresh 只覆寫重抓的月份，其餘快取保留
+        self.assertEqual(len(twse.fetch_twse_range_cached('2330', '2024-01-01', '2024-05-31')),
+                         twse_calendar().session_count('2024-01-01', '2024-05-31') - 2)
+
+    def test_uncovered_year_months_fetched_once(self):
+        twse.fetch_twse_range_cached('2330', '2018-11-01', '2019-01-31')
+        self.assertEqual(self.calls, [(2018, 11), (2018, 12), (2019, 1)])
+        self.calls.clear()
+        twse.fetch_twse_range_cached('2330', '2018-11-01', '2019-01-31')
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
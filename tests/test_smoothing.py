@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.app.features import smoothing
+from src.app.features.indicators import ema, wilder_rsi, macd, atr, bollinger
+
+
+class TestSmoothing(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.close = pd.Series(100 + rng.standard_normal(600).cumsum(), index=pd.date_range('2020-01-01', periods=600))
+        self.high = self.close + rng.uniform(0, 2, 600)
+        self.low = self.close - rng.uniform(0, 2, 600)
+
+    def test_ema_matches_pandas(self):
+        for span in (3, 12, 200):
+            ref = self.close.ewm(span=span, adjust=False).mean()
+            np.testing.assert_allclose(ema(self.close, span), ref, rtol=1e-10)
+
+    def test_nan_gaps_match_pandas_ignore_na(self):
+        s = self.close.copy()
+        s.iloc[:5] = np.nan
+        s.iloc[50:60] = np.nan
+        out, _ = smoothing.ewm_filter(s.to_numpy(), 0.2, min_periods=3)
+        ref = s.ewm(alpha=0.2, adjust=False, ignore_na=True, min_periods=3).mean()
+        np.testing.assert_allclose(out, ref, rtol=1e-10)
+
+    def test_wilder_rsi_matches_reference(self):
+        delta = self.close.diff()
+        g = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        l_ = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        ref = 100 - 100 / (1 + g / l_)
+        np.testing.assert_allclose(wilder_rsi(self.close, 14), ref, rtol=1e-10)
+
+    def test_macd_matches_pandas(self):
+        line, sig, hist = macd(self.close)
+        ref = self.close.ewm(span=12, adjust=False).mean() - self.close.ewm(span=26, adjust=False).mean()
+        np.testing.assert_allclose(line, ref, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(sig, ref.ewm(span=9, adjust=False).mean(), rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(hist, line - sig, atol=1e-12)
+
+    def test_atr_matches_reference(self):
+        prev = self.close.shift(1)
+        tr = pd.concat([self.high - self.low, (self.high - prev).abs(), (self.low - prev).abs()], axis=1).max(axis=1)
+        ref = tr.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        np.testing.assert_allclose(atr(self.high, self.low, self.close, 14), ref, rtol=1e-10)
+
+    def test_panel_equals_per_column(self):
+        panel = pd.DataFrame({'a': self.close, 'b': self.close[::-1].to_numpy()}, index=self.close.index)
+        panel.iloc[:30, 1] = np.nan  # 晚上市的股票
+        out = wilder_rsi(panel, 14)
+        for col in panel.columns:
+            np.testing.assert_allclose(out[col], wilder_rsi(panel[col], 14), rtol=1e-12)
+
+    def test_resume_equals_full(self):
+        c = self.close.to_numpy()
+        full, _ = smoothing.rsi_wilder(c, 14)
+        a, st = smoothing.rsi_wilder(c[:5], 14)  # 尚未達 min_periods 即中斷
+        b, st = smoothing.rsi_wilder(c[5:300], 14, state=st)
+        d, _ = smoothing.rsi_wilder(c[300:], 14, state=st)
+        np.testing.assert_allclose(np.concatenate([a, b, d]), full, rtol=1e-10)
+        (l1, _, _), ms = smoothing.macd(c[:100])
+        (l2, _, _), _ = smoothing.macd(c[100:], state=ms)
+        (lf, _, _), _ = smoothing.macd(c)
+        np.testing.assert_allclose(np.concatenate([l1, l2]), lf, rtol=1e-10)
+
+    def test_bollinger(self):
+        mid, up, lo = bollinger(self.close, 20, 2.0)
+        self.assertEqual(len(mid), len(self.close))
+        self.assertTrue(((up - lo).dropna() >= 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.app.backtest.engine import backtest_engine, backtest_matrix
+from src.app.performance.metrics import basic_report
+from src.app.strategies import (MeanReversionStrategy, MomentumStrategy, PositionBatch, Strategy, param_grid,
+                                regime_switch, sweep, vote, weighted_average)
+
+
+def _panel(n=300, symbols=('2330', '2317', '2454', '0050')):
+    rng = np.random.default_rng(4)
+    idx = pd.bdate_range('2023-01-02', periods=n, name='date')
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, len(symbols))), axis=0)),
+                         index=idx, columns=list(symbols))
+    close.iloc[:40, 1] = np.nan          # 較晚上市
+    close.iloc[100:103, 2] = np.nan      # 停牌
+    close.iloc[150:160, 3] = close.iloc[150, 3]   # 平盤：收盤 == 均線
+    return close
+
+
+class _Breakout(Strategy):
+    def __init__(self, window: int = 10):
+        self.window = window
+
+    def generate_positions(self, df):
+        hi = df['close'].rolling(self.window).max().shift(1)
+        return (df['close'] > hi).astype(float)
+
+
+class TestBatchPositions(unittest.TestCase):
+    def setUp(self):
+        self.close = _panel()
+        self.params = param_grid(lookback=[1, 5, 20, 60, 5])
+
+    def _assert_matches_single(self, cls, values, params):
+        for i, p in enumerate(params):
+            for j, sym in enumerate(self.close.columns):
+                single = cls(**p).generate_positions(self.close[[sym]].rename(columns={sym: 'close'}))
+                np.testing.assert_array_equal(values[i, :, j], single.to_numpy(dtype=float), err_msg=f"{p} {sym}")
+
+    def test_native_batches_match_single_series(self):
+        for cls in (MomentumStrategy, MeanReversionStrategy):
+            with self.subTest(strategy=cls.__name__):
+                values = cls.batch_positions(self.close, self.params)
+                self.assertEqual(values.shape, (5, *self.close.shape))
+                self.assertEqual(values.dtype, np.int8)
+                self._assert_matches_single(cls, values, self.params)
+
+    def test_default_batch_and_series_input(self):
+        params = param_grid(window=[5, 20])
+        self._assert_matches_single(_Breakout, _Breakout.batch_positions(self.close, params), params)
+        one = MomentumStrategy.batch_positions(self.close['2330'], [{'lookback': 5}])
+        self.assertEqual(one.shape, (1, len(self.close), 1))
+        with self.assertRaises(TypeError):
+            MomentumStrategy.batch_positions(self.close, [{'window': 5}])
+
+    def test_position_batch_stacking(self):
+        batch = PositionBatch.build(MomentumStrategy, self.close, self.params[:3])
+        stacked = batch.stacked()
+        self.assertEqual(stacked.shape, (len(self.close), 3 * 4))
+        self.assertEqual(stacked.columns[5], ('lookback=5', '2317'))
+        pd.testing.assert_series_equal(stacked[('lookback=20', '2454')], batch.positions(2, '2454'),
+                                       check_names=False, check_dtype=False)
+
+
+class TestCombinators(unittest.TestCase):
+    def setUp(self):
+        # 3 組 × 4 bar × 2 檔
+        self.values = np.array([
+            [[1, 1], [1, -1], [0, -1], [-1, 0]],
+            [[1, -1], [1, -1], [0, 1], [-1, 0]],
+            [[-1, 1], [0, -1], [1, 1], [1, 0]],
+        ], dtype=np.int8)
+
+    def test_vote(self):
+        np.testing.assert_array_equal(vote(self.values), [[1, 1], [1, -1], [1, 1], [-1, 0]])
+        np.testing.assert_array_equal(vote(self.values, min_agree=2), [[1, 1], [1, -1], [0, 1], [-1, 0]])
+
+    def test_weighted_average(self):
+        out = weighted_average(self.values, [0.5, 0.25, 0.25])
+        np.testing.assert_allclose(out[0], [0.5, 0.5])
+        np.testing.assert_allclose(out[3], [-0.5, 0.0])
+        # 隨時間變動的權重：第 2 個 bar 之後只用第 3 組
+        w = np.ones((3, 4))
+        w[:2, 2:] = 0
+        np.testing.assert_allclose(weighted_average(self.values, w)[2:], self.values[2, 2:])
+
+    def test_regime_switch(self):
+        out = regime_switch(self.values, np.array([0, 2, -1, 1]))
+        np.testing.assert_array_equal(out, [[1, 1], [0, -1], [0, 0], [-1, 0]])
+        per_symbol = np.array([[0, 1], [1, 2], [2, 0], [0, 0]])
+        np.testing.assert_array_equal(regime_switch(self.values, per_symbol), [[1, -1], [1, -1], [1, -1], [-1, 0]])
+
+
+class TestSweep(unittest.TestCase):
+    def test_matches_single_backtests(self):
+        close = _panel().ffill().bfill()
+        costs = {'fee_bps': 2.8, 'tax_bps': 30.0, 'slippage_bps': 5.0}
+        params = param_grid(lookback=[5, 20])
+        table = sweep(MomentumStrategy, close, params, costs)
+        self.assertEqual(len(table), 2 * close.shape[1])
+        for p in params:
+            for sym in close.columns:
+                df = close[[sym]].rename(columns={sym: 'close'})
+                bt = backtest_engine(df, MomentumStrategy(**p).generate_positions(df), 2.8, 30.0, 5.0)
+                row = table.loc[(f"lookback={p['lookback']}", sym)]
+                rpt = basic_report(bt)
+                self.assertAlmostEqual(row['sharpe'], rpt['sharpe'])
+                self.assertAlmostEqual(row['cumulative_return'], rpt['cumulative_return'])
+                self.assertAlmostEqual(row['turnover_sum'], rpt['turnover_sum'])
+        pos = MomentumStrategy.batch_positions(close, params).astype(float)
+        ret = backtest_matrix(close, pos, 2.8, 30.0, 5.0)
+        bt = backtest_engine(close[['2330']].rename(columns={'2330': 'close'}),
+                             pd.Series(pos[0, :, 0], index=close.index), 2.8, 30.0, 5.0)
+        np.testing.assert_array_equal(ret[0, :, 0], bt['ret'].to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from src.app.ops import telemetry
+from src.app.ops.telemetry import MetricsMiddleware, Registry
+
+
+def _lines(text, prefix):
+    return [l for l in text.splitlines() if l.startswith(prefix)]
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.reg = Registry()
+
+    def test_counter_and_gauge(self):
+        c = self.reg.counter('hits_total', 'hits', ['cache', 'result'])
+        c.labels('reports', 'hit').inc()
+        c.labels('reports', 'hit').inc(2)
+        c.labels('reports', 'miss').inc()
+        g = self.reg.gauge('depth', 'queue depth')
+        g.set(5)
+        g.dec()
+        text = self.reg.render()
+        self.assertIn('# TYPE hits_total counter', text)
+        self.assertIn('hits_total{cache="reports",result="hit"} 3', text)
+        self.assertIn('hits_total{cache="reports",result="miss"} 1', text)
+        self.assertIn('# TYPE depth gauge\ndepth 4', text)
+        self.assertIs(self.reg.counter('hits_total'), c)
+        with self.assertRaises(ValueError):
+            self.reg.gauge('hits_total')
+        with self.assertRaises(ValueError):
+            c.labels('only-one')
+
+    def test_histogram_buckets_are_cumulative(self):
+        h = self.reg.histogram('lat_seconds', 'latency', ['stage'], buckets=(0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 3.0):
+            h.labels('fetch').observe(v)
+        text = self.reg.render()
+        self.assertEqual(_lines(text, 'lat_seconds_bucket'), [
+            'lat_seconds_bucket{stage="fetch",le="0.1"} 2',
+            'lat_seconds_bucket{stage="fetch",le="1"} 3',
+            'lat_seconds_bucket{stage="fetch",le="+Inf"} 4',
+        ])
+        self.assertIn('lat_seconds_count{stage="fetch"} 4', text)
+        self.assertIn('lat_seconds_sum{stage="fetch"} 3.65', text)
+
+    def test_label_escaping_and_collectors(self):
+        g = self.reg.gauge('jobs', 'jobs', ['status'])
+        self.reg.on_collect(lambda: g.labels('a"b\\c').set(7))
+        self.assertIn('jobs{status="a\\"b\\\\c"} 7', self.reg.render())
+
+
+class TestStage(unittest.TestCase):
+    def _count(self, name):
+        return telemetry.STAGE_SECONDS.labels(name).counts[:]
+
+    def test_stage_records_latency_and_errors(self):
+        before = sum(self._count('unit-test'))
+        with telemetry.stage('unit-test'):
+            pass
+        with self.assertRaises(RuntimeError):
+            with telemetry.stage('unit-test'):
+                raise RuntimeError('boom')
+
+        @telemetry.timed('unit-test')
+        def work(x):
+            return x * 2
+
+        self.assertEqual(work(3), 6)
+        self.assertEqual(sum(self._count('unit-test')) - before, 3)
+        text = telemetry.REGISTRY.render()
+        self.assertIn('app_stage_errors_total{stage="unit-test"} 1', text)
+        self.assertIn('app_stage_seconds_count{stage="unit-test"}', text)
+
+
+class TestMiddleware(unittest.TestCase):
+    def _run(self, app, path='/api/jobs/abc'):
+        sent = []
+
+        async def send(msg):
+            sent.append(msg)
+
+        async def receive():
+            return {'type': 'http.request'}
+
+        scope = {'type': 'http', 'method': 'GET', 'path': path}
+        asyncio.run(MetricsMiddleware(app)(scope, receive, send))
+        return scope, sent
+
+    def test_route_template_label_and_status(self):
+        async def app(scope, receive, send):
+            scope['route'] = SimpleNamespace(path='/api/jobs/{job_id}')
+            await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b''})
+
+        _, sent = self._run(app)
+        self.assertEqual(sent[0]['status'], 404)
+        child = telemetry.HTTP_SECONDS.labels('GET', '/api/jobs/{job_id}', 404)
+        self.assertEqual(sum(child.counts), 1)
+        self.assertEqual(telemetry.HTTP_IN_PROGRESS._default.value, 0)
+
+    def test_exception_counts_as_500(self):
+        before = sum(telemetry.HTTP_SECONDS.labels('GET', 'unmatched', 500).counts)
+
+        async def app(scope, receive, send):
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            self._run(app, path='/nope')
+        self.assertEqual(sum(telemetry.HTTP_SECONDS.labels('GET', 'unmatched', 500).counts) - before, 1)
+        self.assertEqual(telemetry.HTTP_IN_PROGRESS._default.value, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
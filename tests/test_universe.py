@@ -0,0 +1,70 @@
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.app.data.ratelimit import RateLimiter
+from src.app.ops import run_daily
+from src.app.ops.universe import read_universe, run_universe
+
+
+def _fake_source(calls):
+    def fetch(symbol, start, end, source, refresh=False):
+        calls[symbol] = calls.get(symbol, 0) + 1
+        if symbol == 'BAD':
+            raise ConnectionError('boom')
+        if symbol == 'FLAKY' and calls[symbol] == 1:
+            raise ConnectionError('transient')
+        idx = pd.bdate_range(start, end, name='date')
+        rng = np.random.default_rng(sum(map(ord, symbol)))
+        close = 100 * np.exp(rng.standard_normal(len(idx)).cumsum() * 0.01)
+        return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1.0}, index=idx)
+    return fetch
+
+
+class TestUniverse(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_isolation_retry_and_consolidated_table(self):
+        calls = {}
+        with mock.patch.object(run_daily, '_fetch_from_source', _fake_source(calls)):
+            res = run_universe(['2330', 'FLAKY', 'BAD', '2317'], '2024-01-01', '2024-06-28', out_dir=self.out,
+                               workers=1, rate_per_sec=None, retries=1, retry_backoff=0, reports=False)
+        self.assertEqual(sorted(res.metrics.index), ['2317', '2330', 'FLAKY'])
+        self.assertIn('BAD', res.errors)
+        self.assertEqual(calls['BAD'], 2)
+        self.assertEqual(res.metrics.loc['FLAKY', 'attempts'], 2)
+        for col in ('sharpe', 'max_drawdown', 'trades', 'win_rate'):
+            self.assertIn(col, res.metrics.columns)
+        saved = pd.read_csv(res.metrics_path, index_col='symbol')
+        self.assertEqual(len(saved), 3)
+
+    def test_reports_per_symbol(self):
+        with mock.patch.object(run_daily, '_fetch_from_source', _fake_source({})):
+            res = run_universe(['2330.TW'], '2024-01-01', '2024-03-29', out_dir=self.out, workers=1,
+                               rate_per_sec=None, reports=True)
+        self.assertTrue(Path(res.artifacts['2330.TW']['interactive']).exists())
+        self.assertEqual(Path(res.artifacts['2330.TW']['chart']).parent.name, '2330_TW')
+
+    def test_read_universe(self):
+        p = self.out / 'u.csv'
+        p.write_text('symbol,name\n2330,TSMC\n# comment\n\n2317,Hon Hai\n2330,dup\n', encoding='utf-8')
+        self.assertEqual(read_universe(p), ['2330', '2317'])
+
+    def test_rate_limiter_spacing(self):
+        lim = RateLimiter(50.0)
+        t0 = time.perf_counter()
+        for _ in range(6):
+            lim.acquire()
+        self.assertGreaterEqual(time.perf_counter() - t0, 5 / 50.0 * 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
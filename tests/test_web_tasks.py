@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.app.backtest.cache import BacktestCache
+from src.app.visual.artifacts import ArtifactCache
+from src.web import tasks
+
+
+def _ohlcv(n=120):
+    idx = pd.bdate_range('2024-01-01', periods=n, name='date')
+    close = 100 + np.random.default_rng(3).standard_normal(n).cumsum()
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1.0}, index=idx)
+
+
+class TestBacktestTask(unittest.TestCase):
+    def test_cost_change_rerenders_report(self):
+        params = {'symbol': '2330.TW', 'start': '2024-01-01', 'end': '2024-06-30', 'lookback': 5}
+        with tempfile.TemporaryDirectory() as tmp:
+            reports = ArtifactCache(Path(tmp) / 'reports')
+            reports.url_for = lambda path: path.as_posix()
+            with mock.patch.object(tasks, 'fetch_ohlcv_yf', return_value=_ohlcv()), \
+                    mock.patch.object(tasks, 'backtest_cache', BacktestCache(Path(tmp) / 'bt')), \
+                    mock.patch.object(tasks, 'report_cache', reports):
+                first = tasks.backtest_task(params)
+                self.assertTrue(tasks.backtest_task(params)['cached'])
+                with mock.patch.object(tasks.settings, 'tx_fee_bps', tasks.settings.tx_fee_bps + 50):
+                    changed = tasks.backtest_task(params)
+        self.assertFalse(changed['cached'])
+        self.assertFalse(changed['backtest_cached'])
+        self.assertNotEqual(changed['report_html'], first['report_html'])
+        self.assertNotEqual(changed['metrics'], first['metrics'])
+
+
+if __name__ == '__main__':
+    unittest.main()